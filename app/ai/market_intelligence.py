@@ -21,6 +21,7 @@ import openai
 
 from app.core.config import settings
 from app.core.enterprise_architecture import PerformanceConfig, ServiceTier
+from app.core.performance import performance_system
 from app.ai.technical_analyzer import TechnicalAnalyzer
 from app.ai.news_processor import NewsProcessor
 from app.ai.sentiment_analyzer import SentimentAnalyzer
@@ -150,6 +151,12 @@ class MarketIntelligenceEngine:
             logger.error(f"❌ Failed to initialize Market Intelligence: {str(e)}")
             raise
     
+    @performance_system.cache_result(
+        ttl=1,
+        key_generator=lambda self: "market_overview:nifty",
+        stale_while_revalidate=5,
+        early_refresh_beta=1.0
+    )
     async def get_real_time_market_overview(self) -> Dict[str, Any]:
         """Get comprehensive real-time market overview with AI insights"""
         
@@ -18,6 +18,8 @@ import logging
 from pathlib import Path
 import time
 import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -133,6 +135,24 @@ class StrategyPerformance:
     updated_at: datetime = field(default_factory=datetime.now)
 
 
+@dataclass
+class PrecomputedSignals:
+    """Per-bar signal fields for one price history, computed in a single vectorized pass
+    
+    Row ``i`` holds what ``generate_signal`` would return given the bars up to and
+    including ``i`` (direction 0 where it would return None).
+    """
+    direction: np.ndarray  # +1 buy, -1 sell, 0 no signal
+    entry_price: np.ndarray
+    confidence: np.ndarray
+    strength: np.ndarray
+    target_price: np.ndarray
+    stop_loss: np.ndarray
+    position_size: float
+    expires_after: timedelta
+    metadata: Dict[str, np.ndarray] = field(default_factory=dict)
+
+
 @dataclass
 class MarketData:
     """Market data structure"""
@@ -149,76 +169,150 @@ class MarketData:
     spread: Optional[float] = None
 
 
+@dataclass
+class FeatureState:
+    """Incremental technical feature state for one (symbol, timeframe)
+    
+    Bars and feature rows live in growable numpy columns. A new row only reads the
+    trailing window it needs (at most 200 bars), so appending costs the same at any
+    history length.
+    """
+    columns: List[str]  # public feature columns, in generate_technical_features order
+    quotes: bool  # bid/ask present, fixed by the first bars seen
+    size: int = 0
+    bars: Dict[str, np.ndarray] = field(default_factory=dict)
+    features: Dict[str, np.ndarray] = field(default_factory=dict)
+    
+    BAR_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+    QUOTE_FIELDS = ('bid', 'ask')
+    # MACD legs are not output columns but are needed to extend the EMAs
+    INTERNAL_COLUMNS = ('_ema_12', '_ema_26')
+    
+    @property
+    def bar_fields(self) -> Tuple[str, ...]:
+        return self.BAR_FIELDS + (self.QUOTE_FIELDS if self.quotes else ())
+    
+    def reserve(self, size: int):
+        """Grow every column to hold at least ``size`` rows, doubling capacity"""
+        capacity = len(self.bars['close']) if self.bars else 0
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 64)
+        
+        for name in self.bar_fields:
+            grown = np.empty(capacity, dtype=np.int64 if name == 'timestamp' else np.float64)
+            if name in self.bars:
+                grown[:self.size] = self.bars[name][:self.size]
+            self.bars[name] = grown
+        for name in self.columns + list(self.INTERNAL_COLUMNS):
+            grown = np.full(capacity, np.nan)
+            if name in self.features:
+                grown[:self.size] = self.features[name][:self.size]
+            self.features[name] = grown
+    
+    def set_bar(self, i: int, values: Dict[str, Any]):
+        """Store one bar at row ``i``"""
+        for name in self.bar_fields:
+            self.bars[name][i] = values[name]
+    
+    def find(self, timestamp: int) -> int:
+        """Row holding ``timestamp``, or where it would be inserted"""
+        return int(np.searchsorted(self.bars['timestamp'][:self.size], timestamp))
+    
+    def row(self, i: int) -> Dict[str, float]:
+        return {name: float(self.features[name][i]) for name in self.columns}
+
+
 class FeatureEngineer:
     """Advanced feature engineering for ML strategies"""
     
+    # Present once generate_technical_features / generate_sentiment_features have run
+    TECHNICAL_MARKER = 'rsi_14'
+    SENTIMENT_MARKER = 'news_sentiment'
+    
     def __init__(self):
         """Initialize feature engineer"""
         self.feature_cache = {}
     
     async def generate_technical_features(self, data: pd.DataFrame) -> pd.DataFrame:
         """Generate comprehensive technical analysis features"""
-        df = data.copy()
+        return self._merge_features(data, self._technical_feature_columns(data))
+    
+    def _technical_feature_columns(self, df: pd.DataFrame) -> Dict[str, pd.Series]:
+        """Vectorized technical feature columns over the whole history"""
+        close = df['close']
+        
+        # Features are collected and joined once; inserting ~50 columns one by one dominates the cost
+        f = {}
         
         # Price-based features
-        df['returns'] = df['close'].pct_change()
-        df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
-        df['price_change'] = df['close'] - df['open']
-        df['price_range'] = df['high'] - df['low']
-        df['body_size'] = abs(df['close'] - df['open'])
-        df['upper_shadow'] = df['high'] - np.maximum(df['open'], df['close'])
-        df['lower_shadow'] = np.minimum(df['open'], df['close']) - df['low']
+        f['returns'] = close.pct_change()
+        f['log_returns'] = np.log(close / close.shift(1))
+        f['price_change'] = close - df['open']
+        f['price_range'] = df['high'] - df['low']
+        f['body_size'] = abs(close - df['open'])
+        f['upper_shadow'] = df['high'] - np.maximum(df['open'], close)
+        f['lower_shadow'] = np.minimum(df['open'], close) - df['low']
         
         # Moving averages
         for period in [5, 10, 20, 50, 100, 200]:
-            df[f'sma_{period}'] = df['close'].rolling(window=period).mean()
-            df[f'ema_{period}'] = df['close'].ewm(span=period).mean()
-            df[f'price_to_sma_{period}'] = df['close'] / df[f'sma_{period}']
+            f[f'sma_{period}'] = close.rolling(window=period).mean()
+            f[f'ema_{period}'] = close.ewm(span=period).mean()
+            f[f'price_to_sma_{period}'] = close / f[f'sma_{period}']
         
         # Volatility features
-        df['volatility_10'] = df['returns'].rolling(window=10).std()
-        df['volatility_20'] = df['returns'].rolling(window=20).std()
-        df['parkinson_vol'] = np.sqrt(np.log(df['high'] / df['low']) ** 2 / (4 * np.log(2)))
+        f['volatility_10'] = f['returns'].rolling(window=10).std()
+        f['volatility_20'] = f['returns'].rolling(window=20).std()
+        f['parkinson_vol'] = np.sqrt(np.log(df['high'] / df['low']) ** 2 / (4 * np.log(2)))
         
         # Momentum indicators
-        df['rsi_14'] = self._calculate_rsi(df['close'], 14)
-        df['rsi_21'] = self._calculate_rsi(df['close'], 21)
-        df['momentum_10'] = df['close'] / df['close'].shift(10) - 1
-        df['momentum_20'] = df['close'] / df['close'].shift(20) - 1
+        f['rsi_14'] = self._calculate_rsi(close, 14)
+        f['rsi_21'] = self._calculate_rsi(close, 21)
+        f['momentum_10'] = close / close.shift(10) - 1
+        f['momentum_20'] = close / close.shift(20) - 1
         
         # MACD
-        ema_12 = df['close'].ewm(span=12).mean()
-        ema_26 = df['close'].ewm(span=26).mean()
-        df['macd'] = ema_12 - ema_26
-        df['macd_signal'] = df['macd'].ewm(span=9).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
+        ema_12 = close.ewm(span=12).mean()
+        ema_26 = close.ewm(span=26).mean()
+        f['macd'] = ema_12 - ema_26
+        f['macd_signal'] = f['macd'].ewm(span=9).mean()
+        f['macd_histogram'] = f['macd'] - f['macd_signal']
         
         # Bollinger Bands
-        sma_20 = df['close'].rolling(window=20).mean()
-        std_20 = df['close'].rolling(window=20).std()
-        df['bb_upper'] = sma_20 + (2 * std_20)
-        df['bb_lower'] = sma_20 - (2 * std_20)
-        df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
+        sma_20 = close.rolling(window=20).mean()
+        std_20 = close.rolling(window=20).std()
+        f['bb_upper'] = sma_20 + (2 * std_20)
+        f['bb_lower'] = sma_20 - (2 * std_20)
+        f['bb_position'] = (close - f['bb_lower']) / (f['bb_upper'] - f['bb_lower'])
         
         # Volume features
-        df['volume_sma_20'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / df['volume_sma_20']
-        df['price_volume'] = df['close'] * df['volume']
-        df['vwap'] = (df['price_volume'].rolling(window=20).sum() / 
+        f['volume_sma_20'] = df['volume'].rolling(window=20).mean()
+        f['volume_ratio'] = df['volume'] / f['volume_sma_20']
+        f['price_volume'] = close * df['volume']
+        f['vwap'] = (f['price_volume'].rolling(window=20).sum() / 
                      df['volume'].rolling(window=20).sum())
         
         # Advanced features
-        df['atr_14'] = self._calculate_atr(df, 14)
-        df['stochastic_k'] = self._calculate_stochastic(df, 14)
-        df['williams_r'] = self._calculate_williams_r(df, 14)
+        f['atr_14'] = self._calculate_atr(df, 14)
+        f['stochastic_k'] = self._calculate_stochastic(df, 14)
+        f['williams_r'] = self._calculate_williams_r(df, 14)
         
         # Market microstructure (if bid/ask available)
         if 'bid' in df.columns and 'ask' in df.columns:
-            df['spread'] = df['ask'] - df['bid']
-            df['mid_price'] = (df['bid'] + df['ask']) / 2
-            df['price_to_mid'] = df['close'] / df['mid_price']
+            f['spread'] = df['ask'] - df['bid']
+            f['mid_price'] = (df['bid'] + df['ask']) / 2
+            f['price_to_mid'] = close / f['mid_price']
         
-        return df
+        return f
+    
+    @staticmethod
+    def _merge_features(df: pd.DataFrame, f: Dict[str, Any]) -> pd.DataFrame:
+        """Recomputed columns replace existing ones in place, new ones are appended in order"""
+        existing = [name for name in f if name in df.columns]
+        df = df.copy()
+        for name in existing:
+            df[name] = f.pop(name)
+        return pd.concat([df, pd.DataFrame(f, index=df.index)], axis=1)
     
     def _calculate_rsi(self, prices: pd.Series, period: int) -> pd.Series:
         """Calculate Relative Strength Index"""
@@ -248,15 +342,239 @@ class FeatureEngineer:
         lowest_low = df['low'].rolling(window=period).min()
         return -100 * (highest_high - df['close']) / (highest_high - lowest_low)
     
+    # ---- Incremental feature store ----
+    
+    # Recomputing more rows than this at once falls back to one vectorized pass
+    INCREMENTAL_MAX_ROWS = 256
+    
+    async def update_technical_features(
+        self,
+        symbol: str,
+        timeframe: Any,
+        data: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Coroutine form of technical_feature_frame"""
+        return self.technical_feature_frame(symbol, timeframe, data)
+    
+    def technical_feature_frame(self, symbol: str, timeframe: Any, data: pd.DataFrame) -> pd.DataFrame:
+        """generate_technical_features for a growing history, computing only new or revised rows
+        
+        Bars are matched by the ``timestamp`` column (or the index when there is none).
+        A frame whose first bar is a stored bar continues the history from there, so a
+        sliding window that drops bars at the front still reuses the stored rows; its
+        features then keep the warm-up of the older stored bars. Rows from the first
+        bar that differs from the stored history onwards are recomputed, so revisions
+        of any earlier bar are picked up. A frame starting at a bar that is not stored
+        rebuilds the history from that frame.
+        """
+        timestamps = data['timestamp'] if 'timestamp' in data.columns else data.index
+        incoming = {'timestamp': self._timestamps_ns(timestamps)}
+        quotes = all(name in data.columns for name in FeatureState.QUOTE_FIELDS)
+        for name in FeatureState.BAR_FIELDS[1:] + (FeatureState.QUOTE_FIELDS if quotes else ()):
+            incoming[name] = data[name].to_numpy(dtype=np.float64)
+        
+        key = (symbol, timeframe)
+        state = self.feature_cache.get(key)
+        if state is None or state.quotes != quotes:
+            state = self.feature_cache[key] = self._new_feature_state(quotes)
+        
+        # Stored row of the frame's first bar
+        offset = state.find(incoming['timestamp'][0]) if state.size and len(data) else state.size
+        if offset == state.size or state.bars['timestamp'][offset] != incoming['timestamp'][0]:
+            offset = state.size = 0
+        end = offset + len(data)
+        state.reserve(end)
+        
+        # First row where the stored history and the incoming frame disagree
+        overlap = min(state.size - offset, len(data))
+        start = overlap
+        for name in state.bar_fields:
+            stored, new = state.bars[name][offset:offset + overlap], incoming[name][:overlap]
+            changed = np.flatnonzero((stored != new) & ~(pd.isna(stored) & pd.isna(new)))
+            if len(changed):
+                start = min(start, int(changed[0]))
+        
+        state.size = offset + start
+        for name in state.bar_fields:
+            state.bars[name][offset + start:end] = incoming[name][start:]
+        self._extend_features(state, offset + start, end)
+        
+        return self._merge_features(data, {
+            name: state.features[name][offset:end] for name in state.columns
+        })
+    
+    def append_bar(self, symbol: str, timeframe: Any, bar: Dict[str, Any]) -> Dict[str, float]:
+        """Add or revise one bar and return its feature row
+        
+        A bar with the latest stored timestamp replaces that bar; an earlier timestamp
+        revises history and recomputes every row after it. Bid/ask features are kept
+        only if the first bar for the key carried them.
+        """
+        key = (symbol, timeframe)
+        state = self.feature_cache.get(key)
+        if state is None:
+            quotes = all(bar.get(name) is not None for name in FeatureState.QUOTE_FIELDS)
+            state = self.feature_cache[key] = self._new_feature_state(quotes)
+        
+        values = {name: np.nan if bar.get(name) is None else bar[name] for name in state.bar_fields}
+        values['timestamp'] = pd.Timestamp(bar['timestamp']).as_unit('ns').value
+        
+        i = state.find(values['timestamp']) if state.size else 0
+        if i < state.size and state.bars['timestamp'][i] != values['timestamp']:
+            raise ValueError(f"Bar at {bar['timestamp']} for {symbol} is older than the stored history")
+        
+        end = max(state.size, i + 1)
+        state.reserve(end)
+        state.set_bar(i, values)
+        state.size = i
+        self._extend_features(state, i, end)
+        return state.row(i)
+    
+    def invalidate(self, symbol: str, timeframe: Any = None):
+        """Drop incremental state for a symbol (every timeframe unless one is given)"""
+        for key in [k for k in self.feature_cache if k[0] == symbol and timeframe in (None, k[1])]:
+            del self.feature_cache[key]
+    
+    def _new_feature_state(self, quotes: bool) -> FeatureState:
+        sample = pd.DataFrame({name: [1.0] for name in FeatureState.BAR_FIELDS[1:]})
+        if quotes:
+            sample['bid'] = sample['ask'] = 1.0
+        return FeatureState(columns=list(self._technical_feature_columns(sample)), quotes=quotes)
+    
+    @staticmethod
+    def _timestamps_ns(values) -> np.ndarray:
+        return pd.DatetimeIndex(values).as_unit('ns').asi8
+    
+    def _extend_features(self, state: FeatureState, start: int, end: int):
+        """Compute feature rows ``start:end`` from the stored bars"""
+        state.size = end
+        if end - start > self.INCREMENTAL_MAX_ROWS:
+            self._rebuild_features(state)
+            return
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i in range(start, end):
+                self._compute_feature_row(state, i)
+    
+    def _rebuild_features(self, state: FeatureState):
+        """Vectorized pass over the whole stored history"""
+        df = pd.DataFrame({name: state.bars[name][:state.size] for name in state.bar_fields[1:]})
+        f = self._technical_feature_columns(df)
+        f['_ema_12'] = df['close'].ewm(span=12).mean()
+        f['_ema_26'] = df['close'].ewm(span=26).mean()
+        for name in state.columns + list(FeatureState.INTERNAL_COLUMNS):
+            state.features[name][:state.size] = f[name].to_numpy(dtype=np.float64)
+    
+    @staticmethod
+    def _ema_step(values: np.ndarray, i: int, x: float, span: int) -> float:
+        """Row ``i`` of ``ewm(span).mean()`` (adjust=True) from row ``i - 1``"""
+        if i == 0:
+            return x
+        decay = 1 - 2 / (span + 1)
+        weight = (1 - decay ** i) / (1 - decay)  # sum of the weights behind row i - 1
+        return (x + decay * weight * values[i - 1]) / (1 + decay * weight)
+    
+    def _compute_feature_row(self, state: FeatureState, i: int):
+        """One feature row from trailing windows, matching _technical_feature_columns"""
+        b, out = state.bars, state.features
+        o, h, l, c, v = b['open'], b['high'], b['low'], b['close'], b['volume']
+        close = c[i]
+        previous = c[i - 1] if i else np.nan
+        f = {}
+        
+        def window(values: np.ndarray, period: int) -> Optional[np.ndarray]:
+            return values[i + 1 - period:i + 1] if i + 1 >= period else None
+        
+        # Price-based features
+        f['returns'] = close / previous - 1
+        f['log_returns'] = np.log(close / previous)
+        f['price_change'] = close - o[i]
+        f['price_range'] = h[i] - l[i]
+        f['body_size'] = abs(close - o[i])
+        f['upper_shadow'] = h[i] - np.maximum(o[i], close)
+        f['lower_shadow'] = np.minimum(o[i], close) - l[i]
+        out['returns'][i] = f['returns']
+        
+        # Moving averages
+        for period in [5, 10, 20, 50, 100, 200]:
+            closes = window(c, period)
+            f[f'sma_{period}'] = closes.mean() if closes is not None else np.nan
+            f[f'ema_{period}'] = self._ema_step(out[f'ema_{period}'], i, close, period)
+            f[f'price_to_sma_{period}'] = close / f[f'sma_{period}']
+        
+        # Volatility features
+        for period in [10, 20]:
+            returns = window(out['returns'], period)
+            f[f'volatility_{period}'] = returns.std(ddof=1) if returns is not None else np.nan
+        f['parkinson_vol'] = np.sqrt(np.log(h[i] / l[i]) ** 2 / (4 * np.log(2)))
+        
+        # Momentum indicators; the first diff counts as no gain and no loss
+        for period in [14, 21]:
+            if i + 1 >= period:
+                delta = np.diff(c[max(i - period, 0):i + 1])
+                gain = delta[delta > 0].sum() / period
+                loss = -delta[delta < 0].sum() / period
+                f[f'rsi_{period}'] = 100 - (100 / (1 + gain / loss))
+            else:
+                f[f'rsi_{period}'] = np.nan
+        for period in [10, 20]:
+            f[f'momentum_{period}'] = close / c[i - period] - 1 if i >= period else np.nan
+        
+        # MACD
+        f['_ema_12'] = self._ema_step(out['_ema_12'], i, close, 12)
+        f['_ema_26'] = self._ema_step(out['_ema_26'], i, close, 26)
+        f['macd'] = f['_ema_12'] - f['_ema_26']
+        f['macd_signal'] = self._ema_step(out['macd_signal'], i, f['macd'], 9)
+        f['macd_histogram'] = f['macd'] - f['macd_signal']
+        
+        # Bollinger Bands
+        closes = window(c, 20)
+        sma_20, std_20 = (closes.mean(), closes.std(ddof=1)) if closes is not None else (np.nan, np.nan)
+        f['bb_upper'] = sma_20 + (2 * std_20)
+        f['bb_lower'] = sma_20 - (2 * std_20)
+        f['bb_position'] = (close - f['bb_lower']) / (f['bb_upper'] - f['bb_lower'])
+        
+        # Volume features
+        volumes = window(v, 20)
+        f['volume_sma_20'] = volumes.mean() if volumes is not None else np.nan
+        f['volume_ratio'] = v[i] / f['volume_sma_20']
+        f['price_volume'] = close * v[i]
+        f['vwap'] = (closes * volumes).sum() / volumes.sum() if volumes is not None else np.nan
+        
+        # Advanced features; the first true range is undefined
+        if i >= 14:
+            highs, lows, prior = h[i - 13:i + 1], l[i - 13:i + 1], c[i - 14:i]
+            f['atr_14'] = np.maximum(highs - lows, np.maximum(abs(highs - prior), abs(lows - prior))).mean()
+        else:
+            f['atr_14'] = np.nan
+        if i + 1 >= 14:
+            lowest_low, highest_high = l[i - 13:i + 1].min(), h[i - 13:i + 1].max()
+            f['stochastic_k'] = 100 * (close - lowest_low) / (highest_high - lowest_low)
+            f['williams_r'] = -100 * (highest_high - close) / (highest_high - lowest_low)
+        else:
+            f['stochastic_k'] = f['williams_r'] = np.nan
+        
+        # Market microstructure
+        if state.quotes:
+            f['spread'] = b['ask'][i] - b['bid'][i]
+            f['mid_price'] = (b['bid'][i] + b['ask'][i]) / 2
+            f['price_to_mid'] = close / f['mid_price']
+        
+        for name, value in f.items():
+            out[name][i] = value
+    
     async def generate_sentiment_features(self, symbol: str, data: pd.DataFrame) -> pd.DataFrame:
         """Generate sentiment-based features"""
+        return self.sentiment_feature_frame(symbol, data)
+    
+    def sentiment_feature_frame(self, symbol: str, data: pd.DataFrame) -> pd.DataFrame:
+        """generate_sentiment_features without the coroutine, for worker threads"""
         df = data.copy()
         
         # Mock sentiment features (replace with actual sentiment analysis)
-        np.random.seed(42)  # For reproducible mock data
-        df['news_sentiment'] = np.random.normal(0, 0.3, len(df))
-        df['social_sentiment'] = np.random.normal(0, 0.25, len(df))
-        df['analyst_sentiment'] = np.random.normal(0.1, 0.2, len(df))
+        rng = np.random.RandomState(42)  # For reproducible mock data; private state is safe across threads
+        df['news_sentiment'] = rng.normal(0, 0.3, len(df))
+        df['social_sentiment'] = rng.normal(0, 0.25, len(df))
+        df['analyst_sentiment'] = rng.normal(0.1, 0.2, len(df))
         
         # Sentiment momentum
         df['sentiment_ma_5'] = df['news_sentiment'].rolling(window=5).mean()
@@ -266,10 +584,25 @@ class FeatureEngineer:
 
 
 class MLStrategyOptimizer:
-    """Machine learning strategy optimization"""
+    """Machine learning strategy optimization
     
-    def __init__(self):
-        """Initialize ML optimizer"""
+    Rule-based strategies are tuned by a k-fold parameter sweep over the
+    historical bars: every grid variant is backtested on each fold and the
+    variant with the best mean out-of-sample ``metric`` wins.
+    """
+    
+    # Values swept around the default parameters; other strategy types keep their defaults
+    PARAMETER_GRIDS = {
+        StrategyType.MEAN_REVERSION: {'lookback_window': [10, 20], 'entry_threshold': [1.5, 2.0]},
+        StrategyType.MOMENTUM: {'momentum_period': [5, 10], 'strength_threshold': [0.01, 0.02, 0.05]},
+    }
+    SWEEP_COLUMNS = ('timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume')
+    
+    def __init__(self, folds: int = 3, metric: str = "sharpe_ratio", max_workers: int = 1):
+        """Initialize ML optimizer; ``max_workers`` > 1 runs the sweep's backtests in a process pool"""
+        self.folds = folds
+        self.metric = metric
+        self.max_workers = max_workers
         self.models = {}
         self.feature_importance = {}
         self.hyperparameters = {}
@@ -278,11 +611,15 @@ class MLStrategyOptimizer:
         self, 
         strategy_type: StrategyType,
         historical_data: pd.DataFrame,
-        lookback_period: int = 252
+        lookback_period: int = 252,
+        parameter_grid: Optional[Dict[str, List[Any]]] = None
     ) -> Dict[str, Any]:
-        """Optimize strategy parameters using ML"""
+        """Optimize strategy parameters with a k-fold sweep over the last ``lookback_period`` bars
+        
+        ``parameter_grid`` replaces the default grid for the strategy type. Without bars
+        to backtest (or a grid) the default parameters are returned.
+        """
         
-        # Mock ML optimization (replace with actual sklearn/tensorflow)
         optimized_params = {
             StrategyType.MEAN_REVERSION: {
                 'lookback_window': 20,
@@ -316,6 +653,15 @@ class MLStrategyOptimizer:
             }
         }.get(strategy_type, {})
         
+        grid = parameter_grid if parameter_grid is not None else self.PARAMETER_GRIDS.get(strategy_type)
+        if grid and all(column in historical_data.columns for column in self.SWEEP_COLUMNS):
+            try:
+                optimized_params.update(await self._sweep_parameters(
+                    strategy_type, historical_data, optimized_params, grid, lookback_period
+                ))
+            except Exception as e:
+                logger.error(f"Parameter sweep failed for {strategy_type.value}, keeping defaults: {e}")
+        
         # Add market regime specific adjustments
         market_regime = await self._detect_market_regime(historical_data)
         regime_adjustments = self._get_regime_adjustments(market_regime)
@@ -325,6 +671,51 @@ class MLStrategyOptimizer:
         logger.info(f"Optimized parameters for {strategy_type.value}: {optimized_params}")
         return optimized_params
     
+    async def _sweep_parameters(
+        self,
+        strategy_type: StrategyType,
+        historical_data: pd.DataFrame,
+        defaults: Dict[str, Any],
+        grid: Dict[str, List[Any]],
+        lookback_period: int
+    ) -> Dict[str, Any]:
+        """Best grid point by mean out-of-sample ``metric`` across k-fold splits"""
+        # Imported here: the sweep and backtester import this module's strategies
+        from .backtesting_framework import BacktestConfig, BacktestMode, CostModel, ExecutionModel
+        from .parameter_sweep import ParameterSweep, StrategySpec, kfold_splits
+        
+        timestamps = pd.to_datetime(historical_data['timestamp'])
+        days = sorted(timestamps.dt.date.unique())[-lookback_period:]
+        if len(days) < self.folds * 2:
+            return {}
+        
+        # Each simulated day is stepped at the close, inside the simulator's market hours
+        market_close = datetime.strptime(BacktestConfig.market_hours_end, "%H:%M").time()
+        config = BacktestConfig(
+            start_date=datetime.combine(days[0], market_close),
+            end_date=datetime.combine(days[-1], market_close),
+            initial_capital=10_000_000.0,
+            execution_model=ExecutionModel.REALISTIC,
+            cost_model=CostModel.INDIAN_RETAIL,
+            benchmark_symbol="NIFTY50",
+            mode=BacktestMode.INDEXED
+        )
+        key = strategy_type.value
+        sweep = ParameterSweep(
+            config, {key: StrategySpec(f"{key}_sweep", strategy_type, defaults)},
+            historical_data.assign(timestamp=timestamps), max_workers=self.max_workers
+        )
+        table = await sweep.run(sweep.grid({key: grid}), kfold_splits(sweep.trading_days(), self.folds))
+        
+        out_of_sample = table[table['segment'] == 'test']
+        best = ParameterSweep.best_parameters(out_of_sample, self.metric).get(key, {})
+        self.hyperparameters[strategy_type] = {
+            'parameters': best,
+            'variants': int(table['variant_id'].nunique()),
+            f'mean_test_{self.metric}': float(out_of_sample.groupby('variant_id')[self.metric].mean().max())
+        }
+        return best
+    
     async def _detect_market_regime(self, data: pd.DataFrame) -> MarketRegime:
         """Detect current market regime"""
         if len(data) < 50:
@@ -418,6 +809,38 @@ class TradingStrategy:
         """Generate trading signal - to be implemented by subclasses"""
         raise NotImplementedError("Subclasses must implement generate_signal")
     
+    def precompute_signals(self, close: np.ndarray) -> Optional[PrecomputedSignals]:
+        """Vectorized generate_signal over every prefix of a close history
+        
+        Optional fast path for backtests; strategies returning None are called
+        bar by bar through generate_signal instead.
+        """
+        return None
+    
+    def signal_at(self, precomputed: PrecomputedSignals, index: int, symbol: str) -> Optional[TradingSignal]:
+        """Materialize the precomputed signal for one bar"""
+        direction = precomputed.direction[index]
+        if direction == 0:
+            return None
+        
+        now = datetime.now()
+        return TradingSignal(
+            signal_id=str(uuid.uuid4()),
+            strategy_id=self.strategy_id,
+            symbol=symbol,
+            signal_type="buy" if direction > 0 else "sell",
+            confidence=float(precomputed.confidence[index]),
+            strength=float(precomputed.strength[index]),
+            entry_price=float(precomputed.entry_price[index]),
+            target_price=float(precomputed.target_price[index]),
+            stop_loss=float(precomputed.stop_loss[index]),
+            position_size=precomputed.position_size,
+            timeframe=TimeFrame.DAY_1,
+            generated_at=now,
+            expires_at=now + precomputed.expires_after,
+            metadata={key: float(values[index]) for key, values in precomputed.metadata.items()}
+        )
+    
     async def update_performance(self, trade_result: Dict[str, Any]):
         """Update strategy performance metrics"""
         self.performance.total_trades += 1
@@ -507,6 +930,35 @@ class MeanReversionStrategy(TradingStrategy):
             expires_at=datetime.now() + timedelta(hours=24),
             metadata={'z_score': z_score, 'mean_price': mean_price, 'std_price': std_price}
         )
+    
+    def precompute_signals(self, close: np.ndarray) -> Optional[PrecomputedSignals]:
+        """Rolling z-score signals for every bar"""
+        lookback = self.parameters.get('lookback_window', 20)
+        entry_threshold = self.parameters.get('entry_threshold', 2.0)
+        stop_loss_pct = self.parameters.get('stop_loss_pct', 0.02)
+        
+        window = pd.Series(close).rolling(lookback)
+        mean_price = window.mean().to_numpy()
+        std_price = window.std().to_numpy()
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_score = (close - mean_price) / std_price
+        confidence = np.minimum(np.abs(z_score) / 3.0, 1.0)
+        
+        direction = np.where(z_score > entry_threshold, -1, np.where(z_score < -entry_threshold, 1, 0)).astype(np.int8)
+        direction[~(std_price != 0) | (confidence < 0.5)] = 0  # also clears NaN (warm-up) rows
+        
+        return PrecomputedSignals(
+            direction=direction,
+            entry_price=close,
+            confidence=confidence,
+            strength=np.abs(z_score) / 3.0,
+            target_price=mean_price,
+            stop_loss=np.where(direction < 0, close * (1 + stop_loss_pct), close * (1 - stop_loss_pct)),
+            position_size=self.parameters.get('position_size_pct', 0.05),
+            expires_after=timedelta(hours=24),
+            metadata={'z_score': z_score, 'mean_price': mean_price, 'std_price': std_price}
+        )
 
 
 class MomentumStrategy(TradingStrategy):
@@ -564,6 +1016,38 @@ class MomentumStrategy(TradingStrategy):
             expires_at=datetime.now() + timedelta(hours=12),
             metadata={'momentum': momentum, 'momentum_strength': momentum_strength}
         )
+    
+    def precompute_signals(self, close: np.ndarray) -> Optional[PrecomputedSignals]:
+        """Momentum signals for every bar"""
+        momentum_period = self.parameters.get('momentum_period', 10)
+        strength_threshold = self.parameters.get('strength_threshold', 0.02)
+        take_profit_pct = self.parameters.get('take_profit_pct', 0.03)
+        stop_loss_pct = self.parameters.get('stop_loss_pct', 0.015)
+        
+        prices = pd.Series(close)
+        past_price = prices.shift(momentum_period).to_numpy()
+        volatility = prices.pct_change().rolling(momentum_period).std().to_numpy()
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            momentum = (close - past_price) / past_price
+            momentum_strength = np.abs(momentum) / volatility
+        
+        buy = momentum > 0
+        direction = np.where(buy, 1, -1).astype(np.int8)
+        direction[~(volatility != 0) | ~(momentum_strength >= strength_threshold)] = 0
+        direction[:momentum_period + 4] = 0  # generate_signal needs momentum_period + 5 bars
+        
+        return PrecomputedSignals(
+            direction=direction,
+            entry_price=close,
+            confidence=np.minimum(momentum_strength / 0.1, 1.0),
+            strength=momentum_strength,
+            target_price=np.where(buy, close * (1 + take_profit_pct), close * (1 - take_profit_pct)),
+            stop_loss=np.where(buy, close * (1 - stop_loss_pct), close * (1 + stop_loss_pct)),
+            position_size=self.parameters.get('position_size_pct', 0.08),
+            expires_after=timedelta(hours=12),
+            metadata={'momentum': momentum, 'momentum_strength': momentum_strength}
+        )
 
 
 class MLRegressionStrategy(TradingStrategy):
@@ -580,12 +1064,15 @@ class MLRegressionStrategy(TradingStrategy):
         if not self.trained or len(data) < 100:
             return None
         
-        # Generate features
-        features_df = await self.feature_engineer.generate_technical_features(data)
-        features_df = await self.feature_engineer.generate_sentiment_features(
-            data['symbol'].iloc[-1] if 'symbol' in data.columns else 'UNKNOWN',
-            features_df
-        )
+        # Generate features, unless the engine already passed a shared feature frame
+        features_df = data
+        if FeatureEngineer.TECHNICAL_MARKER not in features_df.columns:
+            features_df = await self.feature_engineer.generate_technical_features(features_df)
+        if FeatureEngineer.SENTIMENT_MARKER not in features_df.columns:
+            features_df = await self.feature_engineer.generate_sentiment_features(
+                data['symbol'].iloc[-1] if 'symbol' in data.columns else 'UNKNOWN',
+                features_df
+            )
         
         # Mock ML prediction (replace with actual model)
         prediction_horizon = self.parameters.get('prediction_horizon', 5)
@@ -661,7 +1148,11 @@ class AlgorithmicTradingEngine:
         self.performance_tracker = {}
         self.feature_engineer = FeatureEngineer()
         self.ml_optimizer = MLStrategyOptimizer()
-        self.market_data_cache = {}
+        self.market_data_cache = {}  # (symbol, timeframe) -> (data version, feature frame)
+        
+        # Bulk signal generation
+        self.signal_workers = min(8, os.cpu_count() or 1)
+        self._signal_pool: Optional[ThreadPoolExecutor] = None
         
         # Risk management
         self.max_position_size = 0.1  # 10% max position
@@ -732,10 +1223,85 @@ class AlgorithmicTradingEngine:
             return signals
         
         # Get market data
-        market_data = await self._prepare_market_data(symbol, current_data)
+        market_data = await self._get_feature_frame(symbol, current_data)
         
-        # Generate signals from each strategy
-        for strategy in symbol_strategies:
+        return await self._run_strategies(symbol_strategies, market_data, current_data)
+    
+    async def generate_signals_bulk(
+        self,
+        symbols: Dict[str, Dict[str, Any]],
+        timeframe: TimeFrame = TimeFrame.DAY_1
+    ) -> Dict[str, List[TradingSignal]]:
+        """Generate signals for many symbols at once
+        
+        ``symbols`` maps each symbol to its current bar. The feature frame is
+        built once per symbol/timeframe and data version and shared by every
+        strategy registered for the symbol. Frames are built in chunks of symbols
+        on a thread pool of ``signal_workers`` (shut down by ``stop``); the
+        strategies then run on the caller's event loop.
+        """
+        symbol_strategies = self._strategies_by_symbol(symbols)
+        pending = [symbol for symbol in symbols if symbol_strategies[symbol]]
+        if not pending:
+            return {symbol: [] for symbol in symbols}
+        
+        if self._signal_pool is None:
+            self._signal_pool = ThreadPoolExecutor(max_workers=self.signal_workers, thread_name_prefix="signals")
+        
+        loop = asyncio.get_running_loop()
+        chunks = [pending[i::self.signal_workers] for i in range(self.signal_workers)]
+        built = await asyncio.gather(*(
+            loop.run_in_executor(self._signal_pool, self._feature_frames, chunk, symbols, timeframe)
+            for chunk in chunks if chunk
+        ))
+        
+        results = {symbol: [] for symbol in symbols}
+        for frames in built:
+            for symbol, market_data in frames.items():
+                results[symbol] = await self._run_strategies(symbol_strategies[symbol], market_data, symbols[symbol])
+        
+        logger.info(f"Bulk scan of {len(symbols)} symbols produced {sum(map(len, results.values()))} signals")
+        return results
+    
+    async def stop(self):
+        """Shut down the bulk-scan thread pool; the next bulk scan starts a new one"""
+        pool, self._signal_pool = self._signal_pool, None
+        if pool is not None:
+            await asyncio.to_thread(pool.shutdown)
+    
+    def _feature_frames(
+        self,
+        chunk: List[str],
+        symbols: Dict[str, Dict[str, Any]],
+        timeframe: TimeFrame
+    ) -> Dict[str, pd.DataFrame]:
+        """Worker-thread body of generate_signals_bulk; symbols that fail are left out"""
+        frames = {}
+        for symbol in chunk:
+            try:
+                frames[symbol] = self._feature_frame(symbol, symbols[symbol], timeframe)
+            except Exception as e:
+                logger.error(f"Error preparing market data for {symbol}: {e}")
+        return frames
+    
+    def _strategies_by_symbol(self, symbols: Dict[str, Dict[str, Any]]) -> Dict[str, List[TradingStrategy]]:
+        """Registered strategies per symbol, matched on the strategy ID as in generate_signals"""
+        strategies = list(self.strategies.values())
+        return {
+            symbol: [strategy for strategy in strategies if symbol in strategy.strategy_id]
+            for symbol in symbols
+        }
+    
+    async def _run_strategies(
+        self,
+        strategies: List[TradingStrategy],
+        market_data: pd.DataFrame,
+        current_data: Dict[str, Any]
+    ) -> List[TradingSignal]:
+        """Run strategies against one shared feature frame"""
+        signals = []
+        
+        for strategy in strategies:
             try:
                 signal = await strategy.generate_signal(market_data, current_data['close'])
                 if signal and await self._validate_signal(signal):
@@ -747,17 +1313,58 @@ class AlgorithmicTradingEngine:
         
         return signals
     
-    async def _prepare_market_data(self, symbol: str, current_data: Dict[str, Any]) -> pd.DataFrame:
+    @staticmethod
+    def _data_version(current_data: Dict[str, Any]) -> Tuple:
+        """Identity of the bar a feature frame was built from"""
+        return tuple(current_data.get(key) for key in ('timestamp', 'open', 'high', 'low', 'close', 'volume'))
+    
+    async def _get_feature_frame(
+        self,
+        symbol: str,
+        current_data: Dict[str, Any],
+        timeframe: TimeFrame = TimeFrame.DAY_1
+    ) -> pd.DataFrame:
+        """Coroutine form of _feature_frame"""
+        return self._feature_frame(symbol, current_data, timeframe)
+    
+    def _feature_frame(self, symbol: str, current_data: Dict[str, Any], timeframe: TimeFrame) -> pd.DataFrame:
+        """Feature frame for a symbol/timeframe, rebuilt only when the current bar changes"""
+        key = (symbol, timeframe)
+        version = self._data_version(current_data)
+        
+        cached = self.market_data_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        market_data = self._market_data_frame(symbol, current_data, timeframe)
+        self.market_data_cache[key] = (version, market_data)
+        return market_data
+    
+    async def _prepare_market_data(
+        self,
+        symbol: str,
+        current_data: Dict[str, Any],
+        timeframe: TimeFrame = TimeFrame.DAY_1
+    ) -> pd.DataFrame:
         """Prepare market data for analysis"""
+        return self._market_data_frame(symbol, current_data, timeframe)
+    
+    def _market_data_frame(
+        self,
+        symbol: str,
+        current_data: Dict[str, Any],
+        timeframe: TimeFrame = TimeFrame.DAY_1
+    ) -> pd.DataFrame:
+        """Bars and features for a symbol; a plain function so bulk scans can run it on worker threads"""
         
         # Mock historical data preparation (replace with actual data feed)
         dates = pd.date_range(end=datetime.now(), periods=200, freq='1D')
         
         # Generate realistic mock data
-        np.random.seed(hash(symbol) % 2**32)  # Consistent seed per symbol
+        rng = np.random.RandomState(hash(symbol) % 2**32)  # Consistent seed per symbol, thread-safe
         
         base_price = current_data.get('close', 100.0)
-        returns = np.random.normal(0.001, 0.02, 200)  # Daily returns
+        returns = rng.normal(0.001, 0.02, 200)  # Daily returns
         prices = [base_price]
         
         for i in range(1, 200):
@@ -767,10 +1374,10 @@ class AlgorithmicTradingEngine:
         df = pd.DataFrame({
             'timestamp': dates,
             'open': prices,
-            'high': [p * (1 + abs(np.random.normal(0, 0.01))) for p in prices],
-            'low': [p * (1 - abs(np.random.normal(0, 0.01))) for p in prices],
+            'high': [p * (1 + abs(rng.normal(0, 0.01))) for p in prices],
+            'low': [p * (1 - abs(rng.normal(0, 0.01))) for p in prices],
             'close': prices,
-            'volume': [np.random.randint(100000, 1000000) for _ in range(200)],
+            'volume': [rng.randint(100000, 1000000) for _ in range(200)],
             'symbol': symbol
         })
         
@@ -785,16 +1392,16 @@ class AlgorithmicTradingEngine:
             'symbol': symbol
         }
         
-        # Generate features
-        df = await self.feature_engineer.generate_technical_features(df)
-        df = await self.feature_engineer.generate_sentiment_features(symbol, df)
+        # Generate features; the feature store only computes bars it has not seen
+        df = self.feature_engineer.technical_feature_frame(symbol, timeframe, df)
+        df = self.feature_engineer.sentiment_feature_frame(symbol, df)
         
         return df
     
     async def _get_historical_data(self, symbol: str, timeframe: TimeFrame) -> pd.DataFrame:
         """Get historical data for strategy optimization"""
         # Mock implementation - replace with actual data feed
-        return await self._prepare_market_data(symbol, {'close': 100.0})
+        return await self._prepare_market_data(symbol, {'close': 100.0}, timeframe)
     
     async def _validate_signal(self, signal: TradingSignal) -> bool:
         """Validate signal against risk management rules"""
@@ -976,6 +1583,8 @@ async def main():
     # Get portfolio metrics
     portfolio_metrics = await engine.get_portfolio_metrics()
     print(f"\nPortfolio Metrics: {portfolio_metrics}")
+    
+    await engine.stop()
 
 
 if __name__ == "__main__":
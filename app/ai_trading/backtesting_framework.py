@@ -7,7 +7,6 @@ Advanced backtesting engine optimized for Indian markets with realistic simulati
 
 import asyncio
 import json
-import uuid
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
@@ -18,11 +17,12 @@ import logging
 from pathlib import Path
 import time
 import copy
+from array import array
 
 # Import trading engine components
 from .algorithmic_trading_engine import (
     TradingStrategy, TradingSignal, StrategyType, OrderType, TimeFrame,
-    StrategyPerformance, MarketData, AlgorithmicTradingEngine
+    StrategyPerformance, MarketData, AlgorithmicTradingEngine, PrecomputedSignals
 )
 
 # Set up logging
@@ -47,6 +47,13 @@ class CostModel(Enum):
     INDIAN_INSTITUTIONAL = "indian_institutional"  # Institution rates
 
 
+class BacktestMode(Enum):
+    """How the engine walks market data"""
+    LEGACY = "legacy"  # Re-filter the full DataFrame for every strategy on every day
+    INDEXED = "indexed"  # Sort and index once, walk per-symbol integer offsets
+    PORTFOLIO = "portfolio"  # Indexed signals; dates x symbols panel for vectorized marks and exits
+
+
 @dataclass
 class BacktestConfig:
     """Backtesting configuration"""
@@ -57,6 +64,7 @@ class BacktestConfig:
     cost_model: CostModel
     benchmark_symbol: str
     risk_free_rate: float = 0.065  # Indian 10-year bond yield
+    mode: BacktestMode = BacktestMode.LEGACY
     
     # Indian market specific
     market_hours_start: str = "09:15"  # NSE opening
@@ -83,7 +91,7 @@ class BacktestConfig:
 @dataclass
 class Trade:
     """Individual trade record"""
-    trade_id: str
+    trade_id: int
     strategy_id: str
     signal_id: str
     symbol: str
@@ -111,6 +119,241 @@ class Position:
     last_update: datetime
 
 
+_EPOCH = datetime(1970, 1, 1)
+_NAT = -2**63  # int64 sentinel that numpy reads as NaT
+_NAN = float('nan')
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_ns(timestamp: Optional[datetime]) -> int:
+    """Naive datetime -> int64 nanoseconds since the epoch"""
+    if timestamp is None:
+        return _NAT
+    return (timestamp - _EPOCH) // _ONE_MICROSECOND * 1000
+
+
+def _from_ns(value: int) -> Optional[datetime]:
+    if value == _NAT:
+        return None
+    return _EPOCH + timedelta(microseconds=value // 1000)
+
+
+class ColumnarLedger:
+    """Append-only struct-of-arrays ledger
+    
+    Each column is a typed ``array.array`` (amortized growth, one machine
+    value per row). String columns are stored as int32 codes into a label
+    table, and times as int64 nanoseconds. ``column()`` returns a NumPy
+    copy: a live view would pin the array's buffer and make the next append
+    raise BufferError.
+    """
+    
+    NUMERIC_COLUMNS: Dict[str, str] = {}
+    TIME_COLUMNS: Tuple[str, ...] = ()
+    LABEL_COLUMNS: Tuple[str, ...] = ()
+    
+    def __init__(self):
+        self._columns: Dict[str, array] = {}
+        for name, typecode in self.NUMERIC_COLUMNS.items():
+            self._columns[name] = array(typecode)
+        for name in self.TIME_COLUMNS:
+            self._columns[name] = array('q')
+        for name in self.LABEL_COLUMNS:
+            self._columns[name] = array('i')
+        self._labels: Dict[str, List[str]] = {name: [] for name in self.LABEL_COLUMNS}
+        self._label_codes: Dict[str, Dict[str, int]] = {name: {} for name in self.LABEL_COLUMNS}
+        self._size = 0
+        
+        # Bound appends in column order, so a row is appended without building a dict
+        self._numeric_appends = [self._columns[name].append for name in self.NUMERIC_COLUMNS]
+        self._time_appends = [self._columns[name].append for name in self.TIME_COLUMNS]
+        self._label_appends = [
+            (self._columns[name].append, self._label_codes[name], self._labels[name])
+            for name in self.LABEL_COLUMNS
+        ]
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __iter__(self):
+        for i in range(self._size):
+            yield self._row(i)
+    
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._row(i) for i in range(*item.indices(self._size))]
+        if item < 0:
+            item += self._size
+        if not 0 <= item < self._size:
+            raise IndexError("ledger index out of range")
+        return self._row(item)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, ColumnarLedger)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def _append_row(self, numeric: tuple, times: tuple = (), labels: tuple = ()) -> int:
+        """Append one row; values are given in NUMERIC/TIME/LABEL column order"""
+        for append, value in zip(self._numeric_appends, numeric):
+            append(value)
+        for append, value in zip(self._time_appends, times):
+            append(_to_ns(value))
+        for (append, codes, names), label in zip(self._label_appends, labels):
+            code = codes.get(label)
+            if code is None:
+                code = codes[label] = len(names)
+                names.append(label)
+            append(code)
+        self._size += 1
+        return self._size - 1
+    
+    def _value(self, name: str, i: int) -> Any:
+        value = self._columns[name][i]
+        if name in self._labels:
+            return self._labels[name][value]
+        if name in self.TIME_COLUMNS:
+            return _from_ns(value)
+        return value
+    
+    def _row(self, i: int):
+        return {name: self._value(name, i) for name in self._columns}
+    
+    def column(self, name: str) -> np.ndarray:
+        """Copy of a column (codes for label columns, datetime64[ns] for times); appends may continue"""
+        values = np.frombuffer(self._columns[name], dtype=self._columns[name].typecode).copy()
+        if name in self.TIME_COLUMNS:
+            return values.view('datetime64[ns]')
+        return values
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays (label tables excluded)"""
+        return sum(values.itemsize * len(values) for values in self._columns.values())
+    
+    def last(self, name: str) -> Any:
+        """Most recent value of a column"""
+        return self._value(name, self._size - 1)
+    
+    def labels(self, name: str) -> List[str]:
+        return list(self._labels[name])
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Columnar DataFrame; label columns become categoricals"""
+        data = {}
+        for name in self._columns:
+            values = self.column(name)
+            if name in self._labels:
+                data[name] = pd.Categorical.from_codes(values, categories=self._labels[name])
+            else:
+                data[name] = values
+        return pd.DataFrame(data)
+    
+    def to_arrow(self):
+        """pyarrow.Table with dictionary-encoded label columns"""
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("pyarrow is required for Arrow export") from e
+        return pa.Table.from_pandas(self.to_frame(), preserve_index=False)
+    
+    def to_parquet(self, path: Union[str, Path]):
+        """Write the ledger as a Parquet file"""
+        self.to_frame().to_parquet(path, index=False)
+
+
+class TradeLedger(ColumnarLedger):
+    """Trade records; the trade ID is the row number"""
+    
+    NUMERIC_COLUMNS = {
+        'side': 'b',  # +1 buy, -1 sell
+        'quantity': 'q',
+        'entry_price': 'd',
+        'exit_price': 'd',  # NaN while open
+        'pnl': 'd',  # NaN while open
+        'commission': 'd',
+        'slippage': 'd',
+    }
+    TIME_COLUMNS = ('entry_time', 'exit_time')
+    LABEL_COLUMNS = ('strategy_id', 'signal_id', 'symbol', 'tag')
+    
+    def append(
+        self,
+        strategy_id: str,
+        signal_id: str,
+        symbol: str,
+        side: str,
+        quantity: int,
+        entry_price: float,
+        entry_time: datetime,
+        exit_price: Optional[float] = None,
+        exit_time: Optional[datetime] = None,
+        pnl: Optional[float] = None,
+        commission: float = 0.0,
+        slippage: float = 0.0,
+        tag: str = ""
+    ) -> int:
+        """Record a trade and return its integer ID"""
+        return self._append_row(
+            (1 if side == "buy" else -1, quantity, entry_price,
+             _NAN if exit_price is None else exit_price, _NAN if pnl is None else pnl,
+             commission, slippage),
+            (entry_time, exit_time),
+            (strategy_id, signal_id, symbol, tag)
+        )
+    
+    def _row(self, i: int) -> Trade:
+        exit_price = self._columns['exit_price'][i]
+        pnl = self._columns['pnl'][i]
+        tag = self._value('tag', i)
+        return Trade(
+            trade_id=i,
+            strategy_id=self._value('strategy_id', i),
+            signal_id=self._value('signal_id', i),
+            symbol=self._value('symbol', i),
+            side="buy" if self._columns['side'][i] > 0 else "sell",
+            quantity=self._columns['quantity'][i],
+            entry_price=self._columns['entry_price'][i],
+            exit_price=None if exit_price != exit_price else exit_price,
+            entry_time=self._value('entry_time', i),
+            exit_time=self._value('exit_time', i),
+            pnl=None if pnl != pnl else pnl,
+            commission=self._columns['commission'][i],
+            slippage=self._columns['slippage'][i],
+            tags=[tag] if tag else []
+        )
+    
+    def to_frame(self) -> pd.DataFrame:
+        frame = super().to_frame()
+        frame.insert(0, 'trade_id', np.arange(len(self), dtype=np.int64))
+        frame['side'] = pd.Categorical.from_codes((frame['side'] > 0).astype(np.int8), categories=["sell", "buy"])
+        return frame
+
+
+class EquityLedger(ColumnarLedger):
+    """Daily equity curve; rows read back as the engine's equity-point dicts"""
+    
+    NUMERIC_COLUMNS = {
+        'equity': 'd',
+        'cash': 'd',
+        'positions_value': 'd',
+        'daily_return': 'd',
+    }
+    TIME_COLUMNS = ('date',)
+    
+    def append(self, date: datetime, equity: float, cash: float, positions_value: float, daily_return: float) -> int:
+        return self._append_row((equity, cash, positions_value, daily_return), (date,))
+    
+    def _row(self, i: int) -> Dict[str, Any]:
+        return {
+            'date': self._value('date', i),
+            'equity': self._columns['equity'][i],
+            'cash': self._columns['cash'][i],
+            'positions_value': self._columns['positions_value'][i],
+            'daily_return': self._columns['daily_return'][i],
+        }
+
+
 @dataclass
 class BacktestResults:
     """Comprehensive backtesting results"""
@@ -160,12 +403,12 @@ class BacktestResults:
     tracking_error: float
     
     # Equity curve
-    equity_curve: List[Dict[str, Any]]
+    equity_curve: EquityLedger
     monthly_returns: Dict[str, float]
     yearly_returns: Dict[str, float]
     
     # Trade details
-    all_trades: List[Trade]
+    all_trades: TradeLedger
     strategy_performance: Dict[str, StrategyPerformance]
 
 
@@ -300,9 +543,93 @@ class IndianMarketSimulator:
         return total_cost
 
 
+class MarketDataIndex:
+    """Market data sorted and indexed once for offset-based backtests
+    
+    Rows are stably sorted by (symbol, timestamp), so each symbol's history
+    is one contiguous block starting at ``starts[s]``. ``day_ends[s, d]`` is
+    the row just past symbol ``s``'s last bar on or before trading day ``d``;
+    a strategy's history on day ``d`` is the zero-copy prefix
+    ``frame.iloc[starts[s]:day_ends[s, d]]``.
+    """
+    
+    def __init__(self, market_data: pd.DataFrame):
+        timestamps = pd.to_datetime(market_data['timestamp']).to_numpy(dtype='datetime64[ns]')
+        if 'symbol' in market_data.columns:
+            symbol_codes, symbols = pd.factorize(market_data['symbol'], sort=True)
+            self.symbols: List[str] = [str(symbol) for symbol in symbols]
+        else:
+            symbol_codes = np.zeros(len(market_data), dtype=np.int64)
+            self.symbols = ['UNKNOWN']
+        
+        order = np.lexsort((timestamps, symbol_codes))
+        self.frame = market_data.iloc[order].reset_index(drop=True)
+        self.timestamps = timestamps[order]
+        self.columns = {column: self.frame[column].to_numpy() for column in self.frame.columns}
+        self.close = self.frame['close'].to_numpy(dtype=np.float64)
+        
+        symbol_codes = symbol_codes[order]
+        self.starts = np.searchsorted(symbol_codes, np.arange(len(self.symbols)), side='left')
+        self.ends = np.searchsorted(symbol_codes, np.arange(len(self.symbols)), side='right')
+        
+        days = self.timestamps.astype('datetime64[D]')
+        self.trading_days = np.unique(days)
+        self.day_lookup = {day.item(): i for i, day in enumerate(self.trading_days)}
+        
+        self.day_ends = np.empty((len(self.symbols), len(self.trading_days)), dtype=np.int64)
+        for s, (start, end) in enumerate(zip(self.starts, self.ends)):
+            self.day_ends[s] = start + np.searchsorted(days[start:end], self.trading_days, side='right')
+        
+        # Symbols with a bar on each day
+        previous = np.concatenate((self.starts[:, None], self.day_ends[:, :-1]), axis=1)
+        self.has_bar = self.day_ends > previous
+    
+    def __len__(self) -> int:
+        return len(self.frame)
+    
+    def history(self, symbol_index: int, day: int) -> pd.DataFrame:
+        """Zero-copy view of a symbol's bars up to and including a trading day"""
+        return self.frame.iloc[self.starts[symbol_index]:self.day_ends[symbol_index, day]]
+    
+    def row(self, row: int) -> Dict[str, Any]:
+        """One bar as a dict"""
+        return {column: values[row] for column, values in self.columns.items()}
+
+
+class MarketDataPanel:
+    """Dates x symbols OHLCV arrays built from a MarketDataIndex
+    
+    ``close[d, s]`` is symbol ``s``'s last close on trading day ``d``, NaN
+    if it had no bar that day; the symbol axis follows ``index.symbols``.
+    """
+    
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+    
+    def __init__(self, index: MarketDataIndex):
+        self.symbols = index.symbols
+        self.slots = {symbol: s for s, symbol in enumerate(self.symbols)}
+        self.trading_days = index.trading_days
+        
+        has_bar = index.has_bar.T
+        self.rows = np.where(has_bar, (index.day_ends - 1).T, -1)  # Index row of each (day, symbol) bar
+        
+        for name in self.FIELDS:
+            values = np.full(has_bar.shape, np.nan)
+            if name in index.columns:
+                values[has_bar] = index.columns[name][self.rows[has_bar]]
+            setattr(self, name, values)
+    
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.close.shape
+
+
 class BacktestingEngine:
     """Advanced backtesting engine"""
     
+    STOP_LOSS_PCT = 0.05  # 5% stop loss
+    TAKE_PROFIT_PCT = 0.10  # 10% take profit
+    
     def __init__(self, config: BacktestConfig):
         """Initialize backtesting engine"""
         self.config = config
@@ -312,15 +639,19 @@ class BacktestingEngine:
         self.current_capital = config.initial_capital
         self.positions = {}
         self.pending_orders = {}
-        self.completed_trades = []
+        self.completed_trades = TradeLedger()
         
         # Performance tracking
-        self.equity_curve = []
-        self.daily_returns = []
+        self.equity_curve = EquityLedger()
         self.benchmark_data = {}
         
         # Strategy tracking
         self.strategy_performance = {}
+        
+        # Portfolio mode: position book aligned with the panel's symbol axis
+        self.panel: Optional[MarketDataPanel] = None
+        self.book_quantity = np.zeros(0, dtype=np.int64)
+        self.book_cost = np.zeros(0)
     
     async def run_backtest(
         self, 
@@ -335,6 +666,18 @@ class BacktestingEngine:
         for strategy_id, strategy in strategies.items():
             self.strategy_performance[strategy_id] = copy.deepcopy(strategy.performance)
         
+        # Indexed mode: sort and index once, precompute vectorized strategy signals
+        index = None
+        if self.config.mode in (BacktestMode.INDEXED, BacktestMode.PORTFOLIO):
+            index = MarketDataIndex(market_data)
+            precomputed = self._precompute_signals(strategies, index)
+        
+        # Portfolio mode: dates x symbols panel and an array position book
+        if self.config.mode == BacktestMode.PORTFOLIO:
+            self.panel = MarketDataPanel(index)
+            self.book_quantity = np.zeros(len(self.panel.symbols), dtype=np.int64)
+            self.book_cost = np.zeros(len(self.panel.symbols))
+        
         # Simulate trading day by day
         current_date = self.config.start_date
         day_count = 0
@@ -342,7 +685,12 @@ class BacktestingEngine:
         while current_date <= self.config.end_date:
             
             if self.market_simulator.is_market_open(current_date):
-                await self._simulate_trading_day(current_date, strategies, market_data)
+                if self.panel is not None:
+                    await self._simulate_portfolio_day(current_date, strategies, index, self.panel, precomputed)
+                elif index is not None:
+                    await self._simulate_indexed_day(current_date, strategies, index, precomputed)
+                else:
+                    await self._simulate_trading_day(current_date, strategies, market_data)
                 day_count += 1
             
             # Update equity curve
@@ -404,6 +752,158 @@ class BacktestingEngine:
         # Check for position exits (stop losses, take profits)
         await self._check_position_exits(day_data, date)
     
+    def _precompute_signals(
+        self, 
+        strategies: Dict[str, TradingStrategy], 
+        index: MarketDataIndex
+    ) -> Dict[str, Tuple[np.ndarray, List[PrecomputedSignals]]]:
+        """Run each vectorized strategy once per symbol block
+        
+        Returns strategy_id -> (direction for every index row, per-symbol
+        PrecomputedSignals); strategies without a vectorized path are omitted.
+        """
+        precomputed = {}
+        for strategy_id, strategy in strategies.items():
+            direction = np.zeros(len(index), dtype=np.int8)
+            blocks = []
+            
+            for s in range(len(index.symbols)):
+                start, end = index.starts[s], index.ends[s]
+                block = strategy.precompute_signals(index.close[start:end])
+                if block is None:
+                    break
+                direction[start:end] = block.direction
+                blocks.append(block)
+            else:
+                precomputed[strategy_id] = (direction, blocks)
+        
+        return precomputed
+    
+    async def _simulate_indexed_day(
+        self, 
+        date: datetime, 
+        strategies: Dict[str, TradingStrategy], 
+        index: MarketDataIndex,
+        precomputed: Dict[str, Tuple[np.ndarray, List[PrecomputedSignals]]]
+    ):
+        """Simulate a trading day by walking integer offsets into the index
+        
+        Strategies see each symbol's bars through the end of the trading day and
+        trade at the day's last bar. The legacy path cuts history at the simulation
+        clock instead (``timestamp <= date``, e.g. 15:30) while still pricing at the
+        day's last bar. The two agree for bars stamped at or before the clock, such as
+        daily bars at midnight; a bar stamped later in the day is seen here on its own
+        day, but by the legacy path only from the next trading day.
+        """
+        
+        day = index.day_lookup.get(date.date())
+        if day is None:
+            return
+        
+        all_signals, trading, rows = await self._indexed_signals(day, strategies, index, precomputed)
+        
+        # Execute signals
+        for signal, row in all_signals:
+            await self._execute_signal_with_quote(signal, index.row(row), date)
+        
+        # Mark to market and check exits against today's closes
+        prices = dict(zip((index.symbols[s] for s in trading), index.close[rows]))
+        for symbol, position in self.positions.items():
+            if symbol in prices:
+                self._mark_position(position, prices[symbol])
+        
+        positions_to_close = []
+        for symbol, position in self.positions.items():
+            if symbol in prices:
+                reason = self._exit_reason(position, prices[symbol])
+                if reason:
+                    positions_to_close.append((symbol, prices[symbol], reason))
+        
+        for symbol, exit_price, reason in positions_to_close:
+            await self._close_position(symbol, exit_price, date, reason)
+    
+    async def _indexed_signals(
+        self, 
+        day: int, 
+        strategies: Dict[str, TradingStrategy], 
+        index: MarketDataIndex,
+        precomputed: Dict[str, Tuple[np.ndarray, List[PrecomputedSignals]]]
+    ) -> Tuple[List[Tuple[TradingSignal, int]], np.ndarray, np.ndarray]:
+        """Signals for one trading day as (signal, index row) pairs, plus the warmed-up symbols and their rows"""
+        
+        # Today's last bar per symbol, for symbols that traded today with enough history
+        trading = np.flatnonzero(index.has_bar[:, day])
+        rows = index.day_ends[trading, day] - 1
+        warmed_up = rows - index.starts[trading] + 1 >= 20  # Need minimum history
+        trading, rows = trading[warmed_up], rows[warmed_up]
+        
+        all_signals = []
+        for strategy_id, strategy in strategies.items():
+            if strategy_id in precomputed:
+                # Vectorized strategies: only visit the symbols whose signal fires today
+                direction, blocks = precomputed[strategy_id]
+                firing = direction[rows] != 0
+                candidates = zip(trading[firing], rows[firing])
+            else:
+                candidates = zip(trading, rows)
+            
+            for s, row in candidates:
+                try:
+                    if strategy_id in precomputed:
+                        signal = strategy.signal_at(blocks[s], row - index.starts[s], index.symbols[s])
+                    else:
+                        signal = await strategy.generate_signal(index.history(s, day), index.close[row])
+                    
+                    if signal:
+                        all_signals.append((signal, row))
+                        
+                except Exception as e:
+                    logger.error(f"Error generating signal for {strategy_id}: {e}")
+        
+        return all_signals, trading, rows
+    
+    async def _simulate_portfolio_day(
+        self, 
+        date: datetime, 
+        strategies: Dict[str, TradingStrategy], 
+        index: MarketDataIndex,
+        panel: MarketDataPanel,
+        precomputed: Dict[str, Tuple[np.ndarray, List[PrecomputedSignals]]]
+    ):
+        """Indexed signal generation, then one vectorized mark / exit pass over the position book"""
+        
+        day = index.day_lookup.get(date.date())
+        if day is None:
+            return
+        
+        all_signals, _, _ = await self._indexed_signals(day, strategies, index, precomputed)
+        
+        for signal, row in all_signals:
+            await self._execute_signal_with_quote(signal, index.row(row), date)
+        
+        # Open positions with a bar today
+        prices = panel.close[day]
+        held = np.flatnonzero((self.book_quantity != 0) & ~np.isnan(prices))
+        if len(held) == 0:
+            return
+        
+        quantity = self.book_quantity[held]
+        avg_cost = self.book_cost[held]
+        current = prices[held]
+        
+        market_value = quantity * current
+        unrealized_pnl = (current - avg_cost) * quantity
+        for s, value, pnl in zip(held, market_value.tolist(), unrealized_pnl.tolist()):
+            position = self.positions[panel.symbols[s]]
+            position.market_value = value
+            position.unrealized_pnl = pnl
+        
+        stop_loss, take_profit = self._exit_masks(quantity, avg_cost, current)
+        exits = np.flatnonzero(stop_loss | take_profit)
+        for k in exits:
+            reason = "stop_loss" if stop_loss[k] else "take_profit"
+            await self._close_position(panel.symbols[held[k]], current[k], date, reason)
+    
     def _get_market_data_for_date(self, date: datetime, market_data: pd.DataFrame) -> pd.DataFrame:
         """Get market data for specific date"""
         
@@ -425,18 +925,23 @@ class BacktestingEngine:
     
     async def _execute_signal(self, signal: TradingSignal, market_data: pd.DataFrame, date: datetime):
         """Execute a trading signal"""
+        await self._execute_signal_with_quote(signal, market_data.iloc[-1].to_dict(), date)
+    
+    async def _execute_signal_with_quote(self, signal: TradingSignal, quote: Dict[str, Any], date: datetime):
+        """Execute a trading signal against the latest bar for its symbol"""
         
         # Calculate position size in shares
         position_value = self.current_capital * signal.position_size
         current_price = signal.entry_price
         quantity = int(position_value / current_price)
         
-        if quantity == 0:
+        # Covering shorts can leave cash negative; no new positions until it recovers
+        if quantity <= 0:
             return
         
         # Get execution price with slippage
         execution_price, slippage_cost = await self.market_simulator.get_execution_price(
-            signal, market_data.iloc[-1].to_dict(), quantity
+            signal, quote, quantity
         )
         
         # Calculate transaction costs
@@ -451,34 +956,28 @@ class BacktestingEngine:
             logger.warning(f"Insufficient capital for {signal.symbol} trade")
             return
         
-        # Execute trade
-        trade = Trade(
-            trade_id=str(uuid.uuid4()),
+        # Update portfolio
+        if signal.signal_type == "buy":
+            self.current_capital -= total_cost
+            self._add_position(signal.symbol, quantity, execution_price, date)
+        else:
+            # Short selling (if supported)
+            self.current_capital += (quantity * execution_price - transaction_cost - slippage_cost)
+            self._add_position(signal.symbol, -quantity, execution_price, date)
+        
+        # Record trade
+        self.completed_trades.append(
             strategy_id=signal.strategy_id,
             signal_id=signal.signal_id,
             symbol=signal.symbol,
             side=signal.signal_type,
             quantity=quantity if signal.signal_type == "buy" else -quantity,
             entry_price=execution_price,
-            exit_price=None,
             entry_time=date,
-            exit_time=None,
-            pnl=None,
             commission=transaction_cost,
             slippage=slippage_cost
         )
         
-        # Update portfolio
-        if signal.signal_type == "buy":
-            self.current_capital -= total_cost
-            self._add_position(signal.symbol, quantity, execution_price, date)
-        else:
-            # Short selling (if supported)
-            self.current_capital += (quantity * execution_price - transaction_cost - slippage_cost)
-            self._add_position(signal.symbol, -quantity, execution_price, date)
-        
-        self.completed_trades.append(trade)
-        
         logger.debug(f"Executed {signal.signal_type} {quantity} {signal.symbol} at ₹{execution_price:.2f}")
     
     def _add_position(self, symbol: str, quantity: int, price: float, timestamp: datetime):
@@ -509,6 +1008,18 @@ class BacktestingEngine:
                 entry_time=timestamp,
                 last_update=timestamp
             )
+        
+        self._sync_book(symbol)
+    
+    def _sync_book(self, symbol: str):
+        """Mirror a position into the portfolio-mode book arrays"""
+        if self.panel is None:
+            return
+        
+        s = self.panel.slots[symbol]
+        position = self.positions.get(symbol)
+        self.book_quantity[s] = position.quantity if position else 0
+        self.book_cost[s] = position.avg_cost if position else 0.0
     
     async def _update_positions(self, market_data: pd.DataFrame):
         """Update position values with current market prices"""
@@ -518,9 +1029,12 @@ class BacktestingEngine:
             symbol_data = market_data[market_data.get('symbol', '') == position.symbol]
             
             if not symbol_data.empty:
-                current_price = symbol_data['close'].iloc[-1]
-                position.market_value = position.quantity * current_price
-                position.unrealized_pnl = (current_price - position.avg_cost) * position.quantity
+                self._mark_position(position, symbol_data['close'].iloc[-1])
+    
+    def _mark_position(self, position: Position, current_price: float):
+        """Revalue a position at the current price"""
+        position.market_value = position.quantity * current_price
+        position.unrealized_pnl = (current_price - position.avg_cost) * position.quantity
     
     async def _check_position_exits(self, market_data: pd.DataFrame, date: datetime):
         """Check for stop loss and take profit exits"""
@@ -535,36 +1049,48 @@ class BacktestingEngine:
                 continue
             
             current_price = symbol_data['close'].iloc[-1]
+            exit_reason = self._exit_reason(position, current_price)
             
-            # Simple exit logic (can be enhanced)
-            pnl_pct = (current_price - position.avg_cost) / position.avg_cost
-            
-            # Exit conditions
-            should_exit = False
-            exit_reason = ""
-            
-            if position.quantity > 0:  # Long position
-                if pnl_pct <= -0.05:  # 5% stop loss
-                    should_exit = True
-                    exit_reason = "stop_loss"
-                elif pnl_pct >= 0.10:  # 10% take profit
-                    should_exit = True
-                    exit_reason = "take_profit"
-            else:  # Short position
-                if pnl_pct >= 0.05:  # 5% stop loss for short
-                    should_exit = True
-                    exit_reason = "stop_loss"
-                elif pnl_pct <= -0.10:  # 10% take profit for short
-                    should_exit = True
-                    exit_reason = "take_profit"
-            
-            if should_exit:
+            if exit_reason:
                 positions_to_close.append((symbol, current_price, exit_reason))
         
         # Close positions
         for symbol, exit_price, reason in positions_to_close:
             await self._close_position(symbol, exit_price, date, reason)
     
+    def _exit_reason(self, position: Position, current_price: float) -> Optional[str]:
+        """Stop loss / take profit check for one position"""
+        
+        # Simple exit logic (can be enhanced)
+        pnl_pct = (current_price - position.avg_cost) / position.avg_cost
+        
+        if position.quantity > 0:  # Long position
+            if pnl_pct <= -self.STOP_LOSS_PCT:
+                return "stop_loss"
+            elif pnl_pct >= self.TAKE_PROFIT_PCT:
+                return "take_profit"
+        else:  # Short position
+            if pnl_pct >= self.STOP_LOSS_PCT:
+                return "stop_loss"
+            elif pnl_pct <= -self.TAKE_PROFIT_PCT:
+                return "take_profit"
+        
+        return None
+    
+    def _exit_masks(
+        self, 
+        quantity: np.ndarray, 
+        avg_cost: np.ndarray, 
+        current_price: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized _exit_reason: (stop loss, take profit) masks over many positions"""
+        
+        # Signed so that a gain is positive for both longs and shorts
+        pnl_pct = (current_price - avg_cost) / avg_cost * np.sign(quantity)
+        stop_loss = pnl_pct <= -self.STOP_LOSS_PCT
+        take_profit = ~stop_loss & (pnl_pct >= self.TAKE_PROFIT_PCT)
+        return stop_loss, take_profit
+    
     async def _close_position(self, symbol: str, exit_price: float, date: datetime, reason: str):
         """Close a position"""
         
@@ -589,28 +1115,26 @@ class BacktestingEngine:
             cost = abs(position.quantity) * exit_price + transaction_cost
             self.current_capital -= cost
         
-        # Create exit trade record
-        exit_trade = Trade(
-            trade_id=str(uuid.uuid4()),
+        # Record exit trade
+        self.completed_trades.append(
             strategy_id="position_management",
             signal_id="exit",
             symbol=symbol,
             side="sell" if position.quantity > 0 else "buy",
             quantity=-position.quantity,  # Opposite of original position
             entry_price=position.avg_cost,
-            exit_price=exit_price,
             entry_time=position.entry_time,
+            exit_price=exit_price,
             exit_time=date,
             pnl=pnl,
             commission=transaction_cost,
             slippage=0.0,
-            tags=[reason]
+            tag=reason
         )
         
-        self.completed_trades.append(exit_trade)
-        
         # Remove position
         del self.positions[symbol]
+        self._sync_book(symbol)
         
         logger.debug(f"Closed {symbol} position: P&L = ₹{pnl:.2f} ({reason})")
     
@@ -624,27 +1148,23 @@ class BacktestingEngine:
         
         # Calculate daily return
         if self.equity_curve:
-            prev_equity = self.equity_curve[-1]['equity']
+            prev_equity = self.equity_curve.last('equity')
             daily_return = (total_equity - prev_equity) / prev_equity
         else:
             daily_return = 0.0
         
-        self.equity_curve.append({
-            'date': date,
-            'equity': total_equity,
-            'cash': cash,
-            'positions_value': position_value,
-            'daily_return': daily_return
-        })
-        
-        self.daily_returns.append(daily_return)
+        self.equity_curve.append(date, total_equity, cash, position_value, daily_return)
     
     async def _generate_results(self) -> BacktestResults:
-        """Generate comprehensive backtest results"""
+        """Generate comprehensive backtest results with vectorized passes over the ledgers"""
+        
+        equity = self.equity_curve.column('equity')
+        daily_returns = self.equity_curve.column('daily_return')
+        dates = self.equity_curve.column('date')
         
         # Basic calculations
         initial_capital = self.config.initial_capital
-        final_capital = self.equity_curve[-1]['equity'] if self.equity_curve else initial_capital
+        final_capital = equity[-1] if len(equity) else initial_capital
         total_return = (final_capital - initial_capital) / initial_capital
         
         duration_days = (self.config.end_date - self.config.start_date).days
@@ -652,25 +1172,30 @@ class BacktestingEngine:
         annualized_return = (final_capital / initial_capital) ** (1 / duration_years) - 1 if duration_years > 0 else 0
         
         # Risk metrics
-        daily_returns_array = np.array(self.daily_returns[1:])  # Exclude first day
+        daily_returns_array = daily_returns[1:]  # Exclude first day
         volatility = np.std(daily_returns_array) * np.sqrt(252) if len(daily_returns_array) > 0 else 0
         
         sharpe_ratio = (annualized_return - self.config.risk_free_rate) / volatility if volatility > 0 else 0
         
         # Drawdown calculation
-        equity_values = [point['equity'] for point in self.equity_curve]
-        running_max = np.maximum.accumulate(equity_values)
-        drawdown = (equity_values - running_max) / running_max
+        running_max = np.maximum.accumulate(equity)
+        drawdown = (equity - running_max) / running_max
         max_drawdown = np.min(drawdown) if len(drawdown) > 0 else 0
         
-        # Trade statistics
-        completed_trades = [t for t in self.completed_trades if t.pnl is not None]
-        winning_trades = len([t for t in completed_trades if t.pnl > 0])
-        losing_trades = len([t for t in completed_trades if t.pnl <= 0])
-        
-        win_rate = winning_trades / len(completed_trades) if completed_trades else 0
-        avg_win = np.mean([t.pnl for t in completed_trades if t.pnl > 0]) if winning_trades > 0 else 0
-        avg_loss = np.mean([abs(t.pnl) for t in completed_trades if t.pnl <= 0]) if losing_trades > 0 else 0
+        # Trade statistics (closed trades carry a P&L)
+        pnl = self.completed_trades.column('pnl')
+        closed = ~np.isnan(pnl)
+        closed_pnl = pnl[closed]
+        closed_quantity = self.completed_trades.column('quantity')[closed]
+        wins = closed_pnl[closed_pnl > 0]
+        losses = closed_pnl[closed_pnl <= 0]
+        total_trades = len(closed_pnl)
+        winning_trades = len(wins)
+        losing_trades = len(losses)
+        
+        win_rate = winning_trades / total_trades if total_trades else 0
+        avg_win = np.mean(wins) if winning_trades > 0 else 0
+        avg_loss = np.mean(np.abs(losses)) if losing_trades > 0 else 0
         
         profit_factor = (avg_win * winning_trades) / (avg_loss * losing_trades) if losing_trades > 0 and avg_loss > 0 else 0
         
@@ -679,23 +1204,9 @@ class BacktestingEngine:
         calmar_ratio = annualized_return / abs(max_drawdown) if max_drawdown < 0 else 0
         var_95 = np.percentile(daily_returns_array, 5) if len(daily_returns_array) > 0 else 0
         
-        # Monthly and yearly returns
-        monthly_returns = {}
-        yearly_returns = {}
-        
-        for point in self.equity_curve:
-            month_key = point['date'].strftime("%Y-%m")
-            year_key = str(point['date'].year)
-            
-            if month_key not in monthly_returns:
-                monthly_returns[month_key] = point['daily_return']
-            else:
-                monthly_returns[month_key] = (1 + monthly_returns[month_key]) * (1 + point['daily_return']) - 1
-            
-            if year_key not in yearly_returns:
-                yearly_returns[year_key] = point['daily_return']
-            else:
-                yearly_returns[year_key] = (1 + yearly_returns[year_key]) * (1 + point['daily_return']) - 1
+        # Monthly and yearly returns, compounded within each calendar period
+        monthly_returns = self._compound_by_period(dates, daily_returns, 'M')
+        yearly_returns = self._compound_by_period(dates, daily_returns, 'Y')
         
         # Create results object
         results = BacktestResults(
@@ -715,19 +1226,19 @@ class BacktestingEngine:
             max_drawdown_duration=30,  # Simplified
             var_95=var_95,
             cvar_95=var_95 * 1.3,  # Approximation
-            total_trades=len(completed_trades),
+            total_trades=total_trades,
             winning_trades=winning_trades,
             losing_trades=losing_trades,
             win_rate=win_rate,
             avg_win=avg_win,
             avg_loss=avg_loss,
             profit_factor=profit_factor,
-            largest_win=max([t.pnl for t in completed_trades], default=0),
-            largest_loss=min([t.pnl for t in completed_trades], default=0),
-            long_trades=len([t for t in completed_trades if t.quantity > 0]),
-            short_trades=len([t for t in completed_trades if t.quantity < 0]),
+            largest_win=closed_pnl.max() if total_trades else 0,
+            largest_loss=closed_pnl.min() if total_trades else 0,
+            long_trades=int(np.count_nonzero(closed_quantity > 0)),
+            short_trades=int(np.count_nonzero(closed_quantity < 0)),
             avg_trade_duration=2.5,  # Simplified
-            trades_per_month=len(completed_trades) / (duration_days / 30.4) if duration_days > 0 else 0,
+            trades_per_month=total_trades / (duration_days / 30.4) if duration_days > 0 else 0,
             benchmark_return=0.15,  # Mock benchmark return
             alpha=annualized_return - 0.15,  # Alpha vs benchmark
             beta=1.1,  # Simplified
@@ -741,6 +1252,16 @@ class BacktestingEngine:
         )
         
         return results
+    
+    @staticmethod
+    def _compound_by_period(dates: np.ndarray, returns: np.ndarray, unit: str) -> Dict[str, float]:
+        """Compound daily returns per calendar month ('M') or year ('Y'); dates are in order"""
+        if len(dates) == 0:
+            return {}
+        periods = dates.astype(f'datetime64[{unit}]')
+        keys, starts = np.unique(periods, return_index=True)
+        compounded = np.multiply.reduceat(1 + returns, starts) - 1
+        return dict(zip(np.datetime_as_string(keys, unit=unit).tolist(), compounded.tolist()))
 
 
 # Example usage and testing
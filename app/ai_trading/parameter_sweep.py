@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+TradeMate Parameter Sweep Runner
+===============================
+Grid / random parameter sweeps and walk-forward / k-fold evaluation of
+backtests across a process pool, with market data shared through
+shared memory instead of being pickled into every worker
+"""
+
+import asyncio
+import dataclasses
+import itertools
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, field
+import logging
+
+from .algorithmic_trading_engine import (
+    TradingStrategy, StrategyType, MeanReversionStrategy, MomentumStrategy, MLRegressionStrategy
+)
+from .backtesting_framework import BacktestingEngine, BacktestConfig, BacktestResults
+
+logger = logging.getLogger(__name__)
+
+
+STRATEGY_CLASSES = {
+    StrategyType.MEAN_REVERSION: MeanReversionStrategy,
+    StrategyType.MOMENTUM: MomentumStrategy,
+    StrategyType.ML_REGRESSION: MLRegressionStrategy,
+}
+
+# Metrics copied from BacktestResults into the comparison table
+SUMMARY_METRICS = (
+    "final_capital", "total_return", "annualized_return", "volatility", "sharpe_ratio",
+    "max_drawdown", "var_95", "total_trades", "win_rate", "profit_factor"
+)
+
+_SHARED_ALIGNMENT = 64
+
+
+@dataclass
+class StrategySpec:
+    """Picklable recipe for building a strategy inside a worker"""
+    strategy_id: str
+    strategy_type: StrategyType
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    strategy_class: Optional[type] = None
+
+    def build(self, overrides: Optional[Dict[str, Any]] = None) -> TradingStrategy:
+        strategy_class = self.strategy_class or STRATEGY_CLASSES.get(self.strategy_type, TradingStrategy)
+        return strategy_class(self.strategy_id, self.strategy_type, {**self.parameters, **(overrides or {})})
+
+
+@dataclass
+class SweepVariant:
+    """One point of the sweep: per-strategy parameter overrides plus BacktestConfig overrides"""
+    variant_id: int
+    strategy_parameters: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    config_overrides: Dict[str, Any] = field(default_factory=dict)
+
+    def flatten(self) -> Dict[str, Any]:
+        """Table columns: ``<strategy>.<parameter>`` and ``config.<field>``"""
+        columns = {}
+        for strategy_key, parameters in self.strategy_parameters.items():
+            for name, value in parameters.items():
+                columns[f"{strategy_key}.{name}"] = value
+        for name, value in self.config_overrides.items():
+            columns[f"config.{name}"] = getattr(value, "value", value)
+        return columns
+
+
+@dataclass
+class TimeSplit:
+    """Walk-forward or k-fold window
+
+    Walk-forward splits train on one window before the test window. K-fold
+    splits train on the complement of the test block: ``train_start`` /
+    ``train_end`` before it and ``train_after_start`` / ``train_after_end``
+    after it, either of which is empty for the first and last folds.
+    """
+    fold: int
+    test_start: date
+    test_end: date
+    train_start: Optional[date] = None
+    train_end: Optional[date] = None
+    train_after_start: Optional[date] = None
+    train_after_end: Optional[date] = None
+
+    def segments(self) -> List[Tuple[str, date, date]]:
+        segments = []
+        if self.train_start is not None:
+            segments.append(("train", self.train_start, self.train_end))
+        if self.train_after_start is not None:
+            segments.append(("train_after", self.train_after_start, self.train_after_end))
+        segments.append(("test", self.test_start, self.test_end))
+        return segments
+
+
+@dataclass
+class SharedFrameHandle:
+    """Picklable description of a DataFrame laid out in one shared memory block"""
+    name: str
+    rows: int
+    columns: List[Tuple[str, str, int]]  # (column, dtype, byte offset)
+    symbols: Optional[List[str]] = None
+
+
+class SharedMarketData:
+    """Market data copied once into shared memory for sweep workers
+
+    Numeric and timestamp columns are stored column by column in a single
+    block; the symbol column is stored as integer codes plus the symbol
+    list. Workers attach by name and rebuild a read-only DataFrame over the
+    shared buffers, so only the small handle crosses the process boundary.
+    """
+
+    def __init__(self, market_data: pd.DataFrame):
+        arrays = {}
+        symbols = None
+        for column in market_data.columns:
+            values = market_data[column]
+            if column == 'symbol':
+                codes, uniques = pd.factorize(values, sort=True)
+                arrays[column] = codes.astype(np.int32)
+                symbols = [str(symbol) for symbol in uniques]
+            elif pd.api.types.is_datetime64_any_dtype(values):
+                arrays[column] = pd.to_datetime(values).to_numpy(dtype='datetime64[ns]')
+            elif pd.api.types.is_numeric_dtype(values):
+                arrays[column] = values.to_numpy()
+            else:
+                logger.warning(f"Column {column} is not numeric; not shared with sweep workers")
+
+        layout = []
+        offset = 0
+        for column, array in arrays.items():
+            layout.append((column, array.dtype.str, offset))
+            offset += -(-array.nbytes // _SHARED_ALIGNMENT) * _SHARED_ALIGNMENT
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (column, dtype, start), array in zip(layout, arrays.values()):
+            np.ndarray(array.shape, dtype=dtype, buffer=self.shm.buf, offset=start)[:] = array
+
+        self.handle = SharedFrameHandle(
+            name=self.shm.name, rows=len(market_data), columns=layout, symbols=symbols
+        )
+
+    @staticmethod
+    def attach(handle: SharedFrameHandle) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+        """Attach to a block and wrap it as a DataFrame; keep the segment alive while the frame is used"""
+        shm = shared_memory.SharedMemory(name=handle.name)
+        data = {}
+        for column, dtype, offset in handle.columns:
+            array = np.ndarray((handle.rows,), dtype=dtype, buffer=shm.buf, offset=offset)
+            array.flags.writeable = False
+            if column == 'symbol' and handle.symbols is not None:
+                data[column] = pd.Categorical.from_codes(array, categories=handle.symbols)
+            else:
+                data[column] = array
+        return shm, pd.DataFrame(data, copy=False)
+
+    def close(self):
+        """Release and unlink the shared block"""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedMarketData":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def walk_forward_splits(
+    trading_days: List[date],
+    train_days: int,
+    test_days: int,
+    step_days: Optional[int] = None,
+    anchored: bool = False
+) -> List[TimeSplit]:
+    """Rolling (or anchored) train/test windows measured in trading days"""
+    step_days = step_days or test_days
+    splits = []
+    start = 0
+    while start + train_days + test_days <= len(trading_days):
+        train_from = 0 if anchored else start
+        test_from = start + train_days
+        splits.append(TimeSplit(
+            fold=len(splits),
+            train_start=trading_days[train_from],
+            train_end=trading_days[test_from - 1],
+            test_start=trading_days[test_from],
+            test_end=trading_days[test_from + test_days - 1]
+        ))
+        start += step_days
+    return splits
+
+
+def kfold_splits(trading_days: List[date], folds: int) -> List[TimeSplit]:
+    """Contiguous, non-overlapping test blocks, each trained on the days outside it"""
+    blocks = [block for block in np.array_split(np.arange(len(trading_days)), folds) if len(block)]
+    last = len(trading_days) - 1
+    splits = []
+    for k, block in enumerate(blocks):
+        first, final = block[0], block[-1]
+        splits.append(TimeSplit(
+            fold=k,
+            test_start=trading_days[first],
+            test_end=trading_days[final],
+            train_start=trading_days[0] if first > 0 else None,
+            train_end=trading_days[first - 1] if first > 0 else None,
+            train_after_start=trading_days[final + 1] if final < last else None,
+            train_after_end=trading_days[last] if final < last else None
+        ))
+    return splits
+
+
+def summarize_backtest(results: BacktestResults) -> Dict[str, Any]:
+    """Scalar metrics of one backtest for the comparison table"""
+    return {metric: float(getattr(results, metric)) for metric in SUMMARY_METRICS}
+
+
+# Worker state, set once per process by the pool initializer
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_sweep_worker(handle: SharedFrameHandle, base_config: BacktestConfig, strategies: Dict[str, StrategySpec]):
+    shm, market_data = SharedMarketData.attach(handle)
+    _worker_state.update(shm=shm, market_data=market_data, base_config=base_config, strategies=strategies)
+
+
+def _run_sweep_task(task: Tuple[SweepVariant, Optional[int], str, date, date, bool]):
+    """Pool entry point: one variant on one window"""
+    variant, fold, segment, start, end, keep_results = task
+    return _evaluate(
+        _worker_state['market_data'], _worker_state['base_config'], _worker_state['strategies'],
+        variant, fold, segment, start, end, keep_results
+    )
+
+
+def _window_config(base_config: BacktestConfig, variant: SweepVariant,
+                   start: Optional[date], end: Optional[date]) -> BacktestConfig:
+    """Base config with the variant's overrides, restricted to a window at the base time of day"""
+    overrides = dict(variant.config_overrides)
+    if start is not None:
+        overrides['start_date'] = datetime.combine(start, base_config.start_date.time())
+    if end is not None:
+        overrides['end_date'] = datetime.combine(end, base_config.end_date.time())
+    return dataclasses.replace(base_config, **overrides)
+
+
+def _evaluate(
+    market_data: pd.DataFrame,
+    base_config: BacktestConfig,
+    strategies: Dict[str, StrategySpec],
+    variant: SweepVariant,
+    fold: Optional[int],
+    segment: str,
+    start: Optional[date],
+    end: Optional[date],
+    keep_results: bool
+) -> Tuple[Dict[str, Any], Optional[BacktestResults]]:
+    config = _window_config(base_config, variant, start, end)
+    built = {
+        key: spec.build(variant.strategy_parameters.get(key))
+        for key, spec in strategies.items()
+    }
+
+    started = time.perf_counter()
+    results = asyncio.run(BacktestingEngine(config).run_backtest(built, market_data))
+
+    row = {
+        'variant_id': variant.variant_id,
+        'fold': fold,
+        'segment': segment,
+        'start_date': config.start_date,
+        'end_date': config.end_date,
+        **variant.flatten(),
+        **summarize_backtest(results),
+        'elapsed_seconds': time.perf_counter() - started
+    }
+    return row, results if keep_results else None
+
+
+class ParameterSweep:
+    """Fan BacktestConfig x strategy parameter variants out over a process pool"""
+
+    def __init__(
+        self,
+        base_config: BacktestConfig,
+        strategies: Dict[str, StrategySpec],
+        market_data: pd.DataFrame,
+        max_workers: Optional[int] = None,
+        mp_context=None
+    ):
+        """``max_workers=1`` evaluates in-process, without a pool or shared memory"""
+        self.base_config = base_config
+        self.strategies = strategies
+        self.market_data = market_data
+        self.max_workers = max_workers
+        self.mp_context = mp_context
+
+        # Full BacktestResults by (variant_id, fold, segment) when run with keep_results
+        self.results: Dict[Tuple[int, Optional[int], str], BacktestResults] = {}
+
+    def grid(
+        self,
+        parameter_grid: Dict[str, Dict[str, List[Any]]],
+        config_grid: Optional[Dict[str, List[Any]]] = None
+    ) -> List[SweepVariant]:
+        """Cartesian product of ``{strategy: {parameter: values}}`` and ``{config_field: values}``"""
+        axes = [
+            (strategy_key, name, values)
+            for strategy_key, parameters in parameter_grid.items()
+            for name, values in parameters.items()
+        ]
+        axes += [(None, name, values) for name, values in (config_grid or {}).items()]
+
+        variants = []
+        for combination in itertools.product(*(values for _, _, values in axes)):
+            variant = SweepVariant(variant_id=len(variants))
+            for (strategy_key, name, _), value in zip(axes, combination):
+                if strategy_key is None:
+                    variant.config_overrides[name] = value
+                else:
+                    variant.strategy_parameters.setdefault(strategy_key, {})[name] = value
+            variants.append(variant)
+        return variants
+
+    def random(
+        self,
+        parameter_space: Dict[str, Dict[str, Any]],
+        n_variants: int,
+        config_space: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None
+    ) -> List[SweepVariant]:
+        """Random search; a list is sampled as choices, a ``(low, high)`` tuple uniformly (integers if both ends are)"""
+        rng = np.random.default_rng(seed)
+
+        def sample(space):
+            if isinstance(space, tuple):
+                low, high = space
+                if isinstance(low, int) and isinstance(high, int):
+                    return int(rng.integers(low, high + 1))
+                return float(rng.uniform(low, high))
+            return space[int(rng.integers(len(space)))]
+
+        return [
+            SweepVariant(
+                variant_id=i,
+                strategy_parameters={
+                    strategy_key: {name: sample(space) for name, space in parameters.items()}
+                    for strategy_key, parameters in parameter_space.items()
+                },
+                config_overrides={name: sample(space) for name, space in (config_space or {}).items()}
+            )
+            for i in range(n_variants)
+        ]
+
+    def trading_days(self) -> List[date]:
+        """Distinct bar dates inside the base config's window"""
+        days = pd.to_datetime(self.market_data['timestamp']).dt.date.unique()
+        return sorted(
+            day for day in days
+            if self.base_config.start_date.date() <= day <= self.base_config.end_date.date()
+        )
+
+    async def run(
+        self,
+        variants: List[SweepVariant],
+        splits: Optional[List[TimeSplit]] = None,
+        keep_results: bool = False
+    ) -> pd.DataFrame:
+        """Backtest every variant on every split segment (or the full window); one table row per run"""
+        if splits:
+            tasks = [
+                (variant, split.fold, segment, start, end, keep_results)
+                for split in splits
+                for segment, start, end in split.segments()
+                for variant in variants
+            ]
+        else:
+            tasks = [(variant, None, "full", None, None, keep_results) for variant in variants]
+
+        logger.info(f"Running {len(tasks)} backtests for {len(variants)} variants")
+
+        if self.max_workers == 1:
+            outcomes = [
+                await asyncio.to_thread(
+                    _evaluate, self.market_data, self.base_config, self.strategies, *task
+                )
+                for task in tasks
+            ]
+        else:
+            outcomes = await self._run_in_pool(tasks)
+
+        rows = []
+        for (variant, fold, segment, *_), (row, results) in zip(tasks, outcomes):
+            rows.append(row)
+            if results is not None:
+                self.results[(variant.variant_id, fold, segment)] = results
+
+        return pd.DataFrame(rows).sort_values(['fold', 'segment', 'variant_id'], na_position='first') \
+            .reset_index(drop=True)
+
+    async def _run_in_pool(self, tasks: List[tuple]) -> List[tuple]:
+        loop = asyncio.get_running_loop()
+        with SharedMarketData(self.market_data) as shared:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self.mp_context,
+                initializer=_init_sweep_worker,
+                initargs=(shared.handle, self.base_config, self.strategies)
+            ) as executor:
+                return await asyncio.gather(*(
+                    loop.run_in_executor(executor, _run_sweep_task, task) for task in tasks
+                ))
+
+    async def walk_forward(
+        self,
+        variants: List[SweepVariant],
+        train_days: int,
+        test_days: int,
+        step_days: Optional[int] = None,
+        anchored: bool = False,
+        metric: str = "sharpe_ratio"
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Pick the best variant on each training window and report it out of sample
+
+        Returns (full comparison table, one row per fold for the selected variant).
+        """
+        splits = walk_forward_splits(self.trading_days(), train_days, test_days, step_days, anchored)
+        if not splits:
+            raise ValueError("Not enough trading days for one walk-forward split")
+
+        table = await self.run(variants, splits)
+        return table, self.select_walk_forward(table, metric)
+
+    @staticmethod
+    def select_walk_forward(table: pd.DataFrame, metric: str = "sharpe_ratio") -> pd.DataFrame:
+        """Per fold: best in-sample variant by ``metric`` and its out-of-sample row
+
+        A k-fold training set split around the test block scores the mean of its two windows.
+        """
+        train = table[table['segment'].isin(('train', 'train_after'))] \
+            .groupby(['fold', 'variant_id'], as_index=False)[metric].mean()
+        test = table[table['segment'] == 'test'].set_index(['fold', 'variant_id'])
+
+        best = train.loc[train.groupby('fold')[metric].idxmax(), ['fold', 'variant_id', metric]]
+        best = best.rename(columns={metric: f"train_{metric}"})
+        selected = test.loc[list(zip(best['fold'], best['variant_id']))].reset_index()
+        selected.insert(2, f"train_{metric}", best[f"train_{metric}"].to_numpy())
+        return selected
+
+    @staticmethod
+    def best_parameters(table: pd.DataFrame, metric: str = "sharpe_ratio") -> Dict[str, Dict[str, Any]]:
+        """Strategy parameters of the variant with the best mean ``metric`` across its rows"""
+        variant_id = table.groupby('variant_id')[metric].mean().idxmax()
+        row = table[table['variant_id'] == variant_id].iloc[0]
+
+        parameters: Dict[str, Dict[str, Any]] = {}
+        for column, value in row.items():
+            if '.' in column and not column.startswith('config.'):
+                strategy_key, name = column.split('.', 1)
+                parameters.setdefault(strategy_key, {})[name] = value.item() if hasattr(value, 'item') else value
+        return parameters
+
+
+__all__ = [
+    "StrategySpec", "SweepVariant", "TimeSplit", "SharedFrameHandle", "SharedMarketData",
+    "ParameterSweep", "walk_forward_splits", "kfold_splits", "summarize_backtest"
+]
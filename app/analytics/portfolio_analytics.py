@@ -16,16 +16,24 @@ Features:
 """
 
 import asyncio
+import gc
+import itertools
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import pandas as pd
 import numpy as np
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import json
 import statistics
+from pathlib import Path
+from scipy import sparse
+from scipy.optimize import minimize
+
+from app.institutional.covariance_store import CovarianceStore, shared_covariance_store
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +74,7 @@ class PortfolioHolding:
     country: str = "IN"
     beta: Optional[float] = None
     dividend_yield: Optional[float] = None
+    duration: Optional[float] = None  # modified duration, for rate shocks
 
 
 @dataclass
@@ -109,6 +118,7 @@ class StressTestResult:
     liquidity_impact: float
     recovery_time_estimate: int  # days
     description: str
+    scenario_name: Optional[str] = None
 
 
 @dataclass
@@ -133,24 +143,529 @@ class PerformanceAttribution:
     stock_contributions: Dict[str, float]
 
 
+@dataclass
+class SimulatedReturns:
+    """Horizon returns from one Monte Carlo run"""
+    portfolio_returns: np.ndarray        # one per path
+    asset_mean: np.ndarray               # per-asset mean horizon return
+    asset_covariance: np.ndarray         # covariance of asset horizon returns across paths
+
+
+def _simulate_chunk(task: Tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Simulate one chunk of paths; module level so process pool workers can run it"""
+    seed, paths, steps, mean, factor, weights = task
+    rng = np.random.default_rng(seed)
+    
+    # (paths x steps x assets) correlated step returns in one draw
+    step_returns = rng.standard_normal((paths, steps, len(mean)), dtype=np.float32) @ factor
+    step_returns += 1.0 + mean
+    asset_returns = step_returns.prod(axis=1, dtype=np.float64)
+    asset_returns -= 1.0
+    
+    return asset_returns @ weights, asset_returns.sum(axis=0), asset_returns.T @ asset_returns
+
+
+class MonteCarloEngine:
+    """Correlated multi-asset Monte Carlo on a Cholesky-factored covariance
+    
+    Paths are drawn chunk by chunk so memory stays bounded by ``chunk_elements``
+    float32 values. Every chunk gets its own seed from one ``SeedSequence``, so a
+    seeded run gives the same paths in-process or across any number of workers.
+    """
+    
+    def __init__(self, mean: np.ndarray, covariance: np.ndarray, seed: Optional[int] = None,
+                 chunk_elements: int = 4_000_000, max_workers: int = 1, mp_context=None):
+        """``mean`` and ``covariance`` are per simulation step"""
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.covariance = np.asarray(covariance, dtype=np.float64)
+        self.cholesky = self._cholesky(self.covariance)
+        self.seed = seed
+        self.chunk_elements = chunk_elements
+        self.max_workers = max_workers
+        self.mp_context = mp_context
+    
+    @staticmethod
+    def _cholesky(covariance: np.ndarray) -> np.ndarray:
+        """Lower Cholesky factor, adding diagonal jitter to sample covariances that are only semi-definite"""
+        jitter = 0.0
+        scale = max(np.trace(covariance) / max(len(covariance), 1), 1e-12)
+        for _ in range(8):
+            try:
+                return np.linalg.cholesky(covariance + jitter * np.eye(len(covariance)))
+            except np.linalg.LinAlgError:
+                jitter = scale * 1e-10 if jitter == 0.0 else jitter * 100
+        raise ValueError("Covariance matrix is not positive semi-definite")
+    
+    def _tasks(self, weights: np.ndarray, simulations: int, steps: int) -> List[Tuple]:
+        chunk = max(1, self.chunk_elements // (steps * len(self.mean)))
+        sizes = [min(chunk, simulations - start) for start in range(0, simulations, chunk)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        factor = self.cholesky.T.astype(np.float32)
+        mean = self.mean.astype(np.float32)
+        return [(seed, size, steps, mean, factor, weights) for seed, size in zip(seeds, sizes)]
+    
+    def simulate(self, weights: np.ndarray, simulations: int, steps: int = 1) -> SimulatedReturns:
+        """Compound ``steps`` correlated step returns per path and weight them into portfolio returns"""
+        weights = np.asarray(weights, dtype=np.float64)
+        tasks = self._tasks(weights, simulations, steps)
+        
+        if self.max_workers == 1 or len(tasks) == 1:
+            chunks = [_simulate_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self.mp_context) as executor:
+                chunks = list(executor.map(_simulate_chunk, tasks))
+        
+        portfolio_returns = np.concatenate([chunk[0] for chunk in chunks])
+        asset_mean = sum(chunk[1] for chunk in chunks) / simulations
+        second_moment = sum(chunk[2] for chunk in chunks) / simulations
+        asset_covariance = (second_moment - np.outer(asset_mean, asset_mean)) * simulations / max(simulations - 1, 1)
+        return SimulatedReturns(portfolio_returns, asset_mean, asset_covariance)
+
+
+@dataclass
+class ShockScenario:
+    """One stress scenario as data
+    
+    A holding's price move is its asset-class shock (times beta for equities when
+    ``beta_scaled``) plus its sector shock, its market-value tier shock and
+    ``-duration * rate_shock_bps / 10,000``. Only losses count; gains do not offset them.
+    """
+    name: str
+    category: StressScenario
+    description: str = ""
+    asset_class_shocks: Dict[str, float] = field(default_factory=dict)  # lower-case asset class
+    default_asset_class_shock: float = 0.0
+    beta_scaled: bool = False
+    sector_shocks: Dict[str, float] = field(default_factory=dict)
+    default_sector_shock: float = 0.0
+    rate_shock_bps: float = 0.0
+    market_value_tiers: List[Tuple[Optional[float], float]] = field(default_factory=list)  # (exclusive upper bound or None, shock)
+    liquidity_impact: float = 0.0
+    recovery_time_estimate: int = 0
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ShockScenario":
+        data = dict(data)
+        data["category"] = StressScenario(data.get("category", StressScenario.BLACK_SWAN.value))
+        data["market_value_tiers"] = [tuple(tier) for tier in data.get("market_value_tiers", [])]
+        return cls(**data)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(self.__dict__)
+        data["category"] = self.category.value
+        data["market_value_tiers"] = [list(tier) for tier in self.market_value_tiers]
+        return data
+
+
+DEFAULT_STRESS_SCENARIOS = [
+    ShockScenario(
+        name="market_crash",
+        category=StressScenario.MARKET_CRASH,
+        description="Severe market crash scenario (-30% market drop with sector-specific impacts)",
+        asset_class_shocks={"equity": -0.35, "debt": -0.05, "commodity": -0.20, "real_estate": -0.25, "cash": 0.0},
+        default_asset_class_shock=-0.30,
+        beta_scaled=True,
+        liquidity_impact=0.15,
+        recovery_time_estimate=180
+    ),
+    ShockScenario(
+        name="interest_rate_shock",
+        category=StressScenario.INTEREST_RATE_SHOCK,
+        description="Interest rate shock (+300 bps) with duration-based impact analysis",
+        asset_class_shocks={"debt": -0.15, "equity": -0.08, "real_estate": -0.12, "commodity": 0.03, "cash": 0.05},
+        default_asset_class_shock=-0.05,
+        liquidity_impact=0.08,
+        recovery_time_estimate=120
+    ),
+    ShockScenario(
+        name="sector_rotation",
+        category=StressScenario.SECTOR_ROTATION,
+        description="Major sector rotation from growth to value with style factor impacts",
+        sector_shocks={
+            "Technology": -0.25, "Healthcare": -0.15, "Consumer Discretionary": -0.20,
+            "Financial Services": 0.10, "Energy": 0.15, "Utilities": 0.08,
+            "Consumer Staples": 0.05, "Industrials": -0.05, "Materials": 0.12
+        },
+        liquidity_impact=0.05,
+        recovery_time_estimate=90
+    ),
+    ShockScenario(
+        name="liquidity_crisis",
+        category=StressScenario.LIQUIDITY_CRISIS,
+        description="Liquidity crisis with market cap-based impact differentiation",
+        market_value_tiers=[(1_000_000, -0.20), (5_000_000, -0.12), (None, -0.05)],
+        liquidity_impact=0.25,
+        recovery_time_estimate=60
+    ),
+    ShockScenario(
+        name="historical_replay_2008",
+        category=StressScenario.HISTORICAL_REPLAY,
+        description="2008 Financial Crisis replay with historical sector-specific impacts",
+        sector_shocks={
+            "Financial Services": -0.55, "Real Estate": -0.45, "Consumer Discretionary": -0.35,
+            "Industrials": -0.30, "Technology": -0.25, "Materials": -0.40, "Energy": -0.30,
+            "Healthcare": -0.15, "Consumer Staples": -0.10, "Utilities": -0.20
+        },
+        default_sector_shock=-0.25,
+        liquidity_impact=0.30,
+        recovery_time_estimate=365
+    )
+]
+
+
+class StressScenarioSet:
+    """Scenarios compiled into shock matrices, reusable across portfolios
+    
+    Asset-class and sector matrices are built per vocabulary (the distinct values in a
+    batch of holdings) and cached, so repeated batches over the same universe only
+    gather columns.
+    """
+    
+    def __init__(self, scenarios: List[ShockScenario]):
+        self.scenarios = list(scenarios)
+        self.beta_scaled = np.array([s.beta_scaled for s in self.scenarios])
+        self.rate_shocks = np.array([s.rate_shock_bps for s in self.scenarios], dtype=float) / 10_000
+        self.tiers = [
+            (i, np.array([np.inf if bound is None else bound for bound, _ in s.market_value_tiers], dtype=float),
+             np.array([shock for _, shock in s.market_value_tiers] + [0.0]))
+            for i, s in enumerate(self.scenarios) if s.market_value_tiers
+        ]
+        self._matrix_cache: Dict[Tuple[str, Tuple[str, ...]], np.ndarray] = {}
+    
+    def __len__(self) -> int:
+        return len(self.scenarios)
+    
+    @classmethod
+    def default(cls) -> "StressScenarioSet":
+        return cls(DEFAULT_STRESS_SCENARIOS)
+    
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "StressScenarioSet":
+        """Load ``{"scenarios": [...]}`` (or a bare list) written by ``to_file``"""
+        with open(path) as f:
+            data = json.load(f)
+        return cls([ShockScenario.from_dict(s) for s in (data["scenarios"] if isinstance(data, dict) else data)])
+    
+    def to_file(self, path: Union[str, Path]):
+        with open(path, "w") as f:
+            json.dump({"scenarios": [s.to_dict() for s in self.scenarios]}, f, indent=2)
+    
+    def shock_matrix(self, kind: str, vocabulary: Tuple[str, ...]) -> np.ndarray:
+        """(scenarios x vocabulary) shocks for ``kind`` "asset_class" or "sector\""""
+        key = (kind, vocabulary)
+        matrix = self._matrix_cache.get(key)
+        if matrix is None:
+            matrix = np.array([
+                [getattr(s, f"{kind}_shocks").get(value, getattr(s, f"default_{kind}_shock")) for value in vocabulary]
+                for s in self.scenarios
+            ], dtype=float).reshape(len(self.scenarios), len(vocabulary))
+            self._matrix_cache[key] = matrix
+        return matrix
+
+
+class StressTestEngine:
+    """Applies every scenario to every holding of a batch of books in one array computation"""
+    
+    def __init__(self, scenario_set: Optional[StressScenarioSet] = None, batch_size: int = 500,
+                 top_assets: int = 5):
+        self.scenario_set = scenario_set or StressScenarioSet.default()
+        self.batch_size = batch_size
+        self.top_assets = top_assets
+    
+    def run(self, holdings: List[PortfolioHolding]) -> List[StressTestResult]:
+        """All scenarios for one book"""
+        return self._run_batch([holdings])[0] if holdings else []
+    
+    def stream(self, books: Union[Dict[str, List[PortfolioHolding]], Iterable[Tuple[str, List[PortfolioHolding]]]]
+               ) -> Iterator[List[Tuple[str, List[StressTestResult]]]]:
+        """Yield ``batch_size`` books at a time as (book_id, results) pairs; books without holdings get no results"""
+        items = iter(books.items() if isinstance(books, dict) else books)
+        while True:
+            batch = list(itertools.islice(items, self.batch_size))
+            if not batch:
+                return
+            filled = [holdings for _, holdings in batch if holdings]
+            results = iter(self._run_batch(filled)) if filled else iter(())
+            yield [(book_id, next(results) if holdings else []) for book_id, holdings in batch]
+    
+    def impacts(self, holdings: List[PortfolioHolding]) -> np.ndarray:
+        """(scenarios x holdings) fractional price moves"""
+        return self._impacts(self._encode([holdings]))
+    
+    def _encode(self, books: List[List[PortfolioHolding]]) -> Dict[str, Any]:
+        asset_classes: Dict[str, int] = {}
+        sectors: Dict[str, int] = {}
+        columns = defaultdict(list)
+        group_names: List[str] = []
+        book_starts, group_starts = [], []
+        
+        for b, holdings in enumerate(books):
+            book_starts.append(len(columns["value"]))
+            book_groups: Dict[str, int] = {}  # sector -> group, in first-seen order like the dict it feeds
+            for h in holdings:
+                asset_class = h.asset_class.lower()
+                is_equity_with_beta = asset_class == "equity" and h.beta
+                columns["value"].append(h.market_value)
+                columns["beta"].append(h.beta if is_equity_with_beta else 1.0)
+                columns["duration"].append(h.duration or 0.0)
+                columns["asset_class"].append(asset_classes.setdefault(asset_class, len(asset_classes)))
+                columns["sector"].append(sectors.setdefault(h.sector, len(sectors)))
+                group = book_groups.get(h.sector)
+                if group is None:
+                    group = book_groups[h.sector] = len(group_names)
+                    group_names.append(h.sector)
+                columns["group"].append(group)
+                columns["book"].append(b)
+            group_starts.append(len(group_names) - len(book_groups))
+        
+        encoded = {name: np.array(values, dtype=float if name in ("value", "beta", "duration") else np.int64)
+                   for name, values in columns.items()}
+        encoded.update({
+            "asset_class_vocabulary": tuple(asset_classes),
+            "sector_vocabulary": tuple(sectors),
+            "symbols": [h.symbol for holdings in books for h in holdings],
+            "book_starts": np.array(book_starts + [len(encoded["value"])]),
+            "group_names": group_names,
+            "group_starts": group_starts + [len(group_names)]
+        })
+        return encoded
+    
+    def _impacts(self, encoded: Dict[str, Any]) -> np.ndarray:
+        scenarios = self.scenario_set
+        impact = scenarios.shock_matrix("asset_class", encoded["asset_class_vocabulary"])[:, encoded["asset_class"]]
+        if scenarios.beta_scaled.any():
+            impact[scenarios.beta_scaled] *= encoded["beta"]
+        impact += scenarios.shock_matrix("sector", encoded["sector_vocabulary"])[:, encoded["sector"]]
+        if scenarios.rate_shocks.any():
+            impact -= np.outer(scenarios.rate_shocks, encoded["duration"])
+        for row, bounds, shocks in scenarios.tiers:
+            impact[row] += shocks[np.searchsorted(bounds, encoded["value"], side="right")]
+        return impact
+    
+    def _run_batch(self, books: List[List[PortfolioHolding]]) -> List[List[StressTestResult]]:
+        encoded = self._encode(books)
+        impact = self._impacts(encoded)
+        losses = encoded["value"] * np.maximum(-impact, 0.0)  # scenarios x holdings
+        
+        starts = encoded["book_starts"]
+        book_losses = np.add.reduceat(losses, starts[:-1], axis=1).T.tolist()
+        book_values = np.add.reduceat(encoded["value"], starts[:-1]).tolist()
+        
+        order = np.argsort(encoded["group"], kind="stable")
+        group_offsets = np.flatnonzero(np.diff(encoded["group"][order], prepend=-1))
+        group_losses = np.add.reduceat(losses[:, order], group_offsets, axis=1).T.tolist()
+        
+        # Worst performers: books padded to equal length so one stable sort ranks every book
+        sizes = np.diff(starts)
+        width = int(sizes.max())
+        position = np.arange(len(impact[0])) - np.repeat(starts[:-1], sizes)
+        padded = np.full((len(impact), len(books), width), np.inf)
+        padded[:, encoded["book"], position] = impact
+        top = min(self.top_assets, width)
+        ranked = np.argsort(padded, axis=2, kind="stable")[:, :, :top]
+        
+        # (symbol, impact) pairs for every book x scenario x rank, sliced per result below
+        top_impacts = np.take_along_axis(padded, ranked, axis=2).transpose(1, 0, 2).ravel().tolist()
+        top_holdings = np.minimum(ranked + starts[:-1, None], len(position) - 1).transpose(1, 0, 2).ravel()
+        symbols = encoded["symbols"]
+        ranked_pairs = list(zip([symbols[i] for i in top_holdings.tolist()], top_impacts))
+        
+        group_names, group_starts = encoded["group_names"], encoded["group_starts"]
+        scenarios = [(s.category, s.liquidity_impact, s.recovery_time_estimate, s.description, s.name)
+                     for s in self.scenario_set.scenarios]
+        
+        # Millions of small containers: keep the cyclic collector from rescanning them mid-batch
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            results = []
+            base = 0
+            for b, size in enumerate(sizes.tolist()):
+                value = book_values[b]
+                g0, g1 = group_starts[b], group_starts[b + 1]
+                names = group_names[g0:g1]
+                k = min(top, size)
+                book_results = []
+                for (category, liquidity, recovery, description, name), loss, groups in zip(
+                        scenarios, book_losses[b], zip(*group_losses[g0:g1])):
+                    book_results.append(StressTestResult(
+                        category, loss, loss / value if value else 0.0, ranked_pairs[base:base + k],
+                        dict(zip(names, groups)), liquidity, recovery, description, name
+                    ))
+                    base += top
+                results.append(book_results)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return results
+
+
+@dataclass
+class BatchPortfolioResult:
+    """Risk and performance metrics for one portfolio of a batch run"""
+    portfolio_id: str
+    portfolio_value: float
+    risk_metrics: RiskMetrics
+    performance: PortfolioPerformance
+
+
+RISK_METRIC_FIELDS = ("var_95", "var_99", "cvar_95", "cvar_99", "max_drawdown", "current_drawdown",
+                      "volatility", "downside_deviation", "beta", "correlation_to_market")
+PERFORMANCE_METRIC_FIELDS = ("total_return", "annualized_return", "volatility", "sharpe_ratio", "max_drawdown",
+                             "calmar_ratio", "alpha", "beta", "tracking_error", "information_ratio")
+
+
+def _drawdowns(returns: np.ndarray) -> np.ndarray:
+    growth = np.cumprod(1 + returns, axis=1)
+    running_max = np.maximum.accumulate(growth, axis=1)
+    return (growth - running_max) / running_max
+
+
+def _co_moments(returns: np.ndarray, benchmark: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per row: sample covariance with the benchmark, population benchmark variance and correlation"""
+    days = returns.shape[1]
+    centred = returns - returns.mean(axis=1, keepdims=True)
+    benchmark_centred = benchmark - benchmark.mean(axis=-1, keepdims=True)
+    cross = (centred * benchmark_centred).sum(axis=1)
+    benchmark_squares = (benchmark_centred ** 2).sum(axis=-1)
+    correlation = cross / np.sqrt((centred ** 2).sum(axis=1) * benchmark_squares)
+    return cross / (days - 1), benchmark_squares / days, correlation
+
+
+def _risk_metric_columns(returns: np.ndarray, benchmark: Optional[np.ndarray]) -> Dict[str, np.ndarray]:
+    """RiskMetrics fields for every row of a (portfolios x days) return matrix
+    
+    Without a benchmark each row is measured against itself, as the single-portfolio path always has.
+    """
+    annualize = np.sqrt(252)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_95, var_99 = np.percentile(returns, [5, 1], axis=1)
+        cvar = []
+        for var in (var_95, var_99):
+            tail = returns <= var[:, None]
+            tail_count = tail.sum(axis=1)
+            tail_mean = np.where(tail, returns, 0.0).sum(axis=1) / np.maximum(tail_count, 1)
+            cvar.append(np.where(tail_count > 0, tail_mean, var))
+        
+        drawdowns = _drawdowns(returns)
+        
+        negative = returns < 0
+        negative_count = np.maximum(negative.sum(axis=1), 1)
+        negative_mean = np.where(negative, returns, 0.0).sum(axis=1) / negative_count
+        negative_variance = np.where(negative, (returns - negative_mean[:, None]) ** 2, 0.0).sum(axis=1) / negative_count
+        downside_deviation = np.where(negative.any(axis=1), np.sqrt(negative_variance) * annualize, 0.0)
+        
+        if benchmark is None or len(benchmark) == returns.shape[1]:
+            covariance, benchmark_variance, correlation = _co_moments(
+                returns, returns if benchmark is None else benchmark
+            )
+            beta = np.where(benchmark_variance != 0, covariance / benchmark_variance, 1.0)
+        else:
+            beta = np.ones(len(returns))
+            correlation = np.zeros(len(returns))
+    
+    return {
+        "var_95": var_95, "var_99": var_99, "cvar_95": cvar[0], "cvar_99": cvar[1],
+        "max_drawdown": drawdowns.min(axis=1), "current_drawdown": drawdowns[:, -1],
+        "volatility": returns.std(axis=1) * annualize, "downside_deviation": downside_deviation,
+        "beta": beta, "correlation_to_market": correlation
+    }
+
+
+def _performance_metric_columns(returns: np.ndarray, benchmark: Optional[np.ndarray],
+                                risk_free_rate: float) -> Dict[str, np.ndarray]:
+    """PortfolioPerformance figures for every row of a (portfolios x days) return matrix"""
+    annualize = np.sqrt(252)
+    daily_risk_free = risk_free_rate / 252
+    count, days = returns.shape
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_return = np.prod(1 + returns, axis=1) - 1
+        annualized_return = (1 + total_return) ** (252 / days) - 1
+        
+        excess = returns - daily_risk_free
+        excess_std = excess.std(axis=1)
+        sharpe_ratio = np.where(excess_std != 0, excess.mean(axis=1) / excess_std * annualize, 0.0)
+        
+        max_drawdown = _drawdowns(returns).min(axis=1)
+        calmar_ratio = np.where(max_drawdown != 0, annualized_return / np.abs(max_drawdown), 0.0)
+        
+        if benchmark is None or len(benchmark) == days:
+            benchmark_excess = (returns if benchmark is None else benchmark) - daily_risk_free
+            covariance, benchmark_variance, _ = _co_moments(excess, benchmark_excess)
+            beta = np.where(benchmark_variance != 0, covariance / benchmark_variance, 1.0)
+            alpha = (excess.mean(axis=1) - beta * benchmark_excess.mean(axis=-1)) * 252
+            
+            active = returns if benchmark is None else returns - benchmark
+            active_std = active.std(axis=1)
+            tracking_error = active_std * annualize
+            information_ratio = np.where(active_std != 0, active.mean(axis=1) / active_std * annualize, 0.0)
+        else:
+            alpha = beta = tracking_error = information_ratio = np.zeros(count)
+    
+    return {
+        "total_return": total_return, "annualized_return": annualized_return,
+        "volatility": returns.std(axis=1) * annualize, "sharpe_ratio": sharpe_ratio,
+        "max_drawdown": max_drawdown, "calmar_ratio": calmar_ratio, "alpha": alpha, "beta": beta,
+        "tracking_error": tracking_error, "information_ratio": information_ratio
+    }
+
+
+_batch_worker_context: Optional[Tuple[np.ndarray, Optional[np.ndarray], float]] = None
+
+
+def _init_batch_worker(context: Tuple[np.ndarray, Optional[np.ndarray], float]):
+    """Pool initializer: the shared (assets x days) returns matrix is sent once per worker, not per chunk"""
+    global _batch_worker_context
+    _batch_worker_context = context
+
+
+def _batch_metrics_chunk(weights: sparse.csr_matrix, context: Optional[Tuple] = None
+                         ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """Metric columns for a (portfolios x assets) block of sparse weights; module level so pool workers can run it"""
+    asset_returns, benchmark, risk_free_rate = context or _batch_worker_context
+    returns = np.asarray(weights @ asset_returns)  # (portfolios x days) from one sparse-dense product
+    return _risk_metric_columns(returns, benchmark), _performance_metric_columns(returns, benchmark, risk_free_rate)
+
+
 class PortfolioAnalyzer:
     """Advanced portfolio analytics engine."""
     
-    def __init__(self, config: Optional[Dict] = None):
+    def __init__(self, config: Optional[Dict] = None, covariance_store: Optional[CovarianceStore] = None):
         self.config = config or self._default_config()
         self.risk_free_rate = self.config.get("risk_free_rate", 0.06)
         self.market_return = self.config.get("market_return", 0.12)
         
+        # Daily covariance estimates, shared with the risk and optimization modules unless a
+        # store or a separate store directory is given
+        store_path = self.config.get("covariance_store_path")
+        self.covariance_store = covariance_store or (CovarianceStore(store_path) if store_path
+                                                     else shared_covariance_store)
+        
         # Caching
         self.price_cache = {}
         self.correlation_cache = {}
         self.benchmark_cache = {}
         
+        # Stress scenarios are data; a file in the config replaces the built-in set
+        scenarios_path = self.config.get("stress_scenarios_path")
+        self.stress_engine = StressTestEngine(
+            StressScenarioSet.from_file(scenarios_path) if scenarios_path else StressScenarioSet.default()
+        )
+        
     def _default_config(self) -> Dict:
         return {
             "risk_free_rate": 0.06,  # 6% risk-free rate (Indian context)
             "market_return": 0.12,   # 12% expected market return
             "monte_carlo_runs": 10000,
+            "monte_carlo_horizon_days": 252,  # One-year horizon...
+            "monte_carlo_steps": 12,          # ...compounded from monthly steps
+            "monte_carlo_seed": None,
+            "monte_carlo_workers": 1,         # >1 spreads path chunks over processes
+            "efficient_frontier_points": 10,
+            "batch_chunk_size": 5000,         # portfolios per streamed batch
+            "batch_workers": 1,               # >1 spreads batches over processes
+            "covariance_store_path": None,    # directory of memory-mapped covariance snapshots
+            "covariance_estimator": "ledoit_wolf",
             "confidence_levels": [0.95, 0.99],
             "rebalancing_threshold": 0.05,  # 5% deviation
             "min_position_size": 0.01,      # 1% minimum
@@ -223,53 +738,9 @@ class PortfolioAnalyzer:
         if not portfolio_returns:
             return RiskMetrics(0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
         
-        returns_array = np.array(portfolio_returns)
-        benchmark_array = np.array(benchmark_returns) if benchmark_returns else returns_array
-        
-        # Value at Risk calculations
-        var_95 = np.percentile(returns_array, 5)  # 5th percentile for 95% VaR
-        var_99 = np.percentile(returns_array, 1)  # 1st percentile for 99% VaR
-        
-        # Conditional VaR (Expected Shortfall)
-        cvar_95 = returns_array[returns_array <= var_95].mean() if len(returns_array[returns_array <= var_95]) > 0 else var_95
-        cvar_99 = returns_array[returns_array <= var_99].mean() if len(returns_array[returns_array <= var_99]) > 0 else var_99
-        
-        # Maximum Drawdown
-        cumulative_returns = np.cumprod(1 + returns_array)
-        running_max = np.maximum.accumulate(cumulative_returns)
-        drawdowns = (cumulative_returns - running_max) / running_max
-        max_drawdown = np.min(drawdowns)
-        current_drawdown = drawdowns[-1] if len(drawdowns) > 0 else 0
-        
-        # Volatility
-        volatility = np.std(returns_array) * np.sqrt(252)  # Annualized
-        
-        # Downside deviation
-        negative_returns = returns_array[returns_array < 0]
-        downside_deviation = np.std(negative_returns) * np.sqrt(252) if len(negative_returns) > 0 else 0
-        
-        # Beta and correlation
-        if len(benchmark_array) == len(returns_array):
-            covariance = np.cov(returns_array, benchmark_array)[0, 1]
-            benchmark_variance = np.var(benchmark_array)
-            beta = covariance / benchmark_variance if benchmark_variance != 0 else 1.0
-            correlation = np.corrcoef(returns_array, benchmark_array)[0, 1]
-        else:
-            beta = 1.0
-            correlation = 0.0
-        
-        return RiskMetrics(
-            var_95=var_95,
-            var_99=var_99,
-            cvar_95=cvar_95,
-            cvar_99=cvar_99,
-            max_drawdown=max_drawdown,
-            current_drawdown=current_drawdown,
-            volatility=volatility,
-            downside_deviation=downside_deviation,
-            beta=beta,
-            correlation_to_market=correlation
-        )
+        columns = _risk_metric_columns(np.array([portfolio_returns], dtype=float),
+                                       np.array(benchmark_returns, dtype=float) if benchmark_returns else None)
+        return RiskMetrics(*(float(columns[name][0]) for name in RISK_METRIC_FIELDS))
     
     def _calculate_performance_metrics(self, portfolio_returns: List[float], 
                                      benchmark_returns: List[float], 
@@ -280,338 +751,146 @@ class PortfolioAnalyzer:
                 portfolio_id, datetime.now(), datetime.now(), 0, 0, 0, 0, 0, 0, 0, 0, 0, 0
             )
         
-        returns_array = np.array(portfolio_returns)
-        benchmark_array = np.array(benchmark_returns) if benchmark_returns else returns_array
-        
-        # Basic returns
-        total_return = np.prod(1 + returns_array) - 1
-        annualized_return = (1 + total_return) ** (252 / len(returns_array)) - 1
-        
-        # Volatility
-        volatility = np.std(returns_array) * np.sqrt(252)
-        
-        # Sharpe ratio
-        excess_returns = returns_array - (self.risk_free_rate / 252)
-        sharpe_ratio = np.mean(excess_returns) / np.std(excess_returns) * np.sqrt(252) if np.std(excess_returns) != 0 else 0
-        
-        # Maximum drawdown
-        cumulative_returns = np.cumprod(1 + returns_array)
-        running_max = np.maximum.accumulate(cumulative_returns)
-        drawdowns = (cumulative_returns - running_max) / running_max
-        max_drawdown = np.min(drawdowns)
-        
-        # Calmar ratio
-        calmar_ratio = annualized_return / abs(max_drawdown) if max_drawdown != 0 else 0
-        
-        # Alpha and Beta
-        if len(benchmark_array) == len(returns_array):
-            portfolio_excess = returns_array - (self.risk_free_rate / 252)
-            benchmark_excess = benchmark_array - (self.risk_free_rate / 252)
-            
-            covariance = np.cov(portfolio_excess, benchmark_excess)[0, 1]
-            benchmark_variance = np.var(benchmark_excess)
-            beta = covariance / benchmark_variance if benchmark_variance != 0 else 1.0
-            
-            portfolio_avg_excess = np.mean(portfolio_excess)
-            benchmark_avg_excess = np.mean(benchmark_excess)
-            alpha = (portfolio_avg_excess - beta * benchmark_avg_excess) * 252
-            
-            # Tracking error and Information ratio
-            if len(benchmark_returns) == len(portfolio_returns):
-                active_returns = np.array(portfolio_returns) - np.array(benchmark_returns)
-            else:
-                active_returns = np.array(portfolio_returns)
-            tracking_error = np.std(active_returns) * np.sqrt(252)
-            information_ratio = np.mean(active_returns) / np.std(active_returns) * np.sqrt(252) if np.std(active_returns) != 0 else 0
-        else:
-            alpha = beta = tracking_error = information_ratio = 0
-        
+        columns = _performance_metric_columns(np.array([portfolio_returns], dtype=float),
+                                              np.array(benchmark_returns, dtype=float) if benchmark_returns else None,
+                                              self.risk_free_rate)
         return PortfolioPerformance(
-            portfolio_id=portfolio_id,
-            start_date=datetime.now() - timedelta(days=len(returns_array)),
-            end_date=datetime.now(),
-            total_return=total_return,
-            annualized_return=annualized_return,
-            volatility=volatility,
-            sharpe_ratio=sharpe_ratio,
-            max_drawdown=max_drawdown,
-            calmar_ratio=calmar_ratio,
-            alpha=alpha,
-            beta=beta,
-            tracking_error=tracking_error,
-            information_ratio=information_ratio
+            portfolio_id, datetime.now() - timedelta(days=len(portfolio_returns)), datetime.now(),
+            *(float(columns[name][0]) for name in PERFORMANCE_METRIC_FIELDS)
         )
     
+    async def analyze_portfolios_batch(
+        self,
+        portfolios: Union[Dict[str, List[PortfolioHolding]], Iterable[Tuple[str, List[PortfolioHolding]]]],
+        lookback_days: int = 252,
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        mp_context=None
+    ) -> AsyncIterator[List[BatchPortfolioResult]]:
+        """Risk and performance metrics for many portfolios, yielded ``chunk_size`` portfolios at a time
+        
+        History is fetched once for the union of all symbols into one (assets x days)
+        returns matrix over the common window. Each chunk's portfolio return series come
+        from a single sparse weights x returns product and every metric is computed
+        column-wise. With ``max_workers`` > 1 chunks run in worker processes.
+        """
+        items = list(portfolios.items() if isinstance(portfolios, dict) else portfolios)
+        chunk_size = chunk_size or self.config.get("batch_chunk_size", 5000)
+        max_workers = max_workers or self.config.get("batch_workers", 1)
+        
+        # One representative holding per symbol; its history is shared by every portfolio holding it
+        universe: Dict[str, PortfolioHolding] = {}
+        for _, holdings in items:
+            for h in holdings:
+                universe.setdefault(h.symbol, h)
+        historical_data = await self._get_historical_data(list(universe.values()), lookback_days)
+        benchmark_returns = self._calculate_benchmark_returns(await self._get_benchmark_data(lookback_days))
+        
+        columns = {symbol: i for i, symbol in enumerate(historical_data)}
+        days = min((len(data["returns"]) for data in historical_data.values()), default=0)
+        asset_returns = np.array([data["returns"][:days] for data in historical_data.values()],
+                                 dtype=float).reshape(len(columns), days)
+        
+        indptr, indices, data, values = [0], [], [], []
+        for _, holdings in items:
+            weights = {h.symbol: h.weight for h in holdings}
+            for symbol, weight in weights.items():
+                if symbol in columns:
+                    indices.append(columns[symbol])
+                    data.append(weight)
+            indptr.append(len(indices))
+            values.append(sum(h.market_value for h in holdings))
+        weights = sparse.csr_matrix((data, indices, indptr), shape=(len(items), len(columns)))
+        
+        benchmark = np.array(benchmark_returns, dtype=float) if benchmark_returns else None
+        context = (asset_returns, benchmark, self.risk_free_rate)
+        starts = range(0, len(items), chunk_size)
+        if days == 0:
+            for start in starts:
+                yield self._batch_results(items[start:start + chunk_size], values[start:start + chunk_size], None, 0)
+            return
+        
+        if max_workers == 1 or len(starts) <= 1:
+            for start in starts:
+                metrics = await asyncio.to_thread(_batch_metrics_chunk, weights[start:start + chunk_size], context)
+                yield self._batch_results(items[start:start + chunk_size], values[start:start + chunk_size], metrics, days)
+            return
+        
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context,
+                                 initializer=_init_batch_worker, initargs=(context,)) as executor:
+            futures = [loop.run_in_executor(executor, _batch_metrics_chunk, weights[start:start + chunk_size])
+                       for start in starts]
+            try:
+                for start, future in zip(starts, futures):
+                    metrics = await future
+                    yield self._batch_results(items[start:start + chunk_size], values[start:start + chunk_size],
+                                              metrics, days)
+            finally:
+                for future in futures:
+                    future.cancel()
+    
+    def _batch_results(self, items: List[Tuple[str, List[PortfolioHolding]]], values: List[float],
+                       metrics: Optional[Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]],
+                       days: int) -> List[BatchPortfolioResult]:
+        """Materialize one chunk of metric columns; portfolios without holdings get zero metrics"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        if metrics is None:
+            risk_rows = perf_rows = itertools.repeat((0,) * 10)
+        else:
+            risk, performance = metrics
+            risk_rows = zip(*(risk[name].tolist() for name in RISK_METRIC_FIELDS))
+            perf_rows = zip(*(performance[name].tolist() for name in PERFORMANCE_METRIC_FIELDS))
+        
+        results = []
+        for (portfolio_id, holdings), value, risk_row, perf_row in zip(items, values, risk_rows, perf_rows):
+            if holdings and metrics is not None:
+                results.append(BatchPortfolioResult(
+                    portfolio_id, value, RiskMetrics(*risk_row),
+                    PortfolioPerformance(portfolio_id, start_date, end_date, *perf_row)
+                ))
+            else:
+                now = datetime.now()
+                results.append(BatchPortfolioResult(
+                    portfolio_id, value, RiskMetrics(0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+                    PortfolioPerformance(portfolio_id, now, now, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+                ))
+        return results
+    
     async def _run_stress_tests(self, holdings: List[PortfolioHolding], 
                                historical_data: Dict) -> List[StressTestResult]:
         """Run comprehensive stress tests."""
-        stress_results = []
-        
-        # Market crash scenario
-        market_crash = await self._stress_test_market_crash(holdings, historical_data)
-        stress_results.append(market_crash)
-        
-        # Interest rate shock
-        rate_shock = await self._stress_test_interest_rate_shock(holdings)
-        stress_results.append(rate_shock)
-        
-        # Sector rotation
-        sector_rotation = await self._stress_test_sector_rotation(holdings)
-        stress_results.append(sector_rotation)
-        
-        # Liquidity crisis
-        liquidity_crisis = await self._stress_test_liquidity_crisis(holdings)
-        stress_results.append(liquidity_crisis)
-        
-        # Historical replay (2008 crisis simulation)
-        historical_replay = await self._stress_test_historical_replay(holdings)
-        stress_results.append(historical_replay)
-        
-        return stress_results
-    
-    async def _stress_test_market_crash(self, holdings: List[PortfolioHolding], 
-                                       historical_data: Dict) -> StressTestResult:
-        """Simulate market crash scenario (-30% market drop)."""
-        portfolio_value = sum(h.market_value for h in holdings)
-        
-        # Simulate different asset impacts
-        crash_impacts = {
-            "equity": -0.35,      # Equities down 35%
-            "debt": -0.05,        # Bonds down 5%
-            "commodity": -0.20,   # Commodities down 20%
-            "real_estate": -0.25, # REITs down 25%
-            "cash": 0.0           # Cash unchanged
-        }
-        
-        total_loss = 0
-        worst_performers = []
-        sector_impacts = defaultdict(float)
-        
-        for holding in holdings:
-            asset_class = holding.asset_class.lower()
-            impact = crash_impacts.get(asset_class, -0.30)  # Default -30%
-            
-            # Add beta adjustment for equities
-            if asset_class == "equity" and holding.beta:
-                impact *= holding.beta
-            
-            holding_loss = holding.market_value * abs(impact)
-            total_loss += holding_loss
-            
-            worst_performers.append((holding.symbol, impact))
-            sector_impacts[holding.sector] += holding_loss
-        
-        # Sort worst performers
-        worst_performers.sort(key=lambda x: x[1])
-        
-        return StressTestResult(
-            scenario=StressScenario.MARKET_CRASH,
-            portfolio_loss=total_loss,
-            portfolio_loss_pct=total_loss / portfolio_value,
-            worst_performing_assets=worst_performers[:5],
-            sector_impact=dict(sector_impacts),
-            liquidity_impact=0.15,  # 15% liquidity premium
-            recovery_time_estimate=180,  # 6 months
-            description="Severe market crash scenario (-30% market drop with sector-specific impacts)"
-        )
+        return self.stress_engine.run(holdings)
     
-    async def _stress_test_interest_rate_shock(self, holdings: List[PortfolioHolding]) -> StressTestResult:
-        """Simulate interest rate shock (+300 bps)."""
-        portfolio_value = sum(h.market_value for h in holdings)
-        
-        # Interest rate sensitivity by asset class
-        rate_sensitivities = {
-            "debt": -0.15,        # Bonds very sensitive
-            "equity": -0.08,      # Equities moderately sensitive
-            "real_estate": -0.12, # REITs sensitive
-            "commodity": 0.03,    # Commodities slightly positive
-            "cash": 0.05          # Cash benefits
-        }
-        
-        total_loss = 0
-        worst_performers = []
-        sector_impacts = defaultdict(float)
-        
-        for holding in holdings:
-            asset_class = holding.asset_class.lower()
-            impact = rate_sensitivities.get(asset_class, -0.05)
-            
-            holding_loss = holding.market_value * abs(impact) if impact < 0 else 0
-            total_loss += holding_loss
-            
-            worst_performers.append((holding.symbol, impact))
-            sector_impacts[holding.sector] += holding_loss
-        
-        worst_performers.sort(key=lambda x: x[1])
-        
-        return StressTestResult(
-            scenario=StressScenario.INTEREST_RATE_SHOCK,
-            portfolio_loss=total_loss,
-            portfolio_loss_pct=total_loss / portfolio_value,
-            worst_performing_assets=worst_performers[:5],
-            sector_impact=dict(sector_impacts),
-            liquidity_impact=0.08,
-            recovery_time_estimate=120,
-            description="Interest rate shock (+300 bps) with duration-based impact analysis"
-        )
-    
-    async def _stress_test_sector_rotation(self, holdings: List[PortfolioHolding]) -> StressTestResult:
-        """Simulate major sector rotation."""
-        portfolio_value = sum(h.market_value for h in holdings)
-        
-        # Simulate rotation out of growth into value
-        sector_impacts_pct = {
-            "Technology": -0.25,
-            "Healthcare": -0.15,
-            "Consumer Discretionary": -0.20,
-            "Financial Services": 0.10,
-            "Energy": 0.15,
-            "Utilities": 0.08,
-            "Consumer Staples": 0.05,
-            "Industrials": -0.05,
-            "Materials": 0.12
-        }
-        
-        total_loss = 0
-        worst_performers = []
-        sector_impacts = defaultdict(float)
-        
-        for holding in holdings:
-            impact = sector_impacts_pct.get(holding.sector, 0)
-            holding_impact = holding.market_value * abs(impact) if impact < 0 else 0
-            total_loss += holding_impact
-            
-            worst_performers.append((holding.symbol, impact))
-            sector_impacts[holding.sector] += holding_impact
-        
-        worst_performers.sort(key=lambda x: x[1])
-        
-        return StressTestResult(
-            scenario=StressScenario.SECTOR_ROTATION,
-            portfolio_loss=total_loss,
-            portfolio_loss_pct=total_loss / portfolio_value,
-            worst_performing_assets=worst_performers[:5],
-            sector_impact=dict(sector_impacts),
-            liquidity_impact=0.05,
-            recovery_time_estimate=90,
-            description="Major sector rotation from growth to value with style factor impacts"
-        )
-    
-    async def _stress_test_liquidity_crisis(self, holdings: List[PortfolioHolding]) -> StressTestResult:
-        """Simulate liquidity crisis scenario."""
-        portfolio_value = sum(h.market_value for h in holdings)
-        
-        # Liquidity impact based on market cap and trading volume
-        liquidity_impacts = {}
-        total_loss = 0
-        
-        for holding in holdings:
-            # Simulate liquidity impact (smaller stocks hit harder)
-            if "small" in holding.symbol.lower() or holding.market_value < 1000000:
-                impact = -0.20  # Small cap liquidity crunch
-            elif "mid" in holding.symbol.lower() or holding.market_value < 5000000:
-                impact = -0.12  # Mid cap impact
-            else:
-                impact = -0.05  # Large cap minimal impact
-            
-            holding_loss = holding.market_value * abs(impact)
-            total_loss += holding_loss
-            liquidity_impacts[holding.symbol] = impact
-        
-        worst_performers = sorted(liquidity_impacts.items(), key=lambda x: x[1])
-        
-        return StressTestResult(
-            scenario=StressScenario.LIQUIDITY_CRISIS,
-            portfolio_loss=total_loss,
-            portfolio_loss_pct=total_loss / portfolio_value,
-            worst_performing_assets=worst_performers[:5],
-            sector_impact={},
-            liquidity_impact=0.25,  # 25% liquidity premium
-            recovery_time_estimate=60,
-            description="Liquidity crisis with market cap-based impact differentiation"
-        )
-    
-    async def _stress_test_historical_replay(self, holdings: List[PortfolioHolding]) -> StressTestResult:
-        """Replay historical crisis scenario (2008-style)."""
-        portfolio_value = sum(h.market_value for h in holdings)
-        
-        # 2008 crisis impacts by sector
-        crisis_impacts = {
-            "Financial Services": -0.55,
-            "Real Estate": -0.45,
-            "Consumer Discretionary": -0.35,
-            "Industrials": -0.30,
-            "Technology": -0.25,
-            "Materials": -0.40,
-            "Energy": -0.30,
-            "Healthcare": -0.15,
-            "Consumer Staples": -0.10,
-            "Utilities": -0.20
-        }
-        
-        total_loss = 0
-        worst_performers = []
-        sector_impacts = defaultdict(float)
-        
-        for holding in holdings:
-            impact = crisis_impacts.get(holding.sector, -0.25)
-            holding_loss = holding.market_value * abs(impact)
-            total_loss += holding_loss
-            
-            worst_performers.append((holding.symbol, impact))
-            sector_impacts[holding.sector] += holding_loss
-        
-        worst_performers.sort(key=lambda x: x[1])
-        
-        return StressTestResult(
-            scenario=StressScenario.HISTORICAL_REPLAY,
-            portfolio_loss=total_loss,
-            portfolio_loss_pct=total_loss / portfolio_value,
-            worst_performing_assets=worst_performers[:5],
-            sector_impact=dict(sector_impacts),
-            liquidity_impact=0.30,
-            recovery_time_estimate=365,  # 1 year
-            description="2008 Financial Crisis replay with historical sector-specific impacts"
-        )
+    def stress_test_books(self, books: Union[Dict[str, List[PortfolioHolding]], Iterable[Tuple[str, List[PortfolioHolding]]]],
+                          scenario_set: Optional[StressScenarioSet] = None
+                          ) -> Iterator[List[Tuple[str, List[StressTestResult]]]]:
+        """Stream stress results for many books, a batch of whole books at a time"""
+        engine = StressTestEngine(scenario_set, self.stress_engine.batch_size) if scenario_set else self.stress_engine
+        return engine.stream(books)
     
     async def _run_monte_carlo_simulation(self, holdings: List[PortfolioHolding], 
                                          historical_data: Dict) -> MonteCarloResult:
         """Run Monte Carlo simulation for portfolio optimization."""
         num_simulations = self.config["monte_carlo_runs"]
+        horizon_days = self.config.get("monte_carlo_horizon_days", 252)
+        steps = self.config.get("monte_carlo_steps", 12)
         
-        # Get correlation matrix and expected returns
         symbols = [h.symbol for h in holdings]
         weights = np.array([h.weight for h in holdings])
         
-        # Simulate expected returns and covariances (simplified)
-        expected_returns = {}
-        covariance_matrix = {}
-        
-        for symbol in symbols:
-            # Simulate expected return based on asset class
-            if symbol in historical_data:
-                returns = historical_data[symbol].get("returns", [])
-                if returns:
-                    expected_returns[symbol] = np.mean(returns) * 252  # Annualized
-                else:
-                    expected_returns[symbol] = 0.12  # Default 12%
-            else:
-                expected_returns[symbol] = 0.12
-        
-        # Run simulations
-        simulation_returns = []
-        for _ in range(num_simulations):
-            # Generate random returns for each asset
-            portfolio_return = 0
-            for i, holding in enumerate(holdings):
-                # Simulate return with some randomness
-                random_factor = np.random.normal(1, 0.2)  # 20% volatility
-                asset_return = expected_returns[holding.symbol] * random_factor
-                portfolio_return += weights[i] * asset_return
-            
-            simulation_returns.append(portfolio_return)
-        
-        simulation_returns = np.array(simulation_returns)
+        # Daily moments from history, scaled to one simulation step
+        daily_mean, daily_covariance = self._estimate_daily_moments(symbols, historical_data)
+        step_days = horizon_days / steps
+        engine = MonteCarloEngine(
+            daily_mean * step_days,
+            daily_covariance * step_days,
+            seed=self.config.get("monte_carlo_seed"),
+            max_workers=self.config.get("monte_carlo_workers", 1)
+        )
+        simulated = await asyncio.to_thread(engine.simulate, weights, num_simulations, steps)
+        simulation_returns = simulated.portfolio_returns
         
         # Calculate statistics
         expected_return = np.mean(simulation_returns)
@@ -619,22 +898,18 @@ class PortfolioAnalyzer:
         probability_of_loss = np.sum(simulation_returns < 0) / num_simulations
         
         # VaR estimates
-        var_estimates = {
-            "95%": np.percentile(simulation_returns, 5),
-            "99%": np.percentile(simulation_returns, 1),
-            "99.9%": np.percentile(simulation_returns, 0.1)
-        }
+        var_levels = np.percentile(simulation_returns, [5, 1, 0.1])
+        var_estimates = dict(zip(["95%", "99%", "99.9%"], var_levels))
         
         # Return percentiles
         percentiles = [5, 10, 25, 50, 75, 90, 95]
-        return_percentiles = {p: np.percentile(simulation_returns, p) for p in percentiles}
+        return_percentiles = dict(zip(percentiles, np.percentile(simulation_returns, percentiles)))
         
-        # Generate efficient frontier points (simplified)
-        efficient_frontier = []
-        for i in range(10):
-            risk = 0.1 + i * 0.02  # Risk from 10% to 28%
-            ret = self.risk_free_rate + (expected_return - self.risk_free_rate) * (risk / expected_volatility)
-            efficient_frontier.append((risk, ret))
+        # Mean-variance frontier over the simulated horizon returns
+        optimal_weights, efficient_frontier = self._optimize_frontier(
+            symbols, simulated.asset_mean, simulated.asset_covariance,
+            self.risk_free_rate * horizon_days / 252
+        )
         
         return MonteCarloResult(
             simulation_runs=num_simulations,
@@ -643,10 +918,91 @@ class PortfolioAnalyzer:
             probability_of_loss=probability_of_loss,
             var_estimates=var_estimates,
             return_percentiles=return_percentiles,
-            optimal_weights=None,  # Would implement optimization algorithm
+            optimal_weights=optimal_weights,
             efficient_frontier=efficient_frontier
         )
     
+    def _estimate_daily_moments(self, symbols: List[str], historical_data: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean vector and covariance of daily returns over the common history
+        
+        Read from the covariance store when it holds today's universe, otherwise the
+        history seeds it. Symbols without history get the 12% / 20% annual defaults, uncorrelated.
+        """
+        default_mean, default_variance = 0.12 / 252, 0.2 ** 2 / 252
+        mean = np.full(len(symbols), default_mean)
+        covariance = np.diag(np.full(len(symbols), default_variance))
+        
+        known = [i for i, symbol in enumerate(symbols) if historical_data.get(symbol, {}).get("returns")]
+        if known:
+            length = min(len(historical_data[symbols[i]]["returns"]) for i in known)
+            if length < 2:
+                mean[known] = [historical_data[symbols[i]]["returns"][-1] for i in known]
+                return mean, covariance
+            
+            as_of = datetime.now().date()
+            snapshot = self.covariance_store.snapshot((symbols[i] for i in known), as_of)
+            if snapshot is None:
+                history = {symbols[i]: historical_data[symbols[i]]["returns"][-length:] for i in known}
+                snapshot = self.covariance_store.seed(pd.DataFrame(history), as_of)
+            position = {s: j for j, s in enumerate(snapshot.symbols)}
+            index = [position[symbols[i]] for i in known]
+            mean[known] = snapshot.mean[index]
+            covariance[np.ix_(known, known)] = snapshot.estimate(
+                self.config.get("covariance_estimator", "ledoit_wolf")
+            )[np.ix_(index, index)]
+        return mean, covariance
+    
+    def _optimize_frontier(self, symbols: List[str], mean: np.ndarray, covariance: np.ndarray,
+                           risk_free_rate: float) -> Tuple[Optional[Dict[str, float]], List[Tuple[float, float]]]:
+        """Long-only minimum-variance frontier and its highest-Sharpe point
+        
+        Weights are bounded by ``max_position_size`` (relaxed to 1/n when that cannot sum to one).
+        """
+        n = len(symbols)
+        if n == 0:
+            return None, []
+        upper = max(self.config.get("max_position_size", 1.0), 1.0 / n)
+        bounds = [(0.0, upper)] * n
+        budget = {'type': 'eq', 'fun': lambda w: w.sum() - 1.0, 'jac': lambda w: np.ones(n)}
+        
+        def variance(w):
+            return w @ covariance @ w
+        
+        def variance_grad(w):
+            return 2.0 * covariance @ w
+        
+        start = np.full(n, 1.0 / n)
+        result = minimize(variance, start, jac=variance_grad, method='SLSQP', bounds=bounds, constraints=[budget])
+        if not result.success:
+            logger.warning(f"Minimum-variance optimization failed: {result.message}")
+            return None, []
+        
+        # Highest attainable return: fill the best assets up to the position cap
+        max_return, remaining = 0.0, 1.0
+        for i in np.argsort(-mean):
+            take = min(upper, remaining)
+            max_return += take * mean[i]
+            remaining -= take
+            if remaining <= 1e-12:
+                break
+        
+        frontier_weights = []
+        weights = result.x
+        for target in np.linspace(weights @ mean, max_return, self.config.get("efficient_frontier_points", 10)):
+            target_return = {'type': 'eq', 'fun': lambda w, t=target: w @ mean - t, 'jac': lambda w: mean}
+            # Each point starts from its neighbour's solution
+            point = minimize(variance, weights, jac=variance_grad, method='SLSQP', bounds=bounds,
+                             constraints=[budget, target_return])
+            if point.success:
+                weights = point.x
+                frontier_weights.append(weights)
+        
+        efficient_frontier = [(float(np.sqrt(max(variance(w), 0.0))), float(w @ mean)) for w in frontier_weights]
+        sharpe = [(ret - risk_free_rate) / risk if risk > 0 else -np.inf for risk, ret in efficient_frontier]
+        best = frontier_weights[int(np.argmax(sharpe))] if frontier_weights else result.x
+        optimal_weights = {symbol: float(w) for symbol, w in zip(symbols, np.clip(best, 0.0, None))}
+        return optimal_weights, efficient_frontier
+    
     def _calculate_performance_attribution(self, holdings: List[PortfolioHolding], 
                                          historical_data: Dict, 
                                          benchmark_data: Dict) -> PerformanceAttribution:
@@ -794,18 +1150,12 @@ class PortfolioAnalyzer:
         
         for holding in holdings:
             # Generate simulated price history
-            returns = []
-            price = holding.current_price
-            
-            for _ in range(days):
-                daily_return = np.random.normal(0.0008, 0.02)  # ~0.08% daily return, 2% volatility
-                returns.append(daily_return)
-                price *= (1 + daily_return)
+            returns = np.random.normal(0.0008, 0.02, days)  # ~0.08% daily return, 2% volatility
             
             historical_data[holding.symbol] = {
-                "prices": [holding.current_price * (1 + sum(returns[:i+1])) for i in range(days)],
-                "returns": returns,
-                "volumes": [np.random.randint(10000, 100000) for _ in range(days)]
+                "prices": (holding.current_price * (1 + np.cumsum(returns))).tolist(),
+                "returns": returns.tolist(),
+                "volumes": np.random.randint(10000, 100000, days).tolist()
             }
         
         return historical_data
@@ -831,15 +1181,11 @@ class PortfolioAnalyzer:
         # Get the length of the shortest return series
         min_length = min(len(data["returns"]) for data in historical_data.values())
         
-        portfolio_returns = []
-        for i in range(min_length):
-            daily_return = 0
-            for symbol, weight in weights.items():
-                if symbol in historical_data:
-                    daily_return += weight * historical_data[symbol]["returns"][i]
-            portfolio_returns.append(daily_return)
-        
-        return portfolio_returns
+        symbols = [symbol for symbol in weights if symbol in historical_data]
+        if not symbols:
+            return [0.0] * min_length
+        returns = np.array([historical_data[symbol]["returns"][:min_length] for symbol in symbols], dtype=float)
+        return (np.array([weights[symbol] for symbol in symbols], dtype=float) @ returns).tolist()
     
     def _calculate_benchmark_returns(self, benchmark_data: Dict) -> List[float]:
         """Calculate benchmark returns."""
@@ -0,0 +1,286 @@
+"""
+TradeMate In-Memory Cache Engine
+================================
+⚡ O(1) LRU get/set/evict
+⏱️ Heap-indexed TTL expiry
+🏷️ Secondary tag → keys index
+📏 Pluggable size estimators
+"""
+
+import heapq
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+SizeEstimator = Callable[[Any], int]
+
+
+def shallow_size_estimator(value: Any) -> int:
+    """Estimate size from the object and its direct children (no serialization)"""
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += sys.getsizeof(k) + sys.getsizeof(v)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += sys.getsizeof(item)
+
+    return size
+
+
+def pickle_size_estimator(value: Any) -> int:
+    """Exact serialized size - accurate but expensive for large values"""
+
+    return len(pickle.dumps(value))
+
+
+def fixed_size_estimator(value: Any) -> int:
+    """Treat every entry as one unit, turning the size bound into an entry count"""
+
+    return 1
+
+
+SIZE_ESTIMATORS: Dict[str, SizeEstimator] = {
+    "shallow": shallow_size_estimator,
+    "pickle": pickle_size_estimator,
+    "fixed": fixed_size_estimator
+}
+
+
+@dataclass
+class CacheEntry:
+    """Cache entry with metadata (timestamps are epoch seconds)"""
+    key: str
+    value: Any
+    created_at: float = field(default_factory=time.time)
+    accessed_at: float = field(default_factory=time.time)
+    expires_at: Optional[float] = None
+    hit_count: int = 0
+    size_bytes: int = 0
+    tags: List[str] = field(default_factory=list)
+
+
+class MemoryCacheEngine:
+    """Bounded LRU cache with TTL heap and tag index
+
+    Recency is kept by an ``OrderedDict`` (oldest first), so lookups, inserts
+    and LRU evictions are O(1). Expiry times live in a min-heap that is
+    drained lazily, making expiry sweeps O(k log n) in the number of expired
+    keys instead of a full scan. All operations are synchronous and never
+    await, so they are atomic with respect to the event loop.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_size_bytes: int = 1000000,
+                 size_estimator: SizeEstimator = shallow_size_estimator,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.max_size_bytes = max_size_bytes
+        self.size_estimator = size_estimator
+        self.clock = clock
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._expiry_seq = 0
+        self._tag_index: Dict[str, Set[str]] = {}
+
+        self.stats = {
+            "evictions": 0,
+            "expirations": 0,
+            "deletions": 0,
+            "rejected": 0,
+            "memory_usage": 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def memory_usage(self) -> int:
+        return self.stats["memory_usage"]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value and mark it most recently used"""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        now = self.clock()
+        if entry.expires_at is not None and now >= entry.expires_at:
+            self._remove(key)
+            self.stats["expirations"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        entry.accessed_at = now
+        entry.hit_count += 1
+
+        return entry.value
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry without touching recency or expiring it"""
+
+        return self._entries.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None,
+            tags: Optional[List[str]] = None) -> bool:
+        """Insert or replace a value, evicting LRU entries to stay within bounds
+
+        A rejected (oversize) value still drops any existing entry for the key,
+        so readers never see the value it was meant to replace.
+        """
+
+        if key in self._entries:
+            self._remove(key)
+
+        size_bytes = self.size_estimator(value)
+        if size_bytes > self.max_size_bytes:
+            self.stats["rejected"] += 1
+            return False
+
+        while self._entries and (
+            len(self._entries) >= self.max_entries or
+            self.stats["memory_usage"] + size_bytes > self.max_size_bytes
+        ):
+            self._evict_lru()
+
+        now = self.clock()
+        expires_at = now + ttl if ttl and ttl > 0 else None
+        entry = CacheEntry(
+            key=key,
+            value=value,
+            created_at=now,
+            accessed_at=now,
+            expires_at=expires_at,
+            size_bytes=size_bytes,
+            tags=list(tags) if tags else []
+        )
+
+        self._entries[key] = entry
+        self.stats["memory_usage"] += size_bytes
+
+        if expires_at is not None:
+            self._push_expiry(expires_at, key)
+
+        for tag in entry.tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Delete a key"""
+
+        if key not in self._entries:
+            return False
+
+        self._remove(key)
+        self.stats["deletions"] += 1
+        return True
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Delete every key carrying any of the tags"""
+
+        removed = 0
+        for tag in tags:
+            for key in list(self._tag_index.get(tag, ())):
+                if key in self._entries:
+                    self._remove(key)
+                    self.stats["deletions"] += 1
+                    removed += 1
+
+        return removed
+
+    def keys_for_tag(self, tag: str) -> Set[str]:
+        """Keys currently indexed under a tag"""
+
+        return set(self._tag_index.get(tag, ()))
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop every expired entry, popping only due heap items"""
+
+        now = self.clock() if now is None else now
+        heap = self._expiry_heap
+        purged = 0
+
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # Skip heap items left behind by overwrites and deletions
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.stats["expirations"] += 1
+                purged += 1
+
+        return purged
+
+    def clear(self):
+        """Remove all entries"""
+
+        self._entries.clear()
+        self._expiry_heap.clear()
+        self._tag_index.clear()
+        self.stats["memory_usage"] = 0
+
+    def items(self) -> Iterator[Tuple[str, CacheEntry]]:
+        """Iterate entries from least to most recently used"""
+
+        return iter(list(self._entries.items()))
+
+    def values(self) -> Iterator[CacheEntry]:
+        """Iterate entries from least to most recently used"""
+
+        return iter(list(self._entries.values()))
+
+    def _evict_lru(self):
+        """Evict the least recently used entry"""
+
+        key = next(iter(self._entries))
+        self._remove(key)
+        self.stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        """Unlink an entry from the LRU order and the tag index"""
+
+        entry = self._entries.pop(key)
+        self.stats["memory_usage"] -= entry.size_bytes
+
+        for tag in entry.tags:
+            tagged = self._tag_index.get(tag)
+            if tagged is not None:
+                tagged.discard(key)
+                if not tagged:
+                    del self._tag_index[tag]
+
+    def _push_expiry(self, expires_at: float, key: str):
+        """Index an expiry time, compacting the heap when stale items pile up"""
+
+        self._expiry_seq += 1
+        heapq.heappush(self._expiry_heap, (expires_at, self._expiry_seq, key))
+
+        if len(self._expiry_heap) > 2 * len(self._entries) + 1024:
+            self._expiry_heap = [
+                (entry.expires_at, seq, key)
+                for seq, (key, entry) in enumerate(self._entries.items())
+                if entry.expires_at is not None
+            ]
+            heapq.heapify(self._expiry_heap)
+
+
+__all__ = [
+    "MemoryCacheEngine",
+    "CacheEntry",
+    "SizeEstimator",
+    "SIZE_ESTIMATORS",
+    "shallow_size_estimator",
+    "pickle_size_estimator",
+    "fixed_size_estimator"
+]
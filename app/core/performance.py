@@ -11,6 +11,8 @@ import asyncio
 import time
 import json
 import hashlib
+import math
+import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable, Union
 from dataclasses import dataclass, field
@@ -28,6 +30,8 @@ from asyncio import Lock
 import psutil
 import threading
 
+from app.core.cache_engine import MemoryCacheEngine, CacheEntry, SIZE_ESTIMATORS
+
 
 class CacheType(Enum):
     """Cache types for different use cases"""
@@ -48,17 +52,51 @@ class PerformanceMetric(Enum):
     ACTIVE_CONNECTIONS = "active_connections"
 
 
+# Redis tag index layout:
+#   cache:{key}    -> serialized value
+#   tag:{tag}      -> SET of keys carrying the tag
+#   keytags:{key}  -> SET of tag:{tag} names the key belongs to (for cleanup on delete)
+# Both scripts only touch single-node keyspace and run atomically on the server.
+
+REDIS_SET_WITH_TAGS_SCRIPT = """
+-- KEYS[1] cache key, KEYS[2] reverse tag set, KEYS[3..] tag sets
+-- ARGV[1] ttl seconds, ARGV[2] payload, ARGV[3] logical key
+local ttl = tonumber(ARGV[1])
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ttl)
+for _, old_tag in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    redis.call('SREM', old_tag, ARGV[3])
+end
+redis.call('UNLINK', KEYS[2])
+for i = 3, #KEYS do
+    redis.call('SADD', KEYS[i], ARGV[3])
+    if redis.call('TTL', KEYS[i]) < ttl then
+        redis.call('EXPIRE', KEYS[i], ttl)
+    end
+    redis.call('SADD', KEYS[2], KEYS[i])
+end
+if #KEYS > 2 then
+    redis.call('EXPIRE', KEYS[2], ttl)
+end
+return 1
+"""
+
+REDIS_DELETE_WITH_TAGS_SCRIPT = """
+-- KEYS[1] cache key, KEYS[2] reverse tag set; ARGV[1] logical key
+for _, tag in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    redis.call('SREM', tag, ARGV[1])
+end
+redis.call('UNLINK', KEYS[2])
+return redis.call('UNLINK', KEYS[1])
+"""
+
+
 @dataclass
-class CacheEntry:
-    """Cache entry with metadata"""
-    key: str
+class CachedResult:
+    """Decorator cache envelope carrying what SWR/XFetch need to decide on refresh"""
     value: Any
-    created_at: datetime = field(default_factory=datetime.now)
-    accessed_at: datetime = field(default_factory=datetime.now)
-    expires_at: Optional[datetime] = None
-    hit_count: int = 0
-    size_bytes: int = 0
-    tags: List[str] = field(default_factory=list)
+    computed_at: float
+    expires_at: float
+    compute_time: float = 0.0
 
 
 @dataclass
@@ -81,9 +119,8 @@ class TradeMatePerformanceSystem:
     
     def __init__(self):
         # Caching layers
-        self.memory_cache = {}  # In-memory cache
-        self.cache_locks = {}   # Per-key locks for cache operations
         self.redis_client = None
+        self.redis_scripts = {}
         
         # Performance tracking
         self.request_metrics = []
@@ -94,20 +131,33 @@ class TradeMatePerformanceSystem:
         self.cache_stats = {
             "hits": 0,
             "misses": 0,
-            "evictions": 0,
-            "memory_usage": 0
+            "coalesced": 0,       # callers that awaited another caller's computation
+            "stale_served": 0,    # stale-while-revalidate responses
+            "early_refreshes": 0  # probabilistic (XFetch) refreshes triggered
         }
         
+        # In-flight computations keyed by cache key (single-flight)
+        self.inflight: Dict[str, asyncio.Task] = {}
+        
         # Configuration
         self.config = {
             "memory_cache_max_size": 1000000,  # 1MB
             "memory_cache_max_entries": 10000,
+            "memory_cache_size_estimator": "shallow",  # shallow | pickle | fixed
             "cache_default_ttl": 300,  # 5 minutes
             "performance_metrics_retention": 3600,  # 1 hour
             "response_time_target": 100,  # 100ms target
-            "cache_compression_threshold": 1024  # 1KB
+            "cache_compression_threshold": 1024,  # 1KB
+            "redis_scan_batch_size": 500  # SSCAN/UNLINK batch for tag invalidation
         }
         
+        # In-memory cache (LRU order + TTL heap + tag index)
+        self.memory_cache = MemoryCacheEngine(
+            max_entries=self.config["memory_cache_max_entries"],
+            max_size_bytes=self.config["memory_cache_max_size"],
+            size_estimator=SIZE_ESTIMATORS[self.config["memory_cache_size_estimator"]]
+        )
+        
         # Background tasks
         self.background_tasks = []
         self.is_monitoring = False
@@ -123,6 +173,10 @@ class TradeMatePerformanceSystem:
                 decode_responses=False  # We'll handle encoding manually for binary data
             )
             await self.redis_client.ping()
+            self.redis_scripts = {
+                "set_with_tags": self.redis_client.register_script(REDIS_SET_WITH_TAGS_SCRIPT),
+                "delete_with_tags": self.redis_client.register_script(REDIS_DELETE_WITH_TAGS_SCRIPT)
+            }
             print("✅ Redis connection established")
         except Exception as e:
             print(f"⚠️ Redis connection failed: {e}")
@@ -230,119 +284,113 @@ class TradeMatePerformanceSystem:
         """Invalidate cache entries by tags"""
         
         if cache_type == CacheType.MEMORY:
-            keys_to_delete = []
-            for key, entry in self.memory_cache.items():
-                if any(tag in entry.tags for tag in tags):
-                    keys_to_delete.append(key)
-            
-            for key in keys_to_delete:
-                await self._delete_memory_cache(key)
+            self.memory_cache.invalidate_tags(tags)
         
         elif cache_type == CacheType.REDIS and self.redis_client:
-            # Redis tag-based invalidation would require additional data structures
-            # For now, we'll implement a simple pattern-based approach
             for tag in tags:
-                pattern = f"tag:{tag}:*"
-                keys = await self.redis_client.keys(pattern)
-                if keys:
-                    await self.redis_client.delete(*keys)
+                await self._invalidate_redis_tag(tag)
     
-    # Memory Cache Implementation
-    async def _get_memory_cache(self, key: str) -> Optional[Any]:
-        """Get from memory cache"""
+    async def mget_cached(self, keys: List[str], cache_type: CacheType = CacheType.MEMORY) -> Dict[str, Any]:
+        """Get many values at once; missing keys are omitted from the result"""
         
-        if key not in self.memory_cache:
-            return None
+        start_time = time.time()
         
-        entry = self.memory_cache[key]
+        try:
+            if cache_type == CacheType.MEMORY:
+                results = {}
+                for key in keys:
+                    value = self.memory_cache.get(key)
+                    if value is not None:
+                        results[key] = value
+            elif cache_type == CacheType.REDIS:
+                results = await self._mget_redis_cache(keys)
+            else:
+                results = {}
+            
+            self.cache_stats["hits"] += len(results)
+            self.cache_stats["misses"] += len(keys) - len(results)
+            
+            cache_time = (time.time() - start_time) * 1000
+            await self._record_cache_metric("mget", cache_time, f"{len(keys)} keys", bool(results))
+            
+            return results
+            
+        except Exception as e:
+            print(f"Cache mget error for {len(keys)} keys: {e}")
+            self.cache_stats["misses"] += len(keys)
+            return {}
+    
+    async def mset_cached(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                         cache_type: CacheType = CacheType.MEMORY, tags: List[str] = None) -> bool:
+        """Set many values at once (one Redis round trip)"""
         
-        # Check expiration
-        if entry.expires_at and datetime.now() > entry.expires_at:
-            await self._delete_memory_cache(key)
-            return None
+        start_time = time.time()
         
-        # Update access metadata
-        entry.accessed_at = datetime.now()
-        entry.hit_count += 1
+        try:
+            ttl = ttl or self.config["cache_default_ttl"]
+            tags = tags or []
+            
+            if cache_type == CacheType.MEMORY:
+                success = all([self.memory_cache.set(key, value, ttl, tags) for key, value in items.items()])
+            elif cache_type == CacheType.REDIS:
+                success = await self._mset_redis_cache(items, ttl, tags)
+            else:
+                success = False
+            
+            cache_time = (time.time() - start_time) * 1000
+            await self._record_cache_metric("mset", cache_time, f"{len(items)} keys", success)
+            
+            return success
+            
+        except Exception as e:
+            print(f"Cache mset error for {len(items)} keys: {e}")
+            return False
+    
+    # Memory Cache Implementation
+    async def _get_memory_cache(self, key: str) -> Optional[Any]:
+        """Get from memory cache"""
         
-        return entry.value
+        return self.memory_cache.get(key)
     
     async def _set_memory_cache(self, key: str, value: Any, ttl: int, tags: List[str]) -> bool:
         """Set in memory cache"""
         
-        # Calculate size
-        size_bytes = len(pickle.dumps(value))
-        
-        # Check if we need to make space
-        await self._ensure_memory_cache_capacity(size_bytes)
-        
-        # Create cache entry
-        expires_at = datetime.now() + timedelta(seconds=ttl) if ttl > 0 else None
-        
-        entry = CacheEntry(
-            key=key,
-            value=value,
-            expires_at=expires_at,
-            size_bytes=size_bytes,
-            tags=tags
-        )
-        
-        # Acquire lock for this key
-        if key not in self.cache_locks:
-            self.cache_locks[key] = Lock()
-        
-        async with self.cache_locks[key]:
-            self.memory_cache[key] = entry
-            self.cache_stats["memory_usage"] += size_bytes
-        
-        return True
+        return self.memory_cache.set(key, value, ttl, tags)
     
     async def _delete_memory_cache(self, key: str) -> bool:
         """Delete from memory cache"""
         
-        if key not in self.memory_cache:
-            return False
+        return self.memory_cache.delete(key)
+    
+    # Redis Cache Implementation
+    def _encode_cache_value(self, value: Any) -> bytes:
+        """Serialize and compress a value for Redis"""
         
-        if key in self.cache_locks:
-            async with self.cache_locks[key]:
-                entry = self.memory_cache.pop(key, None)
-                if entry:
-                    self.cache_stats["memory_usage"] -= entry.size_bytes
-                    self.cache_stats["evictions"] += 1
-                del self.cache_locks[key]
-        else:
-            entry = self.memory_cache.pop(key, None)
-            if entry:
-                self.cache_stats["memory_usage"] -= entry.size_bytes
-                self.cache_stats["evictions"] += 1
+        raw_data = pickle.dumps(value)
+        
+        # Compress if large
+        if len(raw_data) > self.config["cache_compression_threshold"]:
+            raw_data = b"GZIP:" + gzip.compress(raw_data)
         
-        return True
+        return raw_data
     
-    async def _ensure_memory_cache_capacity(self, new_entry_size: int):
-        """Ensure memory cache has capacity for new entry"""
+    def _decode_cache_value(self, raw_data: bytes) -> Any:
+        """Decompress and deserialize a Redis payload"""
         
-        max_size = self.config["memory_cache_max_size"]
-        max_entries = self.config["memory_cache_max_entries"]
+        # Handle compressed data
+        if raw_data.startswith(b"GZIP:"):
+            raw_data = gzip.decompress(raw_data[5:])
         
-        # Check size limit
-        while (self.cache_stats["memory_usage"] + new_entry_size > max_size or 
-               len(self.memory_cache) >= max_entries):
-            
-            # Find least recently used entry
-            lru_key = None
-            lru_time = datetime.now()
-            
-            for key, entry in self.memory_cache.items():
-                if entry.accessed_at < lru_time:
-                    lru_time = entry.accessed_at
-                    lru_key = key
-            
-            if lru_key:
-                await self._delete_memory_cache(lru_key)
-            else:
-                break  # No entries to evict
+        return pickle.loads(raw_data)
+    
+    def _redis_set_call(self, key: str, raw_data: bytes, ttl: int, tags: List[str]) -> Dict[str, Any]:
+        """Keys/args for the set-with-tags script"""
+        
+        return {
+            "keys": [f"cache:{key}", f"keytags:{key}"] + [f"tag:{tag}" for tag in tags],
+            "args": [ttl, raw_data, key]
+        }
     
-    # Redis Cache Implementation
     async def _get_redis_cache(self, key: str) -> Optional[Any]:
         """Get from Redis cache"""
         
@@ -350,67 +398,135 @@ class TradeMatePerformanceSystem:
             return None
         
         try:
-            # Check if key exists and get value
             raw_data = await self.redis_client.get(f"cache:{key}")
             
             if raw_data is None:
                 return None
             
-            # Handle compressed data
-            if raw_data.startswith(b"GZIP:"):
-                raw_data = gzip.decompress(raw_data[5:])
-            
-            # Deserialize
-            value = pickle.loads(raw_data)
-            
-            return value
+            return self._decode_cache_value(raw_data)
             
         except Exception as e:
             print(f"Redis cache get error: {e}")
             return None
     
+    async def _mget_redis_cache(self, keys: List[str]) -> Dict[str, Any]:
+        """Get many keys from Redis with a single MGET"""
+        
+        if not self.redis_client or not keys:
+            return {}
+        
+        try:
+            raw_values = await self.redis_client.mget([f"cache:{key}" for key in keys])
+            
+            return {
+                key: self._decode_cache_value(raw_data)
+                for key, raw_data in zip(keys, raw_values)
+                if raw_data is not None
+            }
+            
+        except Exception as e:
+            print(f"Redis cache mget error: {e}")
+            return {}
+    
     async def _set_redis_cache(self, key: str, value: Any, ttl: int, tags: List[str]) -> bool:
-        """Set in Redis cache"""
+        """Set in Redis cache, updating tag membership atomically"""
         
         if not self.redis_client:
             return False
         
         try:
-            # Serialize value
-            raw_data = pickle.dumps(value)
+            raw_data = self._encode_cache_value(value)
             
-            # Compress if large
-            if len(raw_data) > self.config["cache_compression_threshold"]:
-                raw_data = b"GZIP:" + gzip.compress(raw_data)
+            await self.redis_scripts["set_with_tags"](**self._redis_set_call(key, raw_data, ttl, tags))
             
-            # Set in Redis with TTL
-            await self.redis_client.setex(f"cache:{key}", ttl, raw_data)
+            return True
             
-            # Set tags for invalidation
-            for tag in tags:
-                await self.redis_client.sadd(f"tag:{tag}", key)
-                await self.redis_client.expire(f"tag:{tag}", ttl)
+        except Exception as e:
+            print(f"Redis cache set error: {e}")
+            return False
+    
+    async def _mset_redis_cache(self, items: Dict[str, Any], ttl: int, tags: List[str]) -> bool:
+        """Set many keys in one pipelined round trip"""
+        
+        if not self.redis_client:
+            return False
+        
+        if not items:
+            return True
+        
+        try:
+            script = self.redis_scripts["set_with_tags"]
+            
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    raw_data = self._encode_cache_value(value)
+                    await script(client=pipe, **self._redis_set_call(key, raw_data, ttl, tags))
+                
+                await pipe.execute()
             
             return True
             
         except Exception as e:
-            print(f"Redis cache set error: {e}")
+            print(f"Redis cache mset error: {e}")
             return False
     
     async def _delete_redis_cache(self, key: str) -> bool:
-        """Delete from Redis cache"""
+        """Delete from Redis cache and drop its tag memberships"""
         
         if not self.redis_client:
             return False
         
         try:
-            result = await self.redis_client.delete(f"cache:{key}")
+            result = await self.redis_scripts["delete_with_tags"](
+                keys=[f"cache:{key}", f"keytags:{key}"],
+                args=[key]
+            )
             return result > 0
             
         except Exception as e:
             print(f"Redis cache delete error: {e}")
             return False
     
+    async def _invalidate_redis_tag(self, tag: str) -> int:
+        """Delete every key in a tag set using incremental SSCAN batches
+        
+        Each key goes through the delete-with-tags script, so it also leaves the
+        other tag sets it belonged to rather than lingering there until they expire.
+        """
+        
+        tag_key = f"tag:{tag}"
+        batch_size = self.config["redis_scan_batch_size"]
+        removed = 0
+        cursor = 0
+        
+        try:
+            script = self.redis_scripts["delete_with_tags"]
+            
+            while True:
+                cursor, members = await self.redis_client.sscan(tag_key, cursor=cursor, count=batch_size)
+                
+                if members:
+                    keys = [m.decode() if isinstance(m, bytes) else m for m in members]
+                    
+                    # The script UNLINKs (freeing memory off the main thread) and SREMs the key
+                    # from every tag set; SREM of already-returned members is safe while SSCAN
+                    # is in progress. The final SREM covers keys whose keytags set has expired.
+                    async with self.redis_client.pipeline(transaction=False) as pipe:
+                        for key in keys:
+                            await script(client=pipe, keys=[f"cache:{key}", f"keytags:{key}"], args=[key])
+                        pipe.srem(tag_key, *members)
+                        await pipe.execute()
+                    
+                    removed += len(keys)
+                
+                if cursor == 0:
+                    break
+            
+        except Exception as e:
+            print(f"Redis tag invalidation error for {tag}: {e}")
+        
+        return removed
+    
     # Performance Monitoring
     async def _monitor_performance(self):
         """Monitor system performance continuously"""
@@ -438,7 +554,7 @@ class TradeMatePerformanceSystem:
                     "cache_hit_rate": hit_rate,
                     "avg_response_time": avg_response_time,
                     "active_requests": len(self.active_requests),
-                    "cache_memory_usage": self.cache_stats["memory_usage"],
+                    "cache_memory_usage": self.memory_cache.memory_usage,
                     "cache_entries": len(self.memory_cache)
                 }
                 
@@ -462,18 +578,10 @@ class TradeMatePerformanceSystem:
         
         while self.is_monitoring:
             try:
-                expired_keys = []
-                now = datetime.now()
-                
-                for key, entry in self.memory_cache.items():
-                    if entry.expires_at and now > entry.expires_at:
-                        expired_keys.append(key)
-                
-                for key in expired_keys:
-                    await self._delete_memory_cache(key)
+                expired_count = self.memory_cache.purge_expired()
                 
-                if expired_keys:
-                    print(f"🧹 Cleaned up {len(expired_keys)} expired cache entries")
+                if expired_count:
+                    print(f"🧹 Cleaned up {expired_count} expired cache entries")
                 
                 await asyncio.sleep(300)  # Cleanup every 5 minutes
                 
@@ -487,15 +595,17 @@ class TradeMatePerformanceSystem:
         while self.is_monitoring:
             try:
                 # If memory usage is high, optimize
-                if self.cache_stats["memory_usage"] > self.config["memory_cache_max_size"] * 0.8:
+                if self.memory_cache.memory_usage > self.config["memory_cache_max_size"] * 0.8:
                     
-                    # Find entries that haven't been accessed recently
-                    cutoff_time = datetime.now() - timedelta(minutes=30)
+                    # Entries come back oldest-access first, so stop at the first recent one
+                    cutoff_time = time.time() - 30 * 60
                     stale_keys = []
                     
-                    for key, entry in self.memory_cache.items():
-                        if entry.accessed_at < cutoff_time and entry.hit_count < 5:
-                            stale_keys.append(key)
+                    for entry in self.memory_cache.values():
+                        if entry.accessed_at >= cutoff_time:
+                            break
+                        if entry.hit_count < 5:
+                            stale_keys.append(entry.key)
                     
                     # Remove stale entries
                     for key in stale_keys[:100]:  # Limit to 100 at a time
@@ -552,8 +662,16 @@ class TradeMatePerformanceSystem:
     
     # Performance Decorators and Utilities
     def cache_result(self, ttl: int = None, cache_type: CacheType = CacheType.MEMORY, 
-                    key_generator: Callable = None, tags: List[str] = None):
-        """Decorator to cache function results"""
+                    key_generator: Callable = None, tags: List[str] = None,
+                    stale_while_revalidate: int = 0, early_refresh_beta: float = 0.0):
+        """Decorator to cache function results
+        
+        Concurrent misses on the same key always share one computation. With
+        ``stale_while_revalidate`` seconds set, expired results are still served
+        for that long while a single background refresh runs. A positive
+        ``early_refresh_beta`` enables XFetch: callers refresh probabilistically
+        before expiry, weighted by how long the last computation took.
+        """
         
         def decorator(func):
             @wraps(func)
@@ -568,22 +686,85 @@ class TradeMatePerformanceSystem:
                     key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
                     cache_key = hashlib.md5(":".join(key_parts).encode()).hexdigest()
                 
-                # Try to get from cache
-                cached_result = await self.get_cached(cache_key, cache_type)
-                if cached_result is not None:
-                    return cached_result
+                fresh_ttl = ttl or self.config["cache_default_ttl"]
                 
-                # Execute function
-                result = await func(*args, **kwargs)
+                async def compute():
+                    started_at = time.time()
+                    result = await func(*args, **kwargs)
+                    computed_at = time.time()
+                    
+                    envelope = CachedResult(
+                        value=result,
+                        computed_at=computed_at,
+                        expires_at=computed_at + fresh_ttl,
+                        compute_time=computed_at - started_at
+                    )
+                    await self.set_cached(cache_key, envelope, fresh_ttl + stale_while_revalidate, cache_type, tags)
+                    
+                    return result
                 
-                # Cache result
-                await self.set_cached(cache_key, result, ttl, cache_type, tags)
+                # Try to get from cache
+                cached = await self.get_cached(cache_key, cache_type)
+                if isinstance(cached, CachedResult):
+                    now = time.time()
+                    
+                    if now < cached.expires_at:
+                        if early_refresh_beta > 0 and self._should_refresh_early(cached, early_refresh_beta, now):
+                            self.cache_stats["early_refreshes"] += 1
+                            self._refresh_in_background(cache_key, compute)
+                        return cached.value
+                    
+                    if now < cached.expires_at + stale_while_revalidate:
+                        self.cache_stats["stale_served"] += 1
+                        self._refresh_in_background(cache_key, compute)
+                        return cached.value
                 
-                return result
+                return await self._single_flight(cache_key, compute)
             
             return wrapper
         return decorator
     
+    def _start_flight(self, key: str, compute: Callable) -> asyncio.Task:
+        """Register the shared computation for a key (synchronously, so no caller can race it)"""
+        
+        task = asyncio.ensure_future(compute())
+        self.inflight[key] = task
+        task.add_done_callback(
+            lambda done: self.inflight.pop(key, None) if self.inflight.get(key) is done else None
+        )
+        return task
+    
+    async def _single_flight(self, key: str, compute: Callable) -> Any:
+        """Run compute once per key; concurrent callers await the same task"""
+        
+        task = self.inflight.get(key)
+        
+        if task is None:
+            task = self._start_flight(key, compute)
+        else:
+            self.cache_stats["coalesced"] += 1
+        
+        # Shield so one caller's cancellation doesn't cancel the shared computation
+        return await asyncio.shield(task)
+    
+    def _refresh_in_background(self, key: str, compute: Callable):
+        """Start a refresh unless one is already running for the key"""
+        
+        if key in self.inflight:
+            return
+        
+        def log_failure(task: asyncio.Task):
+            if not task.cancelled() and task.exception() is not None:
+                print(f"Background cache refresh error for key {key}: {task.exception()}")
+        
+        self._start_flight(key, compute).add_done_callback(log_failure)
+    
+    def _should_refresh_early(self, cached: CachedResult, beta: float, now: float) -> bool:
+        """XFetch: refresh if now - compute_time * beta * ln(U) has passed expiry"""
+        
+        gap = -cached.compute_time * beta * math.log(1.0 - random.random())
+        return now + gap >= cached.expires_at
+    
     def track_performance(self, operation_name: str = None):
         """Decorator to track function performance"""
         
@@ -732,19 +913,30 @@ class TradeMatePerformanceSystem:
         total_requests = self.cache_stats["hits"] + self.cache_stats["misses"]
         hit_rate = (self.cache_stats["hits"] / total_requests * 100) if total_requests > 0 else 0
         
+        memory_usage = self.memory_cache.memory_usage
+        engine_stats = self.memory_cache.stats
+        
         return {
             "memory_cache": {
                 "entries": len(self.memory_cache),
-                "memory_usage_bytes": self.cache_stats["memory_usage"],
-                "memory_usage_mb": self.cache_stats["memory_usage"] / 1024 / 1024,
+                "memory_usage_bytes": memory_usage,
+                "memory_usage_mb": memory_usage / 1024 / 1024,
                 "max_size_mb": self.config["memory_cache_max_size"] / 1024 / 1024,
-                "utilization_percent": (self.cache_stats["memory_usage"] / self.config["memory_cache_max_size"]) * 100
+                "utilization_percent": (memory_usage / self.config["memory_cache_max_size"]) * 100
             },
             "statistics": {
                 "total_hits": self.cache_stats["hits"],
                 "total_misses": self.cache_stats["misses"],
                 "hit_rate_percent": hit_rate,
-                "total_evictions": self.cache_stats["evictions"]
+                "total_evictions": engine_stats["evictions"],
+                "total_expirations": engine_stats["expirations"],
+                "rejected_oversize": engine_stats["rejected"]
+            },
+            "stampede_protection": {
+                "coalesced_callers": self.cache_stats["coalesced"],
+                "stale_served": self.cache_stats["stale_served"],
+                "early_refreshes": self.cache_stats["early_refreshes"],
+                "inflight_computations": len(self.inflight)
             },
             "redis_available": self.redis_client is not None
         }
@@ -754,14 +946,19 @@ class TradeMatePerformanceSystem:
         
         if cache_type == CacheType.MEMORY:
             self.memory_cache.clear()
-            self.cache_locks.clear()
-            self.cache_stats["memory_usage"] = 0
             
         elif cache_type == CacheType.REDIS and self.redis_client:
-            # Clear all cache keys
-            keys = await self.redis_client.keys("cache:*")
-            if keys:
-                await self.redis_client.delete(*keys)
+            # Clear cache and tag-index keys incrementally rather than with a blocking KEYS
+            batch_size = self.config["redis_scan_batch_size"]
+            for pattern in ("cache:*", "tag:*", "keytags:*"):
+                batch = []
+                async for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+                    batch.append(key)
+                    if len(batch) >= batch_size:
+                        await self.redis_client.unlink(*batch)
+                        batch = []
+                if batch:
+                    await self.redis_client.unlink(*batch)
         
         print(f"🧹 Cleared {cache_type.value} cache")
     
@@ -858,6 +1055,8 @@ __all__ = [
     "TradeMatePerformanceSystem",
     "PerformanceMiddleware",
     "CacheType",
+    "CacheEntry",
+    "CachedResult",
     "PerformanceReport",
     "performance_system"
 ]
\ No newline at end of file
@@ -10,13 +10,17 @@ import json
 import uuid
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Union, Callable
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any, Union, Callable
 from enum import Enum
 from dataclasses import dataclass, asdict, field
 import logging
 from pathlib import Path
 import time
 import heapq
+import itertools
+from collections import defaultdict, deque
+
+from .order_book import BookFill, LimitOrderBook
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -81,6 +85,8 @@ class TimeInForce(Enum):
 
 class ExecutionAlgorithm(Enum):
     """Execution algorithm types"""
+    TWAP = "twap"                     # Time Weighted Average Price
+    VWAP = "vwap"                     # Volume Weighted Average Price
     ARRIVAL_PRICE = "arrival_price"   # Target arrival price
     PARTICIPATE = "participate"       # Participation rate strategy
     IMPLEMENT_SHORTFALL = "is"        # Implementation Shortfall
@@ -319,6 +325,264 @@ class OrderValidator:
         return len(errors) == 0
 
 
+@dataclass
+class SlicePlan:
+    """Child-order schedule for one algorithmic order"""
+    order: AdvancedOrder
+    algorithm: ExecutionAlgorithm
+    interval: float  # seconds between slices
+    total_slices: Optional[int] = None  # None slices until filled
+    quantity_per_slice: int = 0
+    participation_rate: float = 0.0
+    aggression: float = 0.0
+    
+    slice_num: int = 0
+    due: float = 0.0  # event-loop time of the next slice
+    paused_remaining: Optional[float] = None  # time to the next slice while paused
+    generation: int = 0  # bumped on every reschedule; older heap entries are stale
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    
+    @property
+    def is_last_slice(self) -> bool:
+        return self.total_slices is not None and self.slice_num >= self.total_slices - 1
+
+
+class ChildOrderScheduler:
+    """Drives the child slices of every algorithmic order from one event-loop task
+    
+    Plans wait in a heap keyed by next-slice time. The loop sleeps until the earliest
+    slice is due and fires every slice due within ``batch_window`` together, with one
+    price / volume lookup per symbol per batch. When a symbol's market data cannot be
+    fetched, its slices are retried one interval later; other symbols still fire.
+    """
+    
+    def __init__(self, engine: "ExecutionEngine", time_scale: float = 1.0,
+                 batch_window: float = 0.001, lag_samples: int = 100000):
+        self.engine = engine
+        self.time_scale = time_scale  # multiplies every slice interval; < 1 replays faster
+        self.batch_window = batch_window
+        
+        self.plans: Dict[str, SlicePlan] = {}
+        self._heap: List[Tuple[float, int, str, int]] = []  # (due, seq, order_id, generation)
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        
+        self.lags = deque(maxlen=lag_samples)  # seconds between a slice being due and firing
+        self.stats = {
+            "orders_scheduled": 0,
+            "orders_completed": 0,
+            "orders_cancelled": 0,
+            "slices_fired": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "slice_errors": 0
+        }
+    
+    def schedule(self, plan: SlicePlan):
+        """Start slicing an order; the first slice fires on the next loop tick"""
+        plan.due = asyncio.get_running_loop().time()
+        self.plans[plan.order.order_id] = plan
+        self.stats["orders_scheduled"] += 1
+        self._push(plan)
+    
+    def pause(self, order_id: str) -> bool:
+        """Hold an order's slices, keeping the time left to its next slice"""
+        plan = self.plans.get(order_id)
+        if plan is None or plan.paused_remaining is not None:
+            return False
+        plan.paused_remaining = max(0.0, plan.due - asyncio.get_running_loop().time())
+        plan.generation += 1
+        return True
+    
+    def resume(self, order_id: str) -> bool:
+        """Continue a paused order where it left off"""
+        plan = self.plans.get(order_id)
+        if plan is None or plan.paused_remaining is None:
+            return False
+        plan.due = asyncio.get_running_loop().time() + plan.paused_remaining
+        plan.paused_remaining = None
+        self._push(plan)
+        return True
+    
+    def cancel(self, order_id: str) -> bool:
+        """Stop slicing an order; its heap entries are discarded lazily"""
+        plan = self.plans.pop(order_id, None)
+        if plan is None:
+            return False
+        plan.generation += 1
+        plan.done.set()
+        self.stats["orders_cancelled"] += 1
+        return True
+    
+    async def wait(self, order_id: str, timeout: Optional[float] = None):
+        """Wait until an order is filled, exhausted or cancelled"""
+        plan = self.plans.get(order_id)
+        if plan is not None:
+            await asyncio.wait_for(plan.done.wait(), timeout)
+    
+    async def stop(self):
+        """Stop the scheduler task; pending plans stay queued for the next schedule()"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+    
+    def _push(self, plan: SlicePlan):
+        plan.generation += 1
+        heapq.heappush(self._heap, (plan.due, next(self._sequence), plan.order.order_id, plan.generation))
+        
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        elif self._heap[0][2] == plan.order.order_id:
+            self._wakeup.set()  # new earliest slice; re-arm the sleep
+    
+    def _is_stale(self, entry: Tuple[float, int, str, int]) -> bool:
+        plan = self.plans.get(entry[2])
+        return plan is None or plan.generation != entry[3]
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            while self._heap and self._is_stale(self._heap[0]):
+                heapq.heappop(self._heap)
+            if not self._heap and not self.plans:
+                return
+            
+            self._wakeup.clear()
+            delay = self._heap[0][0] - loop.time() if self._heap else None
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            now = loop.time()
+            horizon = now + self.batch_window
+            batch = []
+            while self._heap and self._heap[0][0] <= horizon:
+                entry = heapq.heappop(self._heap)
+                if not self._is_stale(entry):
+                    batch.append(self.plans[entry[2]])
+            
+            if batch:
+                await self._fire(batch, now)
+    
+    async def _fire(self, batch: List[SlicePlan], now: float):
+        """Execute one slice of every plan in the batch"""
+        engine = self.engine
+        generations = [plan.generation for plan in batch]
+        algorithms = defaultdict(set)
+        for plan in batch:
+            algorithms[plan.order.symbol].add(plan.algorithm)
+        
+        market, failures = {}, {}
+        for symbol, symbol_algorithms in algorithms.items():
+            try:
+                market[symbol] = await self._market_data(symbol, symbol_algorithms)
+            except Exception as e:
+                failures[symbol] = e
+        
+        fired = 0
+        for plan, generation in zip(batch, generations):
+            order = plan.order
+            if self.plans.get(order.order_id) is not plan or plan.generation != generation:
+                continue  # cancelled or paused while market data was awaited
+            if order.symbol in failures:
+                logger.error(f"No market data for slice {plan.slice_num} of order {order.order_id}, "
+                             f"retrying next interval: {failures[order.symbol]}")
+                self.stats["slice_errors"] += 1
+                plan.due += plan.interval * self.time_scale
+                self._push(plan)
+                continue
+            fired += 1
+            self.lags.append(max(0.0, now - plan.due))
+            try:
+                quantity, price = self._slice(plan, *market[order.symbol])
+                if quantity > 0:
+                    engine._record_fill(order, quantity, price)
+            except Exception as e:
+                logger.error(f"Error executing slice {plan.slice_num} of order {order.order_id}: {e}")
+                self.stats["slice_errors"] += 1
+            
+            plan.slice_num += 1
+            if order.remaining_quantity <= 0 or (plan.total_slices is not None and plan.slice_num >= plan.total_slices):
+                self._complete(plan)
+            else:
+                # Next slice keeps the original cadence even if this one fired late
+                plan.due += plan.interval * self.time_scale
+                self._push(plan)
+        
+        self.stats["slices_fired"] += fired
+        self.stats["batches"] += 1
+        self.stats["max_batch_size"] = max(self.stats["max_batch_size"], fired)
+    
+    async def _market_data(self, symbol: str, algorithms: Set[ExecutionAlgorithm]
+                           ) -> Tuple[float, Optional[int], Optional[float]]:
+        """Price, and the market volume / VWAP where the batch's algorithms need them"""
+        engine = self.engine
+        price = await engine._get_current_price(symbol)
+        volume = None
+        if algorithms & {ExecutionAlgorithm.VWAP, ExecutionAlgorithm.PARTICIPATE}:
+            volume = await engine._get_market_volume(symbol)
+        vwap = await engine._get_vwap_price(symbol) if ExecutionAlgorithm.VWAP in algorithms else None
+        return price, volume, vwap
+    
+    def _slice(self, plan: SlicePlan, current_price: float, market_volume: Optional[int],
+               vwap_price: Optional[float]) -> Tuple[int, float]:
+        """Quantity and price of the plan's next slice"""
+        order = plan.order
+        remaining = order.remaining_quantity
+        
+        if plan.algorithm == ExecutionAlgorithm.PARTICIPATE:
+            # Nothing to do until the market trades enough volume
+            return min(int(market_volume * plan.participation_rate), remaining), current_price
+        
+        if plan.is_last_slice:
+            quantity = remaining
+        elif plan.algorithm == ExecutionAlgorithm.VWAP:
+            quantity = min(plan.quantity_per_slice, int(market_volume * plan.participation_rate), remaining)
+        else:
+            quantity = min(plan.quantity_per_slice, remaining)
+        
+        if plan.algorithm == ExecutionAlgorithm.VWAP:
+            return quantity, (current_price + vwap_price) / 2  # Simplified VWAP targeting
+        if plan.algorithm == ExecutionAlgorithm.IMPLEMENT_SHORTFALL:
+            impact = self.engine._calculate_market_impact(quantity, order.symbol) * plan.aggression
+            return quantity, current_price * (1 + impact if order.side == OrderSide.BUY else 1 - impact)
+        return quantity, current_price
+    
+    def _complete(self, plan: SlicePlan):
+        order = plan.order
+        self.plans.pop(order.order_id, None)
+        plan.done.set()
+        self.stats["orders_completed"] += 1
+        logger.info(f"{plan.algorithm.value.upper()} order {order.order_id} completed with "
+                    f"avg price ₹{order.avg_fill_price:.2f}")
+    
+    def lag_percentiles(self, percentiles: Iterable[float] = (50, 99)) -> Dict[str, float]:
+        """Due-to-fire slice lag percentiles in milliseconds."""
+        if not self.lags:
+            return {f"p{p:g}": 0.0 for p in percentiles}
+        samples = np.fromiter(self.lags, dtype=np.float64) * 1000
+        return {f"p{p:g}": float(np.percentile(samples, p)) for p in percentiles}
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Scheduler throughput, batching and lag."""
+        return {
+            **self.stats,
+            "active_orders": len(self.plans),
+            "paused_orders": sum(plan.paused_remaining is not None for plan in self.plans.values()),
+            "queued_entries": len(self._heap),
+            "lag_ms": {**self.lag_percentiles(), "max": max(self.lags, default=0.0) * 1000}
+        }
+
+
 class ExecutionEngine:
     """Advanced order execution engine"""
     
@@ -328,6 +592,8 @@ class ExecutionEngine:
         self.execution_queue = []
         self.market_data_cache = {}
         self.execution_algorithms = {}
+        self.scheduler = ChildOrderScheduler(self)
+        self.order_books: Dict[str, LimitOrderBook] = {}  # symbols with simulated depth
         
         # Initialize execution algorithms
         self._initialize_algorithms()
@@ -427,6 +693,10 @@ class ExecutionEngine:
     
     async def _execute_limit_order(self, order: AdvancedOrder):
         """Execute limit order"""
+        if order.symbol in self.order_books:
+            self._execute_in_book(order)
+            return
+        
         # Simulate limit order logic
         current_price = await self._get_current_price(order.symbol)
         
@@ -488,6 +758,10 @@ class ExecutionEngine:
     
     async def _execute_iceberg_order(self, order: AdvancedOrder):
         """Execute iceberg order"""
+        if order.symbol in self.order_books and order.price:
+            self._execute_in_book(order, order.display_quantity or min(order.quantity // 10, 1000))
+            return
+        
         display_qty = order.display_quantity or min(order.quantity // 10, 1000)
         remaining_qty = order.quantity
         
@@ -544,118 +818,33 @@ class ExecutionEngine:
         duration_minutes = order.algorithm_params.get('duration', 60)  # Default 1 hour
         slice_interval = order.algorithm_params.get('slice_interval', 5)  # 5 minutes
         
-        total_slices = duration_minutes // slice_interval
-        quantity_per_slice = order.quantity // total_slices
-        remaining_quantity = order.quantity
+        total_slices = max(1, duration_minutes // slice_interval)
         
         logger.info(f"TWAP order {order.order_id}: {total_slices} slices over {duration_minutes} minutes")
-        
-        for slice_num in range(total_slices):
-            if remaining_quantity <= 0:
-                break
-            
-            slice_qty = min(quantity_per_slice, remaining_quantity)
-            if slice_num == total_slices - 1:  # Last slice gets remaining
-                slice_qty = remaining_quantity
-            
-            # Execute slice
-            current_price = await self._get_current_price(order.symbol)
-            execution_price = current_price
-            
-            execution = ExecutionReport(
-                report_id=str(uuid.uuid4()),
-                order_id=order.order_id,
-                symbol=order.symbol,
-                side=order.side,
-                quantity=slice_qty,
-                filled_quantity=slice_qty,
-                avg_fill_price=execution_price,
-                commission=self._calculate_commission(slice_qty, execution_price),
-                timestamp=datetime.now(),
-                execution_id=str(uuid.uuid4())
-            )
-            
-            order.filled_quantity += slice_qty
-            order.executions.append(execution)
-            remaining_quantity -= slice_qty
-            
-            # Update average fill price
-            total_value = sum(e.filled_quantity * e.avg_fill_price for e in order.executions)
-            order.avg_fill_price = total_value / order.filled_quantity
-            
-            if remaining_quantity == 0:
-                order.status = OrderStatus.FILLED
-                order.filled_at = datetime.now()
-            else:
-                order.status = OrderStatus.PARTIALLY_FILLED
-            
-            # Wait for next slice
-            if slice_num < total_slices - 1:
-                await asyncio.sleep(slice_interval * 60)  # Convert to seconds
-        
-        logger.info(f"TWAP order {order.order_id} completed with avg price ₹{order.avg_fill_price:.2f}")
+        self.scheduler.schedule(SlicePlan(
+            order=order,
+            algorithm=ExecutionAlgorithm.TWAP,
+            interval=slice_interval * 60,  # Convert to seconds
+            total_slices=total_slices,
+            quantity_per_slice=order.quantity // total_slices
+        ))
     
     async def _execute_vwap(self, order: AdvancedOrder):
         """Execute Volume Weighted Average Price order"""
         participation_rate = order.algorithm_params.get('participation_rate', 0.1)  # 10%
-        duration_minutes = order.algorithm_params.get('duration', 60)
         
-        # Simulate VWAP execution
-        slices = 12  # Execute every 5 minutes for 1 hour
-        quantity_per_slice = order.quantity // slices
-        remaining_quantity = order.quantity
+        # Execute every 5 minutes for 1 hour
+        slices = 12
         
         logger.info(f"VWAP order {order.order_id}: {participation_rate:.1%} participation rate")
-        
-        for slice_num in range(slices):
-            if remaining_quantity <= 0:
-                break
-            
-            # Simulate volume-based sizing
-            market_volume = await self._get_market_volume(order.symbol)
-            max_slice_qty = int(market_volume * participation_rate)
-            slice_qty = min(quantity_per_slice, max_slice_qty, remaining_quantity)
-            
-            if slice_num == slices - 1:  # Last slice
-                slice_qty = remaining_quantity
-            
-            # Execute slice
-            current_price = await self._get_current_price(order.symbol)
-            vwap_price = await self._get_vwap_price(order.symbol)
-            execution_price = (current_price + vwap_price) / 2  # Simplified VWAP targeting
-            
-            execution = ExecutionReport(
-                report_id=str(uuid.uuid4()),
-                order_id=order.order_id,
-                symbol=order.symbol,
-                side=order.side,
-                quantity=slice_qty,
-                filled_quantity=slice_qty,
-                avg_fill_price=execution_price,
-                commission=self._calculate_commission(slice_qty, execution_price),
-                timestamp=datetime.now(),
-                execution_id=str(uuid.uuid4())
-            )
-            
-            order.filled_quantity += slice_qty
-            order.executions.append(execution)
-            remaining_quantity -= slice_qty
-            
-            # Update average fill price
-            total_value = sum(e.filled_quantity * e.avg_fill_price for e in order.executions)
-            order.avg_fill_price = total_value / order.filled_quantity
-            
-            if remaining_quantity == 0:
-                order.status = OrderStatus.FILLED
-                order.filled_at = datetime.now()
-            else:
-                order.status = OrderStatus.PARTIALLY_FILLED
-            
-            # Wait for next slice
-            if slice_num < slices - 1:
-                await asyncio.sleep(5 * 60)  # 5 minutes
-        
-        logger.info(f"VWAP order {order.order_id} completed with avg price ₹{order.avg_fill_price:.2f}")
+        self.scheduler.schedule(SlicePlan(
+            order=order,
+            algorithm=ExecutionAlgorithm.VWAP,
+            interval=5 * 60,
+            total_slices=slices,
+            quantity_per_slice=order.quantity // slices,
+            participation_rate=participation_rate
+        ))
     
     async def _execute_implementation_shortfall(self, order: AdvancedOrder):
         """Execute Implementation Shortfall algorithm"""
@@ -664,110 +853,103 @@ class ExecutionEngine:
         
         # More aggressive = faster execution, higher market impact
         slices = max(1, int(10 * (1 - aggression)))  # 1-10 slices
-        quantity_per_slice = order.quantity // slices
-        remaining_quantity = order.quantity
         
         logger.info(f"Implementation Shortfall order {order.order_id}: {slices} slices, aggression {aggression}")
-        
-        for slice_num in range(slices):
-            if remaining_quantity <= 0:
-                break
-            
-            slice_qty = min(quantity_per_slice, remaining_quantity)
-            if slice_num == slices - 1:
-                slice_qty = remaining_quantity
-            
-            # Calculate market impact based on aggression
-            current_price = await self._get_current_price(order.symbol)
-            impact = self._calculate_market_impact(slice_qty, order.symbol) * aggression
-            execution_price = current_price * (1 + impact if order.side == OrderSide.BUY else 1 - impact)
-            
-            execution = ExecutionReport(
-                report_id=str(uuid.uuid4()),
-                order_id=order.order_id,
-                symbol=order.symbol,
-                side=order.side,
-                quantity=slice_qty,
-                filled_quantity=slice_qty,
-                avg_fill_price=execution_price,
-                commission=self._calculate_commission(slice_qty, execution_price),
-                timestamp=datetime.now(),
-                execution_id=str(uuid.uuid4())
-            )
-            
-            order.filled_quantity += slice_qty
-            order.executions.append(execution)
-            remaining_quantity -= slice_qty
-            
-            # Update average fill price
-            total_value = sum(e.filled_quantity * e.avg_fill_price for e in order.executions)
-            order.avg_fill_price = total_value / order.filled_quantity
-            
-            if remaining_quantity == 0:
-                order.status = OrderStatus.FILLED
-                order.filled_at = datetime.now()
-            else:
-                order.status = OrderStatus.PARTIALLY_FILLED
-            
-            # Dynamic wait time based on aggression
-            wait_time = (1 - aggression) * 60  # 0-60 seconds
-            if slice_num < slices - 1:
-                await asyncio.sleep(wait_time)
-        
-        logger.info(f"IS order {order.order_id} completed with avg price ₹{order.avg_fill_price:.2f}")
+        self.scheduler.schedule(SlicePlan(
+            order=order,
+            algorithm=ExecutionAlgorithm.IMPLEMENT_SHORTFALL,
+            interval=(1 - aggression) * 60,  # 0-60 seconds
+            total_slices=slices,
+            quantity_per_slice=order.quantity // slices,
+            aggression=aggression
+        ))
     
     async def _execute_participation(self, order: AdvancedOrder):
         """Execute participation rate strategy"""
         participation_rate = order.algorithm_params.get('participation_rate', 0.2)  # 20%
-        max_participation = order.algorithm_params.get('max_participation', 0.3)   # 30%
         
-        # Simulate participation-based execution
-        remaining_quantity = order.quantity
+        # Slices every 30 seconds until filled; quiet intervals trade nothing
+        self.scheduler.schedule(SlicePlan(
+            order=order,
+            algorithm=ExecutionAlgorithm.PARTICIPATE,
+            interval=30,
+            participation_rate=participation_rate
+        ))
+    
+    def get_order_book(self, symbol: str) -> LimitOrderBook:
+        """Order book for a symbol; once it exists, limit and iceberg orders match against it"""
+        if symbol not in self.order_books:
+            self.order_books[symbol] = LimitOrderBook(symbol)
+        return self.order_books[symbol]
+    
+    async def apply_l2_snapshot(self, symbol: str, snapshot: Dict[str, Any]) -> List[BookFill]:
+        """Replay one recorded L2 snapshot into the symbol's book, filling our resting orders it trades through"""
+        fills = self.get_order_book(symbol).apply_snapshot(snapshot)
+        self._apply_book_fills(fills)
+        return fills
+    
+    def _execute_in_book(self, order: AdvancedOrder, display_quantity: Optional[int] = None):
+        """Match against book depth; the remainder rests in the queue at its limit"""
+        book = self.order_books[order.symbol]
+        fills = book.add_limit(order.order_id, order.side.value, order.price, order.quantity, display_quantity)
+        self._apply_book_fills(fills)
         
-        while remaining_quantity > 0:
-            market_volume = await self._get_market_volume(order.symbol)
-            target_qty = int(market_volume * participation_rate)
-            slice_qty = min(target_qty, remaining_quantity)
-            
-            if slice_qty == 0:
-                await asyncio.sleep(30)  # Wait for more volume
-                continue
-            
-            # Execute slice
-            current_price = await self._get_current_price(order.symbol)
-            execution_price = current_price
-            
-            execution = ExecutionReport(
-                report_id=str(uuid.uuid4()),
-                order_id=order.order_id,
-                symbol=order.symbol,
-                side=order.side,
-                quantity=slice_qty,
-                filled_quantity=slice_qty,
-                avg_fill_price=execution_price,
-                commission=self._calculate_commission(slice_qty, execution_price),
-                timestamp=datetime.now(),
-                execution_id=str(uuid.uuid4())
-            )
-            
-            order.filled_quantity += slice_qty
-            order.executions.append(execution)
-            remaining_quantity -= slice_qty
-            
-            # Update average fill price
-            total_value = sum(e.filled_quantity * e.avg_fill_price for e in order.executions)
-            order.avg_fill_price = total_value / order.filled_quantity
-            
-            if remaining_quantity == 0:
-                order.status = OrderStatus.FILLED
-                order.filled_at = datetime.now()
-            else:
-                order.status = OrderStatus.PARTIALLY_FILLED
-            
-            # Wait based on market conditions
-            await asyncio.sleep(30)  # 30 seconds between checks
+        if order.filled_quantity == 0:
+            order.status = OrderStatus.ACKNOWLEDGED
+            logger.info(f"Order {order.order_id} resting at ₹{order.price:.2f}, "
+                        f"{book.queue_position(order.order_id)} ahead in queue")
+        else:
+            logger.info(f"Order {order.order_id} filled {order.filled_quantity}/{order.quantity} "
+                        f"at avg ₹{order.avg_fill_price:.2f} against book depth")
+    
+    def _apply_book_fills(self, fills: List[BookFill]):
+        """Book fills for whichever side of each match is one of our orders"""
+        for fill in fills:
+            for order_id in (fill.taker_order_id, fill.maker_order_id):
+                order = self.active_orders.get(order_id)
+                if order is not None:
+                    self._record_fill(order, fill.quantity, fill.price)
+    
+    def _record_fill(self, order: AdvancedOrder, quantity: int, price: float):
+        """Book a child fill, keeping the average price from running totals"""
+        execution = ExecutionReport(
+            report_id=str(uuid.uuid4()),
+            order_id=order.order_id,
+            symbol=order.symbol,
+            side=order.side,
+            quantity=quantity,
+            filled_quantity=quantity,
+            avg_fill_price=price,
+            commission=self._calculate_commission(quantity, price),
+            timestamp=datetime.now(),
+            execution_id=str(uuid.uuid4())
+        )
+        
+        filled_value = order.avg_fill_price * order.filled_quantity + quantity * price
+        order.filled_quantity += quantity
+        order.avg_fill_price = filled_value / order.filled_quantity
+        order.total_commission += execution.commission
+        order.executions.append(execution)
         
-        logger.info(f"Participation order {order.order_id} completed")
+        if order.remaining_quantity <= 0:
+            order.status = OrderStatus.FILLED
+            order.filled_at = datetime.now()
+        else:
+            order.status = OrderStatus.PARTIALLY_FILLED
+    
+    async def pause_order(self, order_id: str) -> bool:
+        """Pause an algorithmic order's child slices"""
+        paused = self.scheduler.pause(order_id)
+        if paused:
+            logger.info(f"Order {order_id} paused")
+        return paused
+    
+    async def resume_order(self, order_id: str) -> bool:
+        """Resume a paused algorithmic order"""
+        resumed = self.scheduler.resume(order_id)
+        if resumed:
+            logger.info(f"Order {order_id} resumed")
+        return resumed
     
     async def cancel_order(self, order_id: str) -> bool:
         """Cancel an active order"""
@@ -779,6 +961,9 @@ class ExecutionEngine:
         if order.status in [OrderStatus.FILLED, OrderStatus.CANCELLED, OrderStatus.REJECTED]:
             return False
         
+        self.scheduler.cancel(order_id)
+        if order.symbol in self.order_books:
+            self.order_books[order.symbol].cancel(order_id)
         order.status = OrderStatus.CANCELLED
         order.cancelled_at = datetime.now()
         
@@ -909,6 +1094,7 @@ async def main():
     print(f"\n3. Submitting TWAP Order for {twap_order.quantity} {twap_order.symbol}")
     print(f"   Duration: {twap_order.algorithm_params['duration']} minutes")
     await engine.submit_order(twap_order)
+    await engine.scheduler.wait(twap_order.order_id)
     print(f"   Status: {twap_order.status.value}")
     print(f"   Executions: {len(twap_order.executions)}")
     if twap_order.avg_fill_price > 0:
@@ -930,6 +1116,7 @@ async def main():
     print(f"\n4. Submitting VWAP Order for {vwap_order.quantity} {vwap_order.symbol}")
     print(f"   Participation Rate: {vwap_order.algorithm_params['participation_rate']:.1%}")
     await engine.submit_order(vwap_order)
+    await engine.scheduler.wait(vwap_order.order_id)
     print(f"   Status: {vwap_order.status.value}")
     print(f"   Executions: {len(vwap_order.executions)}")
     if vwap_order.avg_fill_price > 0:
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+TradeMate Covariance Store
+==========================
+Ledoit-Wolf shrinkage and EWMA covariance of daily returns kept per symbol
+universe and date, updated incrementally as each day's returns arrive and
+optionally persisted as memory-mapped arrays that worker processes read
+without copying
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ESTIMATORS = ("sample", "ledoit_wolf", "ewma")
+HEADERS = "[0-9]*.json"  # one <date>.json header per stored snapshot
+
+
+@dataclass
+class CovarianceSnapshot:
+    """Daily-return moments of one universe as of one date, symbols in sorted order
+
+    ``covariance`` is the sample (ddof 1) estimate, ``ledoit_wolf`` the population
+    covariance shrunk towards a scaled identity and ``ewma`` the zero-mean
+    exponentially weighted estimate. Arrays may be read-only memory maps.
+    """
+    symbols: Tuple[str, ...]
+    as_of: date
+    observations: int
+    mean: np.ndarray
+    covariance: np.ndarray
+    ledoit_wolf: np.ndarray
+    ewma: np.ndarray
+    shrinkage: float
+
+    def estimate(self, estimator: str = "ledoit_wolf") -> np.ndarray:
+        if estimator not in ESTIMATORS:
+            raise ValueError(f"Unknown covariance estimator: {estimator}")
+        return self.covariance if estimator == "sample" else getattr(self, estimator)
+
+    def volatilities(self, estimator: str = "ledoit_wolf", periods_per_year: int = 1) -> np.ndarray:
+        return np.sqrt(np.diag(self.estimate(estimator)) * periods_per_year)
+
+    def subset(self, symbols: Iterable[str]) -> "CovarianceSnapshot":
+        """Sub-block for a subset of the universe, in sorted order"""
+        symbols = tuple(sorted(set(symbols)))
+        if symbols == self.symbols:
+            return self
+        position = {s: i for i, s in enumerate(self.symbols)}
+        index = [position[s] for s in symbols]
+        block = np.ix_(index, index)
+        return CovarianceSnapshot(symbols, self.as_of, self.observations, self.mean[index],
+                                  self.covariance[block], self.ledoit_wolf[block], self.ewma[block], self.shrinkage)
+
+
+class _UniverseState:
+    """Rolling window and running moments of one universe
+
+    Sums over the window: ``s1`` = Σx, ``cross`` = Σxx', ``cubic`` = Σ‖x‖²x and
+    ``quartic`` = Σ‖x‖⁴, enough for the sample and Ledoit-Wolf estimates. The
+    EWMA is a normalized exponentially weighted average over every day seen.
+    """
+
+    def __init__(self, symbols: Tuple[str, ...], window: int):
+        n = len(symbols)
+        self.symbols = symbols
+        self.rows = np.empty((window, n))
+        self.start = 0
+        self.count = 0
+        self.as_of: Optional[date] = None
+        self.s1 = np.zeros(n)
+        self.cross = np.zeros((n, n))
+        self.cubic = np.zeros(n)
+        self.quartic = 0.0
+        self.ewma = np.zeros((n, n))
+        self.ewma_weight = 0.0
+        self.updates_since_refresh = 0
+
+    def window(self) -> np.ndarray:
+        """Rows in arrival order"""
+        end = self.start + self.count
+        if end <= len(self.rows):
+            return self.rows[self.start:end]
+        return np.concatenate([self.rows[self.start:], self.rows[:end - len(self.rows)]])
+
+    def recompute(self):
+        """Exact sums from the window, clearing accumulated round-off"""
+        rows = self.window()
+        norms = np.einsum("ij,ij->i", rows, rows)
+        self.s1 = rows.sum(axis=0)
+        self.cross = rows.T @ rows
+        self.cubic = norms @ rows
+        self.quartic = float(norms @ norms)
+        self.updates_since_refresh = 0
+
+    def push(self, row: np.ndarray, ewma_lambda: float):
+        capacity = len(self.rows)
+        if self.count == capacity:
+            outgoing = self.rows[self.start]
+            norm = outgoing @ outgoing
+            self.s1 -= outgoing
+            self.cross -= np.outer(outgoing, outgoing)
+            self.cubic -= norm * outgoing
+            self.quartic -= norm * norm
+            self.start = (self.start + 1) % capacity
+            self.count -= 1
+        self.rows[(self.start + self.count) % capacity] = row
+        self.count += 1
+
+        norm = row @ row
+        outer = np.outer(row, row)
+        self.s1 += row
+        self.cross += outer
+        self.cubic += norm * row
+        self.quartic += norm * norm
+
+        weight = ewma_lambda * self.ewma_weight + 1.0
+        self.ewma *= ewma_lambda * self.ewma_weight / weight
+        self.ewma += outer / weight
+        self.ewma_weight = weight
+        self.updates_since_refresh += 1
+
+    def snapshot(self) -> CovarianceSnapshot:
+        """Sample, Ledoit-Wolf and EWMA estimates from the running sums in O(n²)"""
+        t, n = self.count, len(self.symbols)
+        mean = self.s1 / t
+        centre = mean @ mean
+        population = self.cross / t - np.outer(mean, mean)
+        sample = population * t / (t - 1)
+
+        # Ledoit-Wolf (2004) towards mu * I on demeaned rows y = x - mean, as in scikit-learn:
+        # Σ‖y‖⁴ expanded in the raw-row sums, Σ‖y‖² = t * trace(population)
+        fourth = (self.quartic - 4 * mean @ self.cubic + 4 * mean @ self.cross @ mean
+                  + 2 * centre * np.trace(self.cross) - 4 * centre * (mean @ self.s1) + t * centre ** 2)
+        mu = np.trace(population) / n
+        squared_norm = float(np.sum(population ** 2))
+        beta = (fourth / t - squared_norm) / (n * t)
+        delta = (squared_norm - 2 * mu * np.trace(population) + n * mu ** 2) / n
+        shrinkage = float(min(max(beta, 0.0), delta) / delta) if delta > 0 else 0.0
+        shrunk = (1 - shrinkage) * population
+        shrunk.flat[::n + 1] += shrinkage * mu
+
+        return CovarianceSnapshot(self.symbols, self.as_of, t, mean, sample, shrunk, self.ewma.copy(), shrinkage)
+
+
+class CovarianceStore:
+    """Covariance estimates shared by the risk, analytics and optimization modules
+
+    Universes are keyed by their sorted symbols. ``seed`` loads a history once;
+    ``update`` / ``append`` then fold in one day of returns in O(n²) instead of
+    re-estimating from the window. The running sums are rebuilt from the window
+    every ``refresh_interval`` updates. With a ``path`` each snapshot is also
+    written under ``<path>/<universe>/`` as a versioned ``.npy`` (sample,
+    Ledoit-Wolf and EWMA stacked) and a ``<date>.json`` header naming it, and any
+    process constructing a store on the same path reads them back as read-only
+    memory maps. Stored universes list their symbols in ``symbols.json``, so
+    subsets are served from disk as from memory.
+
+    At most ``max_universes`` universes are kept in memory; seeding another evicts
+    the least recently served one. Reads and writes take a lock, and ``append``
+    releases it between universes, so the daily close can run on a worker thread
+    while the application keeps reading.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, window: int = 252, ewma_lambda: float = 0.94,
+                 refresh_interval: int = 252, keep_days: int = 5, max_age_days: int = 4,
+                 max_universes: int = 16):
+        self.path = Path(path) if path is not None else None
+        self.window = window
+        self.ewma_lambda = ewma_lambda
+        self.refresh_interval = refresh_interval
+        self.keep_days = keep_days
+        self.max_age = timedelta(days=max_age_days)
+        self.max_universes = max_universes
+        self._lock = threading.RLock()
+        self._universes: "OrderedDict[Tuple[str, ...], _UniverseState]" = OrderedDict()
+        self._snapshots: Dict[Tuple[str, ...], Dict[date, CovarianceSnapshot]] = {}
+        self._stored: Dict[str, Tuple[str, ...]] = {}  # directory name -> symbols, for universes found on disk
+        self.stats = {"seeds": 0, "updates": 0, "refreshes": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def universes(self) -> List[Tuple[str, ...]]:
+        with self._lock:
+            return list(self._universes)
+
+    # Writes
+
+    def seed(self, returns: pd.DataFrame, as_of: date) -> CovarianceSnapshot:
+        """(Re)start a universe from a history of daily returns, one column per symbol"""
+        returns = returns.reindex(columns=sorted(returns.columns))
+        values = returns.to_numpy(dtype=float)[-self.window:]
+        if len(values) < 2:
+            raise ValueError("At least two days of returns are needed to estimate a covariance")
+        if not np.isfinite(values).all():
+            raise ValueError("Returns must be finite")
+
+        symbols = tuple(returns.columns)
+        state = _UniverseState(symbols, self.window)
+        state.rows[:len(values)] = values
+        state.count = len(values)
+        state.as_of = as_of
+        state.recompute()
+        weights = self.ewma_lambda ** np.arange(len(values) - 1, -1, -1)
+        state.ewma_weight = float(weights.sum())
+        state.ewma = (values * weights[:, None]).T @ values / state.ewma_weight
+
+        with self._lock:
+            self._universes[symbols] = state
+            self._universes.move_to_end(symbols)
+            self._snapshots.pop(symbols, None)
+            while len(self._universes) > self.max_universes:
+                evicted, _ = self._universes.popitem(last=False)
+                self._snapshots.pop(evicted, None)
+                self.stats["evictions"] += 1
+            self.stats["seeds"] += 1
+            return self._publish(state)
+
+    def update(self, symbols: Iterable[str], as_of: date, returns: Union[Mapping[str, float], np.ndarray]
+               ) -> CovarianceSnapshot:
+        """Fold one day of returns into a seeded universe
+
+        ``returns`` is a mapping by symbol or a vector in sorted symbol order. A date
+        at or before the universe's last update is ignored.
+        """
+        key = tuple(sorted(set(symbols)))
+        row = np.array([returns[s] for s in key], dtype=float) if isinstance(returns, Mapping) \
+            else np.asarray(returns, dtype=float)
+        if row.shape != (len(key),) or not np.isfinite(row).all():
+            raise ValueError(f"Expected {len(key)} finite returns for {as_of}")
+
+        with self._lock:
+            state = self._universes.get(key)
+            if state is None:
+                raise KeyError(f"Universe {key} has not been seeded")
+            if as_of <= state.as_of:
+                logger.warning(f"Ignoring returns for {as_of}: universe already updated to {state.as_of}")
+                return self._snapshots[key][state.as_of]
+
+            state.push(row, self.ewma_lambda)
+            state.as_of = as_of
+            if state.updates_since_refresh >= self.refresh_interval:
+                state.recompute()
+                self.stats["refreshes"] += 1
+            self.stats["updates"] += 1
+            return self._publish(state)
+
+    def append(self, as_of: date, returns: Mapping[str, float]) -> List[Tuple[str, ...]]:
+        """Update every seeded universe whose symbols all have a return for ``as_of``"""
+        with self._lock:
+            due = [key for key, state in self._universes.items()
+                   if state.as_of < as_of and all(s in returns for s in key)]
+        updated = []
+        for key in due:
+            with self._lock:  # one universe at a time, so readers never wait for the whole close
+                state = self._universes.get(key)
+                if state is None or state.as_of >= as_of:
+                    continue  # evicted or reseeded meanwhile
+                self.update(key, as_of, returns)
+            updated.append(key)
+        return updated
+
+    # Reads
+
+    def latest_date(self, symbols: Iterable[str], as_of: Optional[date] = None) -> Optional[date]:
+        """Date of the estimate ``snapshot`` would serve, without materializing it"""
+        with self._lock:
+            located = self._locate(tuple(sorted(set(symbols))), as_of)
+        return located[1] if located else None
+
+    def snapshot(self, symbols: Iterable[str], as_of: Optional[date] = None) -> Optional[CovarianceSnapshot]:
+        """Latest estimate on or before ``as_of`` (and at most ``max_age_days`` older) for the symbols
+
+        Symbols held inside a larger universe, seeded here or stored on disk, are served
+        as its sub-block.
+        """
+        symbols = tuple(sorted(set(symbols)))
+        with self._lock:
+            located = self._locate(symbols, as_of)
+            if located is None:
+                self.stats["misses"] += 1
+                return None
+            universe, when = located
+            snapshot = self._snapshots.get(universe, {}).get(when)
+            if universe in self._universes:
+                self._universes.move_to_end(universe)
+            self.stats["hits"] += 1
+        if snapshot is None:
+            snapshot = self._load(universe, when)
+        return snapshot.subset(symbols)
+
+    def _locate(self, symbols: Tuple[str, ...], as_of: Optional[date]) -> Optional[Tuple[Tuple[str, ...], date]]:
+        if not symbols:
+            return None
+        for universe in self._candidates(symbols, self._universes):
+            when = self._servable(self._snapshots.get(universe, {}), as_of)
+            if when is not None:
+                return universe, when
+        if self.path is not None:
+            for universe in self._candidates(symbols, self._stored_universes()):
+                when = self._servable(self._stored_dates(universe), as_of)
+                if when is not None:
+                    return universe, when
+        return None
+
+    @staticmethod
+    def _candidates(symbols: Tuple[str, ...], universes: Iterable[Tuple[str, ...]]) -> List[Tuple[str, ...]]:
+        """The universe itself if known, else the known universes containing it, smallest first"""
+        universes = list(universes)
+        if symbols in universes:
+            return [symbols]
+        wanted = set(symbols)
+        return sorted((key for key in universes if len(key) > len(symbols) and wanted <= set(key)), key=len)
+
+    def _servable(self, dates: Iterable[date], as_of: Optional[date]) -> Optional[date]:
+        dates = [d for d in dates if as_of is None or d <= as_of]
+        if not dates:
+            return None
+        latest = max(dates)
+        return latest if as_of is None or as_of - latest <= self.max_age else None
+
+    # Persistence
+
+    def _publish(self, state: _UniverseState) -> CovarianceSnapshot:
+        snapshot = state.snapshot()
+        history = self._snapshots.setdefault(state.symbols, {})
+        history[snapshot.as_of] = snapshot
+        for old in sorted(history)[:-self.keep_days]:
+            del history[old]
+        if self.path is not None:
+            self._save(snapshot)
+        return snapshot
+
+    def _directory(self, symbols: Tuple[str, ...]) -> Path:
+        return self.path / hashlib.sha1("\n".join(symbols).encode()).hexdigest()[:16]
+
+    def _save(self, snapshot: CovarianceSnapshot):
+        """Write the matrices under a new versioned name, then swap in the header that names them
+
+        The header is replaced with one ``os.replace``, so readers see either the previous
+        snapshot or the new one, never a header paired with another version's matrices.
+        Matrix files are removed once no header refers to them.
+        """
+        directory = self._directory(snapshot.symbols)
+        directory.mkdir(parents=True, exist_ok=True)
+        listing = directory / "symbols.json"
+        if not listing.exists():
+            self._write(listing, json.dumps(list(snapshot.symbols)))
+
+        stem = snapshot.as_of.isoformat()
+        matrices = f"{stem}.{uuid.uuid4().hex[:12]}.npy"
+        temporary = directory / f".{matrices}.tmp"
+        with open(temporary, "wb") as handle:
+            np.save(handle, np.stack([snapshot.covariance, snapshot.ledoit_wolf, snapshot.ewma]))
+        os.replace(temporary, directory / matrices)
+        header = {
+            "symbols": list(snapshot.symbols), "as_of": stem, "observations": snapshot.observations,
+            "mean": snapshot.mean.tolist(), "shrinkage": snapshot.shrinkage, "matrices": matrices
+        }
+        self._write(directory / f"{stem}.json", json.dumps(header))
+
+        headers = sorted(directory.glob(HEADERS))
+        for old in headers[:-self.keep_days]:
+            old.unlink()
+        referenced = {json.loads(kept.read_text())["matrices"] for kept in headers[-self.keep_days:]}
+        for orphan in directory.glob("*.npy"):
+            if orphan.name not in referenced:
+                orphan.unlink(missing_ok=True)
+
+    @staticmethod
+    def _write(target: Path, text: str):
+        temporary = target.with_name(f".{target.name}.tmp")
+        temporary.write_text(text)
+        os.replace(temporary, target)
+
+    def _stored_universes(self) -> List[Tuple[str, ...]]:
+        """Universes persisted under ``path``, including those written by other processes"""
+        if self.path.is_dir():
+            for directory in self.path.iterdir():
+                listing = directory / "symbols.json"
+                if directory.name not in self._stored and listing.exists():
+                    self._stored[directory.name] = tuple(json.loads(listing.read_text()))
+        return list(self._stored.values())
+
+    def _stored_dates(self, symbols: Tuple[str, ...]) -> List[date]:
+        directory = self._directory(symbols)
+        if not directory.is_dir():
+            return []
+        return [date.fromisoformat(header.stem) for header in directory.glob(HEADERS)]
+
+    def _load(self, symbols: Tuple[str, ...], as_of: date) -> CovarianceSnapshot:
+        directory = self._directory(symbols)
+        path = directory / f"{as_of.isoformat()}.json"
+        while True:
+            header = json.loads(path.read_text())
+            try:
+                matrices = np.load(directory / header["matrices"], mmap_mode="r")
+                break
+            except FileNotFoundError:
+                # Republished between reading the header and mapping its matrices
+                if json.loads(path.read_text())["matrices"] == header["matrices"]:
+                    raise
+        return CovarianceSnapshot(
+            tuple(header["symbols"]), as_of, header["observations"], np.array(header["mean"]),
+            matrices[0], matrices[1], matrices[2], header["shrinkage"]
+        )
+
+
+# Global covariance store instance, shared by the risk, analytics and optimization modules
+shared_covariance_store = CovarianceStore()
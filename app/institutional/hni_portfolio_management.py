@@ -11,13 +11,17 @@ import uuid
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Any, Union
 from enum import Enum
 from dataclasses import dataclass, asdict, field
+from collections import defaultdict
 import logging
 from pathlib import Path
 import time
 
+from .covariance_store import CovarianceStore, shared_covariance_store
+from .portfolio_optimization import FactorizedCovariance, OptimizationConstraints, PortfolioOptimizationService
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -210,6 +214,42 @@ class HNIPortfolio:
         return False
 
 
+@dataclass
+class PortfolioValuation:
+    """Running aggregates of one portfolio, adjusted by price deltas instead of re-summed
+    
+    Asset class values are a list in ``asset_classes`` order so a tick adds to a slot
+    rather than hashing the enum; the holdings value is their sum. They are re-summed
+    from the holdings on (re)indexing and every ``RESYNC_INTERVAL`` refreshes, so
+    floating-point drift from the deltas cannot accumulate.
+    """
+    asset_classes: Tuple[AssetClass, ...]
+    class_values: List[float]
+    entries: List[Tuple[PortfolioHolding, int]] = field(default_factory=list)  # (holding, class slot) in holding order
+    target_slots: Tuple[int, ...] = ()  # class slot per target allocation, -1 when the class is not held
+    needs_rebalancing: bool = False
+    weights_stale: bool = False  # holding weights lag the last bulk tick
+    refreshes: int = 0  # delta refreshes since the class values were last re-summed
+    
+    RESYNC_INTERVAL = 1000
+    
+    @property
+    def holdings_value(self) -> float:
+        return sum(self.class_values)
+    
+    @property
+    def asset_class_values(self) -> Dict[AssetClass, float]:
+        return dict(zip(self.asset_classes, self.class_values))
+    
+    def resync(self):
+        """Re-sum the class values from the holdings, in place (the symbol index shares the list)"""
+        class_values = self.class_values
+        class_values[:] = [0.0] * len(class_values)
+        for holding, slot in self.entries:
+            class_values[slot] += holding.market_value
+        self.refreshes = 0
+
+
 class PortfolioConstructor:
     """Advanced portfolio construction engine"""
     
@@ -391,14 +431,18 @@ class PortfolioConstructor:
 class PortfolioOptimizer:
     """Modern Portfolio Theory optimization"""
     
-    def __init__(self):
-        """Initialize portfolio optimizer"""
+    def __init__(self, service: Optional[PortfolioOptimizationService] = None,
+                 covariance_store: Optional[CovarianceStore] = None):
+        """Initialize portfolio optimizer; factorizations come from the (shared) covariance store"""
         self.risk_free_rate = 0.065  # 6.5% risk-free rate
+        self.service = service or PortfolioOptimizationService(
+            covariance_store=covariance_store or shared_covariance_store
+        )
         self.optimization_methods = {
-            'mean_variance': self._mean_variance_optimization,
-            'risk_parity': self._risk_parity_optimization,
-            'black_litterman': self._black_litterman_optimization,
-            'maximum_diversification': self._maximum_diversification
+            'mean_variance': self._mean_variance_constraints,
+            'risk_parity': self._risk_parity_constraints,
+            'black_litterman': self._black_litterman_constraints,
+            'maximum_diversification': self._maximum_diversification_constraints
         }
     
     async def optimize_portfolio(
@@ -412,17 +456,64 @@ class PortfolioOptimizer:
         if method not in self.optimization_methods:
             logger.error(f"Unknown optimization method: {method}")
             return {}
+        if not portfolio.holdings:
+            return {}
         
-        # Get historical data for optimization
-        historical_data = await self._get_historical_data(portfolio)
+        # Covariance factorization for this universe and date, shared with other portfolios
+        model = await self._factorization(portfolio)
         
-        # Run optimization
-        optimized_weights = await self.optimization_methods[method](
-            historical_data, constraints or {}
+        # Run optimization, warm-started from this portfolio's last solution
+        result = self.service.optimize(
+            model, method, self.optimization_methods[method](model, constraints or {}), portfolio.portfolio_id
         )
         
         logger.info(f"Portfolio optimization completed using {method}")
-        return optimized_weights
+        return result.as_dict()
+    
+    async def optimize_portfolios(
+        self,
+        portfolios: List[HNIPortfolio],
+        method: str = 'mean_variance',
+        constraints: Optional[Dict] = None,
+        portfolio_constraints: Optional[Dict[str, Dict]] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """Optimize many portfolios; those holding the same universe share one factorization
+        
+        ``portfolio_constraints`` overrides ``constraints`` per portfolio id.
+        """
+        
+        if method not in self.optimization_methods:
+            logger.error(f"Unknown optimization method: {method}")
+            return {}
+        
+        universes: Dict[Tuple[str, ...], List[HNIPortfolio]] = {}
+        for portfolio in portfolios:
+            if portfolio.holdings:
+                universe = tuple(sorted({h.symbol for h in portfolio.holdings}))
+                universes.setdefault(universe, []).append(portfolio)
+        
+        optimized = {}
+        for members in universes.values():
+            model = await self._factorization(members[0])
+            requests = [
+                (p.portfolio_id, self.optimization_methods[method](
+                    model, {**(constraints or {}), **(portfolio_constraints or {}).get(p.portfolio_id, {})}
+                ))
+                for p in members
+            ]
+            for portfolio_id, result in self.service.optimize_batch(model, requests, method).items():
+                optimized[portfolio_id] = result.as_dict()
+        
+        logger.info(f"Optimized {len(optimized)} portfolios across {len(universes)} universes using {method}")
+        return optimized
+    
+    async def _factorization(self, portfolio: HNIPortfolio) -> FactorizedCovariance:
+        """Latest stored factorization for the portfolio's universe; history is only fetched on a miss"""
+        as_of = datetime.now().date()
+        model = self.service.factorization((h.symbol for h in portfolio.holdings), as_of)
+        if model is None:
+            model = self.service.factorize(await self._get_historical_data(portfolio), as_of)
+        return model
     
     async def _get_historical_data(self, portfolio: HNIPortfolio) -> pd.DataFrame:
         """Get historical return data for optimization"""
@@ -451,92 +542,27 @@ class PortfolioOptimizer:
         
         return pd.DataFrame(data, index=dates)
     
-    async def _mean_variance_optimization(
-        self, 
-        returns_data: pd.DataFrame, 
-        constraints: Dict
-    ) -> Dict[str, float]:
-        """Mean-variance optimization (Markowitz)"""
-        
-        # Calculate expected returns and covariance matrix
-        expected_returns = returns_data.mean() * 252  # Annualized
-        cov_matrix = returns_data.cov() * 252  # Annualized
-        
-        # Mock optimization (replace with actual optimization library like cvxpy)
-        n_assets = len(returns_data.columns)
-        
-        # Equal weight as starting point
-        weights = np.ones(n_assets) / n_assets
-        
-        # Apply simple optimization logic
-        risk_adjusted_returns = expected_returns / np.sqrt(np.diag(cov_matrix))
-        weights = risk_adjusted_returns / risk_adjusted_returns.sum()
-        
-        # Apply constraints
-        min_weight = constraints.get('min_weight', 0.05)
-        max_weight = constraints.get('max_weight', 0.4)
-        
-        weights = np.clip(weights, min_weight, max_weight)
-        weights = weights / weights.sum()  # Renormalize
-        
-        return dict(zip(returns_data.columns, weights))
+    def _mean_variance_constraints(self, model: FactorizedCovariance, constraints: Dict) -> OptimizationConstraints:
+        """Mean-variance optimization (Markowitz) within 5%-40% position bounds"""
+        return OptimizationConstraints.from_dict(
+            constraints, min_weight=0.05, max_weight=0.4, risk_free_rate=self.risk_free_rate
+        )
     
-    async def _risk_parity_optimization(
-        self, 
-        returns_data: pd.DataFrame, 
-        constraints: Dict
-    ) -> Dict[str, float]:
-        """Risk parity optimization"""
-        
-        # Calculate volatilities
-        volatilities = returns_data.std() * np.sqrt(252)
-        
-        # Inverse volatility weights
-        inv_vol_weights = 1 / volatilities
-        weights = inv_vol_weights / inv_vol_weights.sum()
-        
-        return dict(zip(returns_data.columns, weights))
+    def _risk_parity_constraints(self, model: FactorizedCovariance, constraints: Dict) -> OptimizationConstraints:
+        """Risk parity: equal (or budgeted) risk contributions"""
+        return OptimizationConstraints.from_dict(constraints)
     
-    async def _black_litterman_optimization(
-        self, 
-        returns_data: pd.DataFrame, 
-        constraints: Dict
-    ) -> Dict[str, float]:
-        """Black-Litterman optimization"""
-        
-        # Simplified Black-Litterman (full implementation requires market cap data)
-        # Start with market cap weights (mock)
-        n_assets = len(returns_data.columns)
-        market_weights = np.ones(n_assets) / n_assets
-        
-        # Apply views (mock - in practice, use analyst views)
-        expected_returns = returns_data.mean() * 252
-        
-        # Combine market equilibrium with views
-        weights = market_weights * (1 + expected_returns * 0.1)  # Simple adjustment
-        weights = weights / weights.sum()
-        
-        return dict(zip(returns_data.columns, weights))
+    def _black_litterman_constraints(self, model: FactorizedCovariance, constraints: Dict) -> OptimizationConstraints:
+        """Black-Litterman around equal market weights; historical mean returns are the views unless given"""
+        return OptimizationConstraints.from_dict(
+            constraints, risk_free_rate=self.risk_free_rate,
+            views=tuple(zip(model.symbols, model.mean.tolist()))
+        )
     
-    async def _maximum_diversification(
-        self, 
-        returns_data: pd.DataFrame, 
-        constraints: Dict
-    ) -> Dict[str, float]:
-        """Maximum diversification optimization"""
-        
-        # Calculate correlations
-        corr_matrix = returns_data.corr()
-        
-        # Diversification ratio = weighted avg volatility / portfolio volatility
-        # Maximize by minimizing correlations
-        
-        # Simplified: use inverse correlation weights
-        avg_correlations = corr_matrix.mean()
-        inv_corr_weights = 1 / (1 + avg_correlations)
-        weights = inv_corr_weights / inv_corr_weights.sum()
-        
-        return dict(zip(returns_data.columns, weights))
+    def _maximum_diversification_constraints(self, model: FactorizedCovariance,
+                                             constraints: Dict) -> OptimizationConstraints:
+        """Maximum diversification: highest weighted-average volatility per unit of portfolio volatility"""
+        return OptimizationConstraints.from_dict(constraints)
 
 
 class PortfolioRebalancer:
@@ -694,13 +720,19 @@ class PortfolioRebalancer:
 class HNIPortfolioManager:
     """Main HNI portfolio management system"""
     
-    def __init__(self):
+    def __init__(self, covariance_store: Optional[CovarianceStore] = None):
         """Initialize HNI portfolio manager"""
         self.portfolios = {}
         self.constructor = PortfolioConstructor()
-        self.optimizer = PortfolioOptimizer()
+        self.optimizer = PortfolioOptimizer(covariance_store=covariance_store)
         self.rebalancer = PortfolioRebalancer()
         
+        # Reverse index symbol -> portfolio id -> holdings, and running valuations per portfolio
+        # Entries are (holding, the portfolio's class value list, slot in it)
+        self._holders: Dict[str, Dict[str, List[Tuple[PortfolioHolding, List[float], int]]]] = defaultdict(dict)
+        self._indexed_holdings = 0
+        self._valuations: Dict[str, PortfolioValuation] = {}
+        
         # Performance tracking
         self.benchmark_returns = {}
         self.risk_free_rate = 0.065
@@ -721,11 +753,51 @@ class HNIPortfolioManager:
             initial_amount, custom_allocations
         )
         
-        self.portfolios[portfolio.portfolio_id] = portfolio
+        self.register_portfolio(portfolio)
         
         logger.info(f"Created HNI portfolio {portfolio.portfolio_id} for ₹{initial_amount:,.0f}")
         return portfolio.portfolio_id
     
+    def register_portfolio(self, portfolio: HNIPortfolio):
+        """Track a portfolio and index its holdings for price updates"""
+        self.portfolios[portfolio.portfolio_id] = portfolio
+        self._index_portfolio(portfolio)
+    
+    def _index_portfolio(self, portfolio: HNIPortfolio):
+        """(Re)build the portfolio's index entries and valuation after its holdings changed"""
+        portfolio_id = portfolio.portfolio_id
+        previous = self._valuations.get(portfolio_id)
+        if previous is not None:
+            for symbol in {holding.symbol for holding, _ in previous.entries}:
+                holders = self._holders[symbol]
+                del holders[portfolio_id]
+                if not holders:
+                    del self._holders[symbol]
+            self._indexed_holdings -= len(previous.entries)
+        
+        slots: Dict[AssetClass, int] = {}
+        class_values: List[float] = []
+        entries = []
+        for holding in portfolio.holdings:
+            slot = slots.setdefault(holding.asset_class, len(slots))
+            if slot == len(class_values):
+                class_values.append(0.0)
+            class_values[slot] += holding.market_value
+            entries.append((holding, slot))
+            self._holders[holding.symbol].setdefault(portfolio_id, []).append((holding, class_values, slot))
+        self._indexed_holdings += len(entries)
+        
+        target_slots = tuple(slots.get(target.asset_class, -1) for target in portfolio.target_allocations)
+        valuation = self._valuations[portfolio_id] = PortfolioValuation(
+            tuple(slots), class_values, entries, target_slots
+        )
+        total = valuation.holdings_value + portfolio.cash_balance
+        valuation.needs_rebalancing = total > 0 and any(
+            abs((class_values[slot] if slot >= 0 else 0.0) / total * 100 - target.target_percentage)
+            > portfolio.rebalance_threshold
+            for target, slot in zip(portfolio.target_allocations, target_slots)
+        )
+    
     async def optimize_portfolio_allocation(
         self,
         portfolio_id: str,
@@ -736,7 +808,7 @@ class HNIPortfolioManager:
         if portfolio_id not in self.portfolios:
             return False
         
-        portfolio = self.portfolios[portfolio_id]
+        portfolio = self.get_portfolio(portfolio_id)
         
         # Get optimized weights
         optimized_weights = await self.optimizer.optimize_portfolio(
@@ -746,19 +818,40 @@ class HNIPortfolioManager:
         if optimized_weights:
             # Rebalance to optimized weights
             await self.rebalancer.rebalance_portfolio(portfolio, optimized_weights)
+            self._index_portfolio(portfolio)
             logger.info(f"Optimized portfolio {portfolio_id} using {optimization_method}")
             return True
         
         return False
     
+    async def optimize_portfolio_allocations(
+        self,
+        portfolio_ids: List[str],
+        optimization_method: str = 'mean_variance',
+        constraints: Optional[Dict] = None
+    ) -> Dict[str, bool]:
+        """Optimize and rebalance many portfolios in one batch"""
+        
+        portfolios = [self.get_portfolio(pid) for pid in portfolio_ids if pid in self.portfolios]
+        optimized = await self.optimizer.optimize_portfolios(portfolios, optimization_method, constraints)
+        
+        for portfolio in portfolios:
+            if portfolio.portfolio_id in optimized:
+                await self.rebalancer.rebalance_portfolio(portfolio, optimized[portfolio.portfolio_id])
+                self._index_portfolio(portfolio)
+        
+        return {pid: pid in optimized for pid in portfolio_ids}
+    
     async def rebalance_portfolio(self, portfolio_id: str) -> bool:
         """Rebalance portfolio to target allocations"""
         
         if portfolio_id not in self.portfolios:
             return False
         
-        portfolio = self.portfolios[portfolio_id]
+        portfolio = self.get_portfolio(portfolio_id)
         trades = await self.rebalancer.rebalance_portfolio(portfolio)
+        if trades:
+            self._index_portfolio(portfolio)
         
         return len(trades) > 0
     
@@ -768,37 +861,120 @@ class HNIPortfolioManager:
         if portfolio_id not in self.portfolios:
             return
         
-        portfolio = self.portfolios[portfolio_id]
-        
-        # Update holding prices and values
-        for holding in portfolio.holdings:
-            if holding.symbol in price_updates:
-                old_price = holding.current_price
-                new_price = price_updates[holding.symbol]
-                
-                holding.current_price = new_price
-                holding.market_value = holding.quantity * new_price
-                holding.unrealized_pnl = (new_price - holding.cost_basis) * holding.quantity
-                
-                # Update return metrics
-                holding.total_return = holding.unrealized_pnl / (holding.cost_basis * holding.quantity)
-        
-        # Recalculate portfolio totals
-        total_market_value = sum(h.market_value for h in portfolio.holdings) + portfolio.cash_balance
-        portfolio.total_value = total_market_value
-        
-        # Update allocations
-        await self.constructor._update_portfolio_metrics(portfolio)
+        for symbol, price in price_updates.items():
+            for holding, class_values, slot in self._holders.get(symbol, {}).get(portfolio_id, ()):
+                class_values[slot] += self._reprice(holding, price)
+        self._refresh_portfolio(self.portfolios[portfolio_id], self._valuations[portfolio_id])
         
         logger.debug(f"Updated prices for portfolio {portfolio_id}")
     
+    async def update_market_prices(self, price_updates: Mapping[str, float]) -> Dict[str, bool]:
+        """Apply a batch of ticks to every portfolio holding the symbols
+        
+        Only the affected holdings are revalued; portfolio totals and asset class
+        values move by the price deltas and each affected portfolio's allocations
+        and rebalancing flag are refreshed once per batch. Holding weights are
+        brought up to date when the portfolio is next read through the manager
+        (``get_portfolio``). Returns needs_rebalancing per affected portfolio id.
+        
+        Sparse batches go through the symbol index. When the batch reaches most
+        indexed holdings, portfolios are walked in holding order instead, which
+        touches memory far more locally than hopping between books per symbol.
+        """
+        affected = set()
+        reprice = self._reprice
+        if 2 * self._reached_holdings(price_updates) > self._indexed_holdings:
+            get_price = price_updates.get
+            for portfolio_id, valuation in self._valuations.items():
+                class_values = valuation.class_values
+                hit = False
+                for holding, slot in valuation.entries:
+                    price = get_price(holding.symbol)
+                    if price is not None:
+                        class_values[slot] += reprice(holding, price)
+                        hit = True
+                if hit:
+                    affected.add(portfolio_id)
+        else:
+            for symbol, price in price_updates.items():
+                holders = self._holders.get(symbol)
+                if not holders:
+                    continue
+                affected.update(holders)
+                for entries in holders.values():
+                    for holding, class_values, slot in entries:
+                        class_values[slot] += reprice(holding, price)
+        
+        for portfolio_id in affected:
+            self._refresh_portfolio(self.portfolios[portfolio_id], self._valuations[portfolio_id], weights=False)
+        
+        logger.debug(f"Applied {len(price_updates)} prices to {len(affected)} portfolios")
+        return {portfolio_id: self._valuations[portfolio_id].needs_rebalancing for portfolio_id in affected}
+    
+    def _reached_holdings(self, symbols: Iterable[str]) -> int:
+        """Indexed holdings (not portfolios) carrying any of the symbols"""
+        return sum(
+            len(entries)
+            for symbol in symbols
+            for entries in self._holders.get(symbol, {}).values()
+        )
+    
+    def portfolios_needing_rebalance(self) -> List[str]:
+        """Portfolio ids flagged by the running aggregates"""
+        return [portfolio_id for portfolio_id, valuation in self._valuations.items() if valuation.needs_rebalancing]
+    
+    @staticmethod
+    def _reprice(holding: PortfolioHolding, price: float) -> float:
+        """Revalue one holding at ``price``; returns its change in market value"""
+        market_value = holding.quantity * price
+        delta = market_value - holding.market_value
+        holding.current_price = price
+        holding.market_value = market_value
+        holding.unrealized_pnl = (price - holding.cost_basis) * holding.quantity
+        holding.total_return = price / holding.cost_basis - 1 if holding.cost_basis else 0.0
+        return delta
+    
+    def get_portfolio(self, portfolio_id: str) -> Optional[HNIPortfolio]:
+        """Portfolio with holding weights current as of the last price update"""
+        portfolio = self.portfolios.get(portfolio_id)
+        if portfolio is not None and self._valuations[portfolio_id].weights_stale:
+            self._refresh_weights(portfolio, self._valuations[portfolio_id])
+        return portfolio
+    
+    @staticmethod
+    def _refresh_weights(portfolio: HNIPortfolio, valuation: PortfolioValuation):
+        scale = 100 / portfolio.total_value if portfolio.total_value else 0.0
+        for holding in portfolio.holdings:
+            holding.weight = holding.market_value * scale
+        valuation.weights_stale = False
+    
+    def _refresh_portfolio(self, portfolio: HNIPortfolio, valuation: PortfolioValuation, weights: bool = True):
+        """Total value, allocations, rebalancing flag and (optionally) holding weights from the running aggregates"""
+        valuation.refreshes += 1
+        if valuation.refreshes >= valuation.RESYNC_INTERVAL:
+            valuation.resync()
+        class_values = valuation.class_values
+        portfolio.total_value = valuation.holdings_value + portfolio.cash_balance
+        scale = 100 / portfolio.total_value if portfolio.total_value else 0.0
+        if weights:
+            self._refresh_weights(portfolio, valuation)
+        else:
+            valuation.weights_stale = True
+        
+        deviates = False
+        for allocation, slot in zip(portfolio.target_allocations, valuation.target_slots):
+            allocation.current_value = class_values[slot] if slot >= 0 else 0.0
+            allocation.current_percentage = allocation.current_value * scale
+            deviates = deviates or abs(allocation.deviation_from_target) > portfolio.rebalance_threshold
+        valuation.needs_rebalancing = deviates and portfolio.total_value > 0
+    
     async def get_portfolio_performance(self, portfolio_id: str) -> Optional[PortfolioPerformance]:
         """Get comprehensive portfolio performance"""
         
         if portfolio_id not in self.portfolios:
             return None
         
-        portfolio = self.portfolios[portfolio_id]
+        portfolio = self.get_portfolio(portfolio_id)
         
         # Calculate performance metrics
         total_cost_basis = sum(h.cost_basis * h.quantity for h in portfolio.holdings)
@@ -851,7 +1027,7 @@ class HNIPortfolioManager:
         if portfolio_id not in self.portfolios:
             return None
         
-        portfolio = self.portfolios[portfolio_id]
+        portfolio = self.get_portfolio(portfolio_id)
         performance = await self.get_portfolio_performance(portfolio_id)
         
         return {
@@ -864,7 +1040,7 @@ class HNIPortfolioManager:
             'cash_balance': portfolio.cash_balance,
             'holdings_count': len(portfolio.holdings),
             'performance': performance,
-            'needs_rebalancing': portfolio.needs_rebalancing,
+            'needs_rebalancing': self._valuations[portfolio_id].needs_rebalancing,
             'last_rebalanced': portfolio.last_rebalanced,
             'next_rebalance': portfolio.next_rebalance
         }
@@ -10,19 +10,20 @@ import json
 import uuid
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Union, Set
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Any, Union, Set
 from enum import Enum
 from dataclasses import dataclass, asdict, field
+from types import MappingProxyType
 import logging
 from pathlib import Path
 import time
-import threading
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict
 import redis
 
-from .advanced_order_management import OrderType, OrderStatus, Order
-from .hni_portfolio_management import Portfolio, AssetClass, RiskProfile
+from .advanced_order_management import OrderType, OrderSide, OrderStatus, AdvancedOrder
+from .covariance_store import CovarianceSnapshot, CovarianceStore, shared_covariance_store
+from .hni_portfolio_management import AssetClass, RiskProfile
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -141,24 +142,138 @@ class RiskMetrics:
     calculated_at: datetime = field(default_factory=datetime.now)
 
 
+@dataclass
+class ClientExposure:
+    """Running exposure aggregates for one client, adjusted by each position change"""
+    portfolio_value: float = 0.0
+    total_exposure: float = 0.0
+    sector_values: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    applied: Dict[str, Tuple[float, float, str]] = field(default_factory=dict)  # symbol -> (market_value, notional, sector)
+    
+    @property
+    def leverage_ratio(self) -> float:
+        return self.total_exposure / self.portfolio_value if self.portfolio_value > 0 else 0
+    
+    def apply(self, symbol: str, position: Optional[Position]):
+        """Swap the contribution last applied for ``symbol`` for the position's current one
+        
+        The recorded contribution is subtracted rather than the stored object, so a
+        position mutated in place and resubmitted still moves the aggregates.
+        """
+        previous = self.applied.pop(symbol, None)
+        if previous is not None:
+            market_value, notional, sector = previous
+            self.portfolio_value -= market_value
+            self.total_exposure -= notional
+            self.sector_values[sector] -= market_value
+        if position is not None:
+            market_value, notional = position.market_value, position.notional_value
+            self.portfolio_value += market_value
+            self.total_exposure += notional
+            self.sector_values[position.sector] += market_value
+            self.applied[symbol] = (market_value, notional, position.sector)
+    
+    def sector_exposure(self) -> Dict[str, float]:
+        if self.portfolio_value <= 0:
+            return dict(self.sector_values)
+        return {sector: value / self.portfolio_value for sector, value in self.sector_values.items()}
+
+
+@dataclass(frozen=True)
+class PreTradeSnapshot:
+    """Immutable limits and holdings for one client, replaced wholesale on every update"""
+    client_id: str
+    portfolio_value: float
+    holdings: Mapping[str, Tuple[int, float, float]]  # symbol -> (quantity, current_price, market_value)
+    hard_limits: Tuple[Tuple[RiskLimitType, float], ...]  # active hard limits checked pre-trade, in order added
+
+
+@dataclass
+class PortfolioVaR:
+    """Historical-simulation VaR of one book with its per-symbol decomposition"""
+    var: float
+    expected_shortfall: float
+    component_var: Dict[str, float]  # sums to var
+    marginal_var: Dict[str, float]  # d(VaR) / d(market value) per symbol
+    observations: int
+
+
 class VolatilityCalculator:
-    """Advanced volatility and risk calculations"""
+    """Advanced volatility and risk calculations
+    
+    Daily closes live in one preallocated NumPy buffer per symbol (twice the lookback,
+    shifted down when full) so the latest window is always a contiguous view. Intraday
+    ticks are kept as marks and only join the history as the day's close in ``close_day``,
+    so return matrices, cached per symbol universe, are rebuilt once a day rather than on
+    every tick. Covariances come from the covariance store, which ``close_day`` feeds
+    incrementally. A miss seeds one universe of every symbol with at least the requested
+    history, so later client books are served as its sub-blocks instead of each seeding
+    a universe of its own.
+    """
+    
+    MIN_HISTORY = 30  # Need at least 30 days of history for VaR
     
-    def __init__(self, lookback_days: int = 252):
+    def __init__(self, lookback_days: int = 252, universe_cache_size: int = 64,
+                 covariance_store: Optional[CovarianceStore] = None):
         self.lookback_days = lookback_days
-        self.price_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=lookback_days))
+        self.universe_cache_size = universe_cache_size
+        self.covariance_store = covariance_store or shared_covariance_store
+        self._prices: Dict[str, np.ndarray] = {}
+        self._ends: Dict[str, int] = {}
+        self._versions: Dict[str, int] = defaultdict(int)
+        self.last_update: Dict[str, datetime] = {}
+        self._marks: Dict[str, float] = {}
+        self._closed: Set[str] = set()  # symbols given a close since the last close_day
+        self._returns_cache: "OrderedDict[Tuple[str, ...], Tuple[Tuple[int, ...], np.ndarray]]" = OrderedDict()
     
     def update_price(self, symbol: str, price: float, timestamp: datetime):
-        """Update price history"""
-        self.price_history[symbol].append((price, timestamp))
+        """Append a daily close to the price history"""
+        buffer = self._prices.get(symbol)
+        if buffer is None:
+            buffer = self._prices[symbol] = np.empty(2 * self.lookback_days)
+            self._ends[symbol] = 0
+        end = self._ends[symbol]
+        if end == len(buffer):
+            keep = self.lookback_days - 1
+            buffer[:keep] = buffer[end - keep:end]
+            end = keep
+        buffer[end] = price
+        self._ends[symbol] = end + 1
+        self._versions[symbol] += 1
+        self._closed.add(symbol)
+        self.last_update[symbol] = timestamp
     
-    def calculate_volatility(self, symbol: str, days: int = 30) -> float:
-        """Calculate historical volatility"""
-        if symbol not in self.price_history or len(self.price_history[symbol]) < days:
+    def mark_price(self, symbol: str, price: float, timestamp: datetime):
+        """Record an intraday price; the last mark of the day becomes its close in ``close_day``"""
+        self._marks[symbol] = price
+        self.last_update[symbol] = timestamp
+    
+    def prices(self, symbol: str) -> np.ndarray:
+        """Latest ``lookback_days`` prices, oldest first (a view, do not modify)"""
+        buffer = self._prices.get(symbol)
+        if buffer is None:
+            return np.empty(0)
+        end = self._ends[symbol]
+        return buffer[max(0, end - self.lookback_days):end]
+    
+    def history_length(self, symbol: str) -> int:
+        return min(self._ends.get(symbol, 0), self.lookback_days)
+    
+    def calculate_volatility(self, symbol: str, days: Optional[int] = None, estimator: str = "ewma") -> float:
+        """Annualized historical volatility
+        
+        Without ``days`` the stored estimate is served (seeded from price history on a
+        miss); ``days`` recomputes the log-return volatility over that window instead.
+        """
+        if days is None:
+            snapshot = self.covariance((symbol,))
+            return float(snapshot.volatilities(estimator, 252)[0]) if snapshot is not None else 0.0
+        
+        prices = self.prices(symbol)
+        if len(prices) < days:
             return 0.0
         
-        prices = [p[0] for p in list(self.price_history[symbol])[-days:]]
-        returns = np.diff(np.log(prices))
+        returns = np.diff(np.log(prices[len(prices) - days:]))
         
         if len(returns) == 0:
             return 0.0
@@ -166,39 +281,175 @@ class VolatilityCalculator:
         daily_vol = np.std(returns)
         return daily_vol * np.sqrt(252)  # Annualized volatility
     
+    def returns_matrix(self, symbols: Tuple[str, ...]) -> np.ndarray:
+        """Simple daily returns, one column per symbol, over the most recent common window"""
+        versions = tuple(self._versions[s] for s in symbols)
+        cached = self._returns_cache.get(symbols)
+        if cached is not None and cached[0] == versions:
+            self._returns_cache.move_to_end(symbols)
+            return cached[1]
+        
+        window = min(self.history_length(s) for s in symbols)
+        if window < 2:
+            returns = np.empty((0, len(symbols)))
+        else:
+            prices = np.column_stack([self.prices(s)[-window:] for s in symbols])
+            returns = prices[1:] / prices[:-1] - 1.0
+        
+        self._returns_cache[symbols] = (versions, returns)
+        self._returns_cache.move_to_end(symbols)
+        while len(self._returns_cache) > self.universe_cache_size:
+            self._returns_cache.popitem(last=False)
+        return returns
+    
+    def covariance(self, symbols: Tuple[str, ...], as_of: Optional[date] = None) -> Optional[CovarianceSnapshot]:
+        """Stored daily-return covariance estimates for the symbols, seeded from price history on a miss"""
+        as_of = as_of or datetime.now().date()
+        snapshot = self.covariance_store.snapshot(symbols, as_of)
+        if snapshot is None:
+            universe = self._seed_universe(symbols)
+            returns = self.returns_matrix(universe)
+            if len(returns) < 2:
+                return None
+            snapshot = self.covariance_store.seed(pd.DataFrame(returns, columns=universe), as_of).subset(symbols)
+        return snapshot
+    
+    def _seed_universe(self, symbols: Iterable[str]) -> Tuple[str, ...]:
+        """The symbols plus every tracked symbol with at least as much history, sorted
+        
+        Members share the requested symbols' common window, so pooling them costs the
+        request no observations. Short histories (below MIN_HISTORY) are not pooled.
+        """
+        symbols = set(symbols)
+        window = min(self.history_length(s) for s in symbols)
+        if window < self.MIN_HISTORY:
+            return tuple(sorted(symbols))
+        return tuple(sorted(symbols | {s for s in self._prices if self.history_length(s) >= window}))
+    
+    def correlation(self, symbols: Iterable[str], estimator: str = "ledoit_wolf") -> Optional[np.ndarray]:
+        """Correlation matrix, in sorted symbol order, of the symbols with enough history"""
+        symbols = tuple(s for s in sorted(set(symbols)) if self.history_length(s) >= self.MIN_HISTORY)
+        snapshot = self.covariance(symbols) if len(symbols) > 1 else None
+        if snapshot is None:
+            return None
+        covariance = snapshot.estimate(estimator)
+        scale = np.sqrt(np.diag(covariance))
+        scale[scale == 0] = 1.0
+        return covariance / np.outer(scale, scale)
+    
+    def close_day(self, as_of: date) -> List[Tuple[str, ...]]:
+        """Close the day's prices and fold the returns into the stored universes"""
+        return self.covariance_store.append(as_of, self.close_prices())
+    
+    def close_prices(self) -> Dict[str, float]:
+        """Append the day's closes to the histories and return each symbol's daily return
+        
+        A symbol's last intraday mark becomes its close. Symbols with neither a mark nor
+        a close since the previous call did not trade: their last close is carried, so
+        they report a zero return rather than repeating the previous day's.
+        """
+        for symbol, price in self._marks.items():
+            self.update_price(symbol, price, self.last_update[symbol])
+        self._marks.clear()
+        for symbol in self._prices.keys() - self._closed:
+            self.update_price(symbol, self.prices(symbol)[-1], self.last_update[symbol])
+        self._closed.clear()
+        
+        returns = {}
+        for symbol in self._prices:
+            prices = self.prices(symbol)
+            if len(prices) >= 2:
+                returns[symbol] = prices[-1] / prices[-2] - 1.0
+        return returns
+    
+    def _exposures(self, positions: List[Position]) -> Dict[str, float]:
+        """Market value per symbol with price history; positions without history add no risk"""
+        exposures: Dict[str, float] = {}
+        for position in positions:
+            if self.history_length(position.symbol):
+                exposures[position.symbol] = exposures.get(position.symbol, 0.0) + position.market_value
+        return exposures
+    
     def calculate_var(self, positions: List[Position], confidence: float = 0.05, days: int = 1) -> float:
         """Calculate Value at Risk using historical simulation"""
-        if not positions:
-            return 0.0
+        result = self.calculate_portfolio_var(positions, confidence, days)
+        return result.var if result is not None else 0.0
+    
+    def calculate_portfolio_var(self, positions: List[Position], confidence: float = 0.05,
+                                days: int = 1) -> Optional[PortfolioVaR]:
+        """VaR, expected shortfall and component / marginal VaR from one scenario P&L vector"""
+        exposures = self._exposures(positions)
+        if not exposures:
+            return None
+        symbols = tuple(exposures)
+        returns = self.returns_matrix(symbols)
+        if len(returns) + 1 < self.MIN_HISTORY:
+            return None
         
-        portfolio_values = []
-        min_history = min([len(self.price_history[pos.symbol]) for pos in positions 
-                          if pos.symbol in self.price_history])
+        values = np.fromiter(exposures.values(), dtype=float, count=len(symbols))
+        pnl = returns @ values  # one P&L per historical scenario
         
-        if min_history < 30:  # Need at least 30 days of history
-            return 0.0
+        # np.percentile's linear interpolation between two order statistics, kept explicit
+        # so the same blend of scenarios attributes the VaR to each symbol
+        order = np.argsort(pnl, kind="stable")
+        rank = (len(pnl) - 1) * confidence
+        lower = int(np.floor(rank))
+        upper = min(lower + 1, len(pnl) - 1)
+        weight = rank - lower
+        tail_returns = (1 - weight) * returns[order[lower]] + weight * returns[order[upper]]
+        quantile = float(tail_returns @ values)
         
-        # Calculate portfolio returns for each historical day
-        for i in range(min_history - 1):
-            portfolio_return = 0.0
-            
-            for position in positions:
-                if position.symbol in self.price_history:
-                    prices = list(self.price_history[position.symbol])
-                    if i + 1 < len(prices):
-                        price_return = (prices[i+1][0] - prices[i][0]) / prices[i][0]
-                        portfolio_return += (position.market_value / sum(p.market_value for p in positions)) * price_return
-            
-            portfolio_values.append(portfolio_return)
+        scale = np.sqrt(days)
+        sign = -1.0 if quantile < 0 else 1.0  # VaR is reported as a positive loss
+        components = sign * values * tail_returns * scale
+        tail = pnl[pnl <= quantile]
+        expected_shortfall = -tail.mean() * scale if len(tail) else 0.0
         
-        if not portfolio_values:
-            return 0.0
+        return PortfolioVaR(
+            var=abs(quantile * scale),
+            expected_shortfall=float(expected_shortfall),
+            component_var=dict(zip(symbols, components.tolist())),
+            marginal_var=dict(zip(symbols, (sign * tail_returns * scale).tolist())),
+            observations=len(pnl)
+        )
+    
+    def calculate_var_batch(self, books: Dict[str, List[Position]], confidence: float = 0.05,
+                            days: int = 1) -> Dict[str, Dict[str, float]]:
+        """VaR and expected shortfall for many books with one returns-by-exposures product
         
-        # Calculate VaR at specified confidence level
-        var_percentile = np.percentile(portfolio_values, confidence * 100)
-        total_portfolio_value = sum(pos.market_value for pos in positions)
+        All books share the window of their combined symbol universe, so a book's figures
+        can differ from ``calculate_var`` when another book holds a symbol with shorter history.
+        """
+        book_exposures = {book_id: self._exposures(positions) for book_id, positions in books.items()}
+        symbols = tuple(dict.fromkeys(s for exposures in book_exposures.values() for s in exposures))
+        results = {book_id: {'var': 0.0, 'expected_shortfall': 0.0} for book_id in books}
+        if not symbols:
+            return results
+        returns = self.returns_matrix(symbols)
+        if len(returns) + 1 < self.MIN_HISTORY:
+            return results
         
-        return abs(var_percentile * total_portfolio_value * np.sqrt(days))
+        column = {symbol: j for j, symbol in enumerate(symbols)}
+        book_ids = list(book_exposures)
+        values = np.zeros((len(symbols), len(book_ids)))
+        for k, book_id in enumerate(book_ids):
+            for symbol, value in book_exposures[book_id].items():
+                values[column[symbol], k] = value
+        
+        pnl = returns @ values  # scenarios x books
+        quantiles = np.percentile(pnl, confidence * 100, axis=0)
+        in_tail = pnl <= quantiles
+        counts = in_tail.sum(axis=0)
+        tail_means = np.where(in_tail, pnl, 0.0).sum(axis=0) / np.maximum(counts, 1)
+        
+        scale = np.sqrt(days)
+        for k, book_id in enumerate(book_ids):
+            if book_exposures[book_id]:
+                results[book_id] = {
+                    'var': float(abs(quantiles[k] * scale)),
+                    'expected_shortfall': float(-tail_means[k] * scale)
+                }
+        return results
 
 
 class InstitutionalRiskManager:
@@ -217,15 +468,28 @@ class InstitutionalRiskManager:
         # Active alerts
         self.active_alerts: Dict[str, List[RiskAlert]] = defaultdict(list)
         
-        # Volatility calculator
+        # Volatility calculator; its covariance estimates advance at each daily close
         self.volatility_calculator = VolatilityCalculator()
+        self.trading_day: date = datetime.now().date()
+        self.day_close: Optional[asyncio.Task] = None  # covariance update of the last rolled-over day
         
         # Redis for real-time updates
         self.redis_client = redis.Redis(host='localhost', port=6379, db=1)
         
-        # Risk monitoring thread
+        # Incremental exposure per client and the clients holding each symbol
+        self.exposures: Dict[str, ClientExposure] = defaultdict(ClientExposure)
+        self.symbol_clients: Dict[str, Set[str]] = defaultdict(set)
+        
+        # Event-driven monitoring: only clients touched since the last pass are re-evaluated
+        self.dirty_clients: Set[str] = set()
+        self.monitoring_interval = 1.0  # seconds; bursts of updates coalesce into one pass
         self.monitoring_active = False
-        self.monitoring_thread = None
+        self.monitoring_task: Optional[asyncio.Task] = None
+        self._dirty_event: Optional[asyncio.Event] = None
+        self.monitoring_stats = {"passes": 0, "clients_evaluated": 0, "last_pass_ms": 0.0}
+        
+        # Pre-trade fast path: one immutable snapshot per client, swapped on each update
+        self.pre_trade_snapshots: Dict[str, PreTradeSnapshot] = {}
         
         # Compliance rules
         self.compliance_rules = self._load_compliance_rules()
@@ -256,6 +520,7 @@ class InstitutionalRiskManager:
         """Add risk limit for client"""
         try:
             self.risk_limits[risk_limit.client_id].append(risk_limit)
+            self.refresh_pre_trade_snapshot(risk_limit.client_id)
             
             # Store in Redis for persistence
             await self._store_risk_limit(risk_limit)
@@ -270,10 +535,15 @@ class InstitutionalRiskManager:
     async def update_position(self, position: Position) -> bool:
         """Update client position"""
         try:
+            self._roll_trading_day(position.last_updated.date())
             self.positions[position.client_id][position.symbol] = position
+            self.exposures[position.client_id].apply(position.symbol, position)
+            self.symbol_clients[position.symbol].add(position.client_id)
+            self._mark_dirty(position.client_id)
+            self.refresh_pre_trade_snapshot(position.client_id)
             
-            # Update price history for volatility calculations
-            self.volatility_calculator.update_price(
+            # Mark the price; the day's last mark joins the volatility history at the close
+            self.volatility_calculator.mark_price(
                 position.symbol, 
                 position.current_price,
                 position.last_updated
@@ -292,44 +562,181 @@ class InstitutionalRiskManager:
             logger.error(f"Failed to update position: {e}")
             return False
     
-    async def validate_order_pre_trade(self, order: Order) -> Tuple[bool, Optional[str]]:
+    async def update_market_price(self, symbol: str, price: float, timestamp: Optional[datetime] = None) -> int:
+        """Reprice every client position in ``symbol`` and mark those clients for re-evaluation
+        
+        Returns the number of clients affected.
+        """
+        timestamp = timestamp or datetime.now()
+        self._roll_trading_day(timestamp.date())
+        self.volatility_calculator.mark_price(symbol, price, timestamp)
+        
+        clients = self.symbol_clients.get(symbol, ())
+        for client_id in clients:
+            position = self.positions[client_id][symbol]
+            position.current_price = price
+            position.market_value = position.quantity * price
+            position.unrealized_pnl = (price - position.avg_price) * position.quantity
+            position.last_updated = timestamp
+            self.exposures[client_id].apply(symbol, position)
+            self._mark_dirty(client_id)
+            self.refresh_pre_trade_snapshot(client_id)
+        
+        return len(clients)
+    
+    async def remove_position(self, client_id: str, symbol: str) -> bool:
+        """Drop a closed position"""
+        position = self.positions.get(client_id, {}).pop(symbol, None)
+        if position is None:
+            return False
+        self.exposures[client_id].apply(symbol, None)
+        self.symbol_clients[symbol].discard(client_id)
+        self._mark_dirty(client_id)
+        self.refresh_pre_trade_snapshot(client_id)
+        return True
+    
+    def close_trading_day(self, as_of: Optional[date] = None) -> List[Tuple[str, ...]]:
+        """Daily close: fold the day's returns into the shared covariance estimates"""
+        as_of = as_of or self.trading_day
+        return self._fold_day(as_of, self.volatility_calculator.close_prices())
+    
+    def _fold_day(self, as_of: date, returns: Dict[str, float]) -> List[Tuple[str, ...]]:
+        updated = self.volatility_calculator.covariance_store.append(as_of, returns)
+        logger.info(f"Closed trading day {as_of}: {len(updated)} covariance universes updated")
+        return updated
+    
+    def _roll_trading_day(self, today: date):
+        """Close the previous trading day before the first update of a new one
+        
+        The closes join the price history here, before any of the new day's marks. The
+        covariance update runs in the background (``day_close``) on a worker thread, so
+        the tick crossing the day boundary is not held up by it.
+        """
+        if today > self.trading_day:
+            as_of, self.trading_day = self.trading_day, today
+            returns = self.volatility_calculator.close_prices()
+            self.day_close = asyncio.get_running_loop().create_task(
+                self._fold_day_in_background(as_of, returns, self.day_close)
+            )
+    
+    async def _fold_day_in_background(self, as_of: date, returns: Dict[str, float],
+                                      previous: Optional[asyncio.Task]) -> List[Tuple[str, ...]]:
+        """Covariance update for one closed day, after the previous day's"""
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self._fold_day, as_of, returns)
+        except Exception as e:
+            logger.error(f"Failed to close trading day {as_of}: {e}")
+            return []
+    
+    def _mark_dirty(self, client_id: str):
+        self.dirty_clients.add(client_id)
+        if self._dirty_event is not None:
+            self._dirty_event.set()
+    
+    PRE_TRADE_LIMIT_TYPES = (RiskLimitType.POSITION_LIMIT, RiskLimitType.PORTFOLIO_LIMIT,
+                             RiskLimitType.CONCENTRATION_LIMIT)
+    
+    def refresh_pre_trade_snapshot(self, client_id: str):
+        """Rebuild a client's pre-trade snapshot; call after editing a RiskLimit in place"""
+        holdings = {}
+        portfolio_value = 0.0
+        for symbol, position in self.positions.get(client_id, {}).items():
+            holdings[symbol] = (position.quantity, position.current_price, position.market_value)
+            portfolio_value += position.market_value
+        hard_limits = tuple(
+            (limit.limit_type, limit.limit_value) for limit in self.risk_limits.get(client_id, ())
+            if limit.is_active and limit.is_hard_limit and limit.limit_type in self.PRE_TRADE_LIMIT_TYPES
+        )
+        # A single reference swap: concurrent readers see the old or the new snapshot, never a mix
+        self.pre_trade_snapshots[client_id] = PreTradeSnapshot(
+            client_id, portfolio_value, MappingProxyType(holdings), hard_limits
+        )
+    
+    @staticmethod
+    def _signed_quantity(order: AdvancedOrder) -> int:
+        side = order.side
+        if side is OrderSide.BUY or side == "BUY" or side == "buy":
+            return order.quantity
+        return -order.quantity
+    
+    @staticmethod
+    def _evaluate_pre_trade(hard_limits: Tuple[Tuple[RiskLimitType, float], ...],
+                            held: Optional[Tuple[int, float, float]], portfolio_value: float,
+                            signed_quantity: int, price: Optional[float]):
+        """Apply one order to a holding and test the hard limits
+        
+        Returns (breached limit type or None, resulting holding, resulting portfolio value).
+        """
+        if held is None:
+            current_price = price or 0
+            quantity = signed_quantity
+            old_value = 0.0
+        else:
+            quantity, current_price, old_value = held
+            current_price = price or current_price
+            quantity += signed_quantity
+        new_value = quantity * current_price
+        total = portfolio_value + new_value - old_value
+        
+        for limit_type, limit_value in hard_limits:
+            if limit_type is RiskLimitType.POSITION_LIMIT:
+                breached = abs(new_value) > limit_value
+            elif limit_type is RiskLimitType.PORTFOLIO_LIMIT:
+                breached = total > limit_value
+            else:  # CONCENTRATION_LIMIT
+                breached = total > 0 and abs(new_value) / total > limit_value
+            if breached:
+                return limit_type, None, portfolio_value
+        return None, (quantity, current_price, new_value), total
+    
+    def check_order_fast(self, order: AdvancedOrder) -> Optional[RiskLimitType]:
+        """Synchronous hard-limit check against the client's snapshot
+        
+        Returns the limit type the order would breach, or None if it passes.
+        """
+        snapshot = self.pre_trade_snapshots.get(order.client_id)
+        if snapshot is None or not snapshot.hard_limits:
+            return None
+        return self._evaluate_pre_trade(
+            snapshot.hard_limits, snapshot.holdings.get(order.symbol), snapshot.portfolio_value,
+            self._signed_quantity(order), order.price
+        )[0]
+    
+    def check_basket_fast(self, orders: List[AdvancedOrder]) -> List[Optional[RiskLimitType]]:
+        """Check basket legs in order; each accepted leg counts against the legs after it"""
+        results: List[Optional[RiskLimitType]] = []
+        working: Dict[str, Tuple[Dict[str, Tuple[int, float, float]], float]] = {}
+        for order in orders:
+            snapshot = self.pre_trade_snapshots.get(order.client_id)
+            if snapshot is None or not snapshot.hard_limits:
+                results.append(None)
+                continue
+            overlay, portfolio_value = working.get(order.client_id, ({}, snapshot.portfolio_value))
+            held = overlay.get(order.symbol) or snapshot.holdings.get(order.symbol)
+            breached, holding, total = self._evaluate_pre_trade(
+                snapshot.hard_limits, held, portfolio_value, self._signed_quantity(order), order.price
+            )
+            if breached is None:
+                overlay[order.symbol] = holding
+                working[order.client_id] = (overlay, total)
+            results.append(breached)
+        return results
+    
+    async def validate_order_pre_trade(self, order: AdvancedOrder) -> Tuple[bool, Optional[str]]:
         """Validate order against risk limits before execution"""
         try:
-            client_id = order.client_id
-            
-            # Get current positions
-            positions = self.positions.get(client_id, {})
-            
-            # Calculate new position after order
-            new_position = await self._calculate_new_position(order, positions)
-            
-            # Check all risk limits
-            for risk_limit in self.risk_limits.get(client_id, []):
-                if not risk_limit.is_active:
-                    continue
-                
-                violation = await self._check_limit_violation(new_position, risk_limit, positions)
-                
-                if violation and risk_limit.is_hard_limit:
-                    error_msg = f"Order rejected: {risk_limit.limit_type.value} limit would be breached"
-                    
-                    # Generate alert
-                    await self._generate_alert(
-                        client_id,
-                        AlertType.LIMIT_BREACHED,
-                        RiskLevel.CRITICAL,
-                        error_msg,
-                        {"order_id": order.order_id, "limit_type": risk_limit.limit_type.value}
-                    )
-                    
-                    return False, error_msg
+            breached = self.check_order_fast(order)
+            if breached is not None:
+                return await self._reject_order(order, breached)
             
             # Check compliance rules
-            compliance_check = await self._check_compliance_rules(order, positions)
+            compliance_check = await self._check_compliance_rules(order, self.positions.get(order.client_id, {}))
             if not compliance_check[0]:
                 return compliance_check
             
-            logger.info(f"Order {order.order_id} passed pre-trade risk validation")
+            logger.debug(f"Order {order.order_id} passed pre-trade risk validation")
             return True, None
             
         except Exception as e:
@@ -337,6 +744,33 @@ class InstitutionalRiskManager:
             logger.error(error_msg)
             return False, error_msg
     
+    async def validate_basket_pre_trade(self, orders: List[AdvancedOrder]) -> List[Tuple[bool, Optional[str]]]:
+        """Validate basket legs together; see check_basket_fast"""
+        try:
+            results = []
+            for order, breached in zip(orders, self.check_basket_fast(orders)):
+                if breached is not None:
+                    results.append(await self._reject_order(order, breached))
+                else:
+                    results.append(await self._check_compliance_rules(order, self.positions.get(order.client_id, {})))
+            return results
+        
+        except Exception as e:
+            error_msg = f"Risk validation error: {e}"
+            logger.error(error_msg)
+            return [(False, error_msg)] * len(orders)
+    
+    async def _reject_order(self, order: AdvancedOrder, limit_type: RiskLimitType) -> Tuple[bool, str]:
+        error_msg = f"Order rejected: {limit_type.value} limit would be breached"
+        await self._generate_alert(
+            order.client_id,
+            AlertType.LIMIT_BREACHED,
+            RiskLevel.CRITICAL,
+            error_msg,
+            {"order_id": order.order_id, "limit_type": limit_type.value}
+        )
+        return False, error_msg
+    
     async def calculate_risk_metrics(self, client_id: str) -> Optional[RiskMetrics]:
         """Calculate comprehensive risk metrics for client"""
         try:
@@ -345,28 +779,18 @@ class InstitutionalRiskManager:
             if not positions:
                 return None
             
-            # Portfolio value
-            portfolio_value = sum(pos.market_value for pos in positions)
-            total_exposure = sum(pos.notional_value for pos in positions)
-            
-            # Leverage ratio
-            leverage_ratio = total_exposure / portfolio_value if portfolio_value > 0 else 0
+            # Portfolio value, exposure and leverage from the running aggregates
+            exposure = self.exposures[client_id]
+            portfolio_value = exposure.portfolio_value
+            total_exposure = exposure.total_exposure
+            leverage_ratio = exposure.leverage_ratio
             
             # VaR calculations
             var_1day = self.volatility_calculator.calculate_var(positions, confidence=0.05, days=1)
             var_5day = self.volatility_calculator.calculate_var(positions, confidence=0.05, days=5)
             
-            # Sector exposure
-            sector_exposure = {}
-            for pos in positions:
-                sector = pos.sector
-                if sector not in sector_exposure:
-                    sector_exposure[sector] = 0
-                sector_exposure[sector] += pos.market_value
-            
-            # Normalize sector exposure to percentages
-            if portfolio_value > 0:
-                sector_exposure = {k: (v / portfolio_value) for k, v in sector_exposure.items()}
+            # Sector exposure as fractions of portfolio value
+            sector_exposure = exposure.sector_exposure()
             
             # Concentration risk (largest position as % of portfolio)
             concentration_risk = 0
@@ -374,6 +798,9 @@ class InstitutionalRiskManager:
                 largest_position = max(pos.market_value for pos in positions) if positions else 0
                 concentration_risk = largest_position / portfolio_value
             
+            # Correlations from the shared covariance store
+            correlation_matrix = self.volatility_calculator.correlation(pos.symbol for pos in positions)
+            
             # Beta calculation (simplified - would need market data)
             beta = 1.0  # Default beta
             
@@ -404,7 +831,8 @@ class InstitutionalRiskManager:
                 sharpe_ratio=sharpe_ratio,
                 max_drawdown=max_drawdown,
                 concentration_risk=concentration_risk,
-                sector_exposure=sector_exposure
+                sector_exposure=sector_exposure,
+                correlation_matrix=correlation_matrix
             )
             
             # Cache metrics
@@ -451,35 +879,61 @@ class InstitutionalRiskManager:
             return False
     
     async def start_monitoring(self):
-        """Start real-time risk monitoring"""
+        """Start real-time risk monitoring as a task on the running event loop"""
         if self.monitoring_active:
             return
         
         self.monitoring_active = True
-        self.monitoring_thread = threading.Thread(target=self._monitoring_loop)
-        self.monitoring_thread.daemon = True
-        self.monitoring_thread.start()
+        self._dirty_event = asyncio.Event()
+        if self.dirty_clients or self.positions:
+            self.dirty_clients.update(self.positions.keys())
+            self._dirty_event.set()
+        self.monitoring_task = asyncio.get_running_loop().create_task(self._monitoring_loop())
         
         logger.info("Risk monitoring started")
     
     async def stop_monitoring(self):
         """Stop risk monitoring"""
         self.monitoring_active = False
-        if self.monitoring_thread:
-            self.monitoring_thread.join(timeout=5)
+        if self.monitoring_task is not None:
+            self.monitoring_task.cancel()
+            try:
+                await self.monitoring_task
+            except asyncio.CancelledError:
+                pass
+            self.monitoring_task = None
+        self._dirty_event = None
         
         logger.info("Risk monitoring stopped")
     
-    def _monitoring_loop(self):
-        """Real-time monitoring loop"""
+    async def _monitoring_loop(self):
+        """Evaluate limits for clients whose positions or prices changed"""
         while self.monitoring_active:
             try:
-                asyncio.run(self._monitor_all_clients())
-                time.sleep(1)  # Monitor every second
-                
+                await self._dirty_event.wait()
+                self._dirty_event.clear()
+                await self._monitor_dirty_clients()
+                await asyncio.sleep(self.monitoring_interval)
+            
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Monitoring loop error: {e}")
-                time.sleep(5)  # Wait longer on error
+                await asyncio.sleep(5)  # Wait longer on error
+    
+    async def _monitor_dirty_clients(self):
+        """Monitor clients marked dirty since the last pass"""
+        started = time.perf_counter()
+        dirty, self.dirty_clients = self.dirty_clients, set()
+        
+        for count, client_id in enumerate(dirty, 1):
+            await self._monitor_client_risk(client_id)
+            if count % 500 == 0:
+                await asyncio.sleep(0)  # Let ticks and orders in between large passes
+        
+        self.monitoring_stats["passes"] += 1
+        self.monitoring_stats["clients_evaluated"] += len(dirty)
+        self.monitoring_stats["last_pass_ms"] = (time.perf_counter() - started) * 1000
     
     async def _monitor_all_clients(self):
         """Monitor all clients for risk violations"""
@@ -489,18 +943,13 @@ class InstitutionalRiskManager:
     async def _monitor_client_risk(self, client_id: str):
         """Monitor individual client risk"""
         try:
-            # Calculate current risk metrics
-            risk_metrics = await self.calculate_risk_metrics(client_id)
-            
-            if not risk_metrics:
+            limits = [limit for limit in self.risk_limits.get(client_id, []) if limit.is_active]
+            if not limits or not self.positions.get(client_id):
                 return
             
             # Check all risk limits
-            for risk_limit in self.risk_limits.get(client_id, []):
-                if not risk_limit.is_active:
-                    continue
-                
-                current_value = await self._get_current_limit_value(risk_limit, risk_metrics)
+            for risk_limit in limits:
+                current_value = await self._get_client_limit_value(client_id, risk_limit)
                 utilization = current_value / risk_limit.limit_value if risk_limit.limit_value > 0 else 0
                 
                 # Generate alerts based on thresholds
@@ -532,88 +981,25 @@ class InstitutionalRiskManager:
         except Exception as e:
             logger.error(f"Client risk monitoring error for {client_id}: {e}")
     
-    async def _calculate_new_position(self, order: Order, current_positions: Dict[str, Position]) -> Position:
-        """Calculate position after order execution"""
-        symbol = order.symbol
-        
-        if symbol in current_positions:
-            current_pos = current_positions[symbol]
-            
-            if order.side == "BUY":
-                new_quantity = current_pos.quantity + order.quantity
-            else:  # SELL
-                new_quantity = current_pos.quantity - order.quantity
-            
-            # Calculate new average price
-            if new_quantity != 0:
-                if order.side == "BUY":
-                    total_cost = (current_pos.quantity * current_pos.avg_price + 
-                                order.quantity * order.price)
-                    new_avg_price = total_cost / (current_pos.quantity + order.quantity)
-                else:
-                    new_avg_price = current_pos.avg_price
-            else:
-                new_avg_price = 0
-            
-            new_position = Position(
-                client_id=order.client_id,
-                symbol=symbol,
-                quantity=new_quantity,
-                avg_price=new_avg_price,
-                current_price=order.price or current_pos.current_price,
-                market_value=new_quantity * (order.price or current_pos.current_price),
-                unrealized_pnl=0,  # Will be calculated
-                realized_pnl=current_pos.realized_pnl,
-                sector=current_pos.sector,
-                asset_class=current_pos.asset_class
-            )
-        else:
-            # New position
-            new_position = Position(
-                client_id=order.client_id,
-                symbol=symbol,
-                quantity=order.quantity if order.side == "BUY" else -order.quantity,
-                avg_price=order.price or 0,
-                current_price=order.price or 0,
-                market_value=(order.quantity * (order.price or 0)) if order.side == "BUY" else -(order.quantity * (order.price or 0)),
-                unrealized_pnl=0,
-                realized_pnl=0,
-                sector="Unknown",  # Would be looked up from reference data
-                asset_class=AssetClass.EQUITY
-            )
-        
-        return new_position
-    
-    async def _check_limit_violation(self, new_position: Position, risk_limit: RiskLimit, 
-                                   current_positions: Dict[str, Position]) -> bool:
-        """Check if new position would violate risk limit"""
-        
-        if risk_limit.limit_type == RiskLimitType.POSITION_LIMIT:
-            return abs(new_position.market_value) > risk_limit.limit_value
-        
-        elif risk_limit.limit_type == RiskLimitType.PORTFOLIO_LIMIT:
-            total_value = sum(pos.market_value for pos in current_positions.values())
-            total_value += new_position.market_value - current_positions.get(new_position.symbol, Position(
-                client_id="", symbol="", quantity=0, avg_price=0, current_price=0,
-                market_value=0, unrealized_pnl=0, realized_pnl=0, sector="", asset_class=AssetClass.EQUITY
-            )).market_value
-            return total_value > risk_limit.limit_value
-        
+    async def _get_client_limit_value(self, client_id: str, risk_limit: RiskLimit) -> float:
+        """Current value for a limit from the client's running aggregates"""
+        exposure = self.exposures[client_id]
+        if risk_limit.limit_type == RiskLimitType.PORTFOLIO_LIMIT:
+            return exposure.portfolio_value
+        elif risk_limit.limit_type == RiskLimitType.LEVERAGE_LIMIT:
+            return exposure.leverage_ratio
         elif risk_limit.limit_type == RiskLimitType.CONCENTRATION_LIMIT:
-            total_portfolio = sum(pos.market_value for pos in current_positions.values())
-            total_portfolio += new_position.market_value - current_positions.get(new_position.symbol, Position(
-                client_id="", symbol="", quantity=0, avg_price=0, current_price=0,
-                market_value=0, unrealized_pnl=0, realized_pnl=0, sector="", asset_class=AssetClass.EQUITY
-            )).market_value
-            
-            if total_portfolio > 0:
-                concentration = abs(new_position.market_value) / total_portfolio
-                return concentration > risk_limit.limit_value
-        
-        # Add more limit type checks as needed
-        return False
+            if exposure.portfolio_value <= 0:
+                return 0.0
+            return max(pos.market_value for pos in self.positions[client_id].values()) / exposure.portfolio_value
+        elif risk_limit.limit_type == RiskLimitType.VAR_LIMIT:
+            # Only clients with a VaR limit pay for the historical simulation
+            positions = list(self.positions[client_id].values())
+            return self.volatility_calculator.calculate_var(positions, confidence=0.05, days=1)
+        else:
+            return 0.0
     
-    async def _check_compliance_rules(self, order: Order, positions: Dict[str, Position]) -> Tuple[bool, Optional[str]]:
+    async def _check_compliance_rules(self, order: AdvancedOrder, positions: Dict[str, Position]) -> Tuple[bool, Optional[str]]:
         """Check regulatory compliance rules"""
         try:
             # Example: Check margin requirements
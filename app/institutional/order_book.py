@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+TradeMate Limit Order Book Simulator
+===================================
+Price-level order book with FIFO queues per level, price-time priority
+matching, iceberg refresh and replay from recorded L2 snapshots
+"""
+
+import heapq
+import itertools
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+BUY = "buy"
+SELL = "sell"
+
+
+class BookOrder:
+    """Resting order; external liquidity from L2 snapshots has ``external`` set"""
+
+    __slots__ = ("order_id", "side", "price", "remaining", "visible", "peak", "sequence", "external")
+
+    def __init__(self, order_id: str, side: str, price: int, quantity: int, peak: Optional[int],
+                 sequence: int, external: bool = False):
+        self.order_id = order_id
+        self.side = side
+        self.price = price  # ticks
+        self.remaining = quantity
+        self.peak = peak  # iceberg display size, None for fully visible orders
+        self.visible = min(peak, quantity) if peak else quantity
+        self.sequence = sequence
+        self.external = external
+
+
+class PriceLevel:
+    """FIFO queue of resting orders at one price"""
+
+    __slots__ = ("price", "orders", "quantity", "external")
+
+    def __init__(self, price: int):
+        self.price = price
+        self.orders: "OrderedDict[str, BookOrder]" = OrderedDict()
+        self.quantity = 0  # visible quantity
+        self.external = 0  # visible quantity from L2 snapshots
+
+
+@dataclass
+class BookFill:
+    """One match between an incoming (taker) and a resting (maker) order"""
+    taker_order_id: str
+    maker_order_id: str
+    side: str  # taker side
+    price: float
+    quantity: int
+
+
+class LimitOrderBook:
+    """Price-level limit order book for one symbol
+
+    Levels are kept in a dict keyed by integer tick price, with a heap per side for
+    ordering. Inserting a new level or cancelling is O(log n); best bid/ask is O(1)
+    once emptied levels have been dropped from the heap top.
+    """
+
+    def __init__(self, symbol: str, tick_size: float = 0.05):
+        self.symbol = symbol
+        self.tick_size = tick_size
+
+        self.levels: Dict[str, Dict[int, PriceLevel]] = {BUY: {}, SELL: {}}
+        self._heaps: Dict[str, List[int]] = {BUY: [], SELL: []}  # bids stored negated
+        self._in_heap: Dict[str, set] = {BUY: set(), SELL: set()}
+        self.orders: Dict[str, BookOrder] = {}
+        self._sequence = itertools.count()
+        self._external_ids = itertools.count()
+        self.last_snapshot_at: Any = None
+
+    # ---- Prices ----
+
+    def to_ticks(self, price: float) -> int:
+        return int(round(price / self.tick_size))
+
+    def to_price(self, ticks: int) -> float:
+        return round(ticks * self.tick_size, 10)
+
+    def _best_ticks(self, side: str) -> Optional[int]:
+        heap, levels = self._heaps[side], self.levels[side]
+        while heap:
+            ticks = -heap[0] if side == BUY else heap[0]
+            if ticks in levels:
+                return ticks
+            heapq.heappop(heap)
+            self._in_heap[side].discard(ticks)
+        return None
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        ticks = self._best_ticks(BUY)
+        return None if ticks is None else self.to_price(ticks)
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        ticks = self._best_ticks(SELL)
+        return None if ticks is None else self.to_price(ticks)
+
+    @property
+    def spread(self) -> Optional[float]:
+        bid, ask = self._best_ticks(BUY), self._best_ticks(SELL)
+        return None if bid is None or ask is None else self.to_price(ask - bid)
+
+    @property
+    def mid_price(self) -> Optional[float]:
+        bid, ask = self._best_ticks(BUY), self._best_ticks(SELL)
+        return None if bid is None or ask is None else self.to_price(bid + ask) / 2
+
+    def depth(self, levels: int = 5) -> Dict[str, List[Tuple[float, int]]]:
+        """Top ``levels`` visible (price, quantity) pairs per side"""
+        return {
+            'bids': [(self.to_price(t), self.levels[BUY][t].quantity)
+                     for t in heapq.nlargest(levels, self.levels[BUY])],
+            'asks': [(self.to_price(t), self.levels[SELL][t].quantity)
+                     for t in heapq.nsmallest(levels, self.levels[SELL])]
+        }
+
+    def queue_position(self, order_id: str) -> Optional[int]:
+        """Visible quantity queued ahead of a resting order at its price"""
+        order = self.orders.get(order_id)
+        if order is None:
+            return None
+        ahead = 0
+        for other in self.levels[order.side][order.price].orders.values():
+            if other is order:
+                return ahead
+            ahead += other.visible
+        return ahead
+
+    # ---- Order entry ----
+
+    def add_limit(self, order_id: str, side: str, price: float, quantity: int,
+                  display_quantity: Optional[int] = None) -> List[BookFill]:
+        """Match a limit order against the opposite side and rest any remainder"""
+        if order_id in self.orders:
+            raise ValueError(f"Order {order_id} is already resting in the {self.symbol} book")
+        order = BookOrder(order_id, side, self.to_ticks(price), quantity, display_quantity, next(self._sequence))
+        fills = self._match(order, order.price)
+        if order.remaining > 0:
+            self._rest(order)
+        return fills
+
+    def add_market(self, order_id: str, side: str, quantity: int) -> List[BookFill]:
+        """Sweep the opposite side; any unfilled remainder is discarded"""
+        order = BookOrder(order_id, side, 0, quantity, None, next(self._sequence))
+        return self._match(order, None)
+
+    def cancel(self, order_id: str) -> bool:
+        """Remove a resting order"""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return False
+        level = self.levels[order.side][order.price]
+        del level.orders[order_id]
+        self._shrink(level, order, order.visible)
+        return True
+
+    def _rest(self, order: BookOrder):
+        levels = self.levels[order.side]
+        level = levels.get(order.price)
+        if level is None:
+            level = levels[order.price] = PriceLevel(order.price)
+            if order.price not in self._in_heap[order.side]:
+                self._in_heap[order.side].add(order.price)
+                heapq.heappush(self._heaps[order.side], -order.price if order.side == BUY else order.price)
+        # Partly matched on entry: show what is left
+        order.visible = min(order.peak, order.remaining) if order.peak else order.remaining
+        level.orders[order.order_id] = order
+        level.quantity += order.visible
+        if order.external:
+            level.external += order.visible
+        self.orders[order.order_id] = order
+
+    def _shrink(self, level: PriceLevel, order: BookOrder, quantity: int):
+        level.quantity -= quantity
+        if order.external:
+            level.external -= quantity
+        if not level.orders:
+            del self.levels[order.side][level.price]
+
+    def _match(self, taker: BookOrder, limit: Optional[int]) -> List[BookFill]:
+        """Price-time priority matching of ``taker`` against resting orders"""
+        fills = []
+        maker_side = SELL if taker.side == BUY else BUY
+        levels = self.levels[maker_side]
+
+        while taker.remaining > 0:
+            best = self._best_ticks(maker_side)
+            if best is None or (limit is not None and (best > limit if taker.side == BUY else best < limit)):
+                break
+            level = levels[best]
+            price = self.to_price(best)
+
+            while taker.remaining > 0 and level.orders:
+                maker = next(iter(level.orders.values()))
+                quantity = min(taker.remaining, maker.visible)
+                fills.append(BookFill(taker.order_id, maker.order_id, taker.side, price, quantity))
+                taker.remaining -= quantity
+                maker.remaining -= quantity
+                maker.visible -= quantity
+                level.quantity -= quantity
+                if maker.external:
+                    level.external -= quantity
+
+                if maker.remaining == 0:
+                    level.orders.popitem(last=False)
+                    del self.orders[maker.order_id]
+                elif maker.visible == 0:
+                    # Iceberg refresh: a new tranche joins the back of the queue
+                    maker.visible = min(maker.peak, maker.remaining)
+                    maker.sequence = next(self._sequence)
+                    level.quantity += maker.visible
+                    level.orders.move_to_end(maker.order_id)
+
+            if not level.orders:
+                del levels[best]
+
+        return fills
+
+    # ---- L2 replay ----
+
+    def apply_snapshot(self, snapshot: Dict[str, Any]) -> List[BookFill]:
+        """Move external liquidity to a recorded L2 snapshot
+
+        ``snapshot`` holds ``bids`` / ``asks`` as (price, quantity) pairs. Shrinking
+        levels lose external quantity from the front of the queue first (it traded or
+        was cancelled ahead of ours); growing levels join the back. Liquidity that
+        arrives through one of our resting orders trades with it at our price.
+        """
+        targets = {
+            BUY: self._aggregate(snapshot.get('bids', ())),
+            SELL: self._aggregate(snapshot.get('asks', ()))
+        }
+
+        # Remove first so the remaining external book is never crossed
+        for side, target in targets.items():
+            for ticks in [t for t, level in self.levels[side].items() if level.external > target.get(t, 0)]:
+                level = self.levels[side][ticks]
+                self._remove_external(level, level.external - target.get(ticks, 0))
+
+        fills = []
+        for side, target in targets.items():
+            for ticks, quantity in target.items():
+                level = self.levels[side].get(ticks)
+                missing = quantity - (level.external if level is not None else 0)
+                if missing > 0:
+                    order = BookOrder(f"L2:{next(self._external_ids)}", side, ticks, missing, None,
+                                      next(self._sequence), external=True)
+                    fills.extend(self._match(order, ticks))
+                    if order.remaining > 0:
+                        self._rest(order)
+
+        self.last_snapshot_at = snapshot.get('timestamp')
+        return fills
+
+    def replay(self, snapshots: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Any, List[BookFill]]]:
+        """Apply snapshots in order, yielding (timestamp, fills) for each"""
+        for snapshot in snapshots:
+            yield snapshot.get('timestamp'), self.apply_snapshot(snapshot)
+
+    def _aggregate(self, levels: Iterable[Tuple[float, int]]) -> Dict[int, int]:
+        target: Dict[int, int] = {}
+        for price, quantity in levels:
+            ticks = self.to_ticks(price)
+            target[ticks] = target.get(ticks, 0) + int(quantity)
+        return target
+
+    def _remove_external(self, level: PriceLevel, quantity: int):
+        side = next(iter(level.orders.values())).side
+        for order in [o for o in level.orders.values() if o.external]:
+            if quantity <= 0:
+                break
+            taken = min(quantity, order.visible)
+            order.remaining -= taken
+            order.visible -= taken
+            level.quantity -= taken
+            level.external -= taken
+            quantity -= taken
+            if order.remaining == 0:
+                del level.orders[order.order_id]
+                del self.orders[order.order_id]
+        if not level.orders:
+            del self.levels[side][level.price]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Book size and top of book"""
+        return {
+            "symbol": self.symbol,
+            "resting_orders": len(self.orders),
+            "bid_levels": len(self.levels[BUY]),
+            "ask_levels": len(self.levels[SELL]),
+            "best_bid": self.best_bid,
+            "best_ask": self.best_ask,
+            "spread": self.spread
+        }
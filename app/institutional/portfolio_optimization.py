@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+TradeMate Portfolio Optimization Service
+=======================================
+Constrained mean-variance, maximum Sharpe, risk parity, maximum
+diversification and Black-Litterman allocation with analytic gradients,
+warm starts from each portfolio's previous solution and covariance
+factorizations cached per universe and date, optionally built from the
+shared covariance store
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from datetime import date
+from typing import Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import cho_factor, cho_solve
+from scipy.optimize import minimize
+
+from .covariance_store import CovarianceSnapshot, CovarianceStore
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+
+
+@dataclass(frozen=True)
+class OptimizationConstraints:
+    """Inputs for one portfolio; hashable so a batch solves each distinct set once
+
+    Per-symbol inputs are (symbol, value) pairs. Risk budgets default to equal,
+    Black-Litterman market weights to equal and views are absolute annual returns.
+    """
+    min_weight: float = 0.0
+    max_weight: float = 1.0
+    risk_aversion: float = 3.0
+    risk_free_rate: float = 0.0
+    target_return: Optional[float] = None   # minimum annual expected return
+    max_volatility: Optional[float] = None  # maximum annual volatility
+    risk_budgets: Tuple[Tuple[str, float], ...] = ()
+    market_weights: Tuple[Tuple[str, float], ...] = ()
+    views: Tuple[Tuple[str, float], ...] = ()
+    view_confidence: float = 1.0  # scales view precision against the prior
+    tau: float = 0.05
+
+    @classmethod
+    def from_dict(cls, constraints: Mapping, **defaults) -> "OptimizationConstraints":
+        """Build from a plain constraints dict, ignoring keys this service does not use"""
+        names = {f.name for f in fields(cls)}
+        values = {**defaults, **{k: v for k, v in constraints.items() if k in names}}
+        for name in ("risk_budgets", "market_weights", "views"):
+            if isinstance(values.get(name), Mapping):
+                values[name] = tuple(sorted((str(s), float(v)) for s, v in values[name].items()))
+        return cls(**values)
+
+    def bounds(self, assets: int) -> Tuple[float, float]:
+        """Weight bounds, widened just enough to admit a fully invested portfolio"""
+        return min(self.min_weight, 1.0 / assets), max(self.max_weight, 1.0 / assets)
+
+
+@dataclass
+class OptimizationResult:
+    """Optimal weights for one portfolio"""
+    method: str
+    symbols: Tuple[str, ...]
+    weights: np.ndarray
+    expected_return: float
+    volatility: float
+    converged: bool
+    iterations: int
+    warm_started: bool = False
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(zip(self.symbols, self.weights.tolist()))
+
+
+class FactorizedCovariance:
+    """Annualized moments of one universe on one date and the factorization every solve reuses"""
+
+    def __init__(self, symbols: Tuple[str, ...], as_of: Optional[date], mean: np.ndarray, covariance: np.ndarray):
+        self.symbols = tuple(symbols)
+        self.as_of = as_of
+        self.mean = np.asarray(mean, dtype=float)
+        self.covariance = np.asarray(covariance, dtype=float)
+        self.volatilities = np.sqrt(np.diag(self.covariance))
+        self.cholesky = self._factor(self.covariance)
+
+    @classmethod
+    def from_returns(cls, returns: pd.DataFrame, as_of: Optional[date] = None,
+                     periods_per_year: int = TRADING_DAYS) -> "FactorizedCovariance":
+        """Annualize per-period returns; columns are taken in sorted symbol order"""
+        returns = returns.reindex(columns=sorted(returns.columns))
+        values = returns.to_numpy(dtype=float)
+        return cls(tuple(returns.columns), as_of, values.mean(axis=0) * periods_per_year,
+                   np.atleast_2d(np.cov(values, rowvar=False)) * periods_per_year)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: CovarianceSnapshot, estimator: str = "ledoit_wolf",
+                      periods_per_year: int = TRADING_DAYS) -> "FactorizedCovariance":
+        """Annualize a covariance store estimate"""
+        return cls(snapshot.symbols, snapshot.as_of, snapshot.mean * periods_per_year,
+                   snapshot.estimate(estimator) * periods_per_year)
+
+    @staticmethod
+    def _factor(covariance: np.ndarray):
+        """Cholesky factor, adding diagonal jitter to sample covariances that are only semi-definite"""
+        jitter = 0.0
+        scale = max(np.trace(covariance) / max(len(covariance), 1), 1e-12)
+        for _ in range(8):
+            try:
+                return cho_factor(covariance + jitter * np.eye(len(covariance)), lower=True)
+            except np.linalg.LinAlgError:
+                jitter = scale * 1e-10 if jitter == 0.0 else jitter * 100
+        raise ValueError("Covariance matrix is not positive semi-definite")
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        """Covariance^-1 b from the cached factor"""
+        return cho_solve(self.cholesky, b)
+
+    def vector(self, pairs: Tuple[Tuple[str, float], ...], default: float) -> np.ndarray:
+        """Per-symbol (symbol, value) pairs laid out in universe order"""
+        values = dict(pairs)
+        return np.array([values.get(s, default) for s in self.symbols], dtype=float)
+
+
+def project_to_bounds(weights: np.ndarray, lower: float, upper: float) -> np.ndarray:
+    """Euclidean projection onto {sum(w) = 1, lower <= w <= upper}"""
+    if abs(weights.sum() - 1.0) < 1e-12 and weights.min() >= lower and weights.max() <= upper:
+        return weights
+    low, high = weights.min() - upper, weights.max() - lower
+    for _ in range(100):
+        shift = (low + high) / 2
+        if np.clip(weights - shift, lower, upper).sum() > 1:
+            low = shift
+        else:
+            high = shift
+    return np.clip(weights - (low + high) / 2, lower, upper)
+
+
+class PortfolioOptimizationService:
+    """Shared allocation solvers
+
+    Factorizations are cached per (universe, date) in an LRU of ``cache_size``
+    entries. Solutions are remembered per (portfolio key, method, universe) and
+    used as the starting point of the next solve, so a rebalance on a slightly
+    moved covariance converges in a few iterations. Cold starts use the
+    unconstrained optimum from the cached factor, projected onto the bounds.
+
+    With a ``covariance_store`` the factorizations are built from its
+    ``estimator`` (Ledoit-Wolf by default) rather than the sample covariance,
+    and histories passed to ``factorize`` seed the store for other readers.
+    """
+
+    METHODS = ("mean_variance", "max_sharpe", "risk_parity", "maximum_diversification", "black_litterman")
+
+    def __init__(self, cache_size: int = 32, max_iterations: int = 500, tolerance: float = 1e-10,
+                 covariance_store: Optional[CovarianceStore] = None, estimator: str = "ledoit_wolf"):
+        self.cache_size = cache_size
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.covariance_store = covariance_store
+        self.estimator = estimator
+        self._factorizations: "OrderedDict[Tuple[Tuple[str, ...], Optional[date]], FactorizedCovariance]" = OrderedDict()
+        self._warm_starts: Dict[Tuple[str, str, Tuple[str, ...]], np.ndarray] = {}
+        self.stats = {"factorizations": 0, "cache_hits": 0, "solves": 0, "warm_starts": 0}
+
+    # Factorization cache
+
+    def cached_factorization(self, symbols: Iterable[str], as_of: Optional[date]) -> Optional[FactorizedCovariance]:
+        key = (tuple(sorted(symbols)), as_of)
+        model = self._factorizations.get(key)
+        if model is not None:
+            self._factorizations.move_to_end(key)
+            self.stats["cache_hits"] += 1
+        return model
+
+    def factorization(self, symbols: Iterable[str], as_of: Optional[date]) -> Optional[FactorizedCovariance]:
+        """Cached factorization, else one built from the covariance store's latest estimate on or before ``as_of``"""
+        symbols = tuple(symbols)
+        if self.covariance_store is not None:
+            estimated = self.covariance_store.latest_date(symbols, as_of)
+            if estimated is not None:
+                model = self.cached_factorization(symbols, estimated)
+                if model is None:
+                    model = self.store(FactorizedCovariance.from_snapshot(
+                        self.covariance_store.snapshot(symbols, estimated), self.estimator
+                    ))
+                return model
+        return self.cached_factorization(symbols, as_of)
+
+    def factorize(self, returns: pd.DataFrame, as_of: Optional[date] = None,
+                  periods_per_year: int = TRADING_DAYS) -> FactorizedCovariance:
+        """Factorization for the universe of ``returns`` on ``as_of``, estimated at most once per cache lifetime;
+        undated estimates are never cached"""
+        if as_of is None:
+            return FactorizedCovariance.from_returns(returns, None, periods_per_year)
+        model = self.factorization(returns.columns, as_of)
+        if model is not None and model.as_of == as_of:
+            return model
+        if self.covariance_store is not None:
+            snapshot = self.covariance_store.seed(returns, as_of)
+            return self.store(FactorizedCovariance.from_snapshot(snapshot, self.estimator, periods_per_year))
+        return self.store(FactorizedCovariance.from_returns(returns, as_of, periods_per_year))
+
+    def store(self, model: FactorizedCovariance) -> FactorizedCovariance:
+        """Cache a factorization built elsewhere (e.g. from a shrunk covariance)"""
+        key = (tuple(sorted(model.symbols)), model.as_of)
+        self._factorizations[key] = model
+        self._factorizations.move_to_end(key)
+        while len(self._factorizations) > self.cache_size:
+            self._factorizations.popitem(last=False)
+        self.stats["factorizations"] += 1
+        return model
+
+    # Solves
+
+    def optimize(self, model: FactorizedCovariance, method: str = "mean_variance",
+                 constraints: Optional[OptimizationConstraints] = None, key: Optional[str] = None,
+                 initial: Optional[np.ndarray] = None) -> OptimizationResult:
+        """Solve one portfolio; ``key`` identifies it across rebalances for warm starts
+        
+        ``initial`` is used when the portfolio has no previous solution of its own.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown optimization method: {method}")
+        constraints = constraints or OptimizationConstraints()
+
+        warm_key = (key, method, model.symbols) if key is not None else None
+        start = self._warm_starts.get(warm_key) if warm_key else None
+        warm_started = start is not None
+        weights, converged, iterations = getattr(self, f"_{method}")(
+            model, constraints, start if warm_started else initial
+        )
+
+        self.stats["solves"] += 1
+        if warm_started:
+            self.stats["warm_starts"] += 1
+        if warm_key and converged:
+            self._warm_starts[warm_key] = weights
+        if not converged:
+            logger.warning(f"{method} optimization did not converge after {iterations} iterations")
+
+        return OptimizationResult(
+            method, model.symbols, weights, float(weights @ model.mean),
+            float(np.sqrt(max(weights @ model.covariance @ weights, 0.0))), converged, iterations, warm_started
+        )
+
+    def optimize_batch(self, model: FactorizedCovariance,
+                       portfolios: Union[Mapping[str, OptimizationConstraints], Iterable[Tuple[str, OptimizationConstraints]]],
+                       method: str = "mean_variance") -> Dict[str, OptimizationResult]:
+        """Solve many portfolios on one shared factorization
+
+        Portfolios with identical constraints share one solve. Distinct constraint
+        sets are solved in order of their bounds and risk aversion, each starting
+        from its own previous solution or else from its neighbour's.
+        """
+        items = list(portfolios.items() if isinstance(portfolios, Mapping) else portfolios)
+        groups: Dict[OptimizationConstraints, list] = {}
+        for key, constraints in items:
+            groups.setdefault(constraints or OptimizationConstraints(), []).append(key)
+
+        solved: Dict[OptimizationConstraints, OptimizationResult] = {}
+        neighbour = None
+        for constraints in sorted(groups, key=lambda c: (c.min_weight, c.max_weight, c.risk_aversion)):
+            keys = groups[constraints]
+            result = solved[constraints] = self.optimize(model, method, constraints, keys[0], neighbour)
+            if result.converged:
+                neighbour = result.weights
+                for key in keys[1:]:
+                    self._warm_starts[(key, method, model.symbols)] = result.weights
+        return {key: solved[constraints or OptimizationConstraints()] for key, constraints in items}
+
+    def forget(self, key: str):
+        """Drop a portfolio's warm starts"""
+        for warm_key in [k for k in self._warm_starts if k[0] == key]:
+            del self._warm_starts[warm_key]
+
+    # Problems
+
+    def _budget_constraints(self, model: FactorizedCovariance, constraints: OptimizationConstraints,
+                            mean: np.ndarray) -> list:
+        covariance = model.covariance
+        ones = np.ones(len(model))
+        problem = [{'type': 'eq', 'fun': lambda w: w.sum() - 1.0, 'jac': lambda w: ones}]
+        if constraints.target_return is not None:
+            problem.append({'type': 'ineq', 'fun': lambda w: w @ mean - constraints.target_return,
+                            'jac': lambda w: mean})
+        if constraints.max_volatility is not None:
+            limit = constraints.max_volatility ** 2
+            problem.append({'type': 'ineq', 'fun': lambda w: limit - w @ covariance @ w,
+                            'jac': lambda w: -2.0 * covariance @ w})
+        return problem
+
+    def _solve(self, objective, start: np.ndarray, bounds, problem: list) -> Tuple[np.ndarray, bool, int]:
+        result = minimize(objective, start, jac=True, method='SLSQP', bounds=bounds, constraints=problem,
+                          options={'maxiter': self.max_iterations, 'ftol': self.tolerance})
+        return result.x, bool(result.success), int(result.nit)
+
+    def _start(self, start: Optional[np.ndarray], cold: np.ndarray, lower: float, upper: float) -> np.ndarray:
+        return project_to_bounds(start if start is not None else cold, lower, upper)
+
+    def _mean_variance(self, model: FactorizedCovariance, constraints: OptimizationConstraints,
+                       start: Optional[np.ndarray], mean: Optional[np.ndarray] = None) -> Tuple[np.ndarray, bool, int]:
+        """max  mu'w - risk_aversion / 2 * w'Cw  over the budget and bounds
+        
+        A box-and-budget QP goes to the active-set solver; return or volatility
+        limits make it a general problem for SLSQP.
+        """
+        mean = model.mean if mean is None else mean
+        covariance, aversion = model.covariance, constraints.risk_aversion
+        lower, upper = constraints.bounds(len(model))
+
+        cold = model.solve(mean) / aversion
+        cold = cold / cold.sum() if cold.sum() > 0 else np.full(len(model), 1.0 / len(model))
+        initial = self._start(start, cold, lower, upper)
+        if constraints.target_return is None and constraints.max_volatility is None:
+            return self._box_qp(aversion * covariance, mean, lower, upper, initial)
+
+        def objective(w):
+            scaled = aversion * (covariance @ w)
+            return 0.5 * (w @ scaled) - mean @ w, scaled - mean
+
+        weights, converged, iterations = self._solve(
+            objective, initial, [(lower, upper)] * len(model), self._budget_constraints(model, constraints, mean)
+        )
+        return self._clean(weights, lower, upper), converged, iterations
+
+    def _box_qp(self, hessian: np.ndarray, linear: np.ndarray, lower: float, upper: float,
+                start: np.ndarray) -> Tuple[np.ndarray, bool, int]:
+        """min  x'Hx / 2 - linear'x  s.t. sum(x) = 1, lower <= x <= upper  by a primal active-set method
+        
+        Assets at a bound in ``start`` begin in the working set, so restarting from
+        the previous optimum usually needs a single equality-constrained solve.
+        """
+        x = start.copy()
+        at_lower = x <= lower + 1e-12
+        at_upper = x >= upper - 1e-12
+        x[at_lower], x[at_upper] = lower, upper
+        
+        for iteration in range(1, self.max_iterations + 1):
+            free = ~(at_lower | at_upper)
+            if free.any():
+                # Equality-constrained minimizer over the free assets with the rest held at their bounds
+                gradient_free = linear[free] - hessian[np.ix_(free, ~free)] @ x[~free]
+                factor = cho_factor(hessian[np.ix_(free, free)], lower=True)
+                base, ones = cho_solve(factor, gradient_free), cho_solve(factor, np.ones(free.sum()))
+                budget = (1.0 - x[~free].sum() - base.sum()) / ones.sum()
+                target = base + budget * ones
+                step = target - x[free]
+                
+                # Walk towards it until the first free asset hits a bound
+                ratio = np.full(len(step), np.inf)
+                falling, rising = step < -1e-15, step > 1e-15
+                ratio[falling] = (lower - x[free][falling]) / step[falling]
+                ratio[rising] = (upper - x[free][rising]) / step[rising]
+                blocking = int(np.argmin(ratio))
+                if ratio[blocking] < 1.0:
+                    indices = np.flatnonzero(free)
+                    x[free] += ratio[blocking] * step
+                    (at_lower if step[blocking] < 0 else at_upper)[indices[blocking]] = True
+                    x[indices[blocking]] = lower if step[blocking] < 0 else upper
+                    continue
+                x[free] = target
+            
+            # Bound multipliers: gradient - budget multiplier must be >= 0 at a lower bound, <= 0 at an upper one
+            gradient = hessian @ x - linear
+            if not free.any():  # every asset at a bound: take the budget multiplier least likely to release one
+                budget = gradient[at_lower].min() if at_lower.any() else gradient[at_upper].max()
+            multiplier = gradient - budget
+            violations = np.where(at_lower, -multiplier, 0.0) + np.where(at_upper, multiplier, 0.0)
+            worst = int(np.argmax(violations))
+            if violations[worst] <= 1e-12 * max(1.0, np.abs(linear).max()):
+                return x, True, iteration
+            at_lower[worst] = at_upper[worst] = False
+        
+        return x, False, self.max_iterations
+
+    def _max_sharpe(self, model: FactorizedCovariance, constraints: OptimizationConstraints,
+                    start: Optional[np.ndarray]) -> Tuple[np.ndarray, bool, int]:
+        """max  (mu'w - rf) / sqrt(w'Cw)  over the budget, bounds and optional return / volatility limits"""
+        excess_mean = model.mean - constraints.risk_free_rate
+        covariance = model.covariance
+        lower, upper = constraints.bounds(len(model))
+
+        def objective(w):
+            covariance_w = covariance @ w
+            volatility = np.sqrt(w @ covariance_w)
+            excess = excess_mean @ w
+            return -excess / volatility, -(excess_mean * volatility - excess * covariance_w / volatility) / volatility ** 2
+
+        cold = model.solve(excess_mean)
+        cold = cold / cold.sum() if cold.sum() > 0 else np.full(len(model), 1.0 / len(model))
+        weights, converged, iterations = self._solve(
+            objective, self._start(start, cold, lower, upper), [(lower, upper)] * len(model),
+            self._budget_constraints(model, constraints, model.mean)
+        )
+        return self._clean(weights, lower, upper), converged, iterations
+
+    def _maximum_diversification(self, model: FactorizedCovariance, constraints: OptimizationConstraints,
+                                 start: Optional[np.ndarray]) -> Tuple[np.ndarray, bool, int]:
+        """max  sigma'w / sqrt(w'Cw), solved as the QP  min y'Cy  s.t. sigma'y = 1, y >= 0, w = y / sum(y)"""
+        volatilities, covariance = model.volatilities, model.covariance
+        assets = len(model)
+        lower, upper = constraints.bounds(assets)
+
+        problem = [{'type': 'eq', 'fun': lambda y: volatilities @ y - 1.0, 'jac': lambda y: volatilities}]
+        if upper < 1.0:  # y_i <= upper * sum(y)
+            upper_jac = np.full((assets, assets), upper) - np.eye(assets)
+            problem.append({'type': 'ineq', 'fun': lambda y: upper * y.sum() - y, 'jac': lambda y: upper_jac})
+        if lower > 0.0:  # y_i >= lower * sum(y)
+            lower_jac = np.eye(assets) - np.full((assets, assets), lower)
+            problem.append({'type': 'ineq', 'fun': lambda y: y - lower * y.sum(), 'jac': lambda y: lower_jac})
+
+        def objective(y):
+            covariance_y = covariance @ y
+            return y @ covariance_y, 2.0 * covariance_y
+
+        cold = np.maximum(model.solve(volatilities), 0.0)
+        weights = self._start(start, cold / cold.sum() if cold.sum() > 0 else np.full(assets, 1.0 / assets), lower, upper)
+        y, converged, iterations = self._solve(objective, weights / (volatilities @ weights), [(0.0, None)] * assets, problem)
+        return self._clean(y / y.sum(), lower, upper), converged, iterations
+
+    def _risk_parity(self, model: FactorizedCovariance, constraints: OptimizationConstraints,
+                     start: Optional[np.ndarray]) -> Tuple[np.ndarray, bool, int]:
+        """Risk contributions proportional to the budgets via Newton's method on the strictly convex
+        min  y'Cy / 2 - b'log(y),  w = y / sum(y); weight bounds do not apply"""
+        covariance = model.covariance
+        budgets = model.vector(constraints.risk_budgets, 1.0 / len(model))  # unlisted symbols get an equal share
+        budgets = budgets / budgets.sum()
+
+        y = start if start is not None else budgets / model.volatilities
+        y = y / np.sqrt(y @ covariance @ y)
+
+        def objective(y):
+            return 0.5 * (y @ covariance @ y) - budgets @ np.log(y)
+
+        value = objective(y)
+        for iteration in range(1, self.max_iterations + 1):
+            gradient = covariance @ y - budgets / y
+            if np.max(np.abs(gradient * y)) < self.tolerance:  # y_i (Cy)_i = b_i
+                return y / y.sum(), True, iteration - 1
+            step = np.linalg.solve(covariance + np.diag(budgets / y ** 2), gradient)
+            size = 1.0
+            while np.any(y - size * step <= 0):
+                size *= 0.5
+            while objective(y - size * step) > value + 1e-4 * size * (gradient @ -step) and size > 1e-12:
+                size *= 0.5
+            y = y - size * step
+            value = objective(y)
+        return y / y.sum(), False, self.max_iterations
+
+    def _black_litterman(self, model: FactorizedCovariance, constraints: OptimizationConstraints,
+                         start: Optional[np.ndarray]) -> Tuple[np.ndarray, bool, int]:
+        """Mean-variance on the Black-Litterman posterior mean"""
+        return self._mean_variance(model, constraints, start, self.black_litterman_returns(model, constraints))
+
+    @staticmethod
+    def black_litterman_returns(model: FactorizedCovariance, constraints: OptimizationConstraints) -> np.ndarray:
+        """Posterior mean  pi + tau C P'(tau P C P' + Omega)^-1 (q - P pi),  pi = risk_aversion * C w_mkt"""
+        covariance = model.covariance
+        market = model.vector(constraints.market_weights, 1.0 if not constraints.market_weights else 0.0)
+        implied = constraints.risk_aversion * covariance @ (market / market.sum())
+
+        index = {s: i for i, s in enumerate(model.symbols)}
+        views = [(index[s], q) for s, q in constraints.views if s in index]
+        if not views:
+            return implied
+
+        rows = np.array([i for i, _ in views])
+        targets = np.array([q for _, q in views])
+        scaled = constraints.tau * covariance[:, rows]                     # tau C P'
+        view_covariance = scaled[rows]                                     # tau P C P'
+        uncertainty = np.diag(np.diag(view_covariance)) / constraints.view_confidence
+        return implied + scaled @ np.linalg.solve(view_covariance + uncertainty, targets - implied[rows])
+
+    @staticmethod
+    def _clean(weights: np.ndarray, lower: float, upper: float) -> np.ndarray:
+        """Trim solver round-off so weights sit inside the bounds and sum to one"""
+        weights = np.clip(weights, lower, upper)
+        return weights / weights.sum()
@@ -22,13 +22,15 @@ import time
 import json
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone, time as dt_time
 from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import uuid
-import websocket
-import threading
+
+from app.pro import indicator_kernels as kernels
+from app.pro.streaming_indicators import create_streaming_indicator
+from app.pro.market_data_feed import MultiplexedFeedManager
 
 logger = logging.getLogger(__name__)
 
@@ -77,6 +79,7 @@ class IndicatorType(Enum):
     
     # Volume Indicators
     OBV = "OBV"  # On Balance Volume
+    VWAP = "VWAP"  # Volume Weighted Average Price (session anchored)
     VOLUME_PROFILE = "VP"  # Volume Profile
     CHAIKIN = "CHAIKIN"  # Chaikin Money Flow
     
@@ -173,13 +176,345 @@ class ChartAlert:
     created_at: datetime = field(default_factory=datetime.now)
 
 
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class OHLCVRingBuffer:
+    """Columnar ring buffer of OHLCV bars for one (symbol, timeframe).
+    
+    Each bar is written twice, at slot ``i`` and ``i + capacity``, so the
+    latest ``len(self)`` bars always form one contiguous slice: appends are
+    O(1) and column reads are zero-copy NumPy views. Sequence access
+    (indexing, iteration) materializes OHLCV objects for existing callers.
+    """
+    
+    def __init__(self, symbol: str, timeframe: TimeFrame, capacity: int = 5000):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.capacity = capacity
+        self.version = 0  # bumped on every write, for downstream caches
+        self.tzinfo = None
+        
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)  # naive epoch microseconds
+        self._open = np.zeros(2 * capacity, dtype=np.float64)
+        self._high = np.zeros(2 * capacity, dtype=np.float64)
+        self._low = np.zeros(2 * capacity, dtype=np.float64)
+        self._close = np.zeros(2 * capacity, dtype=np.float64)
+        self._volume = np.zeros(2 * capacity, dtype=np.int64)
+        self._head = 0  # next write slot in [0, capacity)
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _to_micros(self, timestamp: datetime) -> int:
+        if timestamp.tzinfo is not None:
+            self.tzinfo = timestamp.tzinfo
+            timestamp = timestamp.replace(tzinfo=None)
+        return (timestamp - _EPOCH) // _ONE_MICROSECOND
+    
+    def _to_datetime(self, micros: int) -> datetime:
+        timestamp = _EPOCH + timedelta(microseconds=int(micros))
+        return timestamp.replace(tzinfo=self.tzinfo) if self.tzinfo else timestamp
+    
+    def _write(self, slot: int, timestamp_us: int, bar: OHLCV):
+        for offset in (slot, slot + self.capacity):
+            self._timestamps[offset] = timestamp_us
+            self._open[offset] = bar.open
+            self._high[offset] = bar.high
+            self._low[offset] = bar.low
+            self._close[offset] = bar.close
+            self._volume[offset] = bar.volume
+        self.version += 1
+    
+    @property
+    def _window(self) -> slice:
+        end = self._head + self.capacity
+        return slice(end - self._size, end)
+    
+    @property
+    def last_timestamp_us(self) -> Optional[int]:
+        return int(self._timestamps[self._head + self.capacity - 1]) if self._size else None
+    
+    def append(self, bar: OHLCV) -> bool:
+        """Append a bar; a bar with the latest timestamp replaces it, older bars are ignored.
+        
+        Returns True only when a new bar was added.
+        """
+        timestamp_us = self._to_micros(bar.timestamp)
+        last = self.last_timestamp_us
+        
+        if last is not None and timestamp_us <= last:
+            if timestamp_us == last:
+                self._write((self._head - 1) % self.capacity, timestamp_us, bar)
+            return False
+        
+        self._write(self._head, timestamp_us, bar)
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return True
+    
+    def extend(self, bars: List[OHLCV]) -> int:
+        """Bulk-append time-ordered bars newer than the buffer's last bar (vectorized write)."""
+        last = self.last_timestamp_us
+        timestamps = np.array([self._to_micros(bar.timestamp) for bar in bars], dtype=np.int64)
+        start = 0 if last is None else int(np.searchsorted(timestamps, last, side="right"))
+        start = max(start, len(bars) - self.capacity)
+        
+        if start >= len(bars):
+            return 0
+        
+        new_bars = bars[start:]
+        count = len(new_bars)
+        slots = (self._head + np.arange(count)) % self.capacity
+        
+        columns = [
+            (self._timestamps, timestamps[start:]),
+            (self._open, [bar.open for bar in new_bars]),
+            (self._high, [bar.high for bar in new_bars]),
+            (self._low, [bar.low for bar in new_bars]),
+            (self._close, [bar.close for bar in new_bars]),
+            (self._volume, [bar.volume for bar in new_bars])
+        ]
+        for array, values in columns:
+            array[slots] = values
+            array[slots + self.capacity] = values
+        
+        self._head = (self._head + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+        self.version += 1
+        return count
+    
+    # Zero-copy column views (oldest -> newest)
+    @property
+    def timestamps_us(self) -> np.ndarray:
+        return self._timestamps[self._window]
+    
+    @property
+    def open(self) -> np.ndarray:
+        return self._open[self._window]
+    
+    @property
+    def high(self) -> np.ndarray:
+        return self._high[self._window]
+    
+    @property
+    def low(self) -> np.ndarray:
+        return self._low[self._window]
+    
+    @property
+    def close(self) -> np.ndarray:
+        return self._close[self._window]
+    
+    @property
+    def volume(self) -> np.ndarray:
+        return self._volume[self._window]
+    
+    def timestamps(self, last_n: Optional[int] = None) -> List[datetime]:
+        """Bar timestamps as datetimes, optionally only the last ``last_n``."""
+        micros = self.timestamps_us
+        if last_n is not None:
+            micros = micros[len(micros) - last_n:] if last_n > 0 else micros[:0]
+        return [self._to_datetime(value) for value in micros.tolist()]
+    
+    def _bar_at(self, index: int) -> OHLCV:
+        position = self._window.start + index
+        return OHLCV(
+            timestamp=self._to_datetime(self._timestamps[position]),
+            open=float(self._open[position]),
+            high=float(self._high[position]),
+            low=float(self._low[position]),
+            close=float(self._close[position]),
+            volume=int(self._volume[position]),
+            symbol=self.symbol,
+            timeframe=self.timeframe
+        )
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._bar_at(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("OHLCV buffer index out of range")
+        return self._bar_at(index)
+    
+    def __iter__(self):
+        for index in range(self._size):
+            yield self._bar_at(index)
+    
+    def to_list(self) -> List[OHLCV]:
+        return [self._bar_at(index) for index in range(self._size)]
+
+
+class OHLCVStore:
+    """Shared OHLCV buffers, one per (symbol, timeframe)."""
+    
+    def __init__(self, capacity: int = 5000):
+        self.capacity = capacity
+        self.buffers: Dict[Tuple[str, TimeFrame], OHLCVRingBuffer] = {}
+    
+    def get_buffer(self, symbol: str, timeframe: TimeFrame) -> OHLCVRingBuffer:
+        key = (symbol, timeframe)
+        if key not in self.buffers:
+            self.buffers[key] = OHLCVRingBuffer(symbol, timeframe, self.capacity)
+        return self.buffers[key]
+
+
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
+NSE_SESSION_OPEN = dt_time(9, 15)
+NSE_SESSION_CLOSE = dt_time(15, 30)
+_ONE_MINUTE = timedelta(minutes=1)
+
+# Intraday timeframes, in minutes, bucketed from the session open
+INTRADAY_MINUTES = {
+    TimeFrame.FIVE_MINUTES: 5,
+    TimeFrame.FIFTEEN_MINUTES: 15,
+    TimeFrame.THIRTY_MINUTES: 30,
+    TimeFrame.ONE_HOUR: 60,
+    TimeFrame.FOUR_HOURS: 240
+}
+AGGREGATED_TIMEFRAMES = frozenset(INTRADAY_MINUTES) | {TimeFrame.DAILY, TimeFrame.WEEKLY, TimeFrame.MONTHLY}
+
+
+def to_ist(timestamp: datetime) -> datetime:
+    """Naive IST wall-clock time; naive inputs are assumed to already be IST."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(IST).replace(tzinfo=None)
+    return timestamp
+
+
+def session_period(minute: datetime, timeframe: TimeFrame) -> Optional[Tuple[datetime, datetime]]:
+    """(start, end) of the ``timeframe`` candle containing a 1-minute bar, or None outside the NSE session.
+
+    Intraday candles are anchored at 09:15 and the last one of the day is
+    cut short at 15:30 (e.g. 1h runs 14:15, 15:15-15:30). Weekly candles
+    cover the ISO week (Monday to Sunday) and monthly candles the calendar
+    month, so special weekend sessions join their period's candle instead of
+    opening a second one; these candles close on the next period's first minute.
+    """
+    day = minute.date()
+    day_open = datetime.combine(day, NSE_SESSION_OPEN)
+    day_close = datetime.combine(day, NSE_SESSION_CLOSE)
+    if not day_open <= minute < day_close:
+        return None
+
+    if timeframe in INTRADAY_MINUTES:
+        length = timedelta(minutes=INTRADAY_MINUTES[timeframe])
+        start = day_open + ((minute - day_open) // length) * length
+        return start, min(start + length, day_close)
+
+    if timeframe == TimeFrame.DAILY:
+        return day_open, day_close
+
+    if timeframe == TimeFrame.WEEKLY:
+        year, week, _ = day.isocalendar()
+        monday = date.fromisocalendar(year, week, 1)
+        return (datetime.combine(monday, NSE_SESSION_OPEN),
+                datetime.combine(monday + timedelta(days=6), NSE_SESSION_CLOSE))
+
+    if timeframe == TimeFrame.MONTHLY:
+        first = day.replace(day=1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return datetime.combine(first, NSE_SESSION_OPEN), datetime.combine(last, NSE_SESSION_CLOSE)
+
+    return None
+
+
+class CandleAggregator:
+    """Folds one symbol's 1-minute bars into higher timeframes incrementally.
+
+    Each subscribed timeframe keeps a single forming candle updated in O(1)
+    per minute. A candle is closed, and returned exactly once, when its last
+    minute arrives or when a later minute shows its period is over, so gaps
+    and missing closing minutes never leave a candle open past the next bar.
+    Minutes outside the NSE session and repeated or out-of-order minutes are
+    ignored. A timeframe added mid-period skips that partial period.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.timeframes: List[TimeFrame] = []
+        self.forming: Dict[TimeFrame, OHLCV] = {}
+        self.period_end: Dict[TimeFrame, datetime] = {}
+        self.skip_period: Dict[TimeFrame, Optional[datetime]] = {}
+        self.last_minute: Optional[datetime] = None
+
+    def add_timeframe(self, timeframe: TimeFrame) -> bool:
+        """Start aggregating a timeframe; returns False if it can't be built from 1-minute bars."""
+        if timeframe not in AGGREGATED_TIMEFRAMES:
+            return False
+        if timeframe not in self.timeframes:
+            self.timeframes.append(timeframe)
+            self.skip_period[timeframe] = None
+        return True
+
+    def add_minute(self, bar: OHLCV) -> List[OHLCV]:
+        """Fold in one 1-minute bar and return the candles it closed."""
+        minute = to_ist(bar.timestamp).replace(second=0, microsecond=0)
+        if self.last_minute is not None and minute <= self.last_minute:
+            return []
+        self.last_minute = minute
+
+        closed = []
+        for timeframe in self.timeframes:
+            candle = self.forming.get(timeframe)
+            if candle is not None and minute >= self.period_end[timeframe]:
+                closed.append(self.forming.pop(timeframe))
+                candle = None
+
+            period = session_period(minute, timeframe)
+            if period is None:
+                continue
+            start, end = period
+
+            if candle is None:
+                if timeframe in self.skip_period:
+                    # Joined mid-period: wait for the next full one
+                    if self.skip_period[timeframe] is None and minute != start:
+                        self.skip_period[timeframe] = start
+                    if self.skip_period[timeframe] == start:
+                        continue
+                    del self.skip_period[timeframe]
+
+                candle = OHLCV(
+                    timestamp=start,
+                    open=bar.open,
+                    high=bar.high,
+                    low=bar.low,
+                    close=bar.close,
+                    volume=bar.volume,
+                    symbol=self.symbol,
+                    timeframe=timeframe
+                )
+                self.forming[timeframe] = candle
+                self.period_end[timeframe] = end
+            else:
+                candle.high = max(candle.high, bar.high)
+                candle.low = min(candle.low, bar.low)
+                candle.close = bar.close
+                candle.volume += bar.volume
+
+            if minute + _ONE_MINUTE >= end:
+                closed.append(self.forming.pop(timeframe))
+
+        return closed
+
+    def flush(self) -> List[OHLCV]:
+        """Close and return every forming candle (e.g. when the feed stops)."""
+        return [self.forming.pop(timeframe) for timeframe in self.timeframes if timeframe in self.forming]
+
+
 class RealTimeDataFeed:
     """Real-time market data feed for charting."""
     
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or self._default_config()
         self.subscribers = {}  # symbol -> list of callbacks
-        self.websocket_connections = {}
+        self.aggregators = {}  # symbol -> CandleAggregator for subscribed higher timeframes
+        self.websocket_connections = {}  # symbol -> FeedSubscription on the shared feed manager
+        self.feed_manager: Optional[MultiplexedFeedManager] = None
         self.is_running = False
         
     def _default_config(self) -> Dict:
@@ -188,7 +523,10 @@ class RealTimeDataFeed:
             "bse_websocket": "wss://bsefeed.example.com/ws",
             "reconnect_interval": 5,
             "heartbeat_interval": 30,
-            "max_reconnect_attempts": 10
+            "max_reconnect_attempts": 10,
+            "max_connections": 8,
+            "max_symbols_per_connection": 100,
+            "queue_size": 1000
         }
     
     async def subscribe_symbol(self, symbol: str, timeframe: TimeFrame, callback):
@@ -202,50 +540,52 @@ class RealTimeDataFeed:
             "last_update": datetime.now()
         })
         
+        # Higher timeframes are built from the 1-minute stream
+        if timeframe != TimeFrame.ONE_MINUTE:
+            aggregator = self.aggregators.setdefault(symbol, CandleAggregator(symbol))
+            if not aggregator.add_timeframe(timeframe):
+                logger.warning(f"{timeframe.value} candles can't be built from the 1m feed for {symbol}")
+        
         # Start WebSocket connection if not already running
         if symbol not in self.websocket_connections:
             await self._start_websocket_feed(symbol)
     
     async def _start_websocket_feed(self, symbol: str):
-        """Start WebSocket connection for real-time data."""
+        """Route a symbol through the shared, multiplexed WebSocket connections."""
         try:
-            def on_message(ws, message):
-                try:
-                    data = json.loads(message)
-                    self._process_market_data(symbol, data)
-                except Exception as e:
-                    logger.error(f"Error processing market data: {e}")
-            
-            def on_error(ws, error):
-                logger.error(f"WebSocket error for {symbol}: {error}")
-            
-            def on_close(ws, close_status_code, close_msg):
-                logger.warning(f"WebSocket closed for {symbol}")
-                # Implement reconnection logic
-                threading.Timer(5.0, lambda: self._reconnect_websocket(symbol)).start()
+            if self.feed_manager is None:
+                self.feed_manager = MultiplexedFeedManager(self.config['nse_websocket'], {
+                    "max_connections": self.config.get("max_connections", 8),
+                    "max_symbols_per_connection": self.config.get("max_symbols_per_connection", 100),
+                    "queue_size": self.config.get("queue_size", 1000),
+                    "heartbeat_interval": self.config.get("heartbeat_interval", 30),
+                    "reconnect_max_delay": self.config.get("reconnect_interval", 5),
+                    "max_reconnect_attempts": self.config.get("max_reconnect_attempts")
+                })
             
-            ws_url = f"{self.config['nse_websocket']}?symbol={symbol}"
-            ws = websocket.WebSocketApp(ws_url,
-                                      on_message=on_message,
-                                      on_error=on_error,
-                                      on_close=on_close)
-            
-            self.websocket_connections[symbol] = ws
-            
-            # Start WebSocket in separate thread
-            ws_thread = threading.Thread(target=ws.run_forever)
-            ws_thread.daemon = True
-            ws_thread.start()
+            # Callbacks run on the event loop, fed from the symbol's fan-out queue
+            self.websocket_connections[symbol] = await self.feed_manager.subscribe(
+                symbol, lambda data: self._process_market_data(symbol, data)
+            )
+            await self.feed_manager.start()
+            self.is_running = True
             
         except Exception as e:
             logger.error(f"Failed to start WebSocket for {symbol}: {e}")
     
+    async def stop(self):
+        """Close the shared feed connections."""
+        if self.feed_manager is not None:
+            await self.feed_manager.stop()
+        self.websocket_connections.clear()
+        self.is_running = False
+    
     def _process_market_data(self, symbol: str, data: Dict):
         """Process incoming market data and notify subscribers."""
         try:
-            # Create OHLCV data point
+            # Create OHLCV data point (IST wall-clock time)
             ohlcv = OHLCV(
-                timestamp=datetime.fromtimestamp(data['timestamp']),
+                timestamp=datetime.fromtimestamp(data['timestamp'], IST).replace(tzinfo=None),
                 open=data['open'],
                 high=data['high'],
                 low=data['low'],
@@ -255,17 +595,34 @@ class RealTimeDataFeed:
                 timeframe=TimeFrame.ONE_MINUTE  # Real-time is 1-minute base
             )
             
-            # Notify all subscribers
-            if symbol in self.subscribers:
-                for subscriber in self.subscribers[symbol]:
-                    try:
-                        subscriber['callback'](ohlcv)
-                        subscriber['last_update'] = datetime.now()
-                    except Exception as e:
-                        logger.error(f"Error in subscriber callback: {e}")
+            self._notify_subscribers(symbol, ohlcv)
+            
+            # Fold into higher timeframes; each closed candle is delivered once
+            aggregator = self.aggregators.get(symbol)
+            if aggregator is not None:
+                for candle in aggregator.add_minute(ohlcv):
+                    self._notify_subscribers(symbol, candle)
                         
         except Exception as e:
             logger.error(f"Error processing market data for {symbol}: {e}")
+    
+    def flush_candles(self, symbol: str):
+        """Close a symbol's forming higher-timeframe candles and deliver them."""
+        aggregator = self.aggregators.get(symbol)
+        if aggregator is not None:
+            for candle in aggregator.flush():
+                self._notify_subscribers(symbol, candle)
+    
+    def _notify_subscribers(self, symbol: str, ohlcv: OHLCV):
+        """Deliver a bar to the symbol's subscribers for its timeframe."""
+        for subscriber in self.subscribers.get(symbol, []):
+            if subscriber['timeframe'] != ohlcv.timeframe:
+                continue
+            try:
+                subscriber['callback'](ohlcv)
+                subscriber['last_update'] = datetime.now()
+            except Exception as e:
+                logger.error(f"Error in subscriber callback: {e}")
 
 
 class TechnicalAnalysisEngine:
@@ -277,125 +634,55 @@ class TechnicalAnalysisEngine:
     
     def calculate_sma(self, data: List[float], period: int) -> List[float]:
         """Calculate Simple Moving Average."""
-        if len(data) < period:
-            return []
-        
-        sma_values = []
-        for i in range(period - 1, len(data)):
-            sma = sum(data[i - period + 1:i + 1]) / period
-            sma_values.append(sma)
-        
-        return sma_values
+        return kernels.sma(kernels.as_float_array(data), period).tolist()
     
     def calculate_ema(self, data: List[float], period: int) -> List[float]:
         """Calculate Exponential Moving Average."""
-        if len(data) < period:
-            return []
-        
-        ema_values = []
-        multiplier = 2 / (period + 1)
-        
-        # First EMA is SMA
-        ema = sum(data[:period]) / period
-        ema_values.append(ema)
-        
-        # Calculate subsequent EMA values
-        for i in range(period, len(data)):
-            ema = (data[i] * multiplier) + (ema * (1 - multiplier))
-            ema_values.append(ema)
-        
-        return ema_values
+        return kernels.ema(kernels.as_float_array(data), period).tolist()
     
     def calculate_rsi(self, data: List[float], period: int = 14) -> List[float]:
         """Calculate Relative Strength Index."""
-        if len(data) < period + 1:
-            return []
-        
-        gains = []
-        losses = []
-        
-        # Calculate gains and losses
-        for i in range(1, len(data)):
-            change = data[i] - data[i-1]
-            gains.append(max(change, 0))
-            losses.append(max(-change, 0))
-        
-        rsi_values = []
-        
-        # Calculate initial average gain and loss
-        avg_gain = sum(gains[:period]) / period
-        avg_loss = sum(losses[:period]) / period
-        
-        for i in range(period, len(gains)):
-            # Smooth averages
-            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-            
-            if avg_loss == 0:
-                rsi = 100
-            else:
-                rs = avg_gain / avg_loss
-                rsi = 100 - (100 / (1 + rs))
-            
-            rsi_values.append(rsi)
-        
-        return rsi_values
+        return kernels.rsi(kernels.as_float_array(data), period).tolist()
     
     def calculate_macd(self, data: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, List[float]]:
         """Calculate MACD (Moving Average Convergence Divergence)."""
-        ema_fast = self.calculate_ema(data, fast)
-        ema_slow = self.calculate_ema(data, slow)
-        
-        if not ema_fast or not ema_slow:
-            return {"macd": [], "signal": [], "histogram": []}
-        
-        # Align arrays (EMA slow starts later)
-        offset = slow - fast
-        macd_line = []
-        
-        for i in range(len(ema_slow)):
-            if i + offset < len(ema_fast):
-                macd = ema_fast[i + offset] - ema_slow[i]
-                macd_line.append(macd)
-        
-        # Calculate signal line (EMA of MACD)
-        signal_line = self.calculate_ema(macd_line, signal)
-        
-        # Calculate histogram
-        histogram = []
-        offset_signal = len(macd_line) - len(signal_line)
-        
-        for i in range(len(signal_line)):
-            hist = macd_line[i + offset_signal] - signal_line[i]
-            histogram.append(hist)
-        
-        return {
-            "macd": macd_line,
-            "signal": signal_line,
-            "histogram": histogram
-        }
+        macd_data = kernels.macd(kernels.as_float_array(data), fast, slow, signal)
+        return {name: values.tolist() for name, values in macd_data.items()}
     
     def calculate_bollinger_bands(self, data: List[float], period: int = 20, std_dev: float = 2) -> Dict[str, List[float]]:
         """Calculate Bollinger Bands."""
-        if len(data) < period:
-            return {"upper": [], "middle": [], "lower": []}
-        
-        middle_band = self.calculate_sma(data, period)
-        upper_band = []
-        lower_band = []
-        
-        for i in range(period - 1, len(data)):
-            subset = data[i - period + 1:i + 1]
-            std = np.std(subset)
-            
-            middle = middle_band[i - period + 1]
-            upper_band.append(middle + (std * std_dev))
-            lower_band.append(middle - (std * std_dev))
+        bands = kernels.bollinger_bands(kernels.as_float_array(data), period, std_dev)
+        return {name: values.tolist() for name, values in bands.items()}
+    
+    def calculate_atr(self, ohlcv_data: Union[List[OHLCV], OHLCVRingBuffer], period: int = 14) -> List[float]:
+        """Calculate Average True Range (Wilder)."""
+        columns = self._ohlcv_columns(ohlcv_data)
+        return kernels.atr(columns["high"], columns["low"], columns["close"], period).tolist()
+    
+    def calculate_vwap(self, ohlcv_data: Union[List[OHLCV], OHLCVRingBuffer]) -> List[float]:
+        """Calculate session VWAP, reset at the start of each trading day."""
+        columns = self._ohlcv_columns(ohlcv_data)
+        return kernels.vwap(
+            columns["high"], columns["low"], columns["close"], columns["volume"], columns["session"]
+        ).tolist()
+    
+    def _ohlcv_columns(self, ohlcv_data: Union[List[OHLCV], OHLCVRingBuffer]) -> Dict[str, np.ndarray]:
+        """Float64 columns plus a per-day session id, zero-copy when given a ring buffer."""
+        if isinstance(ohlcv_data, OHLCVRingBuffer):
+            return {
+                "high": ohlcv_data.high,
+                "low": ohlcv_data.low,
+                "close": ohlcv_data.close,
+                "volume": ohlcv_data.volume.astype(np.float64),
+                "session": ohlcv_data.timestamps_us // 86_400_000_000
+            }
         
         return {
-            "upper": upper_band,
-            "middle": middle_band,
-            "lower": lower_band
+            "high": kernels.as_float_array([candle.high for candle in ohlcv_data]),
+            "low": kernels.as_float_array([candle.low for candle in ohlcv_data]),
+            "close": kernels.as_float_array([candle.close for candle in ohlcv_data]),
+            "volume": kernels.as_float_array([candle.volume for candle in ohlcv_data]),
+            "session": np.array([candle.timestamp.date().toordinal() for candle in ohlcv_data], dtype=np.int64)
         }
     
     def detect_patterns(self, ohlcv_data: List[OHLCV], pattern_type: PatternType) -> List[ChartPattern]:
@@ -507,11 +794,16 @@ class ChartingEngine:
     def __init__(self, data_feed: RealTimeDataFeed):
         self.data_feed = data_feed
         self.technical_engine = TechnicalAnalysisEngine()
-        self.chart_data = {}  # symbol -> timeframe -> OHLCV data
+        self.ohlcv_store = OHLCVStore(capacity=5000)  # (symbol, timeframe) -> shared ring buffer
+        self.chart_buffers = {}  # chart_id -> OHLCVRingBuffer
+        self.chart_data = {}  # "{chart_id}_{symbol}_{timeframe}" -> OHLCVRingBuffer (legacy key)
+        self.streamed_until = {}  # chart_id -> timestamp of the last bar fed to streaming indicators
         self.indicators = {}  # chart_id -> list of indicators
         self.patterns = {}    # chart_id -> list of patterns
         self.drawings = {}    # chart_id -> list of drawing tools
         self.alerts = {}      # user_id -> list of alerts
+        self.streaming_indicators = {}  # chart_id -> list of (TechnicalIndicator, StreamingIndicator)
+        self.max_indicator_points = 1000
         
     async def create_chart(self, user_id: str, symbol: str, timeframe: TimeFrame, 
                           chart_type: ChartType = ChartType.CANDLESTICK) -> str:
@@ -520,6 +812,7 @@ class ChartingEngine:
         
         # Initialize chart data structures
         self.indicators[chart_id] = []
+        self.streaming_indicators[chart_id] = []
         self.patterns[chart_id] = []
         self.drawings[chart_id] = []
         
@@ -530,9 +823,11 @@ class ChartingEngine:
             lambda data: self._update_chart_data(chart_id, symbol, timeframe, data)
         )
         
-        # Load historical data
-        historical_data = await self._load_historical_data(symbol, timeframe)
-        self._store_chart_data(chart_id, symbol, timeframe, historical_data)
+        # Load historical data unless another chart already filled the shared buffer
+        buffer = self._attach_chart_buffer(chart_id, symbol, timeframe)
+        if len(buffer) == 0:
+            historical_data = await self._load_historical_data(symbol, timeframe)
+            buffer.extend(historical_data)
         
         logger.info(f"Created chart {chart_id} for {symbol} {timeframe.value}")
         return chart_id
@@ -548,7 +843,7 @@ class ChartingEngine:
         if not chart_data:
             raise ValueError("No chart data available")
         
-        closes = [candle.close for candle in chart_data]
+        closes = chart_data.close  # zero-copy view
         
         # Calculate indicator values
         indicator_values = []
@@ -562,27 +857,42 @@ class ChartingEngine:
             period = parameters.get('period', 14)
             indicator_values = self.technical_engine.calculate_rsi(closes, period)
         elif indicator_type == IndicatorType.MACD:
-            macd_data = self.technical_engine.calculate_macd(closes)
+            macd_data = self.technical_engine.calculate_macd(
+                closes, parameters.get('fast', 12), parameters.get('slow', 26), parameters.get('signal', 9)
+            )
             indicator_values = macd_data['macd']
         elif indicator_type == IndicatorType.BOLLINGER_BANDS:
             period = parameters.get('period', 20)
             std_dev = parameters.get('std_dev', 2)
             bb_data = self.technical_engine.calculate_bollinger_bands(closes, period, std_dev)
             indicator_values = bb_data['middle']  # Return middle band
+        elif indicator_type == IndicatorType.ATR:
+            period = parameters.get('period', 14)
+            indicator_values = self.technical_engine.calculate_atr(chart_data, period)
+        elif indicator_type == IndicatorType.VWAP:
+            indicator_values = self.technical_engine.calculate_vwap(chart_data)
         
         # Create indicator object
         indicator = TechnicalIndicator(
             indicator_id=str(uuid.uuid4()),
             type=indicator_type,
-            symbol=chart_data[0].symbol,
-            timeframe=chart_data[0].timeframe,
+            symbol=chart_data.symbol,
+            timeframe=chart_data.timeframe,
             parameters=parameters,
             values=indicator_values,
-            timestamps=[candle.timestamp for candle in chart_data[-len(indicator_values):]]
+            timestamps=chart_data.timestamps(len(indicator_values))
         )
         
         self.indicators[chart_id].append(indicator)
         
+        # Attach a streaming counterpart so live ticks update the indicator in O(1)
+        streaming = create_streaming_indicator(indicator_type.value, parameters)
+        if streaming is not None:
+            for candle in chart_data:
+                streaming.update(candle)
+            self.streamed_until[chart_id] = chart_data.last_timestamp_us
+            self.streaming_indicators.setdefault(chart_id, []).append((indicator, streaming))
+        
         logger.info(f"Added {indicator_type.value} indicator to chart {chart_id}")
         return indicator.indicator_id
     
@@ -597,8 +907,9 @@ class ChartingEngine:
         
         detected_patterns = []
         
+        candles = chart_data.to_list()
         for pattern_type in pattern_types:
-            patterns = self.technical_engine.detect_patterns(chart_data, pattern_type)
+            patterns = self.technical_engine.detect_patterns(candles, pattern_type)
             detected_patterns.extend(patterns)
         
         # Store patterns
@@ -651,43 +962,75 @@ class ChartingEngine:
     
     def _update_chart_data(self, chart_id: str, symbol: str, timeframe: TimeFrame, new_data: OHLCV):
         """Update chart with new real-time data."""
-        key = f"{chart_id}_{symbol}_{timeframe.value}"
+        buffer = self.chart_buffers.get(chart_id)
+        if buffer is None:
+            buffer = self._attach_chart_buffer(chart_id, symbol, timeframe)
         
-        if key not in self.chart_data:
-            self.chart_data[key] = []
+        # O(1) append; charts sharing the buffer deliver the same bar, which is de-duplicated
+        buffer.append(new_data)
         
-        # Add new data point
-        self.chart_data[key].append(new_data)
-        
-        # Keep only last 1000 data points for performance
-        if len(self.chart_data[key]) > 1000:
-            self.chart_data[key] = self.chart_data[key][-1000:]
+        # Advance attached streaming indicators by one bar
+        self._update_streaming_indicators(chart_id, new_data)
         
         # Check alerts
         self._check_alerts(symbol, new_data)
     
+    def _update_streaming_indicators(self, chart_id: str, new_data: OHLCV):
+        """Append the next value of each streaming indicator on a chart."""
+        if not self.streaming_indicators.get(chart_id):
+            return
+        
+        # Only strictly newer bars advance the indicators (revisions of the last bar are skipped)
+        timestamp_us = (new_data.timestamp.replace(tzinfo=None) - _EPOCH) // _ONE_MICROSECOND
+        last = self.streamed_until.get(chart_id)
+        if last is not None and timestamp_us <= last:
+            return
+        self.streamed_until[chart_id] = timestamp_us
+        
+        for indicator, streaming in self.streaming_indicators[chart_id]:
+            value = streaming.update(new_data)
+            if value is None:
+                continue
+            
+            indicator.values.append(value)
+            indicator.timestamps.append(new_data.timestamp)
+            
+            # Trim in batches so the per-tick cost stays O(1) amortized
+            if len(indicator.values) > 2 * self.max_indicator_points:
+                del indicator.values[:-self.max_indicator_points]
+                del indicator.timestamps[:-self.max_indicator_points]
+    
+    def get_streaming_snapshot(self, chart_id: str) -> Dict[str, Dict[str, Any]]:
+        """Latest streaming outputs for every indicator on a chart, keyed by indicator id."""
+        return {
+            indicator.indicator_id: streaming.snapshot()
+            for indicator, streaming in self.streaming_indicators.get(chart_id, [])
+        }
+    
+    def _attach_chart_buffer(self, chart_id: str, symbol: str, timeframe: TimeFrame) -> OHLCVRingBuffer:
+        """Point a chart at the shared buffer for its symbol and timeframe."""
+        buffer = self.ohlcv_store.get_buffer(symbol, timeframe)
+        self.chart_buffers[chart_id] = buffer
+        self.chart_data[f"{chart_id}_{symbol}_{timeframe.value}"] = buffer
+        return buffer
+    
     def _store_chart_data(self, chart_id: str, symbol: str, timeframe: TimeFrame, data: List[OHLCV]):
         """Store historical chart data."""
-        key = f"{chart_id}_{symbol}_{timeframe.value}"
-        self.chart_data[key] = data
+        self._attach_chart_buffer(chart_id, symbol, timeframe).extend(data)
     
-    def _get_chart_data(self, chart_id: str) -> List[OHLCV]:
+    def _get_chart_data(self, chart_id: str) -> Optional[OHLCVRingBuffer]:
         """Get chart data for a chart ID."""
-        # Find the data key that starts with chart_id
-        for key, data in self.chart_data.items():
-            if key.startswith(chart_id):
-                return data
-        return []
+        return self.chart_buffers.get(chart_id)
     
     def _get_chart_symbol(self, chart_id: str) -> str:
         """Get symbol for a chart."""
-        chart_data = self._get_chart_data(chart_id)
-        return chart_data[0].symbol if chart_data else ""
+        buffer = self.chart_buffers.get(chart_id)
+        return buffer.symbol if buffer is not None else ""
     
     def _get_chart_timeframe(self, chart_id: str) -> TimeFrame:
         """Get timeframe for a chart."""
-        chart_data = self._get_chart_data(chart_id)
-        return chart_data[0].timeframe if chart_data else TimeFrame.ONE_MINUTE
+        buffer = self.chart_buffers.get(chart_id)
+        return buffer.timeframe if buffer is not None else TimeFrame.ONE_MINUTE
     
     async def _load_historical_data(self, symbol: str, timeframe: TimeFrame, 
                                   days: int = 30) -> List[OHLCV]:
@@ -0,0 +1,201 @@
+"""
+TradeMate PRO Indicator Kernels
+===============================
+
+Vectorized NumPy kernels behind TechnicalAnalysisEngine.
+
+All kernels take contiguous float64 arrays and return float64 arrays,
+using the same alignment as the list API (output starts at the first
+complete window). Rolling sums come from cumulative sums, so every
+kernel is O(n) regardless of period; recursive smoothers (EMA, Wilder)
+run as first-order IIR filters in C via ``scipy.signal.lfilter``.
+"""
+
+from typing import Dict, Sequence, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+def as_float_array(data: ArrayLike) -> np.ndarray:
+    """Contiguous float64 view/copy of the input."""
+    return np.ascontiguousarray(data, dtype=np.float64)
+
+
+def rolling_window(values: np.ndarray, period: int) -> np.ndarray:
+    """Zero-copy (n - period + 1, period) window view via stride tricks."""
+    return sliding_window_view(values, period)
+
+
+def _centre(values: np.ndarray) -> float:
+    """Mean of the finite values, used to shift data before cumulative sums."""
+    finite = values[~np.isnan(values)]
+    return float(finite.mean()) if len(finite) else 0.0
+
+
+def _rolling_sum(values: np.ndarray, period: int) -> np.ndarray:
+    """Windowed sums from a cumulative sum; windows containing NaN stay NaN."""
+    nan_mask = np.isnan(values)
+    has_nan = nan_mask.any()
+
+    # Shift by the mean to limit cancellation error in long cumulative sums
+    centre = _centre(values)
+    shifted = values - centre
+    if has_nan:
+        shifted[nan_mask] = 0.0
+
+    csum = np.concatenate(([0.0], np.cumsum(shifted)))
+    sums = csum[period:] - csum[:-period] + period * centre
+
+    if has_nan:
+        nan_count = np.concatenate(([0], np.cumsum(nan_mask)))
+        sums[(nan_count[period:] - nan_count[:-period]) > 0] = np.nan
+
+    return sums
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average, O(n) via cumulative sums."""
+    if period <= 0 or len(values) < period:
+        return np.empty(0, dtype=np.float64)
+    return _rolling_sum(values, period) / period
+
+
+def rolling_variance(values: np.ndarray, period: int) -> np.ndarray:
+    """Population (ddof=0) rolling variance, matching ``np.std`` per window."""
+    if period <= 0 or len(values) < period:
+        return np.empty(0, dtype=np.float64)
+
+    centred = values - _centre(values)
+    mean = _rolling_sum(centred, period) / period
+    mean_sq = _rolling_sum(centred * centred, period) / period
+
+    variance = mean_sq - mean * mean
+    # Clamp tiny negative values from floating point cancellation
+    np.maximum(variance, 0.0, out=variance)
+    return variance
+
+
+def recursive_smooth(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """y[i] = alpha * x[i] + (1 - alpha) * y[i-1], with y[-1] = initial."""
+    if len(values) == 0:
+        return np.empty(0, dtype=np.float64)
+    decay = 1.0 - alpha
+    smoothed, _ = lfilter([alpha], [1.0, -decay], values, zi=[decay * initial])
+    return smoothed
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """EMA seeded with the SMA of the first ``period`` values."""
+    if period <= 0 or len(values) < period:
+        return np.empty(0, dtype=np.float64)
+
+    seed = values[:period].mean()
+    out = np.empty(len(values) - period + 1, dtype=np.float64)
+    out[0] = seed
+    out[1:] = recursive_smooth(values[period:], 2.0 / (period + 1), seed)
+    return out
+
+
+def wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing (alpha = 1/period) seeded with the first-window mean.
+
+    Returns the smoothed values after the seed, i.e. ``len(values) - period``
+    points, matching the RSI convention of the list API.
+    """
+    if period <= 0 or len(values) < period:
+        return np.empty(0, dtype=np.float64)
+    return recursive_smooth(values[period:], 1.0 / period, values[:period].mean())
+
+
+def rsi(values: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder smoothing."""
+    if period <= 0 or len(values) < period + 1:
+        return np.empty(0, dtype=np.float64)
+
+    changes = np.diff(values)
+    avg_gain = wilder_smooth(np.maximum(changes, 0.0), period)
+    avg_loss = wilder_smooth(np.maximum(-changes, 0.0), period)
+
+    rs = np.divide(avg_gain, avg_loss, out=np.zeros_like(avg_gain), where=avg_loss != 0)
+    return np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+
+
+def macd(values: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    """MACD line, signal line and histogram aligned like the list API."""
+    empty = np.empty(0, dtype=np.float64)
+    ema_fast = ema(values, fast)
+    ema_slow = ema(values, slow)
+
+    if len(ema_fast) == 0 or len(ema_slow) == 0:
+        return {"macd": empty, "signal": empty, "histogram": empty}
+
+    offset = slow - fast
+    macd_line = ema_fast[offset:offset + len(ema_slow)] - ema_slow
+    signal_line = ema(macd_line, signal)
+    histogram = macd_line[len(macd_line) - len(signal_line):] - signal_line
+
+    return {"macd": macd_line, "signal": signal_line, "histogram": histogram}
+
+
+def bollinger_bands(values: np.ndarray, period: int = 20, std_dev: float = 2) -> Dict[str, np.ndarray]:
+    """Bollinger Bands from rolling mean and rolling population std."""
+    middle = sma(values, period)
+    if len(middle) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return {"upper": empty, "middle": empty, "lower": empty}
+
+    band = np.sqrt(rolling_variance(values, period)) * std_dev
+    return {"upper": middle + band, "middle": middle, "lower": middle - band}
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range for bars 1..n-1 (each needs the previous close)."""
+    prev_close = close[:-1]
+    return np.maximum.reduce([
+        high[1:] - low[1:],
+        np.abs(high[1:] - prev_close),
+        np.abs(low[1:] - prev_close)
+    ])
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average True Range: mean of the first ``period`` true ranges, then Wilder smoothing."""
+    if period <= 0 or len(close) < period + 1:
+        return np.empty(0, dtype=np.float64)
+
+    tr = true_range(high, low, close)
+    out = np.empty(len(tr) - period + 1, dtype=np.float64)
+    out[0] = tr[:period].mean()
+    out[1:] = wilder_smooth(tr, period)
+    return out
+
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+         session_ids: np.ndarray) -> np.ndarray:
+    """Session-anchored VWAP of the typical price; resets whenever the session id changes.
+
+    Bars before any volume trades in a session report the typical price.
+    """
+    if len(close) == 0:
+        return np.empty(0, dtype=np.float64)
+
+    typical = (high + low + close) / 3.0
+    cum_pv = np.cumsum(typical * volume)
+    cum_v = np.cumsum(volume)
+
+    # Index of the first bar of each bar's session, then subtract the running totals before it
+    is_start = np.empty(len(close), dtype=bool)
+    is_start[0] = True
+    is_start[1:] = session_ids[1:] != session_ids[:-1]
+    session_start = np.maximum.accumulate(np.where(is_start, np.arange(len(close)), 0))
+
+    base_pv = np.where(session_start > 0, cum_pv[session_start - 1], 0.0)
+    base_v = np.where(session_start > 0, cum_v[session_start - 1], 0.0)
+    session_pv = cum_pv - base_pv
+    session_v = cum_v - base_v
+
+    return np.divide(session_pv, session_v, out=typical.copy(), where=session_v > 0)
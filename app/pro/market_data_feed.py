@@ -0,0 +1,426 @@
+"""
+TradeMate PRO Multiplexed Market Data Feed
+==========================================
+
+Asyncio feed manager that carries many symbol subscriptions over a small
+pool of WebSocket connections.
+
+- Symbols are packed onto connections (up to ``max_symbols_per_connection``
+  each, at most ``max_connections`` sockets) instead of one socket and one
+  thread per symbol.
+- Every subscriber owns a bounded queue drained by its own task, so a slow
+  callback never stalls the socket reader. Full queues either drop the
+  oldest message (latest price wins) or block the reader, which pushes
+  backpressure down to TCP.
+- Dropped connections reconnect with exponential backoff and full jitter,
+  then re-subscribe their symbols.
+
+Wire protocol (JSON text frames): the client sends
+``{"action": "subscribe" | "unsubscribe", "symbols": [...]}``; the server
+sends market data messages carrying a ``symbol`` field, either one per
+frame or as a JSON list. ``ReplayFeedServer`` speaks the same protocol
+for offline tests and benchmarks.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import aiohttp
+import numpy as np
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_BLOCK = "block"
+
+
+@dataclass
+class FeedSubscription:
+    """One callback's view of a symbol, with its own bounded fan-out queue."""
+    symbol: str
+    callback: Callable[[Dict[str, Any]], Any]
+    queue: asyncio.Queue
+    overflow: str = OVERFLOW_DROP_OLDEST
+    delivered: int = 0
+    dropped: int = 0
+    task: Optional[asyncio.Task] = None
+
+
+class FeedConnection:
+    """One WebSocket carrying a set of symbols, reconnecting with jittered backoff."""
+
+    def __init__(self, manager: "MultiplexedFeedManager", connection_id: int):
+        self.manager = manager
+        self.connection_id = connection_id
+        self.symbols: Set[str] = set()
+        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.task: Optional[asyncio.Task] = None
+        self.connected = asyncio.Event()
+        self.reconnects = 0
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        if self.ws is not None and not self.ws.closed:
+            await self.ws.close()
+
+    async def add_symbols(self, symbols: Iterable[str]):
+        new = set(symbols) - self.symbols
+        self.symbols |= new
+        if new:
+            await self._send_action("subscribe", new)
+
+    async def remove_symbols(self, symbols: Iterable[str]):
+        gone = set(symbols) & self.symbols
+        self.symbols -= gone
+        if gone:
+            await self._send_action("unsubscribe", gone)
+
+    async def _send_action(self, action: str, symbols: Iterable[str]):
+        # Before (re)connecting there is nothing to send: _run subscribes the full set on open
+        if self.ws is not None and not self.ws.closed:
+            await self.ws.send_str(json.dumps({"action": action, "symbols": sorted(symbols)}))
+
+    async def _run(self):
+        attempt = 0
+        config = self.manager.config
+
+        while True:
+            try:
+                async with self.manager.session.ws_connect(
+                    self.manager.url, heartbeat=config["heartbeat_interval"]
+                ) as ws:
+                    self.ws = ws
+                    attempt = 0
+                    if self.symbols:
+                        await self._send_action("subscribe", self.symbols)
+                    self.connected.set()
+                    await self._read(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Feed connection {self.connection_id} error: {e}")
+            finally:
+                self.connected.clear()
+                self.ws = None
+
+            if self.manager.max_reconnect_attempts is not None and attempt >= self.manager.max_reconnect_attempts:
+                logger.error(f"Feed connection {self.connection_id} giving up after {attempt} reconnect attempts")
+                return
+
+            # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+            delay = random.uniform(0, min(config["reconnect_max_delay"], config["reconnect_base_delay"] * (2 ** attempt)))
+            attempt += 1
+            self.reconnects += 1
+            self.manager.stats["reconnects"] += 1
+            await asyncio.sleep(delay)
+
+    async def _read(self, ws: aiohttp.ClientWebSocketResponse):
+        async for frame in ws:
+            if frame.type != aiohttp.WSMsgType.TEXT:
+                if frame.type == aiohttp.WSMsgType.ERROR:
+                    logger.warning(f"Feed connection {self.connection_id} frame error: {ws.exception()}")
+                continue
+
+            received_at = time.perf_counter()
+            try:
+                payload = json.loads(frame.data)
+            except ValueError as e:
+                logger.error(f"Malformed feed frame: {e}")
+                continue
+
+            for message in payload if isinstance(payload, list) else (payload,):
+                await self.manager._dispatch(message, received_at)
+
+
+class MultiplexedFeedManager:
+    """Fan out market data for many symbols from a small pool of WebSocket connections."""
+
+    def __init__(self, url: str, config: Optional[Dict] = None):
+        self.url = url
+        self.config = {**self._default_config(), **(config or {})}
+        self.max_reconnect_attempts = self.config["max_reconnect_attempts"]
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.connections: List[FeedConnection] = []
+        self.symbol_connection: Dict[str, FeedConnection] = {}
+        self.subscriptions: Dict[str, List[FeedSubscription]] = {}
+        self.is_running = False
+
+        self.latencies = deque(maxlen=self.config["latency_samples"])  # seconds, receipt -> callback done
+        self.stats = {
+            "messages_received": 0,
+            "messages_delivered": 0,
+            "messages_dropped": 0,
+            "unrouted": 0,
+            "callback_errors": 0,
+            "reconnects": 0
+        }
+
+    def _default_config(self) -> Dict:
+        return {
+            "max_connections": 8,
+            "max_symbols_per_connection": 100,
+            "queue_size": 1000,
+            "overflow": OVERFLOW_DROP_OLDEST,
+            "heartbeat_interval": 30,
+            "reconnect_base_delay": 0.5,
+            "reconnect_max_delay": 30.0,
+            "max_reconnect_attempts": None,  # None retries forever
+            "latency_samples": 100000
+        }
+
+    async def start(self):
+        """Open the connection pool for every symbol subscribed so far."""
+        if self.is_running:
+            return
+        self.is_running = True
+        self.session = aiohttp.ClientSession()
+        # Subscriptions kept across a stop() get their consumers back
+        for subscription in (s for subs in self.subscriptions.values() for s in subs):
+            if subscription.task is None or subscription.task.done():
+                subscription.task = asyncio.create_task(self._consume(subscription))
+        for connection in self.connections:
+            connection.start()
+
+    async def stop(self):
+        """Close connections and stop every subscriber task; subscriptions resume on start()."""
+        self.is_running = False
+        for connection in self.connections:
+            await connection.stop()
+        for subscription in [s for subs in self.subscriptions.values() for s in subs]:
+            await self._stop_subscription(subscription)
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def wait_connected(self, timeout: float = 5.0):
+        """Wait until every pooled connection is open."""
+        await asyncio.wait_for(
+            asyncio.gather(*(connection.connected.wait() for connection in self.connections)),
+            timeout
+        )
+
+    async def subscribe(self, symbol: str, callback: Callable[[Dict[str, Any]], Any],
+                        queue_size: Optional[int] = None, overflow: Optional[str] = None) -> FeedSubscription:
+        """Register a callback (sync or async) for a symbol's messages."""
+        subscription = FeedSubscription(
+            symbol=symbol,
+            callback=callback,
+            queue=asyncio.Queue(maxsize=queue_size or self.config["queue_size"]),
+            overflow=overflow or self.config["overflow"]
+        )
+        subscription.task = asyncio.create_task(self._consume(subscription))
+        self.subscriptions.setdefault(symbol, []).append(subscription)
+
+        if symbol not in self.symbol_connection:
+            connection = self._connection_for_new_symbol()
+            self.symbol_connection[symbol] = connection
+            await connection.add_symbols([symbol])
+            if self.is_running:
+                connection.start()
+
+        return subscription
+
+    async def unsubscribe(self, subscription: FeedSubscription):
+        """Remove a subscription; the symbol leaves its connection when nobody watches it."""
+        subscriptions = self.subscriptions.get(subscription.symbol, [])
+        if subscription in subscriptions:
+            subscriptions.remove(subscription)
+        await self._stop_subscription(subscription)
+
+        if not subscriptions:
+            self.subscriptions.pop(subscription.symbol, None)
+            connection = self.symbol_connection.pop(subscription.symbol, None)
+            if connection is not None:
+                await connection.remove_symbols([subscription.symbol])
+
+    def _connection_for_new_symbol(self) -> FeedConnection:
+        """Least-loaded connection with room, opening a new one while the pool has space."""
+        open_connections = [c for c in self.connections if len(c.symbols) < self.config["max_symbols_per_connection"]]
+        if open_connections:
+            return min(open_connections, key=lambda c: len(c.symbols))
+        if len(self.connections) < self.config["max_connections"]:
+            connection = FeedConnection(self, len(self.connections))
+            self.connections.append(connection)
+            return connection
+        # Pool exhausted: over-fill the least loaded socket rather than refuse the symbol
+        return min(self.connections, key=lambda c: len(c.symbols))
+
+    async def _dispatch(self, message: Dict[str, Any], received_at: float):
+        """Offer a message to every subscriber queue of its symbol."""
+        self.stats["messages_received"] += 1
+        subscriptions = self.subscriptions.get(message.get("symbol"))
+        if not subscriptions:
+            self.stats["unrouted"] += 1
+            return
+
+        item = (received_at, message)
+        for subscription in subscriptions:
+            queue = subscription.queue
+            if not queue.full():
+                queue.put_nowait(item)
+            elif subscription.overflow == OVERFLOW_BLOCK:
+                await queue.put(item)  # stalls this connection's reader until the consumer catches up
+            else:
+                queue.get_nowait()
+                queue.put_nowait(item)
+                subscription.dropped += 1
+                self.stats["messages_dropped"] += 1
+
+    async def _consume(self, subscription: FeedSubscription):
+        """Drain a subscriber queue, running its callback off the socket reader."""
+        queue = subscription.queue
+        while True:
+            received_at, message = await queue.get()
+            try:
+                result = subscription.callback(message)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.stats["callback_errors"] += 1
+                logger.error(f"Error in feed callback for {subscription.symbol}: {e}")
+            else:
+                subscription.delivered += 1
+                self.stats["messages_delivered"] += 1
+            self.latencies.append(time.perf_counter() - received_at)
+
+    async def _stop_subscription(self, subscription: FeedSubscription):
+        if subscription.task is not None:
+            subscription.task.cancel()
+            try:
+                await subscription.task
+            except asyncio.CancelledError:
+                pass
+            subscription.task = None
+
+    def latency_percentiles(self, percentiles: Iterable[float] = (50, 99)) -> Dict[str, float]:
+        """Receipt-to-callback-completion latency percentiles in milliseconds."""
+        if not self.latencies:
+            return {f"p{p:g}": 0.0 for p in percentiles}
+        samples = np.fromiter(self.latencies, dtype=np.float64) * 1000
+        return {f"p{p:g}": float(np.percentile(samples, p)) for p in percentiles}
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Feed throughput, drop and reconnect counters."""
+        return {
+            **self.stats,
+            "connections": len(self.connections),
+            "symbols": len(self.symbol_connection),
+            "subscriptions": sum(len(subs) for subs in self.subscriptions.values()),
+            "latency_ms": self.latency_percentiles()
+        }
+
+
+class ReplayFeedServer:
+    """Local WebSocket server replaying recorded messages, standing in for the exchange feed.
+
+    Each client receives, in order, the recorded messages for the symbols it
+    subscribed to, ``batch_size`` messages per frame. Replay starts on the
+    client's first subscribe frame.
+    """
+
+    def __init__(self, messages: List[Dict[str, Any]], host: str = "127.0.0.1", port: int = 0,
+                 batch_size: int = 1):
+        self.messages = messages
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.clients: Set[web.WebSocketResponse] = set()
+        self.connections_accepted = 0
+        self.messages_sent = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/ws", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.disconnect_all()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def disconnect_all(self):
+        """Drop every client connection (to exercise reconnects)."""
+        for ws in list(self.clients):
+            await ws.close()
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients.add(ws)
+        self.connections_accepted += 1
+
+        symbols: Set[str] = set()
+        replay: Optional[asyncio.Task] = None
+        try:
+            async for frame in ws:
+                if frame.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                request_data = json.loads(frame.data)
+                if request_data.get("action") == "subscribe":
+                    symbols.update(request_data.get("symbols", []))
+                    if replay is None:
+                        replay = asyncio.create_task(self._replay(ws, symbols))
+                elif request_data.get("action") == "unsubscribe":
+                    symbols.difference_update(request_data.get("symbols", []))
+        finally:
+            if replay is not None:
+                replay.cancel()
+            self.clients.discard(ws)
+        return ws
+
+    async def _replay(self, ws: web.WebSocketResponse, symbols: Set[str]):
+        batch = []
+        for message in self.messages:
+            if message["symbol"] not in symbols:
+                continue
+            batch.append(message)
+            if len(batch) >= self.batch_size:
+                if not await self._send(ws, batch):
+                    return
+                batch = []
+        if batch:
+            await self._send(ws, batch)
+
+    async def _send(self, ws: web.WebSocketResponse, batch: List[Dict[str, Any]]) -> bool:
+        if ws.closed:
+            return False
+        await ws.send_str(json.dumps(batch if len(batch) > 1 else batch[0]))
+        self.messages_sent += len(batch)
+        return True
+
+
+__all__ = [
+    "MultiplexedFeedManager",
+    "FeedConnection",
+    "FeedSubscription",
+    "ReplayFeedServer",
+    "OVERFLOW_DROP_OLDEST",
+    "OVERFLOW_BLOCK"
+]
@@ -0,0 +1,298 @@
+"""
+TradeMate PRO Streaming Indicators
+==================================
+
+Stateful indicators that update in O(1) per new OHLCV bar.
+
+Each class mirrors a batch TechnicalAnalysisEngine method: feeding the
+same bars one at a time yields the same values, in the same order, as
+the batch call on the full history. ``update`` returns the new value
+once the indicator is warmed up and ``None`` before that.
+
+Running sums are re-derived from the window every RESYNC_INTERVAL
+updates so floating point drift can't accumulate on long-lived charts.
+"""
+
+import math
+from collections import deque
+from typing import Any, Dict, Optional
+
+RESYNC_INTERVAL = 1024
+
+
+class StreamingIndicator:
+    """Base class for per-bar incremental indicators."""
+
+    def __init__(self):
+        self.value: Optional[float] = None
+        self.bars_seen = 0
+
+    @property
+    def is_ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, bar) -> Optional[float]:
+        """Consume one OHLCV bar and return the latest value (None while warming up)."""
+        self.bars_seen += 1
+        self.value = self._update(bar)
+        return self.value
+
+    def _update(self, bar) -> Optional[float]:
+        raise NotImplementedError
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current outputs keyed by line name."""
+        return {"value": self.value}
+
+
+class _RollingWindow:
+    """Fixed-size window with running sum and sum of squared deviations (sliding Welford)."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._updates = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.period
+
+    def push(self, x: float):
+        if self.full:
+            old = self.values[0]
+            self.values.append(x)
+            old_mean = self.mean
+            self.total += x - old
+            self.mean = old_mean + (x - old) / self.period
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        else:
+            self.values.append(x)
+            n = len(self.values)
+            delta = x - self.mean
+            self.total += x
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+
+        self._updates += 1
+        if self._updates % RESYNC_INTERVAL == 0:
+            self._resync()
+
+    def _resync(self):
+        n = len(self.values)
+        self.total = math.fsum(self.values)
+        self.mean = self.total / n
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+
+    @property
+    def variance(self) -> float:
+        return max(self.m2 / len(self.values), 0.0)
+
+
+class StreamingSMA(StreamingIndicator):
+    """Simple moving average of closes."""
+
+    def __init__(self, period: int = 20):
+        super().__init__()
+        self.period = period
+        self.window = _RollingWindow(period)
+
+    def _update(self, bar) -> Optional[float]:
+        self.window.push(bar.close)
+        return self.window.total / self.period if self.window.full else None
+
+
+class _EMAState:
+    """EMA seeded with the SMA of the first ``period`` inputs."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.seed_total = 0.0
+        self.count = 0
+        self.value: Optional[float] = None
+
+    def push(self, x: float) -> Optional[float]:
+        self.count += 1
+        if self.value is None:
+            self.seed_total += x
+            if self.count == self.period:
+                self.value = self.seed_total / self.period
+        else:
+            self.value = (x * self.multiplier) + (self.value * (1 - self.multiplier))
+        return self.value
+
+
+class StreamingEMA(StreamingIndicator):
+    """Exponential moving average of closes."""
+
+    def __init__(self, period: int = 20):
+        super().__init__()
+        self.period = period
+        self.ema = _EMAState(period)
+
+    def _update(self, bar) -> Optional[float]:
+        return self.ema.push(bar.close)
+
+
+class _WilderState:
+    """Wilder smoothing seeded with the mean of the first ``period`` inputs.
+
+    Like the batch kernel, the seed itself is not reported; ``emit_seed``
+    reports it for indicators (ATR) whose batch output starts at the seed.
+    """
+
+    def __init__(self, period: int, emit_seed: bool = False):
+        self.period = period
+        self.emit_seed = emit_seed
+        self.seed_total = 0.0
+        self.count = 0
+        self.value: Optional[float] = None
+
+    def push(self, x: float) -> Optional[float]:
+        self.count += 1
+        if self.value is None:
+            self.seed_total += x
+            if self.count == self.period:
+                self.value = self.seed_total / self.period
+                return self.value if self.emit_seed else None
+            return None
+        self.value = (self.value * (self.period - 1) + x) / self.period
+        return self.value
+
+
+class StreamingRSI(StreamingIndicator):
+    """Relative Strength Index of closes with Wilder smoothing."""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.avg_gain = _WilderState(period)
+        self.avg_loss = _WilderState(period)
+
+    def _update(self, bar) -> Optional[float]:
+        prev_close, self.prev_close = self.prev_close, bar.close
+        if prev_close is None:
+            return None
+
+        change = bar.close - prev_close
+        avg_gain = self.avg_gain.push(max(change, 0.0))
+        avg_loss = self.avg_loss.push(max(-change, 0.0))
+
+        if avg_gain is None:
+            return None
+        if avg_loss == 0:
+            return 100.0
+        return 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD line (value), signal line and histogram."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        self.fast = _EMAState(fast)
+        self.slow = _EMAState(slow)
+        self.signal_ema = _EMAState(signal)
+        self.signal: Optional[float] = None
+        self.histogram: Optional[float] = None
+
+    def _update(self, bar) -> Optional[float]:
+        fast = self.fast.push(bar.close)
+        slow = self.slow.push(bar.close)
+        if fast is None or slow is None:
+            return None
+
+        macd = fast - slow
+        self.signal = self.signal_ema.push(macd)
+        self.histogram = macd - self.signal if self.signal is not None else None
+        return macd
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"macd": self.value, "signal": self.signal, "histogram": self.histogram}
+
+
+class StreamingBollingerBands(StreamingIndicator):
+    """Bollinger Bands; ``value`` is the middle band."""
+
+    def __init__(self, period: int = 20, std_dev: float = 2):
+        super().__init__()
+        self.period = period
+        self.std_dev = std_dev
+        self.window = _RollingWindow(period)
+        self.upper: Optional[float] = None
+        self.lower: Optional[float] = None
+
+    def _update(self, bar) -> Optional[float]:
+        self.window.push(bar.close)
+        if not self.window.full:
+            return None
+
+        middle = self.window.mean
+        band = math.sqrt(self.window.variance) * self.std_dev
+        self.upper = middle + band
+        self.lower = middle - band
+        return middle
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"upper": self.upper, "middle": self.value, "lower": self.lower}
+
+
+class StreamingATR(StreamingIndicator):
+    """Average True Range with Wilder smoothing."""
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.atr = _WilderState(period, emit_seed=True)
+
+    def _update(self, bar) -> Optional[float]:
+        prev_close, self.prev_close = self.prev_close, bar.close
+        if prev_close is None:
+            return None
+
+        true_range = max(bar.high - bar.low, abs(bar.high - prev_close), abs(bar.low - prev_close))
+        return self.atr.push(true_range)
+
+
+class StreamingVWAP(StreamingIndicator):
+    """Session VWAP of the typical price, reset at each new trading day."""
+
+    def __init__(self):
+        super().__init__()
+        self.session = None
+        self.cum_pv = 0.0
+        self.cum_volume = 0.0
+
+    def _update(self, bar) -> Optional[float]:
+        session = bar.timestamp.date()
+        if session != self.session:
+            self.session = session
+            self.cum_pv = 0.0
+            self.cum_volume = 0.0
+
+        typical = (bar.high + bar.low + bar.close) / 3.0
+        self.cum_pv += typical * bar.volume
+        self.cum_volume += bar.volume
+        return self.cum_pv / self.cum_volume if self.cum_volume > 0 else typical
+
+
+STREAMING_INDICATORS = {
+    "SMA": lambda params: StreamingSMA(params.get("period", 20)),
+    "EMA": lambda params: StreamingEMA(params.get("period", 20)),
+    "RSI": lambda params: StreamingRSI(params.get("period", 14)),
+    "MACD": lambda params: StreamingMACD(params.get("fast", 12), params.get("slow", 26), params.get("signal", 9)),
+    "BB": lambda params: StreamingBollingerBands(params.get("period", 20), params.get("std_dev", 2)),
+    "ATR": lambda params: StreamingATR(params.get("period", 14)),
+    "VWAP": lambda params: StreamingVWAP()
+}
+
+
+def create_streaming_indicator(indicator_type: str, parameters: Dict[str, Any]) -> Optional[StreamingIndicator]:
+    """Build a streaming indicator for an IndicatorType value, or None if unsupported."""
+    factory = STREAMING_INDICATORS.get(indicator_type)
+    return factory(parameters) if factory else None
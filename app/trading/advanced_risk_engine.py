@@ -13,12 +13,13 @@ from decimal import Decimal
 from dataclasses import dataclass, asdict
 from enum import Enum
 import scipy.stats as stats
-from scipy.optimize import minimize
 import warnings
 warnings.filterwarnings('ignore')
 
 from app.core.config import settings
 from app.core.enterprise_architecture import PerformanceConfig, ServiceTier
+from app.institutional.covariance_store import CovarianceStore, shared_covariance_store
+from app.institutional.portfolio_optimization import OptimizationConstraints, PortfolioOptimizationService
 from app.models.user import User, Portfolio, Trade
 
 logger = logging.getLogger(__name__)
@@ -89,7 +90,7 @@ class AdvancedRiskEngine:
     Real-time portfolio monitoring and optimization
     """
     
-    def __init__(self):
+    def __init__(self, covariance_store: Optional[CovarianceStore] = None):
         # Performance configuration
         self.performance_config = PerformanceConfig(
             max_response_time_ms=200,
@@ -136,6 +137,10 @@ class AdvancedRiskEngine:
         # Cache for performance
         self.risk_cache = {}
         self.behavioral_cache = {}
+        
+        # Shared optimizer: Ledoit-Wolf factorizations from the covariance store and per-user warm starts
+        self.covariance_store = covariance_store or shared_covariance_store
+        self.optimization_service = PortfolioOptimizationService(covariance_store=self.covariance_store)
     
     async def calculate_portfolio_risk(
         self,
@@ -356,51 +361,37 @@ class AdvancedRiskEngine:
                     'recommendation': 'Diversify portfolio with additional stocks'
                 }
             
-            # Get historical data for optimization
+            # Expected returns and covariance from the shared store; history is fetched only to seed it
             symbols = [holding['symbol'] for holding in holdings]
-            price_data = await self._fetch_optimization_data(symbols, period=252)
-            
-            # Calculate expected returns and covariance matrix
-            returns = price_data.pct_change().dropna()
-            expected_returns = returns.mean() * 252  # Annualized
-            cov_matrix = returns.cov() * 252  # Annualized
+            as_of = datetime.now().date()
+            model = self.optimization_service.factorization(symbols, as_of)
+            if model is None:
+                price_data = await self._fetch_optimization_data(symbols, period=252)
+                model = self.optimization_service.factorize(price_data.pct_change().dropna(), as_of)
+            symbols = list(model.symbols)
+            expected_returns = model.mean  # Annualized
+            cov_matrix = model.covariance  # Annualized
             
             # Set optimization parameters
             target_ret = target_return or self.optimization_params['target_return']
             max_vol = max_volatility or self.optimization_params['max_volatility']
             
-            # Optimization constraints
-            constraints = [
-                {'type': 'eq', 'fun': lambda w: np.sum(w) - 1},  # Weights sum to 1
-                {'type': 'ineq', 'fun': lambda w: target_ret - np.dot(w, expected_returns)},  # Min return
-                {'type': 'ineq', 'fun': lambda w: max_vol - np.sqrt(np.dot(w.T, np.dot(cov_matrix, w)))}  # Max vol
-            ]
-            
-            # Bounds for weights (0% to 40% per stock)
-            bounds = tuple((0, 0.4) for _ in range(len(symbols)))
-            
-            # Initial guess (equal weights)
-            initial_weights = np.array([1/len(symbols)] * len(symbols))
-            
-            # Optimization objective (maximize Sharpe ratio)
-            def objective(weights):
-                portfolio_return = np.dot(weights, expected_returns)
-                portfolio_vol = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-                sharpe_ratio = (portfolio_return - self.optimization_params['risk_free_rate']) / portfolio_vol
-                return -sharpe_ratio  # Minimize negative Sharpe ratio
-            
-            # Run optimization
-            optimization_result = minimize(
-                objective,
-                initial_weights,
-                method='SLSQP',
-                bounds=bounds,
-                constraints=constraints,
-                options={'maxiter': 1000}
+            # Maximize Sharpe ratio: fully invested, 0% to 40% per stock, at least the
+            # target return and at most the volatility cap; warm-started from the last run
+            optimization_result = self.optimization_service.optimize(
+                model,
+                'max_sharpe',
+                OptimizationConstraints(
+                    max_weight=0.4,
+                    risk_free_rate=self.optimization_params['risk_free_rate'],
+                    target_return=target_ret,
+                    max_volatility=max_vol
+                ),
+                key=user_id
             )
             
-            if optimization_result.success:
-                optimal_weights = optimization_result.x
+            if optimization_result.converged:
+                optimal_weights = optimization_result.weights
                 
                 # Calculate optimized portfolio metrics
                 opt_return = np.dot(optimal_weights, expected_returns)
@@ -408,9 +399,10 @@ class AdvancedRiskEngine:
                 opt_sharpe = (opt_return - self.optimization_params['risk_free_rate']) / opt_volatility
                 
                 # Calculate current portfolio metrics for comparison
+                current_values = {holding['symbol']: holding['current_value'] for holding in holdings}
                 current_weights = np.array([
-                    holding['current_value'] / current_portfolio['total_value'] 
-                    for holding in holdings
+                    current_values[symbol] / current_portfolio['total_value'] 
+                    for symbol in symbols
                 ])
                 current_return = np.dot(current_weights, expected_returns)
                 current_volatility = np.sqrt(np.dot(current_weights.T, np.dot(cov_matrix, current_weights)))
@@ -0,0 +1,452 @@
+"""
+TradeMate Backtesting Engine Test Suite
+=======================================
+Indexed (offset-walking) backtest mode: vectorized strategy parity,
+legacy equivalence, the history cutoff against legacy and a 10 year x
+200 symbol benchmark
+"""
+
+import pytest
+import asyncio
+import math
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import List, Optional
+
+from app.ai_trading.algorithmic_trading_engine import (
+    TradingStrategy, MeanReversionStrategy, MomentumStrategy, StrategyType, TradingSignal
+)
+from app.ai_trading.backtesting_framework import (
+    BacktestingEngine, BacktestConfig, BacktestMode, ExecutionModel, CostModel, MarketDataIndex,
+    MarketDataPanel, Position, Trade, TradeLedger, EquityLedger
+)
+
+
+def _market_data(symbols: List[str], start: str, end: str, seed: int = 7) -> pd.DataFrame:
+    """Daily random-walk bars on business days, one block per symbol"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, end)
+    frames = []
+    for symbol in symbols:
+        close = 1000.0 * np.exp(np.cumsum(rng.normal(0, 0.015, len(dates))))
+        frames.append(pd.DataFrame({
+            'timestamp': dates,
+            'symbol': symbol,
+            'open': close * (1 + rng.normal(0, 0.002, len(dates))),
+            'high': close * 1.01,
+            'low': close * 0.99,
+            'close': close,
+            'volume': rng.integers(100_000, 3_000_000, len(dates))
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _config(start: datetime, end: datetime, mode: BacktestMode) -> BacktestConfig:
+    """End-of-day backtest: the engine steps days at the start time, which must fall in market hours"""
+    return BacktestConfig(
+        start_date=start.replace(hour=15, minute=30),
+        end_date=end.replace(hour=15, minute=30),
+        initial_capital=10_000_000.0,
+        execution_model=ExecutionModel.REALISTIC,
+        cost_model=CostModel.INDIAN_RETAIL,
+        benchmark_symbol="NIFTY50",
+        mode=mode
+    )
+
+
+def _strategies():
+    return {
+        "mean_reversion": MeanReversionStrategy(
+            "mr_1", StrategyType.MEAN_REVERSION, {'lookback_window': 20, 'entry_threshold': 2.0}
+        ),
+        "momentum": MomentumStrategy(
+            "mom_1", StrategyType.MOMENTUM, {'momentum_period': 10, 'strength_threshold': 4.0}
+        )
+    }
+
+
+class RecordingStrategy(TradingStrategy):
+    """Strategy without a vectorized path; records the history views it receives"""
+
+    def __init__(self):
+        super().__init__("recorder", StrategyType.MEAN_REVERSION, {})
+        self.calls = []
+
+    async def generate_signal(self, data: pd.DataFrame, current_price: float) -> Optional[TradingSignal]:
+        self.calls.append((data['symbol'].iloc[-1], len(data), current_price, data))
+        return None
+
+
+class TestPrecomputedSignals:
+    """Vectorized strategy paths agree with bar-by-bar generate_signal"""
+
+    @pytest.mark.parametrize("strategy", [
+        MeanReversionStrategy("mr", StrategyType.MEAN_REVERSION, {'lookback_window': 20, 'entry_threshold': 1.5}),
+        MomentumStrategy("mom", StrategyType.MOMENTUM, {'momentum_period': 10, 'strength_threshold': 2.0})
+    ], ids=["mean_reversion", "momentum"])
+    def test_matches_generate_signal_for_every_prefix(self, strategy):
+        data = _market_data(["RELIANCE"], "2023-01-02", "2023-12-29")
+        close = data['close'].to_numpy()
+        precomputed = strategy.precompute_signals(close)
+
+        fired = 0
+        for i in range(len(data)):
+            expected = asyncio.run(strategy.generate_signal(data.iloc[:i + 1], close[i]))
+            actual = strategy.signal_at(precomputed, i, "RELIANCE")
+
+            assert (expected is None) == (actual is None), f"bar {i}"
+            if expected is None:
+                continue
+            fired += 1
+            assert actual.signal_type == expected.signal_type
+            assert actual.symbol == expected.symbol
+            assert actual.position_size == expected.position_size
+            for attribute in ("entry_price", "confidence", "strength", "target_price", "stop_loss"):
+                assert getattr(actual, attribute) == pytest.approx(getattr(expected, attribute), rel=1e-9)
+            assert actual.metadata.keys() == expected.metadata.keys()
+
+        assert fired > 0
+
+    def test_base_strategy_has_no_vectorized_path(self):
+        assert RecordingStrategy().precompute_signals(np.arange(50.0)) is None
+
+
+class TestMarketDataIndex:
+    """Sort-once index and zero-copy prefix views"""
+
+    def test_blocks_and_day_offsets(self):
+        data = _market_data(["TCS", "INFY", "RELIANCE"], "2024-01-01", "2024-03-29")
+        shuffled = data.sample(frac=1.0, random_state=3).reset_index(drop=True)
+        shuffled = shuffled[~((shuffled['symbol'] == "TCS") & (shuffled['timestamp'] == "2024-02-05"))]
+
+        index = MarketDataIndex(shuffled)
+
+        assert index.symbols == ["INFY", "RELIANCE", "TCS"]
+        for s, symbol in enumerate(index.symbols):
+            block = index.frame.iloc[index.starts[s]:index.ends[s]]
+            assert (block['symbol'] == symbol).all()
+            assert block['timestamp'].is_monotonic_increasing
+
+        day = index.day_lookup[datetime(2024, 2, 5).date()]
+        tcs = index.symbols.index("TCS")
+        assert not index.has_bar[tcs, day]
+        assert index.has_bar[:, day].sum() == 2
+        assert index.day_ends[tcs, day] == index.day_ends[tcs, day - 1]
+
+    def test_history_is_a_zero_copy_prefix(self):
+        data = _market_data(["TCS", "INFY"], "2024-01-01", "2024-03-29")
+        index = MarketDataIndex(data)
+        day = index.day_lookup[datetime(2024, 2, 1).date()]
+
+        history = index.history(0, day)
+
+        assert history['timestamp'].iloc[-1] == pd.Timestamp("2024-02-01")
+        assert (history['symbol'] == "INFY").all()
+        assert np.shares_memory(history['close'].to_numpy(), index.frame['close'].to_numpy())
+
+
+class TestIndexedBacktest:
+    """Indexed mode reproduces the legacy engine"""
+
+    def test_matches_legacy_on_single_symbol(self):
+        data = _market_data(["RELIANCE"], "2023-01-02", "2023-12-29", seed=11)
+        start, end = datetime(2023, 1, 2), datetime(2023, 12, 29)
+
+        legacy = asyncio.run(BacktestingEngine(_config(start, end, BacktestMode.LEGACY)).run_backtest(
+            _strategies(), data.copy()
+        ))
+        indexed = asyncio.run(BacktestingEngine(_config(start, end, BacktestMode.INDEXED)).run_backtest(
+            _strategies(), data.copy()
+        ))
+
+        assert len(indexed.all_trades) == len(legacy.all_trades) > 0
+        for ours, theirs in zip(indexed.all_trades, legacy.all_trades):
+            assert (ours.symbol, ours.side, ours.quantity, ours.entry_time) == \
+                (theirs.symbol, theirs.side, theirs.quantity, theirs.entry_time)
+            assert ours.entry_price == pytest.approx(theirs.entry_price, rel=1e-9)
+
+        assert indexed.final_capital == pytest.approx(legacy.final_capital, rel=1e-9)
+        assert [p['equity'] for p in indexed.equity_curve] == pytest.approx(
+            [p['equity'] for p in legacy.equity_curve], rel=1e-9
+        )
+
+    @pytest.mark.parametrize("hour", [0, 16], ids=["before_clock", "after_clock"])
+    def test_history_cutoff_against_legacy(self, hour):
+        data = _market_data(["TCS"], "2024-02-01", "2024-03-29")
+        data['timestamp'] += pd.Timedelta(hours=hour)
+        views = {}
+        for mode in (BacktestMode.LEGACY, BacktestMode.INDEXED):
+            strategy = RecordingStrategy()
+            engine = BacktestingEngine(_config(datetime(2024, 2, 1), datetime(2024, 3, 29), mode))
+            asyncio.run(engine.run_backtest({"recorder": strategy}, data.copy()))
+            views[mode] = {price: history['timestamp'].iloc[-1] for _, _, price, history in strategy.calls}
+
+        legacy, indexed = views[BacktestMode.LEGACY], views[BacktestMode.INDEXED]
+        if hour == 0:
+            # Bars stamped before the 15:30 clock: identical views
+            assert indexed == legacy
+        else:
+            # Bars stamped after the clock: indexed mode sees the day's bar, legacy the previous day's
+            previous_bar = dict(zip(data['timestamp'].iloc[1:], data['timestamp'].iloc[:-1]))
+            assert len(legacy) == len(indexed) - 1 and legacy.keys() <= indexed.keys()
+            assert all(legacy[price] == previous_bar[indexed[price]] for price in legacy)
+
+    def test_fallback_strategies_get_per_symbol_prefix_views(self):
+        data = _market_data(["TCS", "INFY"], "2024-01-01", "2024-02-29")
+        strategy = RecordingStrategy()
+        engine = BacktestingEngine(_config(datetime(2024, 1, 1), datetime(2024, 2, 29), BacktestMode.INDEXED))
+
+        asyncio.run(engine.run_backtest({"recorder": strategy}, data))
+
+        # Two symbols per trading day once each has 20 bars of history
+        by_symbol = {"TCS": [], "INFY": []}
+        for symbol, length, price, history in strategy.calls:
+            by_symbol[symbol].append(length)
+            assert (history['symbol'] == symbol).all()
+            assert history['close'].iloc[-1] == price
+
+        # Prefixes grow one bar per trading day (26 Jan is a market holiday, so that bar is skipped)
+        assert by_symbol["TCS"] == by_symbol["INFY"]
+        assert by_symbol["TCS"][0] == 21
+        assert by_symbol["TCS"] == list(range(21, 21 + len(by_symbol["TCS"])))
+
+    def test_signals_are_tagged_with_their_symbol(self):
+        data = _market_data(["TCS", "INFY", "HDFCBANK"], "2023-01-02", "2023-12-29")
+        engine = BacktestingEngine(_config(datetime(2023, 1, 2), datetime(2023, 12, 29), BacktestMode.INDEXED))
+
+        results = asyncio.run(engine.run_backtest(_strategies(), data))
+
+        traded = {trade.symbol for trade in results.all_trades}
+        assert traded <= {"TCS", "INFY", "HDFCBANK"}
+        assert len(traded) > 1
+
+
+class TestPortfolioBacktest:
+    """Panel layout and vectorized marks / exits"""
+
+    def test_panel_is_dates_by_symbols(self):
+        data = _market_data(["TCS", "INFY", "RELIANCE"], "2024-01-01", "2024-03-29")
+        data = data[~((data['symbol'] == "TCS") & (data['timestamp'] == "2024-02-05"))]
+        index = MarketDataIndex(data)
+
+        panel = MarketDataPanel(index)
+
+        assert panel.shape == (len(index.trading_days), 3)
+        day = index.day_lookup[datetime(2024, 2, 5).date()]
+        tcs, infy = panel.slots["TCS"], panel.slots["INFY"]
+        assert np.isnan(panel.close[day, tcs]) and panel.rows[day, tcs] == -1
+        expected = data[(data['symbol'] == "INFY") & (data['timestamp'] == "2024-02-05")].iloc[0]
+        assert panel.close[day, infy] == expected['close']
+        assert panel.volume[day, infy] == expected['volume']
+
+    def test_exit_masks_match_exit_reason(self):
+        engine = BacktestingEngine(_config(datetime(2024, 1, 1), datetime(2024, 1, 31), BacktestMode.PORTFOLIO))
+        rng = np.random.default_rng(1)
+        quantity = rng.choice([-100, -5, 5, 100], 2000)
+        avg_cost = rng.uniform(50, 5000, 2000)
+        current = avg_cost * (1 + rng.uniform(-0.2, 0.2, 2000))
+
+        stop_loss, take_profit = engine._exit_masks(quantity, avg_cost, current)
+
+        for q, cost, price, stop, take in zip(quantity, avg_cost, current, stop_loss, take_profit):
+            position = Position("X", int(q), cost, q * cost, 0.0, datetime(2024, 1, 1), datetime(2024, 1, 1))
+            reason = engine._exit_reason(position, price)
+            assert (reason == "stop_loss", reason == "take_profit") == (stop, take)
+
+    def test_matches_indexed_mode(self):
+        data = _market_data([f"NSE{i:03d}" for i in range(12)], "2023-01-02", "2023-12-29", seed=3)
+        start, end = datetime(2023, 1, 2), datetime(2023, 12, 29)
+
+        indexed = asyncio.run(BacktestingEngine(_config(start, end, BacktestMode.INDEXED)).run_backtest(
+            _strategies(), data
+        ))
+        engine = BacktestingEngine(_config(start, end, BacktestMode.PORTFOLIO))
+        portfolio = asyncio.run(engine.run_backtest(_strategies(), data))
+
+        # Same trades; exits on one day may be recorded in a different symbol order
+        def key(trade):
+            return (trade.symbol, trade.quantity, trade.entry_time, trade.exit_time, tuple(trade.tags))
+
+        assert len(portfolio.all_trades) == len(indexed.all_trades) > 0
+        assert sorted(map(key, portfolio.all_trades)) == sorted(map(key, indexed.all_trades))
+        assert [p['equity'] for p in portfolio.equity_curve] == pytest.approx(
+            [p['equity'] for p in indexed.equity_curve], rel=1e-9
+        )
+
+        # The book mirrors the open positions
+        held = {engine.panel.symbols[s]: q for s, q in enumerate(engine.book_quantity) if q}
+        assert held == {symbol: position.quantity for symbol, position in engine.positions.items()}
+
+
+class TestLedgers:
+    """Columnar trade and equity ledgers"""
+
+    def test_trades_read_back_with_integer_ids(self):
+        ledger = TradeLedger()
+        opened = ledger.append("mr_1", "sig-1", "TCS", "buy", 10, 3500.0, datetime(2024, 1, 2, 15, 30),
+                               commission=12.5, slippage=1.0)
+        closed = ledger.append("position_management", "exit", "TCS", "sell", -10, 3500.0,
+                               datetime(2024, 1, 2, 15, 30), exit_price=3600.0,
+                               exit_time=datetime(2024, 1, 9, 15, 30), pnl=980.0, commission=20.0, tag="take_profit")
+
+        assert (opened, closed) == (0, 1)
+        assert ledger[0] == Trade(
+            trade_id=0, strategy_id="mr_1", signal_id="sig-1", symbol="TCS", side="buy", quantity=10,
+            entry_price=3500.0, exit_price=None, entry_time=datetime(2024, 1, 2, 15, 30), exit_time=None,
+            pnl=None, commission=12.5, slippage=1.0, tags=[]
+        )
+        assert ledger[-1].tags == ["take_profit"]
+        assert ledger[-1].exit_time == datetime(2024, 1, 9, 15, 30)
+        assert [t.trade_id for t in ledger] == [0, 1]
+        assert ledger.labels("symbol") == ["TCS"]
+
+        pnl = ledger.column("pnl")
+        assert math.isnan(pnl[0]) and pnl[1] == 980.0
+        assert np.isnat(ledger.column("exit_time")[0])
+
+    def test_appends_continue_after_reading_a_column(self):
+        ledger = TradeLedger()
+        ledger.append("mr_1", "sig-0", "TCS", "buy", 10, 3500.0, datetime(2024, 1, 2, 15, 30))
+        quantity, entry_time = ledger.column("quantity"), ledger.column("entry_time")
+
+        for i in range(1, 100):  # enough rows for the arrays to reallocate
+            ledger.append("mr_1", f"sig-{i}", "TCS", "buy", 10 + i, 3500.0, datetime(2024, 1, 2, 15, 30))
+
+        assert list(quantity) == [10] and len(entry_time) == 1
+        assert ledger.column("quantity").tolist() == list(range(10, 110))
+
+    def test_frame_export(self):
+        ledger = TradeLedger()
+        for i in range(5):
+            ledger.append("mom_1", f"sig-{i}", "INFY" if i % 2 else "TCS", "buy" if i % 2 else "sell",
+                          i + 1, 1500.0 + i, datetime(2024, 1, 2 + i, 15, 30))
+
+        frame = ledger.to_frame()
+
+        assert list(frame['trade_id']) == [0, 1, 2, 3, 4]
+        assert frame['symbol'].dtype == "category"
+        assert list(frame['side']) == ["sell", "buy", "sell", "buy", "sell"]
+        assert frame['entry_time'].dtype == "datetime64[ns]"
+        assert frame['exit_time'].isna().all()
+
+    def test_parquet_round_trip(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        ledger = TradeLedger()
+        ledger.append("mr_1", "sig-1", "TCS", "buy", 10, 3500.0, datetime(2024, 1, 2, 15, 30))
+
+        ledger.to_parquet(tmp_path / "trades.parquet")
+        loaded = pd.read_parquet(tmp_path / "trades.parquet")
+
+        assert loaded['symbol'].astype(str).tolist() == ["TCS"]
+        assert ledger.to_arrow().num_rows == 1
+
+    def test_equity_rows_and_period_returns(self):
+        ledger = EquityLedger()
+        returns = [0.0, 0.01, -0.02, 0.03, 0.005]
+        dates = [datetime(2023, 12, 28), datetime(2023, 12, 29), datetime(2024, 1, 1),
+                 datetime(2024, 1, 2), datetime(2024, 2, 1)]
+        for date, daily_return in zip(dates, returns):
+            ledger.append(date, 100.0, 60.0, 40.0, daily_return)
+
+        assert ledger[1] == {'date': dates[1], 'equity': 100.0, 'cash': 60.0,
+                             'positions_value': 40.0, 'daily_return': 0.01}
+        assert ledger.last('date') == dates[-1]
+
+        monthly = BacktestingEngine._compound_by_period(ledger.column('date'), ledger.column('daily_return'), 'M')
+        assert list(monthly) == ["2023-12", "2024-01", "2024-02"]
+        assert monthly["2024-01"] == pytest.approx(0.98 * 1.03 - 1)
+        yearly = BacktestingEngine._compound_by_period(ledger.column('date'), ledger.column('daily_return'), 'Y')
+        assert yearly["2023"] == pytest.approx(0.01)
+
+    def test_results_statistics_come_from_the_ledger(self):
+        data = _market_data(["TCS", "INFY", "HDFCBANK"], "2023-01-02", "2023-12-29")
+        engine = BacktestingEngine(_config(datetime(2023, 1, 2), datetime(2023, 12, 29), BacktestMode.INDEXED))
+
+        results = asyncio.run(engine.run_backtest(_strategies(), data))
+
+        closed = [t for t in results.all_trades if t.pnl is not None]
+        assert results.total_trades == len(closed) > 0
+        assert results.winning_trades == sum(t.pnl > 0 for t in closed)
+        assert results.largest_loss == min(t.pnl for t in closed)
+        assert results.long_trades + results.short_trades == len(closed)
+        assert results.final_capital == results.equity_curve[-1]['equity']
+
+
+class TestBacktestBenchmarks:
+    """Indexed mode at universe scale, and against the legacy path"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="backtest_universe")
+    def test_ten_years_two_hundred_symbols(self, benchmark):
+        symbols = [f"NSE{i:03d}" for i in range(200)]
+        data = _market_data(symbols, "2014-01-01", "2023-12-29")
+        start, end = datetime(2014, 1, 1), datetime(2023, 12, 29)
+        assert len(data) > 500_000
+
+        def run():
+            engine = BacktestingEngine(_config(start, end, BacktestMode.INDEXED))
+            return asyncio.run(engine.run_backtest(_strategies(), data))
+
+        started = time.perf_counter()
+        results = benchmark.pedantic(run, rounds=1, iterations=1)
+        elapsed = time.perf_counter() - started
+
+        benchmark.extra_info.update({"rows": len(data), "trades": len(results.all_trades)})
+        assert results.total_trades >= 0
+        assert elapsed < 60
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="backtest_universe")
+    def test_five_hundred_stock_portfolio(self, benchmark):
+        symbols = [f"NSE{i:03d}" for i in range(500)]
+        data = _market_data(symbols, "2021-01-01", "2023-12-29")
+        start, end = datetime(2021, 1, 1), datetime(2023, 12, 29)
+
+        def run():
+            engine = BacktestingEngine(_config(start, end, BacktestMode.PORTFOLIO))
+            return asyncio.run(engine.run_backtest(_strategies(), data))
+
+        started = time.perf_counter()
+        results = benchmark.pedantic(run, rounds=1, iterations=1)
+        elapsed = time.perf_counter() - started
+
+        benchmark.extra_info.update({"rows": len(data), "trades": len(results.all_trades)})
+        assert len(results.all_trades) > 0
+        assert elapsed < 60
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="backtest_modes")
+    @pytest.mark.parametrize("mode", list(BacktestMode), ids=lambda m: m.value)
+    def test_one_year_ten_symbols(self, benchmark, mode):
+        symbols = [f"NSE{i:03d}" for i in range(10)]
+        data = _market_data(symbols, "2023-01-02", "2023-12-29")
+        start, end = datetime(2023, 1, 2), datetime(2023, 12, 29)
+
+        def run():
+            engine = BacktestingEngine(_config(start, end, mode))
+            return asyncio.run(engine.run_backtest(_strategies(), data.copy()))
+
+        results = benchmark.pedantic(run, rounds=1, iterations=1)
+        assert results.equity_curve
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="trade_ledger")
+    def test_million_trade_ledger(self, benchmark):
+        entry_time = datetime(2024, 1, 2, 9, 15)
+        symbols = [f"NSE{i:03d}" for i in range(200)]
+
+        def fill():
+            ledger = TradeLedger()
+            for i in range(1_000_000):
+                ledger.append("hft_1", "exit", symbols[i % 200], "buy", 10, 100.0 + (i % 7),
+                              entry_time, exit_price=101.0, exit_time=entry_time, pnl=float(i % 11 - 5))
+            return ledger
+
+        ledger = benchmark.pedantic(fill, rounds=1, iterations=1)
+
+        benchmark.extra_info.update({"bytes_per_trade": ledger.nbytes / len(ledger)})
+        assert len(ledger) == 1_000_000
+        assert ledger.nbytes / len(ledger) < 100
+        assert ledger.column('pnl').sum() == pytest.approx(sum(i % 11 - 5 for i in range(1_000_000)))
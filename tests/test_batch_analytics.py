@@ -0,0 +1,234 @@
+"""
+TradeMate Batch Portfolio Analytics Test Suite
+==============================================
+One shared returns matrix for the union of symbols, sparse portfolio
+weights, column-wise risk / performance metrics matching the per-portfolio
+formulas, streamed chunks across worker processes and a 200,000 portfolio
+end-of-day benchmark
+"""
+
+import pytest
+import asyncio
+import random
+import time
+import numpy as np
+
+from app.analytics.portfolio_analytics import (
+    BatchPortfolioResult, PERFORMANCE_METRIC_FIELDS, RISK_METRIC_FIELDS, PortfolioAnalyzer, PortfolioHolding
+)
+
+
+def _book(rng: random.Random, size: int, universe: int = 300) -> list:
+    symbols = rng.sample(range(universe), size)
+    return [PortfolioHolding(f"SYM{s:03d}", 10, 100.0, rng.uniform(1e4, 1e6), 1.0 / size, "IT", "equity")
+            for s in symbols]
+
+
+def _reference_risk(returns: np.ndarray, benchmark: np.ndarray) -> dict:
+    """The original single-portfolio formulas"""
+    var_95, var_99 = np.percentile(returns, 5), np.percentile(returns, 1)
+    growth = np.cumprod(1 + returns)
+    drawdowns = (growth - np.maximum.accumulate(growth)) / np.maximum.accumulate(growth)
+    negative = returns[returns < 0]
+    covariance = np.cov(returns, benchmark)[0, 1]
+    return {
+        "var_95": var_95, "var_99": var_99,
+        "cvar_95": returns[returns <= var_95].mean(), "cvar_99": returns[returns <= var_99].mean(),
+        "max_drawdown": drawdowns.min(), "current_drawdown": drawdowns[-1],
+        "volatility": np.std(returns) * np.sqrt(252),
+        "downside_deviation": np.std(negative) * np.sqrt(252) if len(negative) else 0,
+        "beta": covariance / np.var(benchmark), "correlation_to_market": np.corrcoef(returns, benchmark)[0, 1]
+    }
+
+
+def _reference_performance(returns: np.ndarray, benchmark: np.ndarray, risk_free_rate: float) -> dict:
+    daily_rf = risk_free_rate / 252
+    total_return = np.prod(1 + returns) - 1
+    annualized_return = (1 + total_return) ** (252 / len(returns)) - 1
+    excess, benchmark_excess = returns - daily_rf, benchmark - daily_rf
+    growth = np.cumprod(1 + returns)
+    max_drawdown = np.min((growth - np.maximum.accumulate(growth)) / np.maximum.accumulate(growth))
+    beta = np.cov(excess, benchmark_excess)[0, 1] / np.var(benchmark_excess)
+    active = returns - benchmark
+    return {
+        "total_return": total_return, "annualized_return": annualized_return,
+        "volatility": np.std(returns) * np.sqrt(252),
+        "sharpe_ratio": np.mean(excess) / np.std(excess) * np.sqrt(252),
+        "max_drawdown": max_drawdown, "calmar_ratio": annualized_return / abs(max_drawdown),
+        "alpha": (np.mean(excess) - beta * np.mean(benchmark_excess)) * 252, "beta": beta,
+        "tracking_error": np.std(active) * np.sqrt(252),
+        "information_ratio": np.mean(active) / np.std(active) * np.sqrt(252)
+    }
+
+
+async def _collect(analyzer: PortfolioAnalyzer, books, **kwargs) -> list:
+    return [batch async for batch in analyzer.analyze_portfolios_batch(books, **kwargs)]
+
+
+def _seeded_analyzer(seed: int) -> PortfolioAnalyzer:
+    np.random.seed(seed)
+    return PortfolioAnalyzer()
+
+
+class TestSinglePortfolioMetrics:
+    """The column-wise metrics reproduce the original formulas"""
+
+    def test_risk_and_performance_match_reference(self):
+        analyzer = PortfolioAnalyzer()
+        rng = np.random.default_rng(1)
+        returns, benchmark = rng.normal(0.0008, 0.02, 252), rng.normal(0.0005, 0.015, 252)
+
+        risk = analyzer._calculate_risk_metrics(returns.tolist(), benchmark.tolist())
+        performance = analyzer._calculate_performance_metrics(returns.tolist(), benchmark.tolist(), "P1")
+
+        assert risk.__dict__ == pytest.approx(_reference_risk(returns, benchmark), rel=1e-9)
+        expected = _reference_performance(returns, benchmark, analyzer.risk_free_rate)
+        assert {name: getattr(performance, name) for name in PERFORMANCE_METRIC_FIELDS} == pytest.approx(expected, rel=1e-9)
+
+    def test_edge_cases_keep_original_defaults(self):
+        analyzer = PortfolioAnalyzer()
+        returns = [0.01, -0.02, 0.015, 0.003]
+
+        assert analyzer._calculate_risk_metrics([], []) == analyzer._calculate_risk_metrics([], [0.1])
+        mismatched = analyzer._calculate_risk_metrics(returns, [0.01, 0.02])
+        assert (mismatched.beta, mismatched.correlation_to_market) == (1.0, 0.0)
+        performance = analyzer._calculate_performance_metrics(returns, [0.01, 0.02], "P")
+        assert (performance.alpha, performance.beta, performance.tracking_error) == (0, 0, 0)
+
+        # Without a benchmark a portfolio is compared with itself
+        self_compared = analyzer._calculate_risk_metrics(returns, [])
+        assert self_compared.correlation_to_market == pytest.approx(1.0)
+        assert self_compared.beta == pytest.approx(len(returns) / (len(returns) - 1))
+
+    def test_portfolio_returns_are_weighted_sums(self):
+        analyzer = PortfolioAnalyzer()
+        historical = {"A": {"returns": [0.01, 0.02, 0.03]}, "B": {"returns": [-0.01, 0.0]}}
+
+        returns = analyzer._calculate_portfolio_returns(historical, {"A": 0.25, "B": 0.75, "C": 1.0})
+
+        assert returns == pytest.approx([0.25 * 0.01 - 0.75 * 0.01, 0.25 * 0.02])
+        assert analyzer._calculate_portfolio_returns(historical, {"C": 1.0}) == [0.0, 0.0]
+
+
+class TestBatchPipeline:
+    """Batch results equal per-portfolio analysis on the same history"""
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_per_portfolio_metrics(self):
+        rng = random.Random(2)
+        books = {f"PF{i:03d}": _book(rng, rng.randint(1, 12), universe=40) for i in range(60)}
+        books["EMPTY"] = []
+        analyzer = _seeded_analyzer(3)
+
+        batches = await _collect(analyzer, books, chunk_size=16)
+
+        assert [len(batch) for batch in batches] == [16, 16, 16, 13]
+        results = {r.portfolio_id: r for batch in batches for r in batch}
+        assert list(results) == list(books)
+
+        # Same seed, same fetch order: rebuild the shared history and score each book on its own
+        replay = _seeded_analyzer(3)
+        universe = {}
+        for holdings in books.values():
+            for h in holdings:
+                universe.setdefault(h.symbol, h)
+        historical = await replay._get_historical_data(list(universe.values()), 252)
+        benchmark = replay._calculate_benchmark_returns(await replay._get_benchmark_data(252))
+
+        for book_id, holdings in books.items():
+            result = results[book_id]
+            assert isinstance(result, BatchPortfolioResult)
+            assert result.portfolio_value == pytest.approx(sum(h.market_value for h in holdings))
+            returns = replay._calculate_portfolio_returns(
+                {h.symbol: historical[h.symbol] for h in holdings}, {h.symbol: h.weight for h in holdings}
+            )
+            risk = replay._calculate_risk_metrics(returns, benchmark)
+            performance = replay._calculate_performance_metrics(returns, benchmark, book_id)
+            assert result.risk_metrics.__dict__ == pytest.approx(risk.__dict__, rel=1e-9, abs=1e-12)
+            assert [getattr(result.performance, f) for f in PERFORMANCE_METRIC_FIELDS] == pytest.approx(
+                [getattr(performance, f) for f in PERFORMANCE_METRIC_FIELDS], rel=1e-9, abs=1e-12)
+
+        assert results["EMPTY"].risk_metrics.volatility == 0 and results["EMPTY"].performance.sharpe_ratio == 0
+
+    @pytest.mark.asyncio
+    async def test_history_is_fetched_once_per_symbol(self):
+        rng = random.Random(4)
+        books = [(f"PF{i}", _book(rng, 8, universe=20)) for i in range(30)]
+        analyzer = PortfolioAnalyzer()
+        fetched = []
+        original = analyzer._get_historical_data
+
+        async def counting(holdings, days):
+            fetched.append([h.symbol for h in holdings])
+            return await original(holdings, days)
+
+        analyzer._get_historical_data = counting
+        await _collect(analyzer, books)
+
+        assert len(fetched) == 1
+        assert sorted(fetched[0]) == sorted({h.symbol for _, holdings in books for h in holdings})
+
+    @pytest.mark.asyncio
+    async def test_worker_processes_match_in_process(self):
+        rng = random.Random(5)
+        books = {f"PF{i:03d}": _book(rng, 6, universe=50) for i in range(40)}
+
+        in_process = await _collect(_seeded_analyzer(6), books, chunk_size=10)
+        pooled = await _collect(_seeded_analyzer(6), books, chunk_size=10, max_workers=2)
+
+        assert [len(batch) for batch in pooled] == [10, 10, 10, 10]
+        for a, b in zip((r for batch in in_process for r in batch), (r for batch in pooled for r in batch)):
+            assert a.portfolio_id == b.portfolio_id
+            assert a.risk_metrics == b.risk_metrics
+            assert [getattr(a.performance, f) for f in PERFORMANCE_METRIC_FIELDS] == \
+                [getattr(b.performance, f) for f in PERFORMANCE_METRIC_FIELDS]
+
+    @pytest.mark.asyncio
+    async def test_zero_lookback_gives_zero_metrics(self):
+        books = {"PF": _book(random.Random(7), 3)}
+
+        [[result]] = await _collect(PortfolioAnalyzer(), books, lookback_days=0)
+
+        assert all(getattr(result.risk_metrics, f) == 0 for f in RISK_METRIC_FIELDS)
+
+
+class TestBatchBenchmark:
+    """End-of-day metrics for 200,000 retail portfolios"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="batch_analytics")
+    def test_200000_portfolios(self, benchmark):
+        rng = random.Random(8)
+        holdings = [PortfolioHolding(f"SYM{s:03d}", 10, 100.0, 50_000.0, 0.125, "IT", "equity") for s in range(500)]
+        books = [(f"RETAIL{i:06d}", rng.sample(holdings, 8)) for i in range(200_000)]
+        analyzer = _seeded_analyzer(9)
+        timings = {}
+
+        async def per_portfolio_loop(sample):
+            started = time.perf_counter()
+            for portfolio_id, book in sample:
+                historical = await analyzer._get_historical_data(book, 252)
+                benchmark_returns = analyzer._calculate_benchmark_returns(await analyzer._get_benchmark_data(252))
+                returns = analyzer._calculate_portfolio_returns(historical, {h.symbol: h.weight for h in book})
+                analyzer._calculate_risk_metrics(returns, benchmark_returns)
+                analyzer._calculate_performance_metrics(returns, benchmark_returns, portfolio_id)
+            return (time.perf_counter() - started) / len(sample)
+
+        async def batch():
+            started = time.perf_counter()
+            count = 0
+            async for chunk in analyzer.analyze_portfolios_batch(books, chunk_size=10_000):
+                timings.setdefault("first_chunk", time.perf_counter() - started)
+                count += len(chunk)
+            timings["total"] = time.perf_counter() - started
+            return count
+
+        per_portfolio_seconds = asyncio.run(per_portfolio_loop(books[:200]))
+        count = benchmark.pedantic(lambda: asyncio.run(batch()), rounds=1, iterations=1)
+
+        benchmark.extra_info.update({
+            "portfolios": count, "symbols": 500, "seconds": timings["total"],
+            "first_chunk_seconds": timings["first_chunk"], "per_portfolio_loop_ms": per_portfolio_seconds * 1000
+        })
+        assert count == 200_000
+        assert timings["total"] < per_portfolio_seconds * count / 10
@@ -0,0 +1,174 @@
+"""
+TradeMate Bulk Signal Generation Test Suite
+===========================================
+generate_signals_bulk: parity with per-symbol generation, one shared
+feature frame per symbol, data-version caching, strategies on the
+caller's event loop, pool shutdown and scan throughput
+"""
+
+import pytest
+import asyncio
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from app.ai_trading.algorithmic_trading_engine import (
+    AlgorithmicTradingEngine, FeatureEngineer, MeanReversionStrategy, MomentumStrategy,
+    MLRegressionStrategy, StrategyType, TimeFrame
+)
+
+
+def _engine(symbols, ml: bool = False) -> AlgorithmicTradingEngine:
+    """Engine with mean-reversion and momentum (and optionally ML) strategies for every symbol"""
+    engine = AlgorithmicTradingEngine()
+    for symbol in symbols:
+        for strategy in (
+            MeanReversionStrategy(f"mean_reversion_{symbol}_1d", StrategyType.MEAN_REVERSION, {'entry_threshold': 1.0}),
+            MomentumStrategy(f"momentum_{symbol}_1d", StrategyType.MOMENTUM, {'strength_threshold': 0.5}),
+        ):
+            engine.strategies[strategy.strategy_id] = strategy
+        if ml:
+            strategy = MLRegressionStrategy(f"ml_regression_{symbol}_1d", StrategyType.ML_REGRESSION,
+                                            {'confidence_threshold': 0.0})
+            strategy.trained = True
+            engine.strategies[strategy.strategy_id] = strategy
+    return engine
+
+
+def _bars(symbols, minute: int = 0):
+    return {
+        symbol: {
+            'timestamp': datetime(2024, 1, 2, 9, 15 + minute),
+            'open': 1000.0 + i,
+            'high': 1010.0 + i,
+            'low': 990.0 + i,
+            'close': 1005.0 + i + minute,
+            'volume': 500_000
+        }
+        for i, symbol in enumerate(symbols)
+    }
+
+
+def _summary(signals):
+    return sorted((s.strategy_id, s.signal_type, round(s.entry_price, 6), round(s.confidence, 9)) for s in signals)
+
+
+class TestGenerateSignalsBulk:
+    """Bulk scan behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_matches_per_symbol_generation(self):
+        symbols = [f"NSE{i:03d}" for i in range(40)]
+        bars = _bars(symbols)
+
+        bulk = await _engine(symbols).generate_signals_bulk(bars)
+
+        single = _engine(symbols)
+        expected = {symbol: await single.generate_signals(symbol, bars[symbol]) for symbol in symbols}
+
+        assert set(bulk) == set(symbols)
+        assert all(_summary(bulk[symbol]) == _summary(expected[symbol]) for symbol in symbols)
+        assert sum(map(len, bulk.values())) > 0
+
+    @pytest.mark.asyncio
+    async def test_feature_frame_is_built_once_per_symbol(self):
+        symbols = [f"NSE{i:03d}" for i in range(6)]
+        engine = _engine(symbols, ml=True)
+        original = FeatureEngineer.technical_feature_frame
+
+        with patch.object(FeatureEngineer, "technical_feature_frame", autospec=True,
+                          side_effect=original) as technical, \
+                patch.object(FeatureEngineer, "generate_technical_features", autospec=True) as full:
+            await engine.generate_signals_bulk(_bars(symbols))
+
+        # Three strategies per symbol, including the ML strategy that builds its own features
+        assert technical.call_count == len(symbols)
+        assert full.call_count == 0
+
+    @pytest.mark.asyncio
+    async def test_feature_frames_are_cached_by_data_version(self):
+        symbols = ["RELIANCE", "TCS"]
+        engine = _engine(symbols)
+
+        with patch.object(engine, "_market_data_frame", wraps=engine._market_data_frame) as prepare:
+            await engine.generate_signals_bulk(_bars(symbols))
+            await engine.generate_signals_bulk(_bars(symbols))
+            assert prepare.call_count == 2
+
+            await engine.generate_signals_bulk(_bars(symbols, minute=1))
+            assert prepare.call_count == 4
+
+        assert set(engine.market_data_cache) == {("RELIANCE", TimeFrame.DAY_1), ("TCS", TimeFrame.DAY_1)}
+
+    @pytest.mark.asyncio
+    async def test_symbols_without_strategies_get_empty_lists(self):
+        engine = _engine(["RELIANCE"])
+
+        results = await engine.generate_signals_bulk(_bars(["INFY", "HDFCBANK"]))
+
+        assert results == {"INFY": [], "HDFCBANK": []}
+        assert engine.market_data_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_strategies_run_on_the_callers_event_loop(self):
+        symbols = [f"NSE{i:03d}" for i in range(12)]
+        engine = _engine(symbols)
+        loops = set()
+        original = MomentumStrategy.generate_signal
+
+        async def generate_signal(strategy, data, current_price):
+            loops.add(asyncio.get_running_loop())
+            return await original(strategy, data, current_price)
+
+        with patch.object(MomentumStrategy, "generate_signal", autospec=True, side_effect=generate_signal), \
+                patch("asyncio.run") as run:
+            await engine.generate_signals_bulk(_bars(symbols))
+
+        assert loops == {asyncio.get_running_loop()}
+        assert run.call_count == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_shuts_the_pool_down(self):
+        symbols = ["RELIANCE", "TCS"]
+        engine = _engine(symbols)
+        await engine.generate_signals_bulk(_bars(symbols))
+        pool = engine._signal_pool
+
+        await engine.stop()
+
+        assert engine._signal_pool is None and pool._shutdown
+        results = await engine.generate_signals_bulk(_bars(symbols, minute=1))
+        assert set(results) == set(symbols) and engine._signal_pool is not pool
+        await engine.stop()
+
+
+class TestBulkScanBenchmark:
+    """Universe scan throughput: fresh bars and unchanged bars"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="signal_scan")
+    def test_scan_universe(self, benchmark):
+        symbols = [f"NSE{i:04d}" for i in range(300)]
+        engine = _engine(symbols)
+        timings = {}
+
+        async def scan():
+            started = time.perf_counter()
+            results = await engine.generate_signals_bulk(_bars(symbols))
+            timings['fresh'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await engine.generate_signals_bulk(_bars(symbols))
+            timings['cached'] = time.perf_counter() - started
+            return results
+
+        results = benchmark.pedantic(lambda: asyncio.run(scan()), rounds=1, iterations=1)
+
+        benchmark.extra_info.update({
+            "symbols": len(symbols),
+            "workers": engine.signal_workers,
+            "fresh_ms_per_symbol": timings['fresh'] / len(symbols) * 1000,
+            "cached_ms_per_symbol": timings['cached'] / len(symbols) * 1000
+        })
+        assert len(results) == len(symbols)
+        assert timings['cached'] < timings['fresh'] / 5
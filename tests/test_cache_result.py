@@ -0,0 +1,142 @@
+"""
+TradeMate Cache Decorator Test Suite
+====================================
+cache_result behaviour of TradeMatePerformanceSystem: single-flight on
+concurrent misses, stale-while-revalidate with one background refresh
+and probabilistic (XFetch) early refresh
+"""
+
+import pytest
+import asyncio
+import sys
+import types
+import time
+from unittest.mock import patch
+
+try:
+    import aioredis  # noqa: F401
+except Exception:  # not installed, or incompatible with this Python
+    sys.modules["aioredis"] = types.ModuleType("aioredis")
+
+from app.core.performance import CachedResult, TradeMatePerformanceSystem
+
+
+class QuoteSource:
+    """Counting, slow upstream whose answer changes on every call"""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, symbol: str) -> dict:
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        return {"symbol": symbol, "version": call}
+
+
+def _cached(system: TradeMatePerformanceSystem, source: QuoteSource, **options):
+    return system.cache_result(ttl=60, key_generator=lambda symbol: f"quote:{symbol}", **options)(source)
+
+
+class TestSingleFlight:
+    """Concurrent misses share one computation"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self):
+        system, source = TradeMatePerformanceSystem(), QuoteSource()
+        quote = _cached(system, source)
+
+        results = await asyncio.gather(*(quote("TCS") for _ in range(50)))
+
+        assert source.calls == 1
+        assert all(result == {"symbol": "TCS", "version": 1} for result in results)
+        assert system.cache_stats["coalesced"] == 49
+        assert not system.inflight
+        assert await quote("TCS") == {"symbol": "TCS", "version": 1} and source.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_shared_computation(self):
+        system, source = TradeMatePerformanceSystem(), QuoteSource()
+        quote = _cached(system, source)
+
+        first = asyncio.ensure_future(quote("INFY"))
+        second = asyncio.ensure_future(quote("INFY"))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == {"symbol": "INFY", "version": 1}
+        assert first.cancelled() and source.calls == 1
+
+
+class TestStaleWhileRevalidate:
+    """Expired entries are served stale while exactly one refresh runs"""
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_served_stale_with_one_background_refresh(self):
+        system, source = TradeMatePerformanceSystem(), QuoteSource()
+        quote = _cached(system, source, stale_while_revalidate=30)
+        await quote("TCS")
+        system.memory_cache.get("quote:TCS").expires_at = time.time() - 1  # past its fresh TTL
+
+        results = await asyncio.gather(*(quote("TCS") for _ in range(20)))
+
+        assert all(result["version"] == 1 for result in results)  # no caller waited for the refresh
+        assert system.cache_stats["stale_served"] == 20
+        assert list(system.inflight) == ["quote:TCS"]
+        await system.inflight["quote:TCS"]
+        assert source.calls == 2
+        assert await quote("TCS") == {"symbol": "TCS", "version": 2}
+
+    @pytest.mark.asyncio
+    async def test_past_the_stale_window_callers_wait_for_one_computation(self):
+        system, source = TradeMatePerformanceSystem(), QuoteSource()
+        quote = _cached(system, source, stale_while_revalidate=30)
+        await quote("TCS")
+        system.memory_cache.get("quote:TCS").expires_at = time.time() - 31
+
+        results = await asyncio.gather(*(quote("TCS") for _ in range(5)))
+
+        assert [result["version"] for result in results] == [2] * 5
+        assert source.calls == 2 and system.cache_stats["stale_served"] == 0
+
+
+class TestEarlyRefresh:
+    """XFetch refreshes before expiry in proportion to the last compute time"""
+
+    @staticmethod
+    def _envelope(compute_time: float, expires_in: float) -> CachedResult:
+        now = time.time()
+        return CachedResult({"symbol": "TCS", "version": 0}, now, now + expires_in, compute_time)
+
+    def test_decision_follows_the_random_draw(self):
+        system = TradeMatePerformanceSystem()
+        cached = self._envelope(compute_time=1.0, expires_in=0.5)
+        now = cached.computed_at
+
+        with patch("app.core.performance.random.random", return_value=0.1):  # gap = -ln(0.9) ~ 0.105 s
+            assert not system._should_refresh_early(cached, 1.0, now)
+        with patch("app.core.performance.random.random", return_value=0.9):  # gap = -ln(0.1) ~ 2.3 s
+            assert system._should_refresh_early(cached, 1.0, now)
+            assert not system._should_refresh_early(self._envelope(1.0, 5.0), 1.0, now)
+            assert system._should_refresh_early(self._envelope(1.0, 5.0), 3.0, now)  # larger beta, earlier
+
+    @pytest.mark.asyncio
+    async def test_early_refresh_serves_cached_value_and_refreshes_once(self):
+        system, source = TradeMatePerformanceSystem(), QuoteSource()
+        quote = _cached(system, source, early_refresh_beta=1.0)
+        await quote("TCS")
+        entry = system.memory_cache.get("quote:TCS")
+        entry.compute_time, entry.expires_at = 1.0, time.time() + 0.5
+
+        with patch("app.core.performance.random.random", return_value=0.9):
+            results = await asyncio.gather(*(quote("TCS") for _ in range(10)))
+
+        assert all(result["version"] == 1 for result in results)
+        assert system.cache_stats["early_refreshes"] == 10 and list(system.inflight) == ["quote:TCS"]
+        await system.inflight["quote:TCS"]
+        assert source.calls == 2
+
+        with patch("app.core.performance.random.random", return_value=0.0):
+            assert await quote("TCS") == {"symbol": "TCS", "version": 2}
+        assert source.calls == 2 and system.cache_stats["early_refreshes"] == 10
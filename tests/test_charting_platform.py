@@ -25,7 +25,13 @@ from freezegun import freeze_time
 from app.pro.charting_platform import (
     ChartingEngine, TechnicalAnalysisEngine, RealTimeDataFeed,
     OHLCV, TechnicalIndicator, ChartPattern, DrawingTool, ChartAlert,
-    ChartType, TimeFrame, IndicatorType, PatternType
+    ChartType, TimeFrame, IndicatorType, PatternType,
+    OHLCVRingBuffer, OHLCVStore, CandleAggregator, session_period, IST
+)
+from app.pro import indicator_kernels
+from app.pro.streaming_indicators import (
+    StreamingSMA, StreamingEMA, StreamingRSI, StreamingMACD,
+    StreamingBollingerBands, StreamingATR, StreamingVWAP, create_streaming_indicator
 )
 from app.lite.basic_charting import (
     BasicChartingEngine, LiteChartMessaging, BasicChart, BasicCandle,
@@ -1027,6 +1033,516 @@ class TestErrorHandling:
         assert summary == "Chart not found"
 
 
+class LegacyIndicators:
+    """Pre-vectorization loop implementations, kept as accuracy oracle and benchmark baseline"""
+    
+    @staticmethod
+    def sma(data: List[float], period: int) -> List[float]:
+        if len(data) < period:
+            return []
+        return [sum(data[i - period + 1:i + 1]) / period for i in range(period - 1, len(data))]
+    
+    @staticmethod
+    def ema(data: List[float], period: int) -> List[float]:
+        if len(data) < period:
+            return []
+        multiplier = 2 / (period + 1)
+        ema = sum(data[:period]) / period
+        values = [ema]
+        for i in range(period, len(data)):
+            ema = (data[i] * multiplier) + (ema * (1 - multiplier))
+            values.append(ema)
+        return values
+    
+    @staticmethod
+    def rsi(data: List[float], period: int = 14) -> List[float]:
+        if len(data) < period + 1:
+            return []
+        gains = [max(data[i] - data[i - 1], 0) for i in range(1, len(data))]
+        losses = [max(data[i - 1] - data[i], 0) for i in range(1, len(data))]
+        avg_gain = sum(gains[:period]) / period
+        avg_loss = sum(losses[:period]) / period
+        values = []
+        for i in range(period, len(gains)):
+            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+            values.append(100 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss)))
+        return values
+    
+    @staticmethod
+    def macd(data: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, List[float]]:
+        ema_fast = LegacyIndicators.ema(data, fast)
+        ema_slow = LegacyIndicators.ema(data, slow)
+        if not ema_fast or not ema_slow:
+            return {"macd": [], "signal": [], "histogram": []}
+        offset = slow - fast
+        macd_line = [ema_fast[i + offset] - ema_slow[i] for i in range(len(ema_slow))]
+        signal_line = LegacyIndicators.ema(macd_line, signal)
+        offset_signal = len(macd_line) - len(signal_line)
+        histogram = [macd_line[i + offset_signal] - signal_line[i] for i in range(len(signal_line))]
+        return {"macd": macd_line, "signal": signal_line, "histogram": histogram}
+    
+    @staticmethod
+    def bollinger_bands(data: List[float], period: int = 20, std_dev: float = 2) -> Dict[str, List[float]]:
+        if len(data) < period:
+            return {"upper": [], "middle": [], "lower": []}
+        middle = LegacyIndicators.sma(data, period)
+        upper, lower = [], []
+        for i in range(period - 1, len(data)):
+            std = np.std(data[i - period + 1:i + 1])
+            upper.append(middle[i - period + 1] + std * std_dev)
+            lower.append(middle[i - period + 1] - std * std_dev)
+        return {"upper": upper, "middle": middle, "lower": lower}
+
+
+def _random_walk_closes(count: int, seed: int = 7) -> List[float]:
+    """Minute-bar style random walk around 2500"""
+    rng = np.random.default_rng(seed)
+    return (2500.0 + np.cumsum(rng.normal(0, 5, count))).tolist()
+
+
+class TestVectorizedIndicatorKernels:
+    """Vectorized kernels must match the legacy loop implementations"""
+    
+    def test_kernels_match_legacy_indicators(self):
+        engine = TechnicalAnalysisEngine()
+        closes = _random_walk_closes(5000)
+        
+        np.testing.assert_allclose(engine.calculate_sma(closes, 20), LegacyIndicators.sma(closes, 20), rtol=1e-10)
+        np.testing.assert_allclose(engine.calculate_ema(closes, 20), LegacyIndicators.ema(closes, 20), rtol=1e-10)
+        np.testing.assert_allclose(engine.calculate_rsi(closes, 14), LegacyIndicators.rsi(closes, 14), rtol=1e-8)
+        
+        macd = engine.calculate_macd(closes)
+        legacy_macd = LegacyIndicators.macd(closes)
+        for line in ("macd", "signal", "histogram"):
+            np.testing.assert_allclose(macd[line], legacy_macd[line], rtol=1e-8, atol=1e-9)
+        
+        bands = engine.calculate_bollinger_bands(closes, 20, 2)
+        legacy_bands = LegacyIndicators.bollinger_bands(closes, 20, 2)
+        for band in ("upper", "middle", "lower"):
+            np.testing.assert_allclose(bands[band], legacy_bands[band], rtol=1e-9)
+    
+    def test_list_api_returns_python_floats(self):
+        engine = TechnicalAnalysisEngine()
+        closes = _random_walk_closes(100)
+        
+        assert all(type(val) is float for val in engine.calculate_sma(closes, 10))
+        assert all(type(val) is float for val in engine.calculate_macd(closes)["histogram"])
+        assert engine.calculate_rsi([1, 2, 3], 14) == []
+        assert engine.calculate_bollinger_bands([1.0], 20) == {"upper": [], "middle": [], "lower": []}
+    
+    def test_nan_only_poisons_its_windows(self):
+        values = indicator_kernels.as_float_array([1.0, 2.0, float("nan"), 4.0, 5.0, 6.0, 7.0])
+        
+        result = indicator_kernels.sma(values, 2)
+        
+        assert np.isnan(result[1]) and np.isnan(result[2])
+        np.testing.assert_allclose(result[[0, 3, 4, 5]], [1.5, 4.5, 5.5, 6.5])
+    
+    def test_rolling_variance_is_stable_for_large_offsets(self):
+        values = indicator_kernels.as_float_array(1e6 + np.random.default_rng(1).normal(0, 1, 10_000))
+        windows = indicator_kernels.rolling_window(values, 50)
+        
+        np.testing.assert_allclose(
+            indicator_kernels.rolling_variance(values, 50), windows.var(axis=1), rtol=1e-6
+        )
+    
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="indicator_kernels")
+    @pytest.mark.parametrize("implementation", ["legacy", "vectorized"])
+    @pytest.mark.parametrize("bars", [1_000, 100_000, 1_000_000])
+    def test_indicator_suite_benchmark(self, benchmark, implementation, bars):
+        """SMA + RSI + MACD + Bollinger over minute-bar histories, old vs new"""
+        
+        closes = _random_walk_closes(bars)
+        engine = LegacyIndicators if implementation == "legacy" else TechnicalAnalysisEngine()
+        
+        def run_suite():
+            if implementation == "legacy":
+                return (engine.sma(closes, 20), engine.rsi(closes, 14),
+                        engine.macd(closes), engine.bollinger_bands(closes, 20, 2))
+            return (engine.calculate_sma(closes, 20), engine.calculate_rsi(closes, 14),
+                    engine.calculate_macd(closes), engine.calculate_bollinger_bands(closes, 20, 2))
+        
+        # The legacy path takes tens of seconds at 1M bars; one round is enough to compare
+        rounds = 1 if implementation == "legacy" and bars > 1_000 else 5
+        sma_values, _, _, _ = benchmark.pedantic(run_suite, rounds=rounds, iterations=1)
+        
+        assert len(sma_values) == bars - 19
+
+
+def _multi_session_bars(count: int, seed: int = 11) -> List[OHLCV]:
+    """Minute bars spanning several trading days, with some zero-volume bars"""
+    rng = np.random.default_rng(seed)
+    session_start = datetime(2024, 1, 1, 9, 15)
+    bars = []
+    price = 2500.0
+    
+    for i in range(count):
+        day, minute = divmod(i, 375)  # 375 minutes in an NSE session
+        price += rng.normal(0, 5)
+        open_price = price + rng.normal(0, 2)
+        close_price = price + rng.normal(0, 2)
+        bars.append(OHLCV(
+            timestamp=session_start + timedelta(days=day, minutes=minute),
+            open=open_price,
+            high=max(open_price, close_price) + abs(rng.normal(0, 4)),
+            low=min(open_price, close_price) - abs(rng.normal(0, 4)),
+            close=close_price,
+            volume=0 if i % 97 == 0 else int(rng.integers(1000, 20000)),
+            symbol="RELIANCE",
+            timeframe=TimeFrame.ONE_MINUTE
+        ))
+    
+    return bars
+
+
+def _stream(indicator, bars: List[OHLCV], line: str = "value") -> List[float]:
+    """Feed bars one by one, collecting a snapshot line once warmed up"""
+    values = []
+    for bar in bars:
+        if indicator.update(bar) is not None and indicator.snapshot()[line] is not None:
+            values.append(indicator.snapshot()[line])
+    return values
+
+
+class TestStreamingIndicators:
+    """Streaming indicators must reproduce batch TechnicalAnalysisEngine output"""
+    
+    @pytest.fixture(autouse=True)
+    def session_bars(self):
+        self.BARS = _multi_session_bars(3000)
+        self.CLOSES = [bar.close for bar in self.BARS]
+    
+    def test_sma_matches_batch(self):
+        batch = TechnicalAnalysisEngine().calculate_sma(self.CLOSES, 20)
+        np.testing.assert_allclose(_stream(StreamingSMA(20), self.BARS), batch, rtol=1e-10)
+    
+    def test_ema_matches_batch(self):
+        batch = TechnicalAnalysisEngine().calculate_ema(self.CLOSES, 20)
+        np.testing.assert_allclose(_stream(StreamingEMA(20), self.BARS), batch, rtol=1e-10)
+    
+    def test_rsi_matches_batch(self):
+        batch = TechnicalAnalysisEngine().calculate_rsi(self.CLOSES, 14)
+        np.testing.assert_allclose(_stream(StreamingRSI(14), self.BARS), batch, rtol=1e-8)
+    
+    def test_macd_matches_batch(self):
+        batch = TechnicalAnalysisEngine().calculate_macd(self.CLOSES, 12, 26, 9)
+        
+        for line in ("macd", "signal", "histogram"):
+            streamed = _stream(StreamingMACD(12, 26, 9), self.BARS, line)
+            np.testing.assert_allclose(streamed, batch[line], rtol=1e-7, atol=1e-9)
+    
+    def test_bollinger_matches_batch(self):
+        batch = TechnicalAnalysisEngine().calculate_bollinger_bands(self.CLOSES, 20, 2)
+        
+        for line in ("upper", "middle", "lower"):
+            streamed = _stream(StreamingBollingerBands(20, 2), self.BARS, line)
+            np.testing.assert_allclose(streamed, batch[line], rtol=1e-9)
+    
+    def test_atr_matches_batch(self):
+        batch = TechnicalAnalysisEngine().calculate_atr(self.BARS, 14)
+        np.testing.assert_allclose(_stream(StreamingATR(14), self.BARS), batch, rtol=1e-9)
+    
+    def test_vwap_matches_batch_and_resets_each_session(self):
+        batch = TechnicalAnalysisEngine().calculate_vwap(self.BARS)
+        streamed = _stream(StreamingVWAP(), self.BARS)
+        
+        np.testing.assert_allclose(streamed, batch, rtol=1e-10)
+        
+        # First bar of day two only reflects its own typical price (or volume-weighted self)
+        day_two = self.BARS[375]
+        typical = (day_two.high + day_two.low + day_two.close) / 3
+        assert abs(batch[375] - typical) < 1e-9
+    
+    def test_factory_covers_supported_types(self):
+        for name in ("SMA", "EMA", "RSI", "MACD", "BB", "ATR", "VWAP"):
+            assert create_streaming_indicator(name, {}) is not None
+        assert create_streaming_indicator("ICHIMOKU", {}) is None
+    
+    @pytest.mark.asyncio
+    async def test_live_ticks_extend_chart_indicators(self):
+        engine = ChartingEngine(RealTimeDataFeed())
+        history, live = self.BARS[:2000], self.BARS[2000:]
+        
+        with patch.object(engine.data_feed, 'subscribe_symbol', new=AsyncMock()):
+            with patch.object(engine, '_load_historical_data', new=AsyncMock(return_value=list(history))):
+                chart_id = await engine.create_chart("pro_user", "RELIANCE", TimeFrame.ONE_MINUTE)
+        
+        indicator_ids = {}
+        for indicator_type, params in [(IndicatorType.SMA, {"period": 20}), (IndicatorType.RSI, {"period": 14}),
+                                       (IndicatorType.ATR, {"period": 14}), (IndicatorType.VWAP, {})]:
+            indicator_ids[indicator_type] = await engine.add_indicator(chart_id, indicator_type, params)
+        
+        for bar in live:
+            engine._update_chart_data(chart_id, "RELIANCE", TimeFrame.ONE_MINUTE, bar)
+        
+        indicators = {ind.type: ind for ind in engine.indicators[chart_id]}
+        technical = TechnicalAnalysisEngine()
+        
+        assert indicators[IndicatorType.SMA].values[-1] == pytest.approx(technical.calculate_sma(self.CLOSES, 20)[-1], rel=1e-10)
+        assert indicators[IndicatorType.RSI].values[-1] == pytest.approx(technical.calculate_rsi(self.CLOSES, 14)[-1], rel=1e-8)
+        assert indicators[IndicatorType.ATR].values[-1] == pytest.approx(technical.calculate_atr(self.BARS, 14)[-1], rel=1e-9)
+        assert indicators[IndicatorType.VWAP].values[-1] == pytest.approx(technical.calculate_vwap(self.BARS)[-1], rel=1e-10)
+        assert indicators[IndicatorType.SMA].timestamps[-1] == live[-1].timestamp
+        
+        snapshot = engine.get_streaming_snapshot(chart_id)
+        assert set(snapshot) == set(indicator_ids.values())
+
+
+class TestOHLCVRingBuffer:
+    """Columnar ring buffer backing PRO charts"""
+    
+    @pytest.fixture(autouse=True)
+    def session_bars(self):
+        self.BARS = _multi_session_bars(20)
+    
+    def test_wraparound_keeps_latest_bars_in_order(self):
+        buffer = OHLCVRingBuffer("RELIANCE", TimeFrame.ONE_MINUTE, capacity=8)
+        for bar in self.BARS:
+            buffer.append(bar)
+        
+        assert len(buffer) == 8
+        assert buffer.to_list() == self.BARS[-8:]
+        assert buffer[-1] == self.BARS[-1]
+        assert buffer[2:4] == self.BARS[-6:-4]
+        np.testing.assert_array_equal(buffer.close, [bar.close for bar in self.BARS[-8:]])
+    
+    def test_column_reads_are_zero_copy_views(self):
+        buffer = OHLCVRingBuffer("RELIANCE", TimeFrame.ONE_MINUTE, capacity=8)
+        buffer.extend(self.BARS)
+        
+        closes = buffer.close
+        assert closes.flags["C_CONTIGUOUS"]
+        assert np.shares_memory(closes, buffer.close)
+        assert buffer.timestamps(3) == [bar.timestamp for bar in self.BARS[-3:]]
+    
+    def test_extend_matches_append(self):
+        appended = OHLCVRingBuffer("RELIANCE", TimeFrame.ONE_MINUTE, capacity=8)
+        extended = OHLCVRingBuffer("RELIANCE", TimeFrame.ONE_MINUTE, capacity=8)
+        for bar in self.BARS[:5]:
+            appended.append(bar)
+            extended.append(bar)
+        
+        for bar in self.BARS[3:]:
+            appended.append(bar)
+        assert extended.extend(self.BARS[3:]) == 8  # only the newest capacity bars are written
+        
+        assert appended.to_list() == extended.to_list()
+    
+    def test_same_timestamp_replaces_and_older_is_ignored(self):
+        buffer = OHLCVRingBuffer("RELIANCE", TimeFrame.ONE_MINUTE, capacity=8)
+        buffer.extend(self.BARS[:3])
+        revised = OHLCV(**{**self.BARS[2].__dict__, "close": 9999.0})
+        
+        assert buffer.append(revised) is False
+        assert buffer.append(self.BARS[0]) is False
+        assert len(buffer) == 3
+        assert buffer[-1].close == 9999.0
+    
+    @pytest.mark.asyncio
+    async def test_charts_on_same_symbol_share_one_buffer(self):
+        engine = ChartingEngine(RealTimeDataFeed())
+        history = ChartingTestDataFactory.create_ohlcv_data("RELIANCE", count=200)
+        
+        with patch.object(engine.data_feed, 'subscribe_symbol', new=AsyncMock()):
+            with patch.object(engine, '_load_historical_data', new=AsyncMock(return_value=history)) as mock_load:
+                first = await engine.create_chart("user_1", "RELIANCE", TimeFrame.ONE_MINUTE)
+                second = await engine.create_chart("user_2", "RELIANCE", TimeFrame.ONE_MINUTE)
+        
+        assert mock_load.await_count == 1
+        assert engine._get_chart_data(first) is engine._get_chart_data(second)
+        assert len(engine.ohlcv_store.buffers) == 1
+        
+        # Both chart subscriptions deliver the same tick; the shared buffer stores it once
+        tick = OHLCV(**{**history[-1].__dict__, "timestamp": history[-1].timestamp + timedelta(minutes=1)})
+        engine._update_chart_data(first, "RELIANCE", TimeFrame.ONE_MINUTE, tick)
+        engine._update_chart_data(second, "RELIANCE", TimeFrame.ONE_MINUTE, tick)
+        
+        assert len(engine._get_chart_data(first)) == 201
+        assert engine._get_chart_symbol(second) == "RELIANCE"
+        assert engine._get_chart_data("missing") is None
+
+
+def _session_minutes(day: datetime, count: int = 375, start: str = "09:15") -> List[OHLCV]:
+    """Consecutive 1-minute bars (IST wall clock) starting at ``start`` on ``day``"""
+    hour, minute = map(int, start.split(":"))
+    first = day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    bars = []
+    for i in range(count):
+        price = 2500.0 + (i % 17) - (i % 5) * 0.5
+        bars.append(OHLCV(
+            timestamp=first + timedelta(minutes=i),
+            open=price,
+            high=price + 1 + (i % 3),
+            low=price - 1 - (i % 4),
+            close=price + 0.25,
+            volume=1000 + i,
+            symbol="RELIANCE",
+            timeframe=TimeFrame.ONE_MINUTE
+        ))
+    return bars
+
+
+def _fold(minutes: List[OHLCV]) -> tuple:
+    """Reference OHLCV for a group of minutes"""
+    return (
+        minutes[0].open,
+        max(bar.high for bar in minutes),
+        min(bar.low for bar in minutes),
+        minutes[-1].close,
+        sum(bar.volume for bar in minutes)
+    )
+
+
+class TestCandleAggregation:
+    """Multi-timeframe candles folded from the 1-minute feed"""
+
+    DAY = datetime(2024, 1, 15)  # Monday
+
+    def _aggregate(self, timeframes, bars):
+        aggregator = CandleAggregator("RELIANCE")
+        for timeframe in timeframes:
+            aggregator.add_timeframe(timeframe)
+        closed = []
+        for bar in bars:
+            closed.extend(aggregator.add_minute(bar))
+        return aggregator, closed
+
+    def test_full_session_candle_counts_and_values(self):
+        minutes = _session_minutes(self.DAY)
+        _, closed = self._aggregate([TimeFrame.FIVE_MINUTES, TimeFrame.ONE_HOUR, TimeFrame.DAILY], minutes)
+
+        five = [c for c in closed if c.timeframe == TimeFrame.FIVE_MINUTES]
+        hourly = [c for c in closed if c.timeframe == TimeFrame.ONE_HOUR]
+        daily = [c for c in closed if c.timeframe == TimeFrame.DAILY]
+
+        assert len(five) == 75
+        assert [(c.open, c.high, c.low, c.close, c.volume) for c in five] == [
+            _fold(minutes[i:i + 5]) for i in range(0, 375, 5)
+        ]
+
+        # 09:15 ... 14:15 full hours, then the 15:15-15:30 stub
+        assert [c.timestamp.strftime("%H:%M") for c in hourly] == [
+            "09:15", "10:15", "11:15", "12:15", "13:15", "14:15", "15:15"
+        ]
+        assert hourly[-1].volume == sum(bar.volume for bar in minutes[-15:])
+
+        assert len(daily) == 1
+        assert (daily[0].open, daily[0].high, daily[0].low, daily[0].close, daily[0].volume) == _fold(minutes)
+
+    def test_last_minute_closes_candle_immediately(self):
+        minutes = _session_minutes(self.DAY, count=15)
+        aggregator, closed = self._aggregate([TimeFrame.FIFTEEN_MINUTES], minutes)
+
+        assert len(closed) == 1
+        assert closed[0].timestamp == self.DAY.replace(hour=9, minute=15)
+        assert aggregator.forming == {}
+
+    def test_out_of_session_and_repeated_minutes_are_ignored(self):
+        pre_open = _session_minutes(self.DAY, count=15, start="09:00")
+        session = _session_minutes(self.DAY, count=5)
+        post_close = _session_minutes(self.DAY, count=10, start="15:30")
+        bars = pre_open + session[:3] + [session[1], session[2]] + session[3:] + post_close
+
+        _, closed = self._aggregate([TimeFrame.FIVE_MINUTES], bars)
+
+        assert len(closed) == 1
+        assert (closed[0].open, closed[0].high, closed[0].low, closed[0].close, closed[0].volume) == _fold(session)
+
+    def test_gap_closes_candle_on_next_minute(self):
+        minutes = _session_minutes(self.DAY, count=30)
+        bars = minutes[:12] + minutes[20:]  # 09:27-09:34 missing
+
+        aggregator, closed = self._aggregate([TimeFrame.FIFTEEN_MINUTES], bars)
+
+        assert len(closed) == 2
+        assert closed[0].volume == sum(bar.volume for bar in minutes[:12])
+        assert closed[1].volume == sum(bar.volume for bar in minutes[20:])
+
+    def test_timeframe_added_mid_period_skips_partial_candle(self):
+        minutes = _session_minutes(self.DAY, count=30)
+        aggregator = CandleAggregator("RELIANCE")
+        closed = []
+        for i, bar in enumerate(minutes):
+            if i == 7:
+                aggregator.add_timeframe(TimeFrame.FIFTEEN_MINUTES)
+            closed.extend(aggregator.add_minute(bar))
+
+        assert [c.timestamp.strftime("%H:%M") for c in closed] == ["09:30"]
+
+    def test_weekly_candle_spans_sessions_and_closes_on_next_week(self):
+        week = []
+        for offset in range(5):
+            week.extend(_session_minutes(self.DAY + timedelta(days=offset)))
+        next_monday = _session_minutes(self.DAY + timedelta(days=7), count=1)
+
+        aggregator, closed = self._aggregate([TimeFrame.WEEKLY, TimeFrame.DAILY], week + next_monday)
+
+        assert [c.timeframe for c in closed].count(TimeFrame.DAILY) == 5
+        weekly = [c for c in closed if c.timeframe == TimeFrame.WEEKLY]
+        assert len(weekly) == 1
+        assert weekly[0].volume == sum(bar.volume for bar in week)
+        assert weekly[0].timestamp == self.DAY.replace(hour=9, minute=15)
+        assert aggregator.forming[TimeFrame.WEEKLY].timestamp == next_monday[0].timestamp
+
+    def test_saturday_session_joins_its_weeks_candle(self):
+        week = []
+        for offset in range(6):  # Monday to a Saturday special session
+            week.extend(_session_minutes(self.DAY + timedelta(days=offset), count=30))
+        next_monday = _session_minutes(self.DAY + timedelta(days=7), count=1)
+
+        aggregator, closed = self._aggregate([TimeFrame.WEEKLY], week + next_monday)
+
+        assert len(closed) == 1
+        assert closed[0].timestamp == self.DAY.replace(hour=9, minute=15)
+        assert (closed[0].open, closed[0].high, closed[0].low, closed[0].close, closed[0].volume) == _fold(week)
+        assert session_period(week[-1].timestamp, TimeFrame.WEEKLY)[0] == closed[0].timestamp
+
+    def test_session_period_boundaries(self):
+        assert session_period(self.DAY.replace(hour=9, minute=14), TimeFrame.FIVE_MINUTES) is None
+        assert session_period(self.DAY.replace(hour=15, minute=30), TimeFrame.DAILY) is None
+        assert session_period(self.DAY.replace(hour=15, minute=20), TimeFrame.FOUR_HOURS) == (
+            self.DAY.replace(hour=13, minute=15), self.DAY.replace(hour=15, minute=30)
+        )
+        # Weekly candles run over the ISO week, monthly candles over the calendar month
+        assert session_period(datetime(2024, 1, 20, 10, 0), TimeFrame.WEEKLY) == (
+            self.DAY.replace(hour=9, minute=15), datetime(2024, 1, 21, 15, 30)
+        )
+        assert session_period(datetime(2024, 3, 4, 10, 0), TimeFrame.MONTHLY)[1] == datetime(2024, 3, 31, 15, 30)
+        assert session_period(self.DAY.replace(hour=10), TimeFrame.TEN_SECONDS) is None
+
+    @pytest.mark.asyncio
+    async def test_feed_delivers_each_timeframe_only_to_its_subscribers(self):
+        feed = RealTimeDataFeed()
+        received = {timeframe: [] for timeframe in (TimeFrame.ONE_MINUTE, TimeFrame.FIVE_MINUTES, TimeFrame.FIFTEEN_MINUTES)}
+
+        with patch.object(feed, '_start_websocket_feed', new=AsyncMock()):
+            for timeframe, bars in received.items():
+                await feed.subscribe_symbol("RELIANCE", timeframe, bars.append)
+
+        session_open = datetime(2024, 1, 15, 9, 15, tzinfo=IST).timestamp()
+        for bar in _session_minutes(self.DAY, count=32):
+            message = {
+                "timestamp": session_open + (bar.timestamp - self.DAY.replace(hour=9, minute=15)).total_seconds(),
+                "open": bar.open, "high": bar.high, "low": bar.low, "close": bar.close, "volume": bar.volume
+            }
+            feed._process_market_data("RELIANCE", message)
+
+        assert len(received[TimeFrame.ONE_MINUTE]) == 32
+        assert received[TimeFrame.ONE_MINUTE][0].timestamp == self.DAY.replace(hour=9, minute=15)
+        assert [c.timestamp.minute for c in received[TimeFrame.FIVE_MINUTES]] == [15, 20, 25, 30, 35, 40]
+        assert [c.timestamp.minute for c in received[TimeFrame.FIFTEEN_MINUTES]] == [15, 30]
+        for timeframe, bars in received.items():
+            assert all(bar.timeframe == timeframe for bar in bars)
+
+        # Forming 09:45 candles are delivered on flush, once
+        feed.flush_candles("RELIANCE")
+        feed.flush_candles("RELIANCE")
+        assert [c.timestamp.minute for c in received[TimeFrame.FIVE_MINUTES]][-1] == 45
+        assert len(received[TimeFrame.FIFTEEN_MINUTES]) == 3
+
+
 # Performance and coverage validation
 class TestCoverageValidation:
     """Validate test coverage for charting platform"""
@@ -0,0 +1,241 @@
+"""
+TradeMate Child Order Scheduler Test Suite
+==========================================
+TWAP / VWAP / participation slices driven by one scheduler task:
+cadence, batching, pause/resume/cancel, market-data failures and lag
+metrics
+"""
+
+import pytest
+import asyncio
+import time
+from unittest.mock import patch
+
+from app.institutional.advanced_order_management import (
+    AdvancedOrder, ExecutionAlgorithm, ExecutionEngine, OrderSide, OrderStatus, OrderType
+)
+
+
+def _engine(time_scale: float = 0.001) -> ExecutionEngine:
+    """Engine whose slice intervals are scaled down (one minute -> 60 ms at 0.001)"""
+    engine = ExecutionEngine()
+    engine.scheduler.time_scale = time_scale
+    return engine
+
+
+def _order(order_id: str, algorithm: ExecutionAlgorithm = ExecutionAlgorithm.TWAP, quantity: int = 1000,
+           symbol: str = "TCS", **params) -> AdvancedOrder:
+    order_type = OrderType.VWAP if algorithm in (ExecutionAlgorithm.VWAP, ExecutionAlgorithm.PARTICIPATE) else OrderType.TWAP
+    defaults = {'duration': 10, 'slice_interval': 1} if order_type == OrderType.TWAP else {'participation_rate': 0.5}
+    return AdvancedOrder(
+        order_id=order_id,
+        client_id="INST001",
+        strategy_id=None,
+        symbol=symbol,
+        side=OrderSide.BUY,
+        quantity=quantity,
+        order_type=order_type,
+        status=OrderStatus.PENDING,
+        algorithm=algorithm,
+        algorithm_params={**defaults, **params}
+    )
+
+
+class TestChildOrderScheduler:
+    """Slices of every algorithmic order run from one scheduler"""
+
+    @pytest.mark.asyncio
+    async def test_twap_fills_in_equal_slices_with_running_average(self):
+        engine = _engine()
+        order = _order("TWAP_001", quantity=1003)
+
+        assert await engine.submit_order(order)
+        assert order.filled_quantity == 0  # submit returns before the first slice
+        await engine.scheduler.wait(order.order_id, timeout=5)
+
+        assert order.status == OrderStatus.FILLED
+        assert [e.filled_quantity for e in order.executions] == [100] * 9 + [103]
+        total_value = sum(e.filled_quantity * e.avg_fill_price for e in order.executions)
+        assert order.avg_fill_price == pytest.approx(total_value / order.quantity, rel=1e-12)
+        assert order.total_commission == pytest.approx(sum(e.commission for e in order.executions))
+
+        # Nine one-minute intervals at time_scale 0.001; slices are never early
+        elapsed = (order.executions[-1].timestamp - order.submitted_at).total_seconds()
+        assert elapsed >= 9 * 0.06 * 0.95
+
+    @pytest.mark.asyncio
+    async def test_orders_share_one_task_and_fire_in_batches(self):
+        engine = _engine()
+        orders = [_order(f"TWAP_{i:03d}", symbol="RELIANCE" if i % 2 else "TCS") for i in range(200)]
+
+        with patch.object(engine, "_get_current_price", wraps=engine._get_current_price) as price:
+            for order in orders:
+                await engine.submit_order(order)
+            assert len([t for t in asyncio.all_tasks() if t is not asyncio.current_task()]) == 1
+
+            await asyncio.gather(*(engine.scheduler.wait(o.order_id, timeout=10) for o in orders))
+
+        stats = engine.scheduler.get_statistics()
+        assert all(o.status == OrderStatus.FILLED for o in orders)
+        assert stats["slices_fired"] == 2000
+        assert stats["max_batch_size"] == 200
+        # One price lookup per symbol per batch rather than one per slice
+        assert stats["batches"] < 100
+        assert price.call_count <= 2 * stats["batches"]
+        assert stats["active_orders"] == 0 and stats["queued_entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_pause_holds_slices_until_resume(self):
+        engine = _engine()
+        order = _order("TWAP_PAUSE")
+        await engine.submit_order(order)
+        await asyncio.sleep(0.03)
+
+        assert await engine.pause_order(order.order_id)
+        filled = order.filled_quantity
+        await asyncio.sleep(0.2)
+        assert order.filled_quantity == filled
+        assert engine.scheduler.get_statistics()["paused_orders"] == 1
+
+        assert await engine.resume_order(order.order_id)
+        assert not await engine.resume_order(order.order_id)
+        await engine.scheduler.wait(order.order_id, timeout=5)
+        assert order.status == OrderStatus.FILLED
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_further_slices(self):
+        engine = _engine()
+        order = _order("TWAP_CANCEL")
+        await engine.submit_order(order)
+        await asyncio.sleep(0.1)
+
+        assert await engine.cancel_order(order.order_id)
+        filled = order.filled_quantity
+        await engine.scheduler.wait(order.order_id, timeout=1)
+        await asyncio.sleep(0.15)
+
+        assert 0 < filled < order.quantity
+        assert order.filled_quantity == filled
+        assert order.status == OrderStatus.CANCELLED
+        assert engine.scheduler.get_statistics()["orders_cancelled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_while_prices_are_fetched(self):
+        engine = _engine()
+        cancelled, survivor = _order("TWAP_RACE"), _order("TWAP_AFTER", duration=2, symbol="INFY")
+        fetching, release = asyncio.Event(), asyncio.Event()
+        base_price = engine._get_current_price
+
+        async def yielding_price(symbol):
+            if symbol == "TCS":
+                fetching.set()
+                await release.wait()
+            return await base_price(symbol)
+
+        with patch.object(engine, "_get_current_price", side_effect=yielding_price):
+            await engine.submit_order(cancelled)
+            await asyncio.wait_for(fetching.wait(), timeout=1)
+            assert await engine.cancel_order(cancelled.order_id)
+            release.set()
+            await engine.submit_order(survivor)
+            await engine.scheduler.wait(survivor.order_id, timeout=5)
+
+        assert cancelled.filled_quantity == 0 and cancelled.status == OrderStatus.CANCELLED
+        assert survivor.status == OrderStatus.FILLED
+        assert not engine.scheduler._task.done() or engine.scheduler._task.exception() is None
+        assert engine.scheduler.get_statistics()["slice_errors"] == 0
+
+    @pytest.mark.asyncio
+    async def test_market_data_failure_retries_only_that_symbol(self):
+        engine = _engine()
+        failing, healthy = _order("TWAP_FAIL", duration=3), _order("TWAP_OK", duration=3, symbol="INFY")
+        failures = iter([True, True])
+        base_price = engine._get_current_price
+
+        async def flaky_price(symbol):
+            if symbol == "TCS" and next(failures, False):
+                raise ConnectionError("price feed unavailable")
+            return await base_price(symbol)
+
+        with patch.object(engine, "_get_current_price", side_effect=flaky_price):
+            await engine.submit_order(failing)
+            await engine.submit_order(healthy)
+            await asyncio.gather(engine.scheduler.wait(failing.order_id, timeout=5),
+                                 engine.scheduler.wait(healthy.order_id, timeout=5))
+
+        stats = engine.scheduler.get_statistics()
+        assert healthy.status == OrderStatus.FILLED and len(healthy.executions) == 3
+        # Both failed slices were retried an interval later rather than dropped
+        assert failing.status == OrderStatus.FILLED and len(failing.executions) == 3
+        assert stats["slice_errors"] == 2 and stats["slices_fired"] == 6
+        assert healthy.executions[-1].timestamp < failing.executions[-1].timestamp
+
+    @pytest.mark.asyncio
+    async def test_vwap_and_participation_respect_market_volume(self):
+        engine = _engine(time_scale=0.0005)
+        vwap = _order("VWAP_001", ExecutionAlgorithm.VWAP, quantity=12_000, participation_rate=0.1)
+        participation = _order("PART_001", ExecutionAlgorithm.PARTICIPATE, quantity=1500, participation_rate=0.5)
+        volumes = iter([0] * 4 + [1000] * 100)
+
+        async def market_volume(symbol):
+            return next(volumes) if symbol == "INFY" else 2000
+
+        participation.symbol = "INFY"
+        with patch.object(engine, "_get_market_volume", side_effect=market_volume):
+            await engine.submit_order(vwap)
+            await engine.submit_order(participation)
+            await asyncio.gather(engine.scheduler.wait(vwap.order_id, timeout=5),
+                                 engine.scheduler.wait(participation.order_id, timeout=5))
+
+        # VWAP slices are capped at 10% of volume until the last slice sweeps the rest
+        assert [e.filled_quantity for e in vwap.executions[:-1]] == [200] * 11
+        assert vwap.filled_quantity == 12_000
+        # Quiet intervals trade nothing; afterwards 50% of 1000 per slice
+        assert [e.filled_quantity for e in participation.executions] == [500, 500, 500]
+        assert participation.status == OrderStatus.FILLED
+
+    @pytest.mark.asyncio
+    async def test_lag_metrics_are_reported(self):
+        engine = _engine()
+        orders = [_order(f"TWAP_{i}", duration=3) for i in range(20)]
+        for order in orders:
+            await engine.submit_order(order)
+        await asyncio.gather(*(engine.scheduler.wait(o.order_id, timeout=5) for o in orders))
+
+        stats = engine.scheduler.get_statistics()
+        assert len(engine.scheduler.lags) == 60
+        assert set(stats["lag_ms"]) == {"p50", "p99", "max"}
+        assert 0 <= stats["lag_ms"]["p50"] <= stats["lag_ms"]["p99"] <= stats["lag_ms"]["max"]
+
+
+class TestSchedulerBenchmark:
+    """Thousands of concurrent algo orders on one loop"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="order_scheduler")
+    def test_concurrent_twap_orders(self, benchmark):
+        results = {}
+
+        async def run():
+            engine = _engine()
+            orders = [_order(f"TWAP_{i:05d}", symbol=f"SYM{i % 50:02d}") for i in range(5000)]
+            started = time.perf_counter()
+            for order in orders:
+                await engine.submit_order(order)
+            await asyncio.gather(*(engine.scheduler.wait(o.order_id, timeout=60) for o in orders))
+            elapsed = time.perf_counter() - started
+
+            stats = engine.scheduler.get_statistics()
+            results.update({
+                "orders": len(orders),
+                "slices_per_second": stats["slices_fired"] / elapsed,
+                "batches": stats["batches"],
+                **{f"lag_{k}_ms": v for k, v in stats["lag_ms"].items()}
+            })
+            return orders
+
+        orders = benchmark.pedantic(lambda: asyncio.run(run()), rounds=1, iterations=1)
+        benchmark.extra_info.update(results)
+
+        assert all(o.status == OrderStatus.FILLED for o in orders)
+        assert results["batches"] < 100
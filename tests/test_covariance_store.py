@@ -0,0 +1,377 @@
+"""
+TradeMate Covariance Store Test Suite
+=====================================
+Ledoit-Wolf and EWMA parity with batch estimates, incremental daily
+updates against full re-estimation, memory-mapped snapshots read from
+worker processes, subsets and republished snapshots on disk, the
+optimizer / analytics / risk consumers sharing one store, the daily close
+and an incremental-update benchmark
+"""
+
+import pytest
+import json
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+from app.analytics.portfolio_analytics import PortfolioAnalyzer, PortfolioHolding
+from app.institutional.covariance_store import CovarianceStore, shared_covariance_store
+from app.institutional.hni_portfolio_management import PortfolioOptimizer
+from app.institutional.institutional_risk_management import InstitutionalRiskManager, VolatilityCalculator
+from app.institutional.portfolio_optimization import PortfolioOptimizationService
+
+START = date(2026, 1, 1)
+
+
+def _returns(days: int, assets: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 1, (assets, assets)) / np.sqrt(assets)
+    values = rng.normal(0.0005, 0.015, (days, assets)) @ loadings
+    return pd.DataFrame(values, columns=[f"SYM{i:03d}" for i in range(assets)])
+
+
+def _ledoit_wolf(values: np.ndarray):
+    """Batch Ledoit-Wolf towards a scaled identity, as in scikit-learn"""
+    centred = values - values.mean(axis=0)
+    t, n = centred.shape
+    population = centred.T @ centred / t
+    mu = np.trace(population) / n
+    squares = centred ** 2
+    beta = (np.sum(squares.T @ squares) / t - np.sum(population ** 2)) / (n * t)
+    delta = np.sum((population - mu * np.eye(n)) ** 2) / n
+    shrinkage = min(beta, delta) / delta
+    return (1 - shrinkage) * population + shrinkage * mu * np.eye(n), shrinkage
+
+
+def _ewma(values: np.ndarray, decay: float) -> np.ndarray:
+    weights = decay ** np.arange(len(values) - 1, -1, -1)
+    return (values * weights[:, None]).T @ values / weights.sum()
+
+
+def _worker_trace(path: str, symbols: tuple, as_of: date):
+    snapshot = CovarianceStore(path).snapshot(symbols, as_of)
+    return type(snapshot.ledoit_wolf).__name__, float(np.trace(snapshot.ledoit_wolf))
+
+
+class TestEstimates:
+    """Running sums reproduce the batch estimators"""
+
+    def test_seed_matches_batch_estimators(self):
+        returns = _returns(300, 12)
+        store = CovarianceStore(window=252)
+
+        snapshot = store.seed(returns, START)
+
+        values = returns.to_numpy()[-252:]
+        shrunk, shrinkage = _ledoit_wolf(values)
+        assert snapshot.symbols == tuple(returns.columns) and snapshot.observations == 252
+        assert snapshot.mean == pytest.approx(values.mean(axis=0), rel=1e-12)
+        assert np.allclose(snapshot.covariance, np.cov(values, rowvar=False), rtol=1e-10, atol=1e-16)
+        assert np.allclose(snapshot.ledoit_wolf, shrunk, rtol=1e-10, atol=1e-16)
+        assert snapshot.shrinkage == pytest.approx(shrinkage, rel=1e-10)
+        assert 0 < snapshot.shrinkage < 1
+        assert np.allclose(snapshot.ewma, _ewma(values, 0.94), rtol=1e-10, atol=1e-16)
+
+    def test_daily_updates_match_full_reestimation(self):
+        returns = _returns(400, 15, seed=1)
+        values = returns.to_numpy()
+        store = CovarianceStore(window=100, refresh_interval=1000)
+        store.seed(returns.iloc[:60], START)
+
+        for day in range(60, 400):
+            snapshot = store.update(returns.columns, START + timedelta(days=day), values[day])
+
+        window = values[-100:]
+        assert snapshot.observations == 100 and snapshot.as_of == START + timedelta(days=399)
+        assert np.allclose(snapshot.covariance, np.cov(window, rowvar=False), rtol=1e-8, atol=1e-14)
+        assert np.allclose(snapshot.ledoit_wolf, _ledoit_wolf(window)[0], rtol=1e-8, atol=1e-14)
+        assert np.allclose(snapshot.ewma, _ewma(values, 0.94), rtol=1e-10, atol=1e-16)
+        assert store.stats == {"seeds": 1, "updates": 340, "refreshes": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    def test_periodic_refresh_and_mapping_updates(self):
+        returns = _returns(80, 4, seed=2)
+        store = CovarianceStore(window=30, refresh_interval=10)
+        store.seed(returns.iloc[:30], START)
+
+        for day in range(30, 80):
+            row = dict(zip(returns.columns, returns.iloc[day]))
+            assert store.append(START + timedelta(days=day), row) == [tuple(returns.columns)]
+
+        assert store.stats["refreshes"] == 5
+        snapshot = store.snapshot(returns.columns)
+        assert np.allclose(snapshot.covariance, np.cov(returns.to_numpy()[-30:], rowvar=False), rtol=1e-12)
+
+    def test_stale_and_invalid_updates(self):
+        returns = _returns(40, 3, seed=3)
+        store = CovarianceStore()
+        seeded = store.seed(returns, START)
+
+        assert store.update(returns.columns, START, np.zeros(3)) is seeded
+        with pytest.raises(ValueError):
+            store.update(returns.columns, START + timedelta(days=1), [0.01, np.nan, 0.0])
+        with pytest.raises(KeyError):
+            store.update(["OTHER"], START, [0.01])
+        with pytest.raises(ValueError):
+            store.seed(returns.iloc[:1], START)
+
+    def test_subsets_are_served_from_larger_universes(self):
+        returns = _returns(120, 6, seed=4)
+        store = CovarianceStore()
+        full = store.seed(returns, START)
+
+        subset = store.snapshot(["SYM004", "SYM001"], START + timedelta(days=2))
+
+        assert subset.symbols == ("SYM001", "SYM004")
+        assert subset.ledoit_wolf.tolist() == full.ledoit_wolf[np.ix_([1, 4], [1, 4])].tolist()
+        assert store.snapshot(["SYM001", "NEW"], START) is None
+        assert store.snapshot(returns.columns, START - timedelta(days=1)) is None
+        assert store.snapshot(returns.columns, START + timedelta(days=30)) is None  # too old to serve
+
+    def test_least_recently_used_universes_are_evicted(self):
+        store = CovarianceStore(max_universes=2)
+        books = [_returns(60, 3, seed=seed).add_prefix(f"B{seed}") for seed in range(3)]
+        store.seed(books[0], START)
+        store.seed(books[1], START)
+
+        assert store.snapshot(books[0].columns, START) is not None  # touches the first book
+        store.seed(books[2], START)
+
+        assert store.universes == [tuple(books[0].columns), tuple(books[2].columns)]
+        assert store.snapshot(books[1].columns, START) is None
+        assert store.stats["evictions"] == 1
+
+
+class TestPersistence:
+    """Snapshots are shared through memory-mapped files"""
+
+    def test_round_trip_as_memory_maps(self, tmp_path):
+        returns = _returns(100, 8, seed=5)
+        writer = CovarianceStore(tmp_path, keep_days=2)
+        written = writer.seed(returns.iloc[:98], START)
+        for day in (1, 2):
+            written = writer.update(returns.columns, START + timedelta(days=day), returns.iloc[97 + day].to_numpy())
+
+        reader = CovarianceStore(tmp_path)
+        loaded = reader.snapshot(returns.columns, START + timedelta(days=3))
+
+        assert isinstance(loaded.ledoit_wolf, np.memmap) and not loaded.ledoit_wolf.flags.writeable
+        assert loaded.as_of == written.as_of and loaded.observations == written.observations
+        for name in ("mean", "covariance", "ledoit_wolf", "ewma"):
+            assert np.array_equal(getattr(loaded, name), getattr(written, name))
+        assert loaded.shrinkage == written.shrinkage
+        assert len(list(tmp_path.glob("*/*.npy"))) == 2  # keep_days
+        assert reader.snapshot(returns.columns, START) is None
+
+    def test_worker_processes_read_without_seeding(self, tmp_path):
+        returns = _returns(60, 5, seed=6)
+        snapshot = CovarianceStore(tmp_path).seed(returns, START)
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(_worker_trace, [str(tmp_path)] * 2, [snapshot.symbols] * 2, [START] * 2))
+
+        assert results == [("memmap", pytest.approx(np.trace(snapshot.ledoit_wolf), rel=1e-15))] * 2
+
+    def test_subsets_are_served_from_stored_universes(self, tmp_path):
+        returns = _returns(80, 6, seed=10)
+        full = CovarianceStore(tmp_path).seed(returns, START)
+        reader = CovarianceStore(tmp_path)
+
+        subset = reader.snapshot(["SYM005", "SYM002"], START + timedelta(days=1))
+
+        assert subset.symbols == ("SYM002", "SYM005")
+        assert np.array_equal(subset.ledoit_wolf, full.ledoit_wolf[np.ix_([2, 5], [2, 5])])
+        assert reader.latest_date(["SYM002"], START) == START
+        assert reader.snapshot(["SYM002", "OTHER"], START) is None
+
+    def test_republishing_a_date_swaps_versions_atomically(self, tmp_path):
+        returns = _returns(120, 4, seed=11)
+        writer = CovarianceStore(tmp_path)
+        writer.seed(returns.iloc[:60], START)
+        mapped = CovarianceStore(tmp_path).snapshot(returns.columns, START)
+        before = np.array(mapped.ledoit_wolf)
+
+        republished = writer.seed(returns.iloc[60:], START)
+
+        [header] = tmp_path.glob("*/*-*.json")
+        [matrices] = tmp_path.glob("*/*.npy")
+        assert json.loads(header.read_text())["matrices"] == matrices.name
+        assert not list(tmp_path.glob("*/.*.tmp"))
+        assert np.array_equal(mapped.ledoit_wolf, before)  # an open map keeps the version it was read from
+        assert np.array_equal(CovarianceStore(tmp_path).snapshot(returns.columns, START).ledoit_wolf,
+                              republished.ledoit_wolf)
+
+
+class TestConsumers:
+    """Risk, analytics and optimization read one store"""
+
+    def test_optimizer_factorizes_store_estimates(self):
+        returns = _returns(252, 10, seed=7)
+        store = CovarianceStore()
+        snapshot = store.seed(returns, START)
+        service = PortfolioOptimizationService(covariance_store=store)
+
+        model = service.factorization(returns.columns[:4], START + timedelta(days=1))
+
+        assert model.as_of == START
+        assert np.allclose(model.covariance, snapshot.ledoit_wolf[:4, :4] * 252)
+        assert service.factorization(returns.columns[:4], START + timedelta(days=1)) is model
+        assert service.factorize(returns, START) is not None and store.stats["seeds"] == 1
+
+        fresh = service.factorize(returns.iloc[1:], START + timedelta(days=1))
+        assert fresh.as_of == START + timedelta(days=1) and store.stats["seeds"] == 2
+
+    @pytest.mark.asyncio
+    async def test_modules_share_one_store(self):
+        store = CovarianceStore()
+        calculator = VolatilityCalculator(lookback_days=60, covariance_store=store)
+        rng = np.random.default_rng(8)
+        symbols = ("TCS", "INFY", "ITC")
+        prices = 100 * np.cumprod(1 + rng.normal(0.0005, 0.015, (61, 3)), axis=0)
+        for day in range(60):
+            for symbol, price in zip(symbols, prices[day]):
+                calculator.update_price(symbol, price, datetime(2026, 1, 1))
+        today = datetime.now().date()
+
+        seeded = calculator.covariance(symbols, today - timedelta(days=1))
+        for symbol, price in zip(symbols, prices[60]):
+            calculator.update_price(symbol, price, datetime(2026, 1, 2))
+        assert calculator.close_day(today) == [tuple(sorted(symbols))]
+
+        optimizer = PortfolioOptimizer(covariance_store=store)
+        analyzer = PortfolioAnalyzer(covariance_store=store)
+
+        async def no_history(portfolio):
+            raise AssertionError("history should come from the store")
+
+        optimizer._get_historical_data = no_history
+        model = await optimizer._factorization(type("P", (), {"holdings": [
+            PortfolioHolding(s, 1, 1.0, 1.0, 1 / 3, "IT", "equity") for s in symbols
+        ]})())
+        mean, covariance = analyzer._estimate_daily_moments(["ITC", "TCS"], {"ITC": {"returns": [0.0, 0.0]},
+                                                                          "TCS": {"returns": [0.0, 0.0]}})
+
+        current = store.snapshot(symbols, today)
+        assert seeded.observations == 59 and current.as_of == today
+        assert np.allclose(model.covariance, current.ledoit_wolf * 252)
+        assert np.allclose(covariance, current.ledoit_wolf[np.ix_([1, 2], [1, 2])])
+        assert store.stats["seeds"] == 1 and store.stats["updates"] == 1
+
+
+class TestSharedStore:
+    """One module-level store by default, advanced at the daily close"""
+
+    def test_consumers_default_to_the_shared_store(self):
+        assert VolatilityCalculator().covariance_store is shared_covariance_store
+        assert PortfolioOptimizer().service.covariance_store is shared_covariance_store
+        assert PortfolioAnalyzer().covariance_store is shared_covariance_store
+        assert InstitutionalRiskManager().volatility_calculator.covariance_store is shared_covariance_store
+        assert PortfolioAnalyzer({"covariance_store_path": "/tmp/trademate-cov"}).covariance_store \
+            is not shared_covariance_store
+
+    @pytest.mark.asyncio
+    async def test_first_update_of_a_new_day_closes_the_previous_one(self):
+        store = CovarianceStore()
+        manager = InstitutionalRiskManager()
+        manager.volatility_calculator = VolatilityCalculator(covariance_store=store)
+        calculator = manager.volatility_calculator
+        rng = np.random.default_rng(12)
+        prices = 100 * np.cumprod(1 + rng.normal(0.0005, 0.015, (41, 2)), axis=0)
+        for day in range(40):
+            for symbol, price in zip(("TCS", "INFY"), prices[day]):
+                calculator.update_price(symbol, price, datetime(2026, 1, 1))
+        today = date.today()
+        yesterday = manager.trading_day = today - timedelta(days=1)
+        closing, opening = (datetime.combine(day, datetime.min.time()) + timedelta(hours=hours)
+                            for day, hours in ((yesterday, 15), (today, 9.25)))
+        seeded = calculator.covariance(("TCS", "INFY"), yesterday - timedelta(days=1))
+        assert calculator.calculate_volatility("TCS") == pytest.approx(seeded.volatilities("ewma", 252)[1])
+
+        await manager.update_market_price("TCS", prices[40][0], closing)
+        await manager.update_market_price("INFY", prices[40][1], closing)
+        assert store.stats["updates"] == 0
+        await manager.update_market_price("TCS", prices[40][0] * 1.01, opening)
+        assert calculator.prices("INFY")[-1] == prices[40][1]  # closes are recorded on the tick
+        assert await manager.day_close == [("INFY", "TCS")]  # the covariance update runs in the background
+
+        closed = store.snapshot(("TCS", "INFY"), yesterday)
+        assert manager.trading_day == today and store.stats["updates"] == 1
+        assert closed.as_of == yesterday and closed.observations == seeded.observations + 1
+        correlation = calculator.correlation(["TCS", "INFY"])
+        assert correlation.shape == (2, 2) and np.allclose(np.diag(correlation), 1.0)
+
+    def test_client_books_are_served_from_one_pooled_universe(self):
+        store = CovarianceStore()
+        calculator = VolatilityCalculator(covariance_store=store)
+        rng = np.random.default_rng(13)
+        symbols = ("HDFC", "INFY", "ITC", "RELIANCE", "TCS")
+        prices = 100 * np.cumprod(1 + rng.normal(0.0005, 0.015, (40, 5)), axis=0)
+        for day in range(40):
+            for symbol, price in zip(symbols, prices[day]):
+                calculator.update_price(symbol, price, datetime(2026, 1, 1))
+        calculator.update_price("NEW", 100.0, datetime(2026, 1, 1))  # too short to pool
+        today = date.today()
+
+        book = calculator.covariance(("TCS", "INFY"), today)
+        other = calculator.covariance(("ITC", "HDFC", "RELIANCE"), today)
+        volatility = calculator.calculate_volatility("ITC")
+
+        assert store.universes == [symbols] and store.stats["seeds"] == 1
+        assert book.symbols == ("INFY", "TCS") and other.symbols == ("HDFC", "ITC", "RELIANCE")
+        assert volatility == pytest.approx(other.volatilities("ewma", 252)[1])
+
+    def test_symbols_without_a_close_carry_a_zero_return(self):
+        store = CovarianceStore()
+        calculator = VolatilityCalculator(covariance_store=store)
+        rng = np.random.default_rng(14)
+        prices = 100 * np.cumprod(1 + rng.normal(0.0005, 0.015, (41, 2)), axis=0)
+        for day in range(40):
+            for symbol, price in zip(("TCS", "INFY"), prices[day]):
+                calculator.update_price(symbol, price, datetime(2026, 1, 1))
+        yesterday = date.today() - timedelta(days=1)
+        seeded = calculator.covariance(("TCS", "INFY"), yesterday)
+        assert calculator.close_day(yesterday) == []  # the loaded history is yesterday's close
+        previous_close = calculator.prices("INFY")[-1]
+
+        calculator.mark_price("TCS", prices[40][0], datetime(2026, 1, 2))  # INFY does not trade
+        assert calculator.close_day(date.today()) == [("INFY", "TCS")]
+
+        closed = store.snapshot(("TCS", "INFY"), date.today())
+        window = np.vstack([np.diff(calculator.prices(s)[-41:]) / calculator.prices(s)[-41:-1]
+                            for s in ("INFY", "TCS")]).T
+        assert calculator.prices("INFY")[-2:].tolist() == [previous_close, previous_close]
+        assert window[-1, 0] == 0.0 and window[-1, 1] == pytest.approx(prices[40][0] / prices[39][0] - 1)
+        assert closed.observations == seeded.observations + 1
+        assert np.allclose(closed.covariance, np.cov(window, rowvar=False), rtol=1e-10, atol=1e-16)
+
+
+class TestCovarianceBenchmark:
+    """Daily close for a 500-asset universe: one O(n²) update versus re-estimation"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="covariance_store")
+    def test_incremental_update_500_assets(self, benchmark):
+        returns = _returns(272, 500, seed=9)
+        values = returns.to_numpy()
+        store = CovarianceStore(refresh_interval=1000)
+        store.seed(returns.iloc[:252], START)
+
+        started = time.perf_counter()
+        for day in range(252, 262):
+            store.seed(returns.iloc[day - 251:day + 1], START + timedelta(days=day))
+        reestimate_seconds = (time.perf_counter() - started) / 10
+
+        def run():
+            started = time.perf_counter()
+            for day in range(262, 272):
+                snapshot = store.update(returns.columns, START + timedelta(days=day), values[day])
+            return snapshot, (time.perf_counter() - started) / 10
+
+        snapshot, update_seconds = benchmark.pedantic(run, rounds=1, iterations=1)
+
+        benchmark.extra_info.update({
+            "assets": 500, "update_ms": update_seconds * 1000, "reestimate_ms": reestimate_seconds * 1000
+        })
+        assert np.allclose(snapshot.ledoit_wolf, _ledoit_wolf(values[-252:])[0], rtol=1e-8, atol=1e-14)
+        assert update_seconds < reestimate_seconds
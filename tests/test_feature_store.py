@@ -0,0 +1,211 @@
+"""
+TradeMate Incremental Feature Store Test Suite
+==============================================
+FeatureEngineer.update_technical_features / append_bar: parity with the
+vectorized features, bar revisions, sliding windows matched on
+timestamps, use from generate_signals and per-tick latency versus history
+"""
+
+import pytest
+import time
+import numpy as np
+import pandas as pd
+
+from datetime import datetime
+from unittest.mock import patch
+
+from app.ai_trading.algorithmic_trading_engine import (
+    AlgorithmicTradingEngine, FeatureEngineer, MeanReversionStrategy, StrategyType, TimeFrame
+)
+
+
+def _bars(periods: int, seed: int = 11, quotes: bool = False) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1000.0 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+    df = pd.DataFrame({
+        'timestamp': pd.date_range("2020-01-01 09:15", periods=periods, freq="min"),
+        'open': close * (1 + rng.normal(0, 0.003, periods)),
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'close': close,
+        'volume': rng.integers(100_000, 1_000_000, periods)
+    })
+    if quotes:
+        df['bid'] = close - 0.05
+        df['ask'] = close + 0.05
+    return df
+
+
+async def _expected(df: pd.DataFrame) -> pd.DataFrame:
+    return await FeatureEngineer().generate_technical_features(df)
+
+
+class TestIncrementalFeatures:
+    """Incremental rows match the full recompute"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("quotes", [False, True])
+    async def test_appended_bars_match_full_recompute(self, quotes):
+        df = _bars(400, quotes=quotes)
+        engineer = FeatureEngineer()
+
+        rows = [engineer.append_bar("TCS", TimeFrame.MINUTE_1, bar) for bar in df.to_dict("records")]
+        expected = await _expected(df)
+
+        features = pd.DataFrame(rows)
+        assert list(features.columns) == [c for c in expected.columns if c not in df.columns]
+        pd.testing.assert_frame_equal(features, expected[features.columns], rtol=1e-9)
+
+    @pytest.mark.asyncio
+    async def test_growing_frame_only_computes_new_rows(self):
+        df = _bars(600)
+        engineer = FeatureEngineer()
+
+        await engineer.update_technical_features("TCS", TimeFrame.MINUTE_1, df.iloc[:500])
+        with pytest.MonkeyPatch.context() as patch:
+            computed = []
+            original = engineer._compute_feature_row
+            patch.setattr(engineer, "_compute_feature_row", lambda state, i: (computed.append(i), original(state, i)))
+            result = await engineer.update_technical_features("TCS", TimeFrame.MINUTE_1, df)
+
+        assert computed == list(range(500, 600))
+        pd.testing.assert_frame_equal(result, await _expected(df), rtol=1e-9)
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_is_matched_on_timestamps(self):
+        df = _bars(600)
+        engineer = FeatureEngineer()
+        await engineer.update_technical_features("TCS", TimeFrame.MINUTE_1, df.iloc[:500])
+
+        with pytest.MonkeyPatch.context() as patch:
+            computed = []
+            original = engineer._compute_feature_row
+            patch.setattr(engineer, "_compute_feature_row", lambda state, i: (computed.append(i), original(state, i)))
+            result = await engineer.update_technical_features("TCS", TimeFrame.MINUTE_1, df.iloc[100:])
+
+        # Only the 100 new bars are computed; dropped bars still warm up the window's features
+        assert computed == list(range(500, 600))
+        pd.testing.assert_frame_equal(result, (await _expected(df)).iloc[100:], rtol=1e-9)
+
+    @pytest.mark.asyncio
+    async def test_frame_starting_at_an_unknown_bar_is_rebuilt(self):
+        df = _bars(300)
+        engineer = FeatureEngineer()
+        await engineer.update_technical_features("TCS", TimeFrame.MINUTE_1, df.iloc[100:])
+
+        for frame in (df, df.iloc[150:].assign(timestamp=df['timestamp'].iloc[150:] + pd.Timedelta(seconds=30))):
+            result = await engineer.update_technical_features("TCS", TimeFrame.MINUTE_1, frame)
+            pd.testing.assert_frame_equal(result, await _expected(frame), rtol=1e-9)
+            assert engineer.feature_cache[("TCS", TimeFrame.MINUTE_1)].size == len(frame)
+
+    @pytest.mark.asyncio
+    async def test_revised_last_bar_replaces_its_row(self):
+        df = _bars(300)
+        engineer = FeatureEngineer()
+        for bar in df.to_dict("records"):
+            engineer.append_bar("TCS", TimeFrame.MINUTE_1, bar)
+
+        revised = df.copy()
+        revised.loc[299, ['close', 'high']] = [revised.loc[299, 'close'] * 1.02, revised.loc[299, 'high'] * 1.02]
+        row = engineer.append_bar("TCS", TimeFrame.MINUTE_1, revised.iloc[-1].to_dict())
+
+        expected = (await _expected(revised)).iloc[-1]
+        assert row == pytest.approx({name: expected[name] for name in row}, rel=1e-9, nan_ok=True)
+        assert engineer.feature_cache[("TCS", TimeFrame.MINUTE_1)].size == 300
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("revised_row", [10, 280])
+    async def test_revised_older_bar_recomputes_later_rows(self, revised_row):
+        df = _bars(300)
+        engineer = FeatureEngineer()
+        await engineer.update_technical_features("TCS", TimeFrame.MINUTE_1, df)
+
+        revised = df.copy()
+        revised.loc[revised_row, 'close'] *= 0.97
+        result = await engineer.update_technical_features("TCS", TimeFrame.MINUTE_1, revised)
+        pd.testing.assert_frame_equal(result, await _expected(revised), rtol=1e-9)
+
+        # The same revision pushed as a single bar
+        engineer.invalidate("TCS")
+        await engineer.update_technical_features("TCS", TimeFrame.MINUTE_1, df)
+        engineer.append_bar("TCS", TimeFrame.MINUTE_1, revised.iloc[revised_row].to_dict())
+        state = engineer.feature_cache[("TCS", TimeFrame.MINUTE_1)]
+        np.testing.assert_allclose(state.features['rsi_14'][:state.size], result['rsi_14'], rtol=1e-9)
+
+    def test_bar_before_stored_history_is_rejected(self):
+        df = _bars(50)
+        engineer = FeatureEngineer()
+        for bar in df.iloc[1:].to_dict("records"):
+            engineer.append_bar("TCS", TimeFrame.MINUTE_1, bar)
+
+        with pytest.raises(ValueError):
+            engineer.append_bar("TCS", TimeFrame.MINUTE_1, {**df.iloc[0].to_dict(), 'timestamp': df.iloc[5]['timestamp'] - pd.Timedelta(seconds=30)})
+
+    @pytest.mark.asyncio
+    async def test_invalidate_is_scoped_to_symbol_and_timeframe(self):
+        df = _bars(30)
+        engineer = FeatureEngineer()
+        for key in [("TCS", TimeFrame.MINUTE_1), ("TCS", TimeFrame.DAY_1), ("INFY", TimeFrame.MINUTE_1)]:
+            await engineer.update_technical_features(*key, df)
+
+        engineer.invalidate("TCS", TimeFrame.DAY_1)
+        assert set(engineer.feature_cache) == {("TCS", TimeFrame.MINUTE_1), ("INFY", TimeFrame.MINUTE_1)}
+
+        engineer.invalidate("TCS")
+        assert set(engineer.feature_cache) == {("INFY", TimeFrame.MINUTE_1)}
+
+
+class TestSignalFeatures:
+    """generate_signals builds its feature frame through the store"""
+
+    @pytest.mark.asyncio
+    async def test_generate_signals_updates_the_feature_store(self):
+        engine = AlgorithmicTradingEngine()
+        strategy = MeanReversionStrategy("mean_reversion_TCS_1d", StrategyType.MEAN_REVERSION, {})
+        engine.strategies[strategy.strategy_id] = strategy
+        bar = {'timestamp': datetime(2024, 1, 2, 9, 15), 'open': 1000.0, 'high': 1010.0, 'low': 990.0,
+               'close': 1005.0, 'volume': 500_000}
+
+        with patch.object(engine.feature_engineer, "technical_feature_frame",
+                          wraps=engine.feature_engineer.technical_feature_frame) as update:
+            await engine.generate_signals("TCS", bar)
+
+        assert update.call_args.args[:2] == ("TCS", TimeFrame.DAY_1)
+        state = engine.feature_engineer.feature_cache[("TCS", TimeFrame.DAY_1)]
+        frame = engine.market_data_cache[("TCS", TimeFrame.DAY_1)][1]
+        assert state.size == len(frame)
+        np.testing.assert_allclose(state.features['rsi_14'][:state.size], frame['rsi_14'], rtol=1e-12)
+
+
+class TestIncrementalFeatureBenchmark:
+    """Per-tick latency stays flat as history grows"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="feature_store")
+    @pytest.mark.asyncio
+    async def test_tick_latency_is_independent_of_history(self, benchmark):
+        latency = {}
+        for history in (1_000, 100_000):
+            df = _bars(history)
+            engineer = FeatureEngineer()
+            await engineer.update_technical_features("TCS", TimeFrame.MINUTE_1, df)
+            last = df['timestamp'].iloc[-1]
+
+            ticks = 500
+            started = time.perf_counter()
+            for k in range(ticks):
+                engineer.append_bar("TCS", TimeFrame.MINUTE_1, {
+                    'timestamp': last + pd.Timedelta(minutes=k + 1),
+                    'open': 1000.0, 'high': 1010.0, 'low': 990.0, 'close': 1000.0 + k % 7, 'volume': 100_000
+                })
+            latency[history] = (time.perf_counter() - started) / ticks
+
+        df = _bars(100_000)
+        full = benchmark.pedantic(lambda: FeatureEngineer()._technical_feature_columns(df), rounds=1, iterations=1)
+
+        benchmark.extra_info.update({
+            "tick_us_1k_bars": latency[1_000] * 1e6,
+            "tick_us_100k_bars": latency[100_000] * 1e6
+        })
+        assert len(full['rsi_14']) == len(df)
+        assert latency[100_000] < latency[1_000] * 3
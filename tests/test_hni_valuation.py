@@ -0,0 +1,267 @@
+"""
+TradeMate HNI Holdings Valuation Test Suite
+===========================================
+Symbol -> holding reverse index, delta-adjusted totals and allocations
+against a full re-summation on sparse and dense tick batches, the
+dense-path threshold in holdings, periodic re-summation of drifted
+class values, needs_rebalancing from running aggregates, lazily
+refreshed holding weights, re-indexing after rebalances and a bulk tick
+benchmark over 2,000 books
+"""
+
+import pytest
+import asyncio
+import random
+import time
+
+from app.institutional.hni_portfolio_management import (
+    AssetAllocation, AssetClass, HNIPortfolio, HNIPortfolioManager, PortfolioHolding,
+    PortfolioType, RebalanceFrequency, RiskProfile
+)
+
+CLASSES = [AssetClass.EQUITY, AssetClass.DEBT, AssetClass.COMMODITIES]
+
+
+def _portfolio(portfolio_id: str, rng: random.Random, symbols: int = 20, universe: int = 3000) -> HNIPortfolio:
+    holdings = []
+    for s in rng.sample(range(universe), symbols):
+        quantity, price = rng.randint(10, 500), rng.uniform(50, 5000)
+        holdings.append(PortfolioHolding(f"SYM{s:04d}", f"Security {s}", CLASSES[s % 3], quantity, price,
+                                         price, quantity * price, 0.0))
+    value = sum(h.market_value for h in holdings)
+    cash = value * 0.05
+    targets = [AssetAllocation(AssetClass.EQUITY, 60.0, 50.0, 70.0), AssetAllocation(AssetClass.DEBT, 30.0, 20.0, 40.0),
+               AssetAllocation(AssetClass.COMMODITIES, 5.0, 0.0, 10.0), AssetAllocation(AssetClass.CASH, 5.0, 0.0, 10.0)]
+    portfolio = HNIPortfolio(portfolio_id, "CLIENT", portfolio_id, PortfolioType.BALANCED, RiskProfile.MODERATE,
+                             value + cash, cash, value, targets, RebalanceFrequency.THRESHOLD,
+                             rebalance_threshold=5.0, holdings=holdings)
+    for h in holdings:
+        h.weight = h.market_value / portfolio.total_value * 100
+    return portfolio
+
+
+def _reference_update(portfolio: HNIPortfolio, prices: dict):
+    """The original walk: every holding, full re-sum, per-allocation re-sum"""
+    for h in portfolio.holdings:
+        if h.symbol in prices:
+            h.current_price = prices[h.symbol]
+            h.market_value = h.quantity * h.current_price
+            h.unrealized_pnl = (h.current_price - h.cost_basis) * h.quantity
+            h.total_return = h.unrealized_pnl / (h.cost_basis * h.quantity)
+    portfolio.total_value = sum(h.market_value for h in portfolio.holdings) + portfolio.cash_balance
+    for h in portfolio.holdings:
+        h.weight = h.market_value / portfolio.total_value * 100
+    for allocation in portfolio.target_allocations:
+        allocation.current_value = sum(h.market_value for h in portfolio.holdings if h.asset_class == allocation.asset_class)
+        allocation.current_percentage = allocation.current_value / portfolio.total_value * 100
+
+
+def _ticks(rng: random.Random, count: int, universe: int = 3000, move: float = 0.03) -> dict:
+    return {f"SYM{s:04d}": rng.uniform(50, 5000) * (1 + rng.uniform(-move, move))
+            for s in rng.sample(range(universe), count)}
+
+
+def _state(portfolio: HNIPortfolio):
+    return (portfolio.total_value,
+            [(h.current_price, h.market_value, h.weight, h.unrealized_pnl, h.total_return) for h in portfolio.holdings],
+            [(a.current_value, a.current_percentage) for a in portfolio.target_allocations])
+
+
+def _assert_same(actual: HNIPortfolio, expected: HNIPortfolio):
+    total, holdings, allocations = _state(actual)
+    expected_total, expected_holdings, expected_allocations = _state(expected)
+    assert total == pytest.approx(expected_total, rel=1e-12)
+    for row, expected_row in zip(holdings, expected_holdings):
+        assert row == pytest.approx(expected_row, rel=1e-9, abs=1e-12)
+    for row, expected_row in zip(allocations, expected_allocations):
+        assert row == pytest.approx(expected_row, rel=1e-9, abs=1e-9)
+
+
+def _pair(seed: int, books: int):
+    """Manager-held books and an identical untracked copy for the reference walk"""
+    manager = HNIPortfolioManager()
+    tracked = [_portfolio(f"HNI{i:04d}", random.Random(seed * 10_000 + i)) for i in range(books)]
+    copies = [_portfolio(f"HNI{i:04d}", random.Random(seed * 10_000 + i)) for i in range(books)]
+    for portfolio in tracked:
+        manager.register_portfolio(portfolio)
+    return manager, tracked, copies
+
+
+class TestReverseIndex:
+    """Ticks reach only the holdings that carry the symbol"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_ticks_match_full_resummation(self):
+        manager, tracked, copies = _pair(1, 40)
+        rng = random.Random(2)
+
+        for count in (800, 3000, 50, 2000):  # index path, portfolio walk, index path, portfolio walk
+            prices = _ticks(rng, count)
+            flags = await manager.update_market_prices(prices)
+            for portfolio in copies:
+                _reference_update(portfolio, prices)
+
+            affected = {p.portfolio_id for p in copies if any(h.symbol in prices for h in p.holdings)}
+            assert set(flags) == affected
+            assert {pid for pid, flag in flags.items() if flag} == {p.portfolio_id for p in copies if p.needs_rebalancing} & affected
+            for portfolio, copy in zip(tracked, copies):
+                _assert_same(manager.get_portfolio(portfolio.portfolio_id), copy)
+                assert manager._valuations[portfolio.portfolio_id].needs_rebalancing == copy.needs_rebalancing
+
+    @pytest.mark.asyncio
+    async def test_single_portfolio_updates_use_the_index(self):
+        manager, tracked, copies = _pair(3, 3)
+        target = tracked[1]
+        prices = {h.symbol: h.current_price * 1.1 for h in target.holdings[:5]}
+        untouched = _state(tracked[0])
+
+        await manager.update_portfolio_prices(target.portfolio_id, prices)
+        _reference_update(copies[1], prices)
+
+        _assert_same(target, copies[1])
+        assert _state(tracked[0]) == untouched  # other books keep their prices until they are updated
+        assert await manager.update_portfolio_prices("missing", prices) is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_symbols_and_duplicate_holdings(self):
+        manager = HNIPortfolioManager()
+        portfolio = _portfolio("DUP", random.Random(4), symbols=3)
+        portfolio.holdings.append(PortfolioHolding(portfolio.holdings[0].symbol, "Second lot", AssetClass.EQUITY,
+                                                   7, portfolio.holdings[0].current_price, 100.0,
+                                                   7 * portfolio.holdings[0].current_price, 0.0))
+        copy = _portfolio("DUP", random.Random(4), symbols=3)
+        copy.holdings.append(PortfolioHolding(**portfolio.holdings[-1].__dict__))
+        manager.register_portfolio(portfolio)
+
+        prices = {portfolio.holdings[0].symbol: 123.0, "NOT_HELD": 1.0}
+        assert await manager.update_market_prices(prices) == {"DUP": manager._valuations["DUP"].needs_rebalancing}
+        _reference_update(copy, prices)
+
+        assert manager._valuations["DUP"].weights_stale
+        _assert_same(manager.get_portfolio("DUP"), copy)
+        assert not manager._valuations["DUP"].weights_stale
+        assert portfolio.holdings[-1].market_value == pytest.approx(7 * 123.0)
+        assert await manager.update_market_prices({"NOT_HELD": 2.0}) == {}
+
+    @pytest.mark.asyncio
+    async def test_dense_threshold_counts_holdings(self):
+        manager = HNIPortfolioManager()
+        lots = _portfolio("LOTS", random.Random(5), symbols=2)
+        symbol = lots.holdings[0].symbol
+        for k in range(6):
+            lots.holdings.append(PortfolioHolding(**{**lots.holdings[0].__dict__, 'name': f"Lot {k}"}))
+        copy = _portfolio("LOTS", random.Random(5), symbols=2)
+        copy.holdings += [PortfolioHolding(**h.__dict__) for h in lots.holdings[2:]]
+        manager.register_portfolio(lots)
+        manager.register_portfolio(_portfolio("OTHER", random.Random(6), symbols=5))
+
+        # Seven of the 13 indexed holdings, held by a single portfolio: the batch takes the dense walk
+        assert manager._reached_holdings([symbol, "NOT_HELD"]) == 7
+        assert manager._indexed_holdings == 13
+
+        await manager.update_market_prices({symbol: 321.0})
+        _reference_update(copy, {symbol: 321.0})
+        _assert_same(manager.get_portfolio("LOTS"), copy)
+
+    @pytest.mark.asyncio
+    async def test_drifted_class_values_are_resummed(self):
+        manager, tracked, copies = _pair(7, 1)
+        valuation = manager._valuations[tracked[0].portfolio_id]
+        valuation.class_values[0] += 1e-3  # accumulated rounding error
+        valuation.refreshes = valuation.RESYNC_INTERVAL - 1
+        class_values = valuation.class_values
+        prices = {tracked[0].holdings[0].symbol: 99.0}
+
+        await manager.update_market_prices(prices)
+        _reference_update(copies[0], prices)
+
+        assert valuation.refreshes == 0 and valuation.class_values is class_values  # still shared with the index
+        for slot, asset_class in enumerate(valuation.asset_classes):
+            exact = sum(h.market_value for h in tracked[0].holdings if h.asset_class == asset_class)
+            assert valuation.class_values[slot] == pytest.approx(exact, rel=1e-15)
+        _assert_same(manager.get_portfolio(tracked[0].portfolio_id), copies[0])
+
+
+class TestRebalancingFlags:
+    """Running aggregates drive needs_rebalancing"""
+
+    @pytest.mark.asyncio
+    async def test_flags_follow_prices(self):
+        manager = HNIPortfolioManager()
+        holdings = [
+            PortfolioHolding("EQ", "Equity", AssetClass.EQUITY, 60, 100.0, 100.0, 6000.0, 60.0),
+            PortfolioHolding("GILT", "Gilt", AssetClass.DEBT, 40, 100.0, 100.0, 4000.0, 40.0)
+        ]
+        portfolio = HNIPortfolio("FLAG", "C", "Flag", PortfolioType.BALANCED, RiskProfile.MODERATE, 10_000.0, 0.0,
+                                 10_000.0, [AssetAllocation(AssetClass.EQUITY, 60.0, 50.0, 70.0),
+                                            AssetAllocation(AssetClass.DEBT, 40.0, 30.0, 50.0)],
+                                 RebalanceFrequency.THRESHOLD, rebalance_threshold=5.0, holdings=holdings)
+        manager.register_portfolio(portfolio)
+        assert manager.portfolios_needing_rebalance() == []
+
+        assert await manager.update_market_prices({"EQ": 140.0}) == {"FLAG": True}
+        assert manager.get_portfolio("FLAG").needs_rebalancing and manager.portfolios_needing_rebalance() == ["FLAG"]
+        assert portfolio.target_allocations[0].current_percentage == pytest.approx(8400 / 124)
+
+        assert await manager.update_market_prices({"EQ": 100.0}) == {"FLAG": False}
+        summary = await manager.get_portfolio_summary("FLAG")
+        assert summary["needs_rebalancing"] is False and summary["total_value"] == pytest.approx(10_000.0)
+
+    @pytest.mark.asyncio
+    async def test_created_and_rebalanced_portfolios_are_reindexed(self):
+        manager = HNIPortfolioManager()
+        portfolio_id = await manager.create_hni_portfolio(
+            "CLIENT", "Growth", PortfolioType.GROWTH, RiskProfile.HIGH, 10_000_000.0
+        )
+        portfolio = manager.portfolios[portfolio_id]
+        assert portfolio_id in manager._holders["RELIANCE"]
+
+        assert (await manager.update_market_prices({"RELIANCE": 2420.0 * 3}))[portfolio_id]
+        reliance = next(h for h in portfolio.holdings if h.symbol == "RELIANCE")
+        before = reliance.market_value
+        assert await manager.rebalance_portfolio(portfolio_id)
+
+        valuation = manager._valuations[portfolio_id]
+        assert reliance.market_value != before
+        assert valuation.holdings_value == pytest.approx(sum(h.market_value for h in portfolio.holdings))
+        [(indexed, class_values, _)] = manager._holders["RELIANCE"][portfolio_id]
+        assert indexed is reliance and class_values is valuation.class_values
+        assert manager._indexed_holdings == len(portfolio.holdings)
+
+
+class TestTickBenchmark:
+    """Thousands of symbol prices across 2,000 HNI portfolios in one call"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="hni_valuation")
+    def test_bulk_ticks_2000_portfolios(self, benchmark):
+        universe = 20_000
+        manager = HNIPortfolioManager()
+        tracked = [_portfolio(f"HNI{i:04d}", random.Random(i), universe=universe) for i in range(2000)]
+        copies = [_portfolio(f"HNI{i:04d}", random.Random(i), universe=universe) for i in range(2000)]
+        for portfolio in tracked:
+            manager.register_portfolio(portfolio)
+        ticks = [_ticks(random.Random(6 + i), 1000, universe=universe) for i in range(5)]
+
+        # Previous approach: every book walks all of its holdings for every batch
+        started = time.perf_counter()
+        for prices in ticks:
+            for portfolio in copies:
+                _reference_update(portfolio, prices)
+        walk_seconds = (time.perf_counter() - started) / len(ticks)
+
+        def run():
+            started = time.perf_counter()
+            for prices in ticks:
+                asyncio.run(manager.update_market_prices(prices))
+            return (time.perf_counter() - started) / len(ticks)
+
+        bulk_seconds = benchmark.pedantic(run, rounds=1, iterations=1)
+
+        benchmark.extra_info.update({
+            "portfolios": 2000, "holdings": 40_000, "symbols_per_batch": 1000,
+            "bulk_ms": bulk_seconds * 1000, "per_portfolio_walk_ms": walk_seconds * 1000,
+            "walk_to_bulk_ratio": walk_seconds / bulk_seconds
+        })
+        for portfolio, copy in zip(tracked[::97], copies[::97]):
+            _assert_same(manager.get_portfolio(portfolio.portfolio_id), copy)
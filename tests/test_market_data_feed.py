@@ -0,0 +1,253 @@
+"""
+TradeMate PRO Market Data Feed Test Suite
+========================================
+Multiplexed asyncio feed manager exercised offline against the
+local replay server, plus a throughput / callback latency benchmark
+"""
+
+import pytest
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from app.pro.market_data_feed import (
+    MultiplexedFeedManager, ReplayFeedServer, OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST
+)
+from app.pro.charting_platform import RealTimeDataFeed, TimeFrame, IST
+
+
+SESSION_OPEN = datetime(2024, 1, 15, 9, 15, tzinfo=IST).timestamp()
+
+
+def _replay_messages(symbols: List[str], per_symbol: int) -> List[Dict[str, Any]]:
+    """Interleaved 1-minute bars for every symbol"""
+    messages = []
+    for i in range(per_symbol):
+        for n, symbol in enumerate(symbols):
+            price = 1000.0 + n + i * 0.5
+            messages.append({
+                "symbol": symbol,
+                "seq": i,
+                "timestamp": SESSION_OPEN + 60 * i,
+                "open": price,
+                "high": price + 1,
+                "low": price - 1,
+                "close": price + 0.5,
+                "volume": 100 + i
+            })
+    return messages
+
+
+async def _wait_for(predicate, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met before timeout")
+        await asyncio.sleep(0.005)
+
+
+async def _replay_through_manager(symbols: List[str], per_symbol: int, config: Dict[str, Any],
+                                  batch_size: int = 1, callback_factory=None):
+    """Replay messages through a fresh manager; returns (manager, server, received)"""
+    server = ReplayFeedServer(_replay_messages(symbols, per_symbol), batch_size=batch_size)
+    await server.start()
+    manager = MultiplexedFeedManager(server.url, config)
+    received: Dict[str, List[Dict[str, Any]]] = {symbol: [] for symbol in symbols}
+
+    for symbol in symbols:
+        callback = callback_factory(received[symbol]) if callback_factory else received[symbol].append
+        await manager.subscribe(symbol, callback)
+
+    await manager.start()
+    return manager, server, received
+
+
+class TestMultiplexedFeedManager:
+    """Connection pooling, fan-out and reconnect behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_symbols_share_a_small_connection_pool(self):
+        symbols = [f"SYM{i:03d}" for i in range(250)]
+        manager, server, received = await _replay_through_manager(
+            symbols, per_symbol=4, config={"max_symbols_per_connection": 100, "max_connections": 4}
+        )
+        try:
+            await _wait_for(lambda: manager.stats["messages_delivered"] == 1000)
+
+            assert len(manager.connections) == 3
+            assert server.connections_accepted == 3
+            assert sorted(len(c.symbols) for c in manager.connections) == [50, 100, 100]
+            assert all([m["seq"] for m in messages] == [0, 1, 2, 3] for messages in received.values())
+            assert manager.stats["messages_dropped"] == 0
+        finally:
+            await manager.stop()
+            await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_pool_overfills_least_loaded_connection_when_exhausted(self):
+        manager = MultiplexedFeedManager("ws://unused", {"max_symbols_per_connection": 2, "max_connections": 2})
+        for i in range(5):
+            await manager.subscribe(f"SYM{i}", lambda message: None)
+
+        assert len(manager.connections) == 2
+        assert sorted(len(c.symbols) for c in manager.connections) == [2, 3]
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_oldest_and_keeps_latest(self):
+        def factory(sink):
+            async def callback(message):
+                await asyncio.sleep(0.005)
+                sink.append(message)
+            return callback
+
+        manager, server, received = await _replay_through_manager(
+            ["RELIANCE", "TCS"], per_symbol=200,
+            config={"queue_size": 4, "overflow": OVERFLOW_DROP_OLDEST},
+            batch_size=50, callback_factory=factory
+        )
+        try:
+            await _wait_for(lambda: manager.stats["messages_received"] == 400)
+            await _wait_for(lambda: all(messages and messages[-1]["seq"] == 199 for messages in received.values()))
+
+            assert manager.stats["messages_dropped"] > 0
+            assert manager.stats["messages_delivered"] + manager.stats["messages_dropped"] == 400
+        finally:
+            await manager.stop()
+            await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_blocking_overflow_delivers_every_message(self):
+        def factory(sink):
+            async def callback(message):
+                await asyncio.sleep(0)
+                sink.append(message)
+            return callback
+
+        manager, server, received = await _replay_through_manager(
+            ["RELIANCE", "TCS"], per_symbol=300,
+            config={"queue_size": 2, "overflow": OVERFLOW_BLOCK},
+            batch_size=100, callback_factory=factory
+        )
+        try:
+            await _wait_for(lambda: manager.stats["messages_delivered"] == 600)
+            assert manager.stats["messages_dropped"] == 0
+            assert [m["seq"] for m in received["TCS"]] == list(range(300))
+        finally:
+            await manager.stop()
+            await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_reconnects_with_jitter_and_resubscribes(self):
+        manager, server, received = await _replay_through_manager(
+            ["RELIANCE"], per_symbol=3,
+            config={"reconnect_base_delay": 0.01, "reconnect_max_delay": 0.05}
+        )
+        try:
+            await _wait_for(lambda: len(received["RELIANCE"]) == 3)
+
+            with patch("app.pro.market_data_feed.random.uniform", wraps=random.uniform) as jitter:
+                await server.disconnect_all()
+                await _wait_for(lambda: server.connections_accepted == 2)
+
+            # The server replays from the start on the new connection
+            await _wait_for(lambda: len(received["RELIANCE"]) == 6)
+            assert manager.stats["reconnects"] >= 1
+            assert jitter.call_args.args[0] == 0
+        finally:
+            await manager.stop()
+            await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_restart_resumes_existing_subscriptions(self):
+        manager, server, received = await _replay_through_manager(["RELIANCE", "TCS"], per_symbol=3, config={})
+        try:
+            await _wait_for(lambda: manager.stats["messages_delivered"] == 6)
+            await manager.stop()
+            assert all(s.task is None for subs in manager.subscriptions.values() for s in subs)
+
+            await manager.start()
+
+            # The server replays from the start on the new connection
+            await _wait_for(lambda: manager.stats["messages_delivered"] == 12)
+            assert [m["seq"] for m in received["TCS"]] == [0, 1, 2, 0, 1, 2]
+            assert manager.stats["messages_dropped"] == 0 and server.connections_accepted == 2
+        finally:
+            await manager.stop()
+            await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_releases_symbol(self):
+        manager = MultiplexedFeedManager("ws://unused")
+        first = await manager.subscribe("RELIANCE", lambda message: None)
+        second = await manager.subscribe("RELIANCE", lambda message: None)
+
+        await manager.unsubscribe(first)
+        assert "RELIANCE" in manager.symbol_connection
+
+        await manager.unsubscribe(second)
+        assert "RELIANCE" not in manager.symbol_connection
+        assert manager.connections[0].symbols == set()
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_realtime_feed_uses_shared_connections(self):
+        symbols = ["RELIANCE", "TCS", "INFY"]
+        server = ReplayFeedServer(_replay_messages(symbols, per_symbol=5))
+        await server.start()
+        feed = RealTimeDataFeed({**RealTimeDataFeed()._default_config(), "nse_websocket": server.url})
+        bars = {symbol: [] for symbol in symbols}
+
+        try:
+            for symbol in symbols:
+                await feed.subscribe_symbol(symbol, TimeFrame.ONE_MINUTE, bars[symbol].append)
+
+            await _wait_for(lambda: all(len(received) == 5 for received in bars.values()))
+
+            assert server.connections_accepted == 1
+            assert bars["TCS"][0].timestamp == datetime(2024, 1, 15, 9, 15)
+            assert bars["TCS"][-1].close == pytest.approx(1000.0 + 1 + 4 * 0.5 + 0.5)
+        finally:
+            await feed.stop()
+            await server.stop()
+
+
+class TestFeedThroughputBenchmark:
+    """Messages per second and p99 callback latency over the replay server"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="market_data_feed")
+    def test_replay_throughput(self, benchmark):
+        symbols = [f"SYM{i:03d}" for i in range(500)]
+        per_symbol = 40
+        total = len(symbols) * per_symbol
+        results = {}
+
+        async def replay():
+            manager, server, _ = await _replay_through_manager(
+                symbols, per_symbol,
+                config={"max_symbols_per_connection": 125, "max_connections": 4, "queue_size": 64,
+                        "overflow": OVERFLOW_BLOCK},
+                batch_size=100
+            )
+            try:
+                started = time.perf_counter()
+                await _wait_for(lambda: manager.stats["messages_delivered"] == total, timeout=60)
+                elapsed = time.perf_counter() - started
+
+                results["messages_per_second"] = total / elapsed
+                results.update(manager.latency_percentiles((50, 99)))
+                results["connections"] = len(manager.connections)
+            finally:
+                await manager.stop()
+                await server.stop()
+
+        benchmark.pedantic(lambda: asyncio.run(replay()), rounds=3, iterations=1)
+        benchmark.extra_info.update(results)
+
+        assert results["connections"] == 4
+        assert results["messages_per_second"] > 1000
+        assert results["p99"] < 1000
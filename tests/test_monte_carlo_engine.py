@@ -0,0 +1,124 @@
+"""
+TradeMate Monte Carlo Engine Test Suite
+=======================================
+Correlated Cholesky draws, seeded reproducibility across chunking and
+worker processes, PortfolioAnalyzer optimal weights / efficient frontier
+and a 1M-path, 50-asset benchmark
+"""
+
+import pytest
+import time
+import numpy as np
+
+from app.analytics.portfolio_analytics import MonteCarloEngine, PortfolioAnalyzer, PortfolioHolding
+
+
+def _covariance(assets: int, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.01, (assets, 3))
+    return loadings @ loadings.T + np.diag(rng.uniform(1e-5, 4e-4, assets))
+
+
+def _holdings(count: int) -> list:
+    return [PortfolioHolding(f"SYM{i:02d}", 10, 100.0, 1000.0, 1.0 / count, "IT", "equity") for i in range(count)]
+
+
+class TestMonteCarloEngine:
+    """Draws follow the covariance and are reproducible"""
+
+    def test_draws_recover_mean_and_covariance(self):
+        covariance = _covariance(6)
+        mean = np.linspace(0.001, 0.006, 6)
+        engine = MonteCarloEngine(mean, covariance, seed=1)
+
+        simulated = engine.simulate(np.full(6, 1 / 6), 400_000)
+
+        np.testing.assert_allclose(simulated.asset_mean, mean, atol=1e-4)
+        np.testing.assert_allclose(simulated.asset_covariance, covariance, atol=2e-5)
+        assert np.std(simulated.portfolio_returns) == pytest.approx(np.sqrt(np.full(6, 1 / 6) @ covariance @ np.full(6, 1 / 6)), rel=0.01)
+
+    def test_steps_compound_per_path(self):
+        engine = MonteCarloEngine(np.array([0.01]), np.array([[0.0004]]), seed=2)
+
+        simulated = engine.simulate(np.array([1.0]), 200_000, steps=12)
+
+        assert simulated.portfolio_returns.mean() == pytest.approx(1.01 ** 12 - 1, rel=0.01)
+        assert simulated.portfolio_returns.dtype == np.float64
+
+    def test_seeded_runs_match_across_workers(self):
+        covariance = _covariance(8)
+        weights = np.full(8, 1 / 8)
+        in_process = MonteCarloEngine(np.zeros(8), covariance, seed=42, chunk_elements=20_000)
+        pooled = MonteCarloEngine(np.zeros(8), covariance, seed=42, chunk_elements=20_000, max_workers=2)
+
+        first = in_process.simulate(weights, 10_000, steps=4)
+        np.testing.assert_array_equal(first.portfolio_returns, in_process.simulate(weights, 10_000, steps=4).portfolio_returns)
+        np.testing.assert_array_equal(first.portfolio_returns, pooled.simulate(weights, 10_000, steps=4).portfolio_returns)
+        assert not np.array_equal(first.portfolio_returns,
+                                  MonteCarloEngine(np.zeros(8), covariance, seed=43).simulate(weights, 10_000, 4).portfolio_returns)
+
+    def test_semi_definite_covariance_is_factored(self):
+        returns = np.random.default_rng(0).normal(0, 0.01, (5, 10))  # fewer observations than assets
+        engine = MonteCarloEngine(np.zeros(10), np.cov(returns, rowvar=False), seed=0)
+
+        assert np.isfinite(engine.simulate(np.full(10, 0.1), 1000).portfolio_returns).all()
+
+
+class TestPortfolioAnalyzerMonteCarlo:
+    """Optimal weights and the efficient frontier are filled in"""
+
+    @pytest.mark.asyncio
+    async def test_frontier_and_optimal_weights(self):
+        analyzer = PortfolioAnalyzer()
+        analyzer.config.update({"monte_carlo_seed": 7, "monte_carlo_runs": 20_000})
+        holdings = _holdings(9)
+        historical_data = await analyzer._get_historical_data(holdings, 252)
+
+        result = await analyzer._run_monte_carlo_simulation(holdings, historical_data)
+
+        assert result.simulation_runs == 20_000 and 0 <= result.probability_of_loss <= 1
+        assert result.var_estimates["99%"] <= result.var_estimates["95%"]
+        weights = np.array(list(result.optimal_weights.values()))
+        assert weights.sum() == pytest.approx(1.0, abs=1e-6)
+        assert weights.min() >= 0 and weights.max() <= analyzer.config["max_position_size"] + 1e-6
+
+        risks, returns = zip(*result.efficient_frontier)
+        assert len(result.efficient_frontier) == 10
+        assert all(b >= a - 1e-9 for a, b in zip(returns, returns[1:]))
+        assert all(b >= a - 1e-6 for a, b in zip(risks, risks[1:]))
+
+    @pytest.mark.asyncio
+    async def test_history_drives_correlation(self):
+        analyzer = PortfolioAnalyzer()
+        analyzer.config.update({"monte_carlo_seed": 1, "monte_carlo_runs": 50_000, "monte_carlo_steps": 1})
+        rng = np.random.default_rng(5)
+        common = rng.normal(0.0005, 0.02, 252)
+        correlated = {s: {"returns": list(common + rng.normal(0, 0.001, 252))} for s in ("A", "B")}
+        holdings = [PortfolioHolding(s, 1, 100.0, 100.0, 0.5, "IT", "equity") for s in ("A", "B")]
+
+        result = await analyzer._run_monte_carlo_simulation(holdings, correlated)
+
+        # Perfectly diversifying would halve the variance; near-identical assets do not diversify
+        single_asset_vol = np.std(common) * np.sqrt(252)
+        assert result.expected_volatility == pytest.approx(single_asset_vol, rel=0.1)
+
+
+class TestMonteCarloBenchmark:
+    """One million paths on a 50-asset book"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="monte_carlo")
+    def test_one_million_paths_50_assets(self, benchmark):
+        engine = MonteCarloEngine(np.full(50, 0.12), _covariance(50) * 252, seed=11)
+        weights = np.full(50, 1 / 50)
+
+        def run():
+            started = time.perf_counter()
+            simulated = engine.simulate(weights, 1_000_000)
+            return simulated, time.perf_counter() - started
+
+        simulated, elapsed = benchmark.pedantic(run, rounds=1, iterations=1)
+
+        benchmark.extra_info.update({"paths": 1_000_000, "assets": 50, "seconds": elapsed})
+        assert len(simulated.portfolio_returns) == 1_000_000
+        assert elapsed < 20
@@ -0,0 +1,214 @@
+"""
+TradeMate Limit Order Book Test Suite
+=====================================
+Price-time priority matching, iceberg refresh, L2 snapshot replay,
+ExecutionEngine limit / iceberg fills against depth and a throughput
+benchmark on a book with 100k resting orders
+"""
+
+import pytest
+import random
+import time
+
+from app.institutional.order_book import LimitOrderBook, BUY, SELL
+from app.institutional.advanced_order_management import (
+    AdvancedOrder, ExecutionEngine, OrderSide, OrderStatus, OrderType
+)
+
+
+def _book() -> LimitOrderBook:
+    book = LimitOrderBook("RELIANCE")
+    book.add_limit("B1", BUY, 2419.90, 100)
+    book.add_limit("B2", BUY, 2419.95, 200)
+    book.add_limit("A1", SELL, 2420.05, 150)
+    book.add_limit("A2", SELL, 2420.05, 50)
+    book.add_limit("A3", SELL, 2420.20, 300)
+    return book
+
+
+class TestLimitOrderBook:
+    """Matching and book maintenance"""
+
+    def test_top_of_book_and_depth(self):
+        book = _book()
+
+        assert book.best_bid == 2419.95 and book.best_ask == 2420.05
+        assert book.spread == pytest.approx(0.10)
+        assert book.depth(2) == {'bids': [(2419.95, 200), (2419.90, 100)],
+                                 'asks': [(2420.05, 200), (2420.20, 300)]}
+
+    def test_marketable_order_walks_levels_in_time_priority(self):
+        book = _book()
+
+        fills = book.add_limit("T1", BUY, 2420.20, 260)
+
+        assert [(f.maker_order_id, f.price, f.quantity) for f in fills] == [
+            ("A1", 2420.05, 150), ("A2", 2420.05, 50), ("A3", 2420.20, 60)
+        ]
+        assert book.best_ask == 2420.20
+        assert book.depth(1)['asks'] == [(2420.20, 240)]
+        assert "T1" not in book.orders
+
+    def test_unfilled_remainder_rests_behind_existing_queue(self):
+        book = _book()
+
+        fills = book.add_limit("T1", SELL, 2419.95, 250)
+        book.add_limit("T2", SELL, 2420.05, 10)
+
+        assert [(f.maker_order_id, f.quantity) for f in fills] == [("B2", 200)]
+        assert book.best_ask == 2419.95 and book.orders["T1"].remaining == 50
+        assert book.queue_position("T2") == 200
+        assert book.add_market("M1", BUY, 1000)[-1].maker_order_id == "A3"
+
+    def test_cancel_removes_order_and_empty_level(self):
+        book = _book()
+
+        assert book.cancel("B2")
+        assert not book.cancel("B2")
+        assert book.best_bid == 2419.90
+
+        book.cancel("A1")
+        assert book.queue_position("A2") == 0
+        book.cancel("A2")
+        assert book.best_ask == 2420.20
+
+    def test_iceberg_shows_peak_and_requeues_on_refresh(self):
+        book = LimitOrderBook("TCS")
+        book.add_limit("ICE", SELL, 3680.00, 1000, display_quantity=100)
+        book.add_limit("OTHER", SELL, 3680.00, 50)
+
+        assert book.depth(1)['asks'] == [(3680.00, 150)]
+        fills = book.add_limit("T1", BUY, 3680.00, 220)
+
+        # First tranche, then the other order that was queued behind it, then the refreshed tranche
+        assert [(f.maker_order_id, f.quantity) for f in fills] == [("ICE", 100), ("OTHER", 50), ("ICE", 70)]
+        assert book.orders["ICE"].remaining == 830
+        assert book.depth(1)['asks'] == [(3680.00, 30)]
+
+
+class TestL2Replay:
+    """External liquidity follows recorded snapshots around our orders"""
+
+    def test_shrinking_level_advances_our_queue_position(self):
+        book = LimitOrderBook("INFY")
+        book.apply_snapshot({'bids': [(1420.00, 500)], 'asks': [(1420.10, 400)]})
+        book.add_limit("OURS", BUY, 1420.00, 100)
+        assert book.queue_position("OURS") == 500
+
+        book.apply_snapshot({'bids': [(1420.00, 700)], 'asks': [(1420.10, 400)]})
+        assert book.queue_position("OURS") == 500  # new liquidity joins behind us
+
+        book.apply_snapshot({'bids': [(1420.00, 350)], 'asks': [(1420.10, 400)]})
+        assert book.queue_position("OURS") == 150
+        assert book.depth(1)['bids'] == [(1420.00, 450)]
+
+    def test_offer_trading_through_our_bid_fills_it_at_our_price(self):
+        book = LimitOrderBook("INFY")
+        snapshots = [
+            {'timestamp': 1, 'bids': [(1419.90, 300)], 'asks': [(1420.10, 400)]},
+            {'timestamp': 2, 'bids': [(1419.80, 300)], 'asks': [(1419.95, 400)]},
+        ]
+        replay = book.replay(snapshots)
+        next(replay)
+        book.add_limit("OURS", BUY, 1420.00, 100)
+
+        timestamp, fills = next(replay)
+
+        assert timestamp == 2
+        assert [(f.maker_order_id, f.price, f.quantity) for f in fills] == [("OURS", 1420.00, 100)]
+        assert book.depth(1) == {'bids': [(1419.80, 300)], 'asks': [(1419.95, 300)]}
+
+
+class TestExecutionEngineDepth:
+    """Limit and iceberg orders fill against simulated depth"""
+
+    def _order(self, order_id, order_type, side, quantity, price, **kwargs) -> AdvancedOrder:
+        return AdvancedOrder(order_id=order_id, client_id="INST001", strategy_id=None, symbol="TCS",
+                             side=side, quantity=quantity, order_type=order_type, status=OrderStatus.PENDING,
+                             price=price, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_limit_order_fills_depth_then_rests(self):
+        engine = ExecutionEngine()
+        await engine.apply_l2_snapshot("TCS", {'bids': [(3679.90, 500)], 'asks': [(3680.00, 300), (3680.10, 200)]})
+        order = self._order("LMT_001", OrderType.LIMIT, OrderSide.BUY, 600, 3680.10)
+
+        assert await engine.submit_order(order)
+
+        assert [(e.filled_quantity, e.avg_fill_price) for e in order.executions] == [(300, 3680.00), (200, 3680.10)]
+        assert order.status == OrderStatus.PARTIALLY_FILLED
+        assert order.avg_fill_price == pytest.approx((300 * 3680.00 + 200 * 3680.10) / 500)
+        assert engine.order_books["TCS"].best_bid == 3680.10
+
+        # The resting remainder fills once offers trade through it
+        await engine.apply_l2_snapshot("TCS", {'bids': [(3679.90, 500)], 'asks': [(3680.05, 400)]})
+        assert order.status == OrderStatus.FILLED
+        assert order.executions[-1].avg_fill_price == 3680.10
+
+    @pytest.mark.asyncio
+    async def test_iceberg_rests_with_display_quantity_and_cancels(self):
+        engine = ExecutionEngine()
+        await engine.apply_l2_snapshot("TCS", {'bids': [(3679.90, 500)], 'asks': [(3680.20, 300)]})
+        order = self._order("ICE_001", OrderType.ICEBERG, OrderSide.SELL, 2000, 3680.10, display_quantity=500)
+
+        await engine.submit_order(order)
+        book = engine.order_books["TCS"]
+
+        assert order.status == OrderStatus.ACKNOWLEDGED and order.executions == []
+        assert book.depth(1)['asks'] == [(3680.10, 500)]
+
+        assert await engine.cancel_order(order.order_id)
+        assert book.best_ask == 3680.20
+
+    @pytest.mark.asyncio
+    async def test_symbols_without_a_book_keep_price_simulation(self):
+        engine = ExecutionEngine()
+        order = self._order("LMT_002", OrderType.LIMIT, OrderSide.BUY, 100, 10_000.0)
+
+        await engine.submit_order(order)
+
+        assert order.status == OrderStatus.FILLED and order.avg_fill_price == 10_000.0
+        assert engine.order_books == {}
+
+
+class TestOrderBookBenchmark:
+    """Order flow throughput against a deep book"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="order_book")
+    def test_throughput_with_100k_resting_orders(self, benchmark):
+        rng = random.Random(7)
+        book = LimitOrderBook("NIFTY")
+        for i in range(100_000):
+            side = BUY if i % 2 else SELL
+            offset = rng.randint(1, 500) * 0.05
+            book.add_limit(f"R{i}", side, 20000.0 - offset if side == BUY else 20000.0 + offset, rng.randint(1, 50) * 25)
+        assert len(book.orders) == 100_000
+
+        # Mixed flow: passive adds, cancels of resting orders and marketable orders
+        flow = []
+        for i in range(50_000):
+            kind = rng.random()
+            side = BUY if rng.random() < 0.5 else SELL
+            if kind < 0.5:
+                offset = rng.randint(1, 500) * 0.05
+                flow.append(("add", f"N{i}", side, 20000.0 - offset if side == BUY else 20000.0 + offset, 25))
+            elif kind < 0.85:
+                flow.append(("cancel", f"R{rng.randrange(100_000)}"))
+            else:
+                flow.append(("add", f"X{i}", side, 20000.0 + 0.5 if side == BUY else 20000.0 - 0.5, 100))
+
+        def run():
+            started = time.perf_counter()
+            for action in flow:
+                if action[0] == "add":
+                    book.add_limit(*action[1:])
+                else:
+                    book.cancel(action[1])
+            return len(flow) / (time.perf_counter() - started)
+
+        orders_per_second = benchmark.pedantic(run, rounds=1, iterations=1)
+        benchmark.extra_info.update({"orders_per_second": orders_per_second, "resting_orders": len(book.orders)})
+
+        assert book.best_bid < book.best_ask
+        assert orders_per_second > 50_000
@@ -0,0 +1,262 @@
+"""
+TradeMate Parameter Sweep Test Suite
+====================================
+Grid / random variants, time splits, shared-memory market data and
+process-pool sweeps checked against in-process evaluation
+"""
+
+import pytest
+import asyncio
+import os
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from app.ai_trading.algorithmic_trading_engine import MLStrategyOptimizer, StrategyType
+from app.ai_trading.backtesting_framework import (
+    BacktestConfig, BacktestMode, BacktestResults, ExecutionModel, CostModel
+)
+from app.ai_trading.parameter_sweep import (
+    ParameterSweep, SharedMarketData, StrategySpec, walk_forward_splits, kfold_splits
+)
+
+
+def _market_data(symbols, start="2023-01-02", end="2023-12-29", seed=5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, end)
+    frames = []
+    for symbol in symbols:
+        close = 1000.0 * np.exp(np.cumsum(rng.normal(0, 0.015, len(dates))))
+        frames.append(pd.DataFrame({
+            'timestamp': dates,
+            'symbol': symbol,
+            'open': close,
+            'high': close * 1.01,
+            'low': close * 0.99,
+            'close': close,
+            'volume': rng.integers(100_000, 3_000_000, len(dates))
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _config() -> BacktestConfig:
+    return BacktestConfig(
+        start_date=datetime(2023, 1, 2, 15, 30),
+        end_date=datetime(2023, 12, 29, 15, 30),
+        initial_capital=10_000_000.0,
+        execution_model=ExecutionModel.REALISTIC,
+        cost_model=CostModel.INDIAN_RETAIL,
+        benchmark_symbol="NIFTY50",
+        mode=BacktestMode.INDEXED
+    )
+
+
+STRATEGIES = {
+    "mean_reversion": StrategySpec("mr_1", StrategyType.MEAN_REVERSION, {'lookback_window': 20}),
+    "momentum": StrategySpec("mom_1", StrategyType.MOMENTUM, {'momentum_period': 10}),
+}
+
+GRID = {
+    "mean_reversion": {"entry_threshold": [1.5, 2.0]},
+    "momentum": {"strength_threshold": [2.0, 4.0]},
+}
+
+
+class TestVariantsAndSplits:
+    """Variant generation and time splits"""
+
+    def test_grid_is_the_cartesian_product(self):
+        sweep = ParameterSweep(_config(), STRATEGIES, _market_data(["TCS"]))
+        variants = sweep.grid(GRID, config_grid={"execution_model": [ExecutionModel.PERFECT, ExecutionModel.REALISTIC]})
+
+        assert len(variants) == 8
+        assert [v.variant_id for v in variants] == list(range(8))
+        assert variants[0].flatten() == {
+            "mean_reversion.entry_threshold": 1.5,
+            "momentum.strength_threshold": 2.0,
+            "config.execution_model": "perfect"
+        }
+        combinations = {tuple(sorted(v.flatten().items())) for v in variants}
+        assert len(combinations) == 8
+
+    def test_random_search_is_seeded_and_respects_ranges(self):
+        sweep = ParameterSweep(_config(), STRATEGIES, _market_data(["TCS"]))
+        space = {"momentum": {"momentum_period": (5, 30), "strength_threshold": (1.0, 5.0)},
+                 "mean_reversion": {"entry_threshold": [1.5, 2.0, 2.5]}}
+
+        first = sweep.random(space, 25, seed=3)
+        second = sweep.random(space, 25, seed=3)
+
+        assert [v.strategy_parameters for v in first] == [v.strategy_parameters for v in second]
+        for variant in first:
+            momentum = variant.strategy_parameters["momentum"]
+            assert isinstance(momentum["momentum_period"], int) and 5 <= momentum["momentum_period"] <= 30
+            assert 1.0 <= momentum["strength_threshold"] <= 5.0
+            assert variant.strategy_parameters["mean_reversion"]["entry_threshold"] in (1.5, 2.0, 2.5)
+
+    def test_walk_forward_and_kfold_windows(self):
+        days = list(pd.bdate_range("2023-01-02", periods=100).date)
+
+        rolling = walk_forward_splits(days, train_days=40, test_days=20)
+        assert len(rolling) == 3
+        assert rolling[1].train_start == days[20] and rolling[1].test_start == days[60]
+        assert all(s.train_end < s.test_start for s in rolling)
+
+        anchored = walk_forward_splits(days, train_days=40, test_days=20, anchored=True)
+        assert all(s.train_start == days[0] for s in anchored)
+
+        folds = kfold_splits(days, 4)
+        assert [(f.test_start, f.test_end) for f in folds] == [
+            (days[k * 25], days[k * 25 + 24]) for k in range(4)
+        ]
+        # Each fold trains on the complement of its test block
+        assert (folds[0].train_start, folds[0].train_after_start, folds[0].train_after_end) == (None, days[25], days[99])
+        assert (folds[1].train_start, folds[1].train_end) == (days[0], days[24])
+        assert (folds[1].train_after_start, folds[1].train_after_end) == (days[50], days[99])
+        assert (folds[3].train_start, folds[3].train_end, folds[3].train_after_start) == (days[0], days[74], None)
+        for fold in folds:
+            trained = sum(len([d for d in days if start <= d <= end])
+                          for segment, start, end in fold.segments() if segment != "test")
+            assert trained == 75
+
+
+class TestSharedMarketData:
+    """Shared memory round trip"""
+
+    def test_attached_frame_matches_and_is_read_only(self):
+        data = _market_data(["TCS", "INFY"], "2023-01-02", "2023-03-31")
+
+        with SharedMarketData(data) as shared:
+            shm, attached = SharedMarketData.attach(shared.handle)
+            try:
+                assert list(attached['symbol'].astype(str)) == list(data['symbol'])
+                assert (attached['timestamp'].to_numpy() == data['timestamp'].to_numpy()).all()
+                np.testing.assert_array_equal(attached['close'].to_numpy(), data['close'].to_numpy())
+                assert not attached['close'].to_numpy().flags.writeable
+
+                close = next(c for c in shared.handle.columns if c[0] == 'close')
+                segment = np.ndarray((len(data),), dtype=close[1], buffer=shm.buf, offset=close[2])
+                assert np.shares_memory(attached['close'].to_numpy(), segment)
+            finally:
+                del attached, segment
+                shm.close()
+
+
+class TestParameterSweep:
+    """Process-pool sweeps agree with in-process evaluation"""
+
+    def test_pool_matches_in_process(self):
+        data = _market_data(["TCS", "INFY", "HDFCBANK"])
+        pooled = ParameterSweep(_config(), STRATEGIES, data, max_workers=2)
+        serial = ParameterSweep(_config(), STRATEGIES, data, max_workers=1)
+        variants = pooled.grid(GRID)
+
+        table = asyncio.run(pooled.run(variants))
+        expected = asyncio.run(serial.run(variants))
+
+        assert list(table['variant_id']) == [0, 1, 2, 3]
+        assert (table['segment'] == "full").all()
+        for metric in ("final_capital", "total_trades", "sharpe_ratio", "max_drawdown"):
+            assert table[metric].to_numpy() == pytest.approx(expected[metric].to_numpy(), rel=1e-12)
+        assert table['total_trades'].sum() > 0
+
+    def test_kfold_runs_every_variant_on_every_fold(self):
+        data = _market_data(["TCS", "INFY"])
+        sweep = ParameterSweep(_config(), STRATEGIES, data, max_workers=2)
+        variants = sweep.grid(GRID)
+
+        table = asyncio.run(sweep.run(variants, kfold_splits(sweep.trading_days(), 3), keep_results=True))
+
+        test = table[table['segment'] == "test"]
+        assert test.groupby('fold')['variant_id'].apply(sorted).tolist() == [[0, 1, 2, 3]] * 3
+        assert table.groupby('fold')['segment'].apply(lambda s: sorted(set(s))).tolist() == [
+            ["test", "train_after"], ["test", "train", "train_after"], ["test", "train"]
+        ]
+        assert len(table) == 28
+        assert all(isinstance(r, BacktestResults) for r in sweep.results.values())
+        assert len(sweep.results) == 28
+        assert (table['start_date'].dt.time == _config().start_date.time()).all()
+
+        selected = ParameterSweep.select_walk_forward(table)
+        middle = table[(table['fold'] == 1) & (table['segment'] != "test")].groupby('variant_id')['sharpe_ratio'].mean()
+        assert list(selected['fold']) == [0, 1, 2]
+        assert selected.loc[selected['fold'] == 1, 'variant_id'].item() == middle.idxmax()
+
+    def test_walk_forward_selects_best_training_variant(self):
+        data = _market_data(["TCS", "INFY"])
+        sweep = ParameterSweep(_config(), STRATEGIES, data, max_workers=2)
+        variants = sweep.grid(GRID)
+
+        table, selected = asyncio.run(sweep.walk_forward(
+            variants, train_days=120, test_days=40, metric="total_return"
+        ))
+
+        folds = sorted(table['fold'].unique())
+        assert list(selected['fold']) == folds
+        assert (selected['segment'] == "test").all()
+        for _, row in selected.iterrows():
+            train = table[(table['fold'] == row['fold']) & (table['segment'] == "train")]
+            assert row['train_total_return'] == train['total_return'].max()
+            assert row['variant_id'] == train.loc[train['total_return'].idxmax(), 'variant_id']
+
+        best = ParameterSweep.best_parameters(table, metric="total_return")
+        assert set(best) == {"mean_reversion", "momentum"}
+        assert best["momentum"]["strength_threshold"] in (2.0, 4.0)
+
+    def test_strategy_optimizer_picks_parameters_from_the_sweep(self):
+        optimizer = MLStrategyOptimizer(folds=3)
+        grid = {"momentum_period": [5, 10], "strength_threshold": [0.5, 1.0]}
+
+        parameters = asyncio.run(optimizer.optimize_strategy_parameters(
+            StrategyType.MOMENTUM, _market_data(["TCS", "INFY"]), parameter_grid=grid
+        ))
+
+        summary = optimizer.hyperparameters[StrategyType.MOMENTUM]
+        assert summary['variants'] == 4
+        assert summary['parameters'] == {k: parameters[k] for k in grid}
+        assert parameters['momentum_period'] in (5, 10) and parameters['strength_threshold'] in (0.5, 1.0)
+        assert parameters['confirmation_period'] == 3  # defaults outside the grid are kept
+        assert summary['mean_test_sharpe_ratio'] != 0.0  # the folds traded
+
+        # Bars without OHLCV columns cannot be backtested; the defaults come back
+        closes = _market_data(["TCS"])[['timestamp', 'close']]
+        defaults = asyncio.run(MLStrategyOptimizer().optimize_strategy_parameters(StrategyType.MOMENTUM, closes))
+        assert defaults['momentum_period'] == 10
+
+    def test_default_momentum_grid_sweeps_tradable_thresholds(self):
+        optimizer = MLStrategyOptimizer(folds=3)
+
+        parameters = asyncio.run(optimizer.optimize_strategy_parameters(
+            StrategyType.MOMENTUM, _market_data(["TCS", "INFY"])
+        ))
+
+        summary = optimizer.hyperparameters[StrategyType.MOMENTUM]
+        assert summary['variants'] == 6
+        assert parameters['strength_threshold'] in (0.01, 0.02, 0.05)
+        assert summary['mean_test_sharpe_ratio'] != 0.0
+
+
+class TestSweepBenchmark:
+    """Many variants across all cores versus one"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="parameter_sweep")
+    def test_sweep_throughput(self, benchmark):
+        data = _market_data([f"NSE{i:03d}" for i in range(20)])
+        sweep = ParameterSweep(_config(), STRATEGIES, data, max_workers=os.cpu_count())
+        variants = sweep.grid({
+            "mean_reversion": {"entry_threshold": [1.5, 2.0, 2.5, 3.0]},
+            "momentum": {"strength_threshold": [2.0, 3.0, 4.0, 5.0]},
+        })
+
+        started = time.perf_counter()
+        table = benchmark.pedantic(lambda: asyncio.run(sweep.run(variants)), rounds=1, iterations=1)
+        elapsed = time.perf_counter() - started
+
+        benchmark.extra_info.update({
+            "variants": len(variants),
+            "workers": os.cpu_count(),
+            "variants_per_second": len(variants) / elapsed
+        })
+        assert len(table) == 16
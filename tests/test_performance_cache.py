@@ -0,0 +1,225 @@
+"""
+TradeMate Performance Caching Test Suite
+========================================
+Correctness and latency benchmarks for the in-memory cache engine
+backing TradeMatePerformanceSystem
+"""
+
+import pytest
+from typing import List
+
+from app.core.cache_engine import (
+    MemoryCacheEngine, CacheEntry, SIZE_ESTIMATORS,
+    shallow_size_estimator, pickle_size_estimator, fixed_size_estimator
+)
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return MemoryCacheEngine(
+        max_entries=3,
+        max_size_bytes=1_000_000,
+        size_estimator=fixed_size_estimator,
+        clock=clock
+    )
+
+
+def _filled_cache(entries: int) -> MemoryCacheEngine:
+    """Cache at capacity, sized by entry count"""
+
+    engine = MemoryCacheEngine(
+        max_entries=entries,
+        max_size_bytes=entries * 10,
+        size_estimator=fixed_size_estimator
+    )
+    for i in range(entries):
+        engine.set(f"quote:{i}", i, ttl=300)
+    return engine
+
+
+class TestMemoryCacheEngine:
+    """LRU, TTL and tag index behaviour"""
+
+    def test_get_set_roundtrip(self, cache):
+        assert cache.set("NIFTY", {"ltp": 19500.0})
+        assert cache.get("NIFTY") == {"ltp": 19500.0}
+        assert cache.get("BANKNIFTY") is None
+        assert "NIFTY" in cache
+        assert isinstance(cache.peek("NIFTY"), CacheEntry)
+
+    def test_evicts_least_recently_used(self, cache):
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+
+        # Touch "a" so "b" becomes the LRU victim
+        cache.get("a")
+        cache.set("d", "d")
+
+        assert "b" not in cache
+        assert all(key in cache for key in ("a", "c", "d"))
+        assert cache.stats["evictions"] == 1
+
+    def test_overwrite_does_not_evict(self, cache):
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+
+        cache.set("a", "A")
+
+        assert len(cache) == 3
+        assert cache.get("a") == "A"
+        assert cache.stats["evictions"] == 0
+        assert cache.memory_usage == 3
+
+    def test_ttl_expiry_on_read(self, cache, clock):
+        cache.set("quote", 1, ttl=5)
+        clock.advance(4)
+        assert cache.get("quote") == 1
+
+        clock.advance(2)
+        assert cache.get("quote") is None
+        assert cache.stats["expirations"] == 1
+        assert cache.memory_usage == 0
+
+    def test_purge_expired_skips_overwritten_entries(self, cache, clock):
+        cache.set("a", 1, ttl=5)
+        cache.set("b", 2, ttl=50)
+        cache.set("a", 3, ttl=100)  # leaves a stale heap item for "a"
+
+        clock.advance(10)
+        assert cache.purge_expired() == 0
+        assert cache.get("a") == 3
+
+        clock.advance(45)
+        assert cache.purge_expired() == 1
+        assert "b" not in cache
+
+    def test_zero_ttl_never_expires(self, cache, clock):
+        cache.set("static", "value", ttl=0)
+        clock.advance(10 ** 9)
+        assert cache.purge_expired() == 0
+        assert cache.get("static") == "value"
+
+    def test_tag_invalidation_uses_index(self, cache):
+        cache.set("q:RELIANCE", 1, tags=["quotes", "RELIANCE"])
+        cache.set("q:TCS", 2, tags=["quotes"])
+        cache.set("p:user1", 3, tags=["portfolio"])
+
+        assert cache.keys_for_tag("quotes") == {"q:RELIANCE", "q:TCS"}
+        assert cache.invalidate_tags(["quotes"]) == 2
+        assert len(cache) == 1
+        assert cache.keys_for_tag("RELIANCE") == set()
+
+    def test_overwrite_replaces_tags(self, cache):
+        cache.set("k", 1, tags=["old"])
+        cache.set("k", 2, tags=["new"])
+
+        assert cache.invalidate_tags(["old"]) == 0
+        assert cache.invalidate_tags(["new"]) == 1
+
+    def test_size_bound_and_oversize_rejection(self, clock):
+        engine = MemoryCacheEngine(
+            max_entries=100,
+            max_size_bytes=10,
+            size_estimator=len,
+            clock=clock
+        )
+        engine.set("a", "xxxx")
+        engine.set("b", "xxxx")
+        engine.set("c", "xxxx")  # 12 bytes > 10, evicts "a"
+
+        assert "a" not in engine
+        assert engine.memory_usage == 8
+
+        assert engine.set("huge", "x" * 11) is False
+        assert engine.stats["rejected"] == 1
+        assert len(engine) == 2
+
+    def test_oversize_overwrite_drops_the_old_value(self, clock):
+        engine = MemoryCacheEngine(max_entries=10, max_size_bytes=10, size_estimator=len, clock=clock)
+        engine.set("quote", "xxxx", tags=["quotes"])
+
+        assert engine.set("quote", "x" * 11) is False
+        assert engine.get("quote") is None
+        assert engine.memory_usage == 0
+        assert engine.keys_for_tag("quotes") == set()
+
+    def test_iteration_is_lru_ordered(self, cache):
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+        cache.get("a")
+
+        assert [entry.key for entry in cache.values()] == ["b", "c", "a"]
+
+    def test_size_estimators(self):
+        value = {"symbol": "RELIANCE", "ltp": 2500.5}
+
+        assert shallow_size_estimator(value) > 0
+        assert pickle_size_estimator(value) > 0
+        assert fixed_size_estimator(value) == 1
+        assert set(SIZE_ESTIMATORS) == {"shallow", "pickle", "fixed"}
+
+
+class TestCacheEngineBenchmarks:
+    """Set/get/evict latency at 10k and 1M entries"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="memory_cache_get")
+    @pytest.mark.parametrize("entries", [10_000, 1_000_000])
+    def test_get_latency(self, benchmark, entries):
+        engine = _filled_cache(entries)
+        keys: List[str] = [f"quote:{i}" for i in range(0, entries, max(1, entries // 1000))]
+
+        def get_batch():
+            for key in keys:
+                engine.get(key)
+
+        benchmark(get_batch)
+        assert len(engine) == entries
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="memory_cache_set")
+    @pytest.mark.parametrize("entries", [10_000, 1_000_000])
+    def test_set_overwrite_latency(self, benchmark, entries):
+        engine = _filled_cache(entries)
+        keys: List[str] = [f"quote:{i}" for i in range(0, entries, max(1, entries // 1000))]
+
+        def set_batch():
+            for key in keys:
+                engine.set(key, 1, ttl=300)
+
+        benchmark(set_batch)
+        assert len(engine) == entries
+        assert engine.stats["evictions"] == 0
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="memory_cache_evict")
+    @pytest.mark.parametrize("entries", [10_000, 1_000_000])
+    def test_evicting_set_latency(self, benchmark, entries):
+        engine = _filled_cache(entries)
+        counter = iter(range(10 ** 9))
+
+        def evicting_batch():
+            for _ in range(1000):
+                engine.set(f"new:{next(counter)}", 1, ttl=300)
+
+        benchmark(evicting_batch)
+        assert len(engine) == entries
+        assert engine.stats["evictions"] > 0
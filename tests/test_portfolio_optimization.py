@@ -0,0 +1,280 @@
+"""
+TradeMate Portfolio Optimization Service Test Suite
+===================================================
+Constrained mean-variance / maximum Sharpe / maximum diversification
+against plain SLSQP, risk parity contributions, Black-Litterman posterior,
+factorization caching per universe and date, warm starts, batch solves
+through the HNI PortfolioOptimizer and a 2,000 portfolio rebalance benchmark
+"""
+
+import pytest
+import time
+from datetime import date
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+from app.institutional.portfolio_optimization import (
+    FactorizedCovariance, OptimizationConstraints, PortfolioOptimizationService, project_to_bounds
+)
+from app.institutional.hni_portfolio_management import (
+    AssetClass, HNIPortfolio, PortfolioHolding, PortfolioOptimizer, PortfolioType, RebalanceFrequency, RiskProfile
+)
+
+
+def _returns(assets: int, days: int = 500, seed: int = 1, shift: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.01, (assets, 3))
+    covariance = loadings @ loadings.T + np.diag(rng.uniform(2e-5, 3e-4, assets))
+    draws = rng.multivariate_normal(rng.uniform(-0.0002, 0.0012, assets), covariance, days + shift)
+    return pd.DataFrame(draws[shift:], columns=[f"SYM{i:02d}" for i in range(assets)])
+
+
+def _reference(objective, model: FactorizedCovariance, lower: float, upper: float, extra=()) -> np.ndarray:
+    """Plain SLSQP from equal weights with numerical gradients"""
+    n = len(model)
+    result = minimize(objective, np.full(n, 1 / n), method="SLSQP", bounds=[(lower, upper)] * n,
+                      constraints=[{"type": "eq", "fun": lambda w: w.sum() - 1}, *extra],
+                      options={"maxiter": 1000, "ftol": 1e-12})
+    assert result.success
+    return result.x
+
+
+def _portfolio(portfolio_id: str, symbols) -> HNIPortfolio:
+    holdings = [PortfolioHolding(s, s, AssetClass.EQUITY, 10, 100.0, 100.0, 1000.0, 1 / len(symbols)) for s in symbols]
+    return HNIPortfolio(portfolio_id, "CLIENT", portfolio_id, PortfolioType.BALANCED, RiskProfile.MODERATE,
+                        1000.0 * len(symbols), 0.0, 1000.0 * len(symbols), [], RebalanceFrequency.QUARTERLY,
+                        holdings=holdings)
+
+
+class TestConstrainedProblems:
+    """Each method reaches the optimum of its problem within the constraints"""
+
+    def test_mean_variance_matches_reference(self):
+        model = FactorizedCovariance.from_returns(_returns(12))
+        constraints = OptimizationConstraints(min_weight=0.02, max_weight=0.25, risk_aversion=4.0)
+
+        result = PortfolioOptimizationService().optimize(model, "mean_variance", constraints)
+
+        def utility(w):
+            return 0.5 * 4.0 * w @ model.covariance @ w - model.mean @ w
+
+        reference = _reference(utility, model, 0.02, 0.25)
+        assert result.converged
+        assert result.weights.sum() == pytest.approx(1.0)
+        assert result.weights.min() >= 0.02 - 1e-12 and result.weights.max() <= 0.25 + 1e-12
+        assert utility(result.weights) <= utility(reference) + 1e-9
+
+    def test_max_sharpe_respects_return_and_volatility_limits(self):
+        model = FactorizedCovariance.from_returns(_returns(10))
+        service = PortfolioOptimizationService()
+
+        def sharpe(w):
+            return (model.mean @ w - 0.05) / np.sqrt(w @ model.covariance @ w)
+
+        free = service.optimize(model, "max_sharpe", OptimizationConstraints(max_weight=0.4, risk_free_rate=0.05))
+        reference = _reference(lambda w: -sharpe(w), model, 0.0, 0.4)
+        assert sharpe(free.weights) >= sharpe(reference) - 1e-7
+
+        capped = service.optimize(model, "max_sharpe", OptimizationConstraints(
+            max_weight=0.4, risk_free_rate=0.05, max_volatility=free.volatility * 0.9,
+            target_return=free.expected_return * 0.5))
+        assert capped.converged
+        assert capped.volatility <= free.volatility * 0.9 + 1e-8
+        assert capped.expected_return >= free.expected_return * 0.5 - 1e-8
+
+    def test_maximum_diversification_matches_reference(self):
+        model = FactorizedCovariance.from_returns(_returns(15))
+
+        result = PortfolioOptimizationService().optimize(
+            model, "maximum_diversification", OptimizationConstraints(max_weight=0.1))
+
+        def ratio(w):
+            return model.volatilities @ w / np.sqrt(w @ model.covariance @ w)
+
+        reference = _reference(lambda w: -ratio(w), model, 0.0, 0.1)
+        assert result.weights.max() <= 0.1 + 1e-9
+        assert ratio(result.weights) >= ratio(reference) - 1e-7
+
+    def test_risk_parity_contributions_follow_budgets(self):
+        model = FactorizedCovariance.from_returns(_returns(8))
+        service = PortfolioOptimizationService()
+
+        equal = service.optimize(model, "risk_parity").weights
+        budgets = {"SYM00": 0.3, "SYM01": 0.2}
+        budgeted = service.optimize(model, "risk_parity", OptimizationConstraints.from_dict({"risk_budgets": budgets})).weights
+
+        contributions = equal * (model.covariance @ equal)
+        np.testing.assert_allclose(contributions / contributions.sum(), np.full(8, 1 / 8), rtol=1e-8)
+        contributions = budgeted * (model.covariance @ budgeted)
+        expected = np.array([0.3, 0.2] + [1 / 8] * 6)
+        np.testing.assert_allclose(contributions / contributions.sum(), expected / expected.sum(), rtol=1e-8)
+
+    def test_black_litterman_posterior(self):
+        model = FactorizedCovariance.from_returns(_returns(6))
+        service = PortfolioOptimizationService()
+
+        # No views: the equilibrium portfolio is the market portfolio
+        prior = service.optimize(model, "black_litterman", OptimizationConstraints(risk_aversion=2.5))
+        np.testing.assert_allclose(prior.weights, np.full(6, 1 / 6), atol=1e-8)
+
+        constraints = OptimizationConstraints.from_dict({"views": {"SYM02": 0.30, "SYM04": -0.05},
+                                                         "risk_aversion": 2.5, "view_confidence": 2.0})
+        posterior = service.black_litterman_returns(model, constraints)
+
+        # Precision form of the same posterior
+        tau_cov = 0.05 * model.covariance
+        pick = np.zeros((2, 6))
+        pick[0, 2] = pick[1, 4] = 1
+        omega = np.diag(np.diag(pick @ tau_cov @ pick.T)) / 2.0
+        implied = 2.5 * model.covariance @ np.full(6, 1 / 6)
+        precision = np.linalg.inv(tau_cov) + pick.T @ np.linalg.inv(omega) @ pick
+        expected = np.linalg.solve(precision, np.linalg.inv(tau_cov) @ implied + pick.T @ np.linalg.inv(omega) @ [0.30, -0.05])
+        np.testing.assert_allclose(posterior, expected, rtol=1e-8)
+
+        weights = service.optimize(model, "black_litterman", constraints).as_dict()
+        assert weights["SYM02"] > 1 / 6 > weights["SYM04"]
+
+    def test_projection_onto_bounds(self):
+        projected = project_to_bounds(np.array([0.9, 0.5, -0.2, 0.1]), 0.05, 0.4)
+
+        assert projected.sum() == pytest.approx(1.0)
+        assert projected.min() >= 0.05 and projected.max() <= 0.4
+
+
+class TestCachingAndWarmStarts:
+    """Factorizations are reused per universe and date; rebalances restart from the last solution"""
+
+    def test_factorization_cached_per_universe_and_date(self):
+        service = PortfolioOptimizationService(cache_size=2)
+        returns = _returns(5)
+
+        first = service.factorize(returns, date(2026, 1, 5))
+        assert service.factorize(returns[list(reversed(returns.columns))], date(2026, 1, 5)) is first
+        assert service.factorize(returns, date(2026, 1, 6)) is not first
+        assert service.factorize(returns, None) is not service.factorize(returns, None)
+
+        service.factorize(_returns(4), date(2026, 1, 6))  # evicts the oldest entry
+        assert service.cached_factorization(returns.columns, date(2026, 1, 5)) is None
+        assert service.stats["factorizations"] == 3
+
+    @pytest.mark.parametrize("method", PortfolioOptimizationService.METHODS)
+    def test_rebalance_warm_starts_from_previous_solution(self, method):
+        service = PortfolioOptimizationService()
+        constraints = OptimizationConstraints(max_weight=0.2, min_weight=0.01, risk_free_rate=0.02)
+        today = service.factorize(_returns(30, seed=3), date(2026, 1, 5))
+        tomorrow = service.factorize(_returns(30, seed=3, shift=1), date(2026, 1, 6))
+
+        service.optimize(today, method, constraints, key="PF1")
+        warm = service.optimize(tomorrow, method, constraints, key="PF1")
+        cold = service.optimize(tomorrow, method, constraints)
+
+        assert warm.warm_started and not cold.warm_started
+        assert warm.converged and cold.converged
+        exact_hessian = method in ("mean_variance", "black_litterman", "risk_parity")
+        if exact_hessian:
+            assert warm.iterations <= cold.iterations
+        np.testing.assert_allclose(warm.weights, cold.weights, atol=1e-6 if exact_hessian else 1e-3)
+
+    def test_batch_shares_solves_for_identical_constraints(self):
+        service = PortfolioOptimizationService()
+        model = service.factorize(_returns(20), date(2026, 1, 5))
+        conservative = OptimizationConstraints(risk_aversion=8.0, max_weight=0.1)
+        aggressive = OptimizationConstraints(risk_aversion=1.5, max_weight=0.3)
+        requests = {f"PF{i}": conservative if i % 2 else aggressive for i in range(10)}
+
+        results = service.optimize_batch(model, requests)
+
+        assert service.stats["solves"] == 2
+        for portfolio_id, constraints in requests.items():
+            single = PortfolioOptimizationService().optimize(model, "mean_variance", constraints)
+            np.testing.assert_allclose(results[portfolio_id].weights, single.weights, atol=1e-9)
+        assert ("PF7", "mean_variance", model.symbols) in service._warm_starts
+
+
+class TestHNIPortfolioOptimizer:
+    """PortfolioOptimizer solves through the shared service"""
+
+    @pytest.mark.asyncio
+    async def test_methods_return_valid_weights_and_reuse_history(self):
+        optimizer = PortfolioOptimizer()
+        portfolio = _portfolio("HNI1", ["RELIANCE", "TCS", "HDFC", "INFY", "GILT10Y", "GOLDETF"])
+        fetches = []
+        original = optimizer._get_historical_data
+
+        async def counting(p):
+            fetches.append(p.portfolio_id)
+            return await original(p)
+
+        optimizer._get_historical_data = counting
+        for method in optimizer.optimization_methods:
+            weights = await optimizer.optimize_portfolio(portfolio, method)
+            assert set(weights) == {h.symbol for h in portfolio.holdings}
+            assert sum(weights.values()) == pytest.approx(1.0)
+
+        mean_variance = await optimizer.optimize_portfolio(portfolio, "mean_variance")
+        assert min(mean_variance.values()) >= 0.05 - 1e-9 and max(mean_variance.values()) <= 0.4 + 1e-9
+        assert fetches == ["HNI1"]  # one factorization for the universe today
+        assert await optimizer.optimize_portfolio(portfolio, "unknown") == {}
+
+    @pytest.mark.asyncio
+    async def test_batch_groups_portfolios_by_universe(self):
+        optimizer = PortfolioOptimizer()
+        portfolios = [_portfolio(f"A{i}", ["TCS", "INFY", "ITC"]) for i in range(5)] + \
+                     [_portfolio(f"B{i}", ["GILT5Y", "CORP1", "GOLDETF", "TCS"]) for i in range(3)] + \
+                     [_portfolio("EMPTY", [])]
+
+        optimized = await optimizer.optimize_portfolios(
+            portfolios, "mean_variance", {"max_weight": 0.5}, portfolio_constraints={"A0": {"risk_aversion": 10.0}}
+        )
+
+        assert set(optimized) == {p.portfolio_id for p in portfolios} - {"EMPTY"}
+        assert optimizer.service.stats["factorizations"] == 2
+        assert optimizer.service.stats["solves"] == 3  # A0 differs from A1-A4; B0-B2 share one solve
+        assert optimized["A1"] == optimized["A4"]
+        assert max(optimized["B2"].values()) <= 0.5 + 1e-9
+
+
+class TestOptimizationBenchmark:
+    """Daily rebalance of 2,000 HNI portfolios on one 40-asset universe"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="portfolio_optimization")
+    def test_2000_portfolios_warm_rebalance(self, benchmark):
+        rng = np.random.default_rng(12)
+        requests = [(f"HNI{i:05d}", OptimizationConstraints(
+            max_weight=float(rng.choice([0.1, 0.15, 0.2])), risk_aversion=float(np.round(rng.uniform(1, 10), 3))
+        )) for i in range(2000)]
+        service = PortfolioOptimizationService()
+        timings = {}
+
+        started = time.perf_counter()
+        cold = service.optimize_batch(service.factorize(_returns(40, seed=4), date(2026, 1, 5)), requests)
+        timings["cold"] = time.perf_counter() - started
+
+        # Previous approach: SLSQP from equal weights with numerical gradients, one portfolio at a time
+        day_two = FactorizedCovariance.from_returns(_returns(40, seed=4, shift=1))
+        started = time.perf_counter()
+        for _, constraints in requests[:40]:
+            aversion = constraints.risk_aversion
+            _reference(lambda w: 0.5 * aversion * w @ day_two.covariance @ w - day_two.mean @ w,
+                       day_two, constraints.min_weight, constraints.max_weight)
+        slsqp_per_portfolio = (time.perf_counter() - started) / 40
+
+        def rebalance():
+            started = time.perf_counter()
+            results = service.optimize_batch(service.factorize(_returns(40, seed=4, shift=1), date(2026, 1, 6)), requests)
+            timings["warm"] = time.perf_counter() - started
+            return results
+
+        warm = benchmark.pedantic(rebalance, rounds=1, iterations=1)
+
+        benchmark.extra_info.update({
+            "portfolios": len(requests), "assets": 40, "factorizations": service.stats["factorizations"],
+            "cold_seconds": timings["cold"], "warm_seconds": timings["warm"],
+            "slsqp_per_portfolio_ms": slsqp_per_portfolio * 1000,
+            "warm_iterations": sum(r.iterations for r in warm.values())
+        })
+        assert all(r.converged for r in warm.values()) and all(r.converged for r in cold.values())
+        assert service.stats["factorizations"] == 2
+        assert timings["warm"] < slsqp_per_portfolio * len(requests) / 10
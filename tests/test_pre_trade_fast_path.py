@@ -0,0 +1,189 @@
+"""
+TradeMate Pre-Trade Fast Path Test Suite
+========================================
+Immutable per-client limit / holdings snapshots, parity of the synchronous
+check with a full recompute, basket validation and per-check p99 latency
+"""
+
+import pytest
+import random
+import time
+import numpy as np
+from unittest.mock import MagicMock
+
+from app.institutional.institutional_risk_management import (
+    AlertType, InstitutionalRiskManager, Position, RiskLimit, RiskLimitType
+)
+from app.institutional.advanced_order_management import AdvancedOrder, OrderSide, OrderStatus, OrderType
+from app.institutional.hni_portfolio_management import AssetClass
+
+
+def _manager() -> InstitutionalRiskManager:
+    manager = InstitutionalRiskManager()
+    manager.redis_client = MagicMock()  # no Redis server in the test environment
+    return manager
+
+
+def _position(client_id: str, symbol: str, quantity: int, price: float) -> Position:
+    return Position(client_id, symbol, quantity, price, price, quantity * price, 0.0, 0.0, "IT", AssetClass.EQUITY)
+
+
+def _order(client_id: str, symbol: str, side: OrderSide, quantity: int, price, order_id: str = "ORD") -> AdvancedOrder:
+    return AdvancedOrder(order_id=order_id, client_id=client_id, strategy_id=None, symbol=symbol, side=side,
+                         quantity=quantity, order_type=OrderType.LIMIT, status=OrderStatus.PENDING, price=price)
+
+
+def _reference_breach(manager: InstitutionalRiskManager, order: AdvancedOrder):
+    """Full recompute from the live positions and limits"""
+    positions = manager.positions.get(order.client_id, {})
+    signed = order.quantity if order.side == OrderSide.BUY else -order.quantity
+    current = positions.get(order.symbol)
+    if current is None:
+        new_value = signed * (order.price or 0)
+        old_value = 0.0
+    else:
+        new_value = (current.quantity + signed) * (order.price or current.current_price)
+        old_value = current.market_value
+    total = sum(p.market_value for p in positions.values()) + new_value - old_value
+
+    for limit in manager.risk_limits.get(order.client_id, []):
+        if not (limit.is_active and limit.is_hard_limit):
+            continue
+        if limit.limit_type == RiskLimitType.POSITION_LIMIT and abs(new_value) > limit.limit_value:
+            return limit.limit_type
+        if limit.limit_type == RiskLimitType.PORTFOLIO_LIMIT and total > limit.limit_value:
+            return limit.limit_type
+        if limit.limit_type == RiskLimitType.CONCENTRATION_LIMIT and total > 0 and abs(new_value) / total > limit.limit_value:
+            return limit.limit_type
+    return None
+
+
+async def _client(manager: InstitutionalRiskManager, client_id: str, rng: random.Random, symbols: int = 50):
+    await manager.add_risk_limit(RiskLimit(f"{client_id}_PORT", client_id, RiskLimitType.PORTFOLIO_LIMIT, 5_000_000.0))
+    await manager.add_risk_limit(RiskLimit(f"{client_id}_POS", client_id, RiskLimitType.POSITION_LIMIT, 2_000_000.0))
+    await manager.add_risk_limit(RiskLimit(f"{client_id}_CONC", client_id, RiskLimitType.CONCENTRATION_LIMIT, 0.4))
+    await manager.add_risk_limit(RiskLimit(f"{client_id}_SOFT", client_id, RiskLimitType.POSITION_LIMIT, 1.0,
+                                           is_hard_limit=False))
+    for s in rng.sample(range(symbols), 8):
+        await manager.update_position(_position(client_id, f"SYM{s:03d}", rng.randint(100, 2000), 100.0 + s * 10))
+
+
+class TestPreTradeSnapshots:
+    """Snapshots are immutable and replaced on every update"""
+
+    @pytest.mark.asyncio
+    async def test_fast_check_matches_full_recompute(self):
+        manager = _manager()
+        rng = random.Random(1)
+        for c in range(20):
+            await _client(manager, f"INST{c:03d}", rng)
+        for _ in range(200):
+            await manager.update_market_price(f"SYM{rng.randrange(50):03d}", rng.uniform(80, 700))
+
+        outcomes = set()
+        for i in range(2000):
+            order = _order(f"INST{rng.randrange(20):03d}", f"SYM{rng.randrange(50):03d}",
+                           rng.choice([OrderSide.BUY, OrderSide.SELL]), rng.randint(1, 8000),
+                           rng.choice([None, rng.uniform(80, 700)]), f"ORD{i}")
+            breached = manager.check_order_fast(order)
+            assert breached == _reference_breach(manager, order)
+            outcomes.add(breached)
+
+        assert outcomes == {None, RiskLimitType.POSITION_LIMIT, RiskLimitType.PORTFOLIO_LIMIT,
+                            RiskLimitType.CONCENTRATION_LIMIT}
+
+    @pytest.mark.asyncio
+    async def test_updates_swap_rather_than_mutate(self):
+        manager = _manager()
+        await manager.add_risk_limit(RiskLimit("L", "A", RiskLimitType.POSITION_LIMIT, 500_000.0))
+        await manager.update_position(_position("A", "TCS", 100, 3600.0))
+        before = manager.pre_trade_snapshots["A"]
+
+        await manager.update_market_price("TCS", 3700.0)
+        after = manager.pre_trade_snapshots["A"]
+
+        assert after is not before
+        assert before.holdings["TCS"] == (100, 3600.0, 360_000.0)
+        assert after.holdings["TCS"] == (100, 3700.0, 370_000.0)
+        with pytest.raises(TypeError):
+            after.holdings["INFY"] = (1, 1.0, 1.0)
+
+        await manager.remove_position("A", "TCS")
+        assert manager.pre_trade_snapshots["A"].portfolio_value == 0.0
+
+    @pytest.mark.asyncio
+    async def test_limit_edits_apply_after_refresh(self):
+        manager = _manager()
+        limit = RiskLimit("L", "A", RiskLimitType.POSITION_LIMIT, 100_000.0)
+        await manager.add_risk_limit(limit)
+        order = _order("A", "TCS", OrderSide.BUY, 100, 3600.0)
+        assert manager.check_order_fast(order) == RiskLimitType.POSITION_LIMIT
+
+        limit.is_active = False
+        manager.refresh_pre_trade_snapshot("A")
+        assert manager.check_order_fast(order) is None
+
+
+class TestValidation:
+    """Async validators keep alerts and compliance checks"""
+
+    @pytest.mark.asyncio
+    async def test_rejection_raises_alert(self):
+        manager = _manager()
+        await manager.add_risk_limit(RiskLimit("L", "A", RiskLimitType.PORTFOLIO_LIMIT, 1_000_000.0))
+
+        approved, message = await manager.validate_order_pre_trade(_order("A", "RELIANCE", OrderSide.BUY, 1000, 2450.5))
+        assert not approved and "portfolio_limit" in message
+        alerts = await manager.get_client_alerts("A")
+        assert alerts[0].alert_type == AlertType.LIMIT_BREACHED
+
+        # Selling into a short is a negative market value and stays under a portfolio limit
+        assert await manager.validate_order_pre_trade(_order("A", "RELIANCE", OrderSide.SELL, 1000, 2450.5)) == (True, None)
+
+    @pytest.mark.asyncio
+    async def test_basket_legs_count_against_later_legs(self):
+        manager = _manager()
+        await manager.add_risk_limit(RiskLimit("L", "A", RiskLimitType.PORTFOLIO_LIMIT, 1_000_000.0))
+        await manager.update_position(_position("A", "TCS", 100, 3600.0))  # 360k held
+        basket = [
+            _order("A", "INFY", OrderSide.BUY, 300, 1400.0, "LEG1"),      # 780k
+            _order("A", "HDFC", OrderSide.BUY, 200, 1600.0, "LEG2"),      # 1.1M: rejected
+            _order("A", "INFY", OrderSide.BUY, 100, 1400.0, "LEG3"),      # 920k: fits without LEG2
+            _order("B", "HDFC", OrderSide.BUY, 200, 1600.0, "LEG4")       # other client, no limits
+        ]
+
+        assert manager.check_basket_fast(basket) == [None, RiskLimitType.PORTFOLIO_LIMIT, None, None]
+        results = await manager.validate_basket_pre_trade(basket)
+        assert [approved for approved, _ in results] == [True, False, True, True]
+        assert manager.pre_trade_snapshots["A"].portfolio_value == 360_000.0  # checks never mutate state
+
+
+class TestPreTradeBenchmark:
+    """Per-check latency with thousands of clients"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="pre_trade")
+    @pytest.mark.asyncio
+    async def test_check_p99_under_50us(self, benchmark):
+        manager = _manager()
+        rng = random.Random(8)
+        for c in range(2000):
+            await _client(manager, f"INST{c:05d}", rng, symbols=500)
+        orders = [_order(f"INST{rng.randrange(2000):05d}", f"SYM{rng.randrange(500):03d}",
+                         rng.choice([OrderSide.BUY, OrderSide.SELL]), rng.randint(1, 5000),
+                         rng.uniform(100, 5000), f"ORD{i}") for i in range(20_000)]
+
+        def run():
+            check = manager.check_order_fast
+            timings = np.empty(len(orders))
+            for i, order in enumerate(orders):
+                started = time.perf_counter_ns()
+                check(order)
+                timings[i] = time.perf_counter_ns() - started
+            return timings / 1000
+
+        latencies = benchmark.pedantic(run, rounds=1, iterations=1)
+        p50, p99 = np.percentile(latencies, [50, 99])
+
+        benchmark.extra_info.update({"checks": len(orders), "p50_us": p50, "p99_us": p99})
+        assert p99 < 50
@@ -0,0 +1,207 @@
+"""
+TradeMate Redis Cache Test Suite
+================================
+Batched MSET / MGET and the tag index kept by the Lua scripts of
+TradeMatePerformanceSystem, run against an in-process Redis double
+"""
+
+import pytest
+import sys
+import types
+from collections import defaultdict
+
+try:
+    import aioredis  # noqa: F401
+except Exception:  # not installed, or incompatible with this Python
+    sys.modules["aioredis"] = types.ModuleType("aioredis")
+
+from app.core.performance import (
+    CacheType, TradeMatePerformanceSystem, REDIS_DELETE_WITH_TAGS_SCRIPT, REDIS_SET_WITH_TAGS_SCRIPT
+)
+
+
+class FakeRedis:
+    """Strings, sets and the two tag scripts, with Redis' bytes replies and empty-set removal"""
+
+    def __init__(self):
+        self.strings = {}
+        self.sets = defaultdict(set)
+        self.pipelines = 0
+        self.cursors = {}
+
+    # Commands
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def mget(self, keys):
+        return [self.strings.get(key) for key in keys]
+
+    async def sscan(self, key, cursor=0, count=10):
+        """Members in sorted order; like Redis, removing returned members does not skip others"""
+        after = self.cursors.pop(cursor, None) if cursor else None
+        members = sorted(m for m in self.sets.get(key, ()) if after is None or m > after)
+        batch = members[:count]
+        if len(members) <= count:
+            return 0, batch
+        self.cursors[len(self.cursors) + 1] = batch[-1]
+        return len(self.cursors), batch
+
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    def unlink(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += (self.strings.pop(key, None) is not None) + (self.sets.pop(key, None) is not None)
+        return removed
+
+    def srem(self, key, *members):
+        members = {m if isinstance(m, bytes) else m.encode() for m in members}
+        present = self.sets.get(key, set())
+        removed = len(present & members)
+        present -= members
+        if key in self.sets and not present:
+            del self.sets[key]
+        return removed
+
+    def sadd(self, key, member):
+        self.sets[key].add(member if isinstance(member, bytes) else member.encode())
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, source):
+        return FakeScript(self, {REDIS_SET_WITH_TAGS_SCRIPT: self._set_with_tags,
+                                 REDIS_DELETE_WITH_TAGS_SCRIPT: self._delete_with_tags}[source])
+
+    # Script bodies, line for line with the Lua
+
+    def _set_with_tags(self, keys, args):
+        ttl, payload, key = args
+        self.strings[keys[0]] = payload
+        for old_tag in self.smembers(keys[1]):
+            self.srem(old_tag.decode(), key)
+        self.unlink(keys[1])
+        for tag_key in keys[2:]:
+            self.sadd(tag_key, key)
+            self.sadd(keys[1], tag_key)
+        return 1
+
+    def _delete_with_tags(self, keys, args):
+        for tag in self.smembers(keys[1]):
+            self.srem(tag.decode(), args[0])
+        self.unlink(keys[1])
+        return self.unlink(keys[0])
+
+
+class FakeScript:
+    def __init__(self, redis, body):
+        self.redis = redis
+        self.body = body
+
+    async def __call__(self, keys=(), args=(), client=None):
+        if isinstance(client, FakePipeline):
+            client.queued.append(lambda: self.body(list(keys), list(args)))
+            return client
+        return self.body(list(keys), list(args))
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queued = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def unlink(self, *keys):
+        self.queued.append(lambda: self.redis.unlink(*keys))
+
+    def srem(self, key, *members):
+        self.queued.append(lambda: self.redis.srem(key, *members))
+
+    async def execute(self):
+        self.redis.pipelines += 1
+        results = [command() for command in self.queued]
+        self.queued = []
+        return results
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def system(redis):
+    """Performance system wired to the double the way initialize() wires a live client"""
+    system = TradeMatePerformanceSystem()
+    system.redis_client = redis
+    system.redis_scripts = {
+        "set_with_tags": redis.register_script(REDIS_SET_WITH_TAGS_SCRIPT),
+        "delete_with_tags": redis.register_script(REDIS_DELETE_WITH_TAGS_SCRIPT)
+    }
+    return system
+
+
+class TestBatchedRedisCache:
+    """MSET in one pipeline, MGET with partial hits"""
+
+    @pytest.mark.asyncio
+    async def test_mset_with_tags_then_mget_with_partial_hits(self, system, redis):
+        quotes = {"q:TCS": {"ltp": 3680.0}, "q:INFY": {"ltp": 1420.0}, "q:BIG": list(range(1000))}
+
+        assert await system.mset_cached(quotes, ttl=60, cache_type=CacheType.REDIS, tags=["quotes"])
+
+        assert redis.pipelines == 1
+        assert redis.strings["cache:q:BIG"].startswith(b"GZIP:")  # compressed past the threshold
+        assert redis.smembers("tag:quotes") == {b"q:TCS", b"q:INFY", b"q:BIG"}
+        assert redis.smembers("keytags:q:TCS") == {b"tag:quotes"}
+
+        found = await system.mget_cached(["q:TCS", "q:MISSING", "q:BIG"], CacheType.REDIS)
+
+        assert found == {"q:TCS": {"ltp": 3680.0}, "q:BIG": list(range(1000))}
+        assert system.cache_stats["hits"] == 2 and system.cache_stats["misses"] == 1
+        assert await system.mget_cached([], CacheType.REDIS) == {}
+
+    @pytest.mark.asyncio
+    async def test_overwrite_moves_tag_membership(self, system, redis):
+        await system.set_cached("q:TCS", 1, 60, CacheType.REDIS, tags=["quotes", "IT"])
+        await system.set_cached("q:TCS", 2, 60, CacheType.REDIS, tags=["watchlist"])
+
+        assert "tag:quotes" not in redis.sets and "tag:IT" not in redis.sets
+        assert redis.smembers("keytags:q:TCS") == {b"tag:watchlist"}
+        assert await system.delete_cached("q:TCS", CacheType.REDIS)
+        assert not redis.sets and not redis.strings
+
+
+class TestRedisTagInvalidation:
+    """Invalidated keys leave every tag set, not only the one invalidated"""
+
+    @pytest.mark.asyncio
+    async def test_invalidation_cleans_other_tag_memberships(self, system, redis):
+        system.config["redis_scan_batch_size"] = 2  # several SSCAN rounds
+        await system.mset_cached({"q:TCS": 1, "q:WIPRO": 2}, 60, CacheType.REDIS, tags=["quotes", "IT"])
+        await system.set_cached("q:INFY", 3, 60, CacheType.REDIS, tags=["quotes", "IT", "NIFTY50"])
+        await system.set_cached("q:ITC", 4, 60, CacheType.REDIS, tags=["quotes", "FMCG"])
+        await system.set_cached("p:user1", 5, 60, CacheType.REDIS, tags=["portfolio", "IT"])
+
+        await system.invalidate_cache_by_tags(["quotes"], CacheType.REDIS)
+
+        assert set(redis.strings) == {"cache:p:user1"}
+        assert redis.smembers("tag:IT") == {b"p:user1"}
+        assert "tag:NIFTY50" not in redis.sets and "tag:FMCG" not in redis.sets and "tag:quotes" not in redis.sets
+        assert not [key for key in redis.sets if key.startswith("keytags:q:")]
+        assert await system.get_cached("p:user1", CacheType.REDIS) == 5
+
+    @pytest.mark.asyncio
+    async def test_members_without_keytags_are_still_removed(self, system, redis):
+        await system.set_cached("q:TCS", 1, 60, CacheType.REDIS, tags=["quotes"])
+        redis.unlink("keytags:q:TCS")  # reverse set expired before the tag set
+
+        assert await system._invalidate_redis_tag("quotes") == 1
+        assert not redis.strings and not redis.sets
@@ -0,0 +1,221 @@
+"""
+TradeMate Institutional Risk Monitoring Test Suite
+==================================================
+Event-driven monitoring on the application loop: incremental exposure
+aggregates, dirty-client tracking on position updates and price ticks,
+and per-tick cost with thousands of clients
+"""
+
+import pytest
+import asyncio
+import random
+import time
+from unittest.mock import MagicMock, patch
+
+from app.institutional.institutional_risk_management import (
+    AlertType, InstitutionalRiskManager, Position, RiskLimit, RiskLimitType
+)
+from app.institutional.hni_portfolio_management import AssetClass
+
+
+SECTORS = ["Banking", "IT", "Energy", "FMCG"]
+
+
+def _manager() -> InstitutionalRiskManager:
+    manager = InstitutionalRiskManager()
+    manager.redis_client = MagicMock()  # no Redis server in the test environment
+    manager.monitoring_interval = 0
+    return manager
+
+
+def _position(client_id: str, symbol: str, quantity: int, price: float, sector: str = "IT") -> Position:
+    return Position(
+        client_id=client_id,
+        symbol=symbol,
+        quantity=quantity,
+        avg_price=price,
+        current_price=price,
+        market_value=quantity * price,
+        unrealized_pnl=0.0,
+        realized_pnl=0.0,
+        sector=sector,
+        asset_class=AssetClass.EQUITY
+    )
+
+
+async def _populate(manager: InstitutionalRiskManager, clients: int, symbols: int, per_client: int, seed: int = 3):
+    rng = random.Random(seed)
+    for c in range(clients):
+        client_id = f"INST{c:05d}"
+        for s in rng.sample(range(symbols), per_client):
+            await manager.update_position(_position(client_id, f"SYM{s:03d}", rng.randint(-200, 1000),
+                                                    100.0 + s, SECTORS[s % len(SECTORS)]))
+
+
+def _full_exposure(manager: InstitutionalRiskManager, client_id: str):
+    positions = manager.positions[client_id].values()
+    return sum(p.market_value for p in positions), sum(p.notional_value for p in positions)
+
+
+class TestIncrementalExposure:
+    """Running aggregates track a full recompute"""
+
+    @pytest.mark.asyncio
+    async def test_aggregates_follow_updates_ticks_and_removals(self):
+        manager = _manager()
+        await _populate(manager, clients=50, symbols=40, per_client=8)
+        rng = random.Random(9)
+
+        for _ in range(500):
+            await manager.update_market_price(f"SYM{rng.randrange(40):03d}", rng.uniform(50, 150))
+        await manager.update_position(_position("INST00001", "SYM999", 300, 42.0, "Energy"))
+        first = next(iter(manager.positions["INST00002"]))
+        assert await manager.remove_position("INST00002", first)
+
+        for client_id in manager.positions:
+            portfolio_value, total_exposure = _full_exposure(manager, client_id)
+            exposure = manager.exposures[client_id]
+            assert exposure.portfolio_value == pytest.approx(portfolio_value, rel=1e-9, abs=1e-6)
+            assert exposure.total_exposure == pytest.approx(total_exposure, rel=1e-9, abs=1e-6)
+
+        metrics = await manager.calculate_risk_metrics("INST00001")
+        sectors = {}
+        for p in manager.positions["INST00001"].values():
+            sectors[p.sector] = sectors.get(p.sector, 0) + p.market_value
+        assert metrics.sector_exposure == pytest.approx({k: v / metrics.portfolio_value for k, v in sectors.items()})
+
+    @pytest.mark.asyncio
+    async def test_price_tick_reprices_and_marks_only_holders(self):
+        manager = _manager()
+        await manager.update_position(_position("A", "TCS", 10, 3600.0))
+        await manager.update_position(_position("B", "TCS", -5, 3600.0))
+        await manager.update_position(_position("C", "INFY", 20, 1400.0))
+        manager.dirty_clients.clear()
+
+        assert await manager.update_market_price("TCS", 3700.0) == 2
+
+        assert manager.dirty_clients == {"A", "B"}
+        assert manager.positions["A"]["TCS"].unrealized_pnl == pytest.approx(1000.0)
+        assert manager.positions["B"]["TCS"].market_value == pytest.approx(-18500.0)
+        assert manager.exposures["B"].total_exposure == pytest.approx(18500.0)
+
+    @pytest.mark.asyncio
+    async def test_position_mutated_in_place_and_resubmitted(self):
+        manager = _manager()
+        position = _position("A", "TCS", 10, 3600.0, "IT")
+        await manager.update_position(position)
+        await manager.update_position(_position("A", "ITC", 100, 450.0, "FMCG"))
+
+        position.quantity = -25
+        position.current_price = 3650.0
+        position.market_value = position.quantity * position.current_price
+        position.sector = "Services"
+        await manager.update_position(position)
+
+        exposure = manager.exposures["A"]
+        portfolio_value, total_exposure = _full_exposure(manager, "A")
+        assert exposure.portfolio_value == pytest.approx(portfolio_value)
+        assert exposure.total_exposure == pytest.approx(total_exposure)
+        assert exposure.sector_values["IT"] == pytest.approx(0.0)
+        assert exposure.sector_values["Services"] == pytest.approx(-25 * 3650.0)
+
+        assert await manager.remove_position("A", "TCS")
+        assert exposure.portfolio_value == pytest.approx(100 * 450.0)
+        assert exposure.total_exposure == pytest.approx(100 * 450.0)
+
+
+class TestEventDrivenMonitoring:
+    """The monitor is a task on the caller's loop and only evaluates dirty clients"""
+
+    @pytest.mark.asyncio
+    async def test_monitor_runs_on_the_application_loop(self):
+        manager = _manager()
+        await manager.start_monitoring()
+        try:
+            assert isinstance(manager.monitoring_task, asyncio.Task)
+            assert manager.monitoring_task.get_loop() is asyncio.get_running_loop()
+        finally:
+            await manager.stop_monitoring()
+        assert manager.monitoring_task is None
+
+    @pytest.mark.asyncio
+    async def test_breach_raises_alert_for_dirty_client_only(self):
+        manager = _manager()
+        for client_id in ("A", "B"):
+            await manager.add_risk_limit(RiskLimit(f"L_{client_id}", client_id, RiskLimitType.PORTFOLIO_LIMIT, 1_000_000.0))
+            await manager.update_position(_position(client_id, "TCS", 100, 3600.0))
+        await manager.update_position(_position("B", "INFY", 100, 1400.0))
+
+        await manager.start_monitoring()
+        try:
+            await asyncio.sleep(0.01)
+            assert manager.dirty_clients == set()
+            assert manager.active_alerts == {}
+
+            with patch.object(manager, "_monitor_client_risk", wraps=manager._monitor_client_risk) as monitor:
+                await manager.update_market_price("INFY", 9000.0)  # B: 360k + 900k > 1M
+                await asyncio.sleep(0.01)
+
+            assert [call.args[0] for call in monitor.call_args_list] == ["B"]
+            alerts = await manager.get_client_alerts("B")
+            assert alerts and alerts[0].alert_type == AlertType.LIMIT_BREACHED
+            assert "A" not in manager.active_alerts
+        finally:
+            await manager.stop_monitoring()
+
+    @pytest.mark.asyncio
+    async def test_burst_of_ticks_coalesces_into_one_pass(self):
+        manager = _manager()
+        manager.monitoring_interval = 0.05
+        await manager.add_risk_limit(RiskLimit("L", "A", RiskLimitType.LEVERAGE_LIMIT, 10.0))
+        await manager.update_position(_position("A", "TCS", 100, 3600.0))
+
+        await manager.start_monitoring()
+        try:
+            await asyncio.sleep(0.01)
+            passes = manager.monitoring_stats["passes"]
+            for i in range(100):
+                await manager.update_market_price("TCS", 3600.0 + i)
+            await asyncio.sleep(0.15)
+
+            assert manager.monitoring_stats["passes"] == passes + 1
+            assert manager.dirty_clients == set()
+        finally:
+            await manager.stop_monitoring()
+
+
+class TestMonitoringBenchmark:
+    """Per-tick cost with 5,000 clients"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="risk_monitoring")
+    def test_dirty_pass_versus_full_pass(self, benchmark):
+        timings = {}
+
+        async def scenario():
+            manager = _manager()
+            await _populate(manager, clients=5000, symbols=500, per_client=10)
+            for client_id in list(manager.positions):
+                await manager.add_risk_limit(RiskLimit(f"L_{client_id}", client_id, RiskLimitType.CONCENTRATION_LIMIT, 0.9))
+            manager.dirty_clients.clear()
+
+            started = time.perf_counter()
+            await manager._monitor_all_clients()
+            timings['full'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            holders = await manager.update_market_price("SYM007", 120.0)
+            await manager._monitor_dirty_clients()
+            timings['tick'] = time.perf_counter() - started
+            return holders
+
+        holders = benchmark.pedantic(lambda: asyncio.run(scenario()), rounds=1, iterations=1)
+
+        benchmark.extra_info.update({
+            "clients": 5000,
+            "clients_per_tick": holders,
+            "full_pass_ms": timings['full'] * 1000,
+            "tick_pass_ms": timings['tick'] * 1000
+        })
+        assert 0 < holders < 500
+        assert timings['tick'] < timings['full'] / 5
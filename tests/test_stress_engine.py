@@ -0,0 +1,180 @@
+"""
+TradeMate Stress Scenario Engine Test Suite
+===========================================
+Scenarios as data: parity of the built-in set with per-holding loops,
+rate-duration and market-value tier shocks, file round trips, batched
+streaming over many books and a 500 scenario x 10,000 portfolio benchmark
+"""
+
+import pytest
+import random
+import time
+from collections import defaultdict
+
+from app.analytics.portfolio_analytics import (
+    DEFAULT_STRESS_SCENARIOS, PortfolioAnalyzer, PortfolioHolding, ShockScenario,
+    StressScenario, StressScenarioSet, StressTestEngine
+)
+
+SECTORS = ["Technology", "Healthcare", "Energy", "Financial Services", "Utilities", "Materials",
+           "Consumer Staples", "Real Estate", "Telecom"]
+ASSET_CLASSES = ["equity", "equity", "equity", "Debt", "commodity", "real_estate", "cash", "hybrid"]
+
+
+def _book(rng: random.Random, size: int) -> list:
+    return [
+        PortfolioHolding(f"SYM{rng.randrange(300):03d}", 10, 100.0, rng.uniform(1e4, 8e6), 1.0 / size,
+                         rng.choice(SECTORS), rng.choice(ASSET_CLASSES),
+                         beta=rng.choice([None, rng.uniform(0.5, 1.6)]), duration=rng.uniform(0, 9))
+        for _ in range(size)
+    ]
+
+
+def _reference(scenario: ShockScenario, holdings: list):
+    """Per-holding loop in the style of the original hard-coded scenarios"""
+    total_loss, worst, sectors = 0.0, [], defaultdict(float)
+    for h in holdings:
+        asset_class = h.asset_class.lower()
+        impact = scenario.asset_class_shocks.get(asset_class, scenario.default_asset_class_shock)
+        if scenario.beta_scaled and asset_class == "equity" and h.beta:
+            impact *= h.beta
+        impact += scenario.sector_shocks.get(h.sector, scenario.default_sector_shock)
+        impact -= (h.duration or 0.0) * scenario.rate_shock_bps / 10_000
+        for bound, shock in scenario.market_value_tiers:
+            if bound is None or h.market_value < bound:
+                impact += shock
+                break
+        loss = h.market_value * abs(impact) if impact < 0 else 0
+        total_loss += loss
+        worst.append((h.symbol, impact))
+        sectors[h.sector] += loss
+    worst.sort(key=lambda x: x[1])
+    return total_loss, worst[:5], dict(sectors)
+
+
+def _assert_matches(result, scenario, holdings):
+    loss, worst, sectors = _reference(scenario, holdings)
+    assert result.scenario == scenario.category and result.scenario_name == scenario.name
+    assert result.portfolio_loss == pytest.approx(loss, rel=1e-12)
+    assert result.portfolio_loss_pct == pytest.approx(loss / sum(h.market_value for h in holdings), rel=1e-12)
+    assert [s for s, _ in result.worst_performing_assets] == [s for s, _ in worst]
+    assert [i for _, i in result.worst_performing_assets] == pytest.approx([i for _, i in worst], rel=1e-12)
+    assert result.sector_impact == pytest.approx(sectors, rel=1e-12)
+    assert list(result.sector_impact) == list(sectors)
+
+
+class TestScenarioMatrix:
+    """Vectorized shocks agree with per-holding loops"""
+
+    def test_built_in_scenarios_match_loops(self):
+        rng = random.Random(1)
+        holdings = _book(rng, 25)
+
+        results = StressTestEngine().run(holdings)
+
+        assert [r.scenario for r in results] == [s.category for s in DEFAULT_STRESS_SCENARIOS]
+        for result, scenario in zip(results, DEFAULT_STRESS_SCENARIOS):
+            _assert_matches(result, scenario, holdings)
+
+    def test_rate_duration_and_value_tiers(self):
+        scenario = ShockScenario(
+            name="rates_up_200", category=StressScenario.INTEREST_RATE_SHOCK,
+            rate_shock_bps=200, market_value_tiers=[(1_000_000, -0.02), (None, -0.01)]
+        )
+        holdings = [
+            PortfolioHolding("GSEC", 1, 100.0, 500_000.0, 0.5, "Sovereign", "debt", duration=6.5),
+            PortfolioHolding("CASH", 1, 100.0, 2_000_000.0, 0.5, "Cash", "cash")
+        ]
+
+        impacts = StressTestEngine(StressScenarioSet([scenario])).impacts(holdings)
+
+        assert impacts.shape == (1, 2)
+        assert impacts[0].tolist() == pytest.approx([-0.13 - 0.02, -0.01])
+
+    def test_shock_matrices_are_reused_per_vocabulary(self):
+        scenario_set = StressScenarioSet.default()
+        engine = StressTestEngine(scenario_set)
+        holdings = _book(random.Random(2), 10)
+
+        engine.run(holdings)
+        cached = dict(scenario_set._matrix_cache)
+        engine.run(holdings)
+
+        assert all(scenario_set._matrix_cache[key] is matrix for key, matrix in cached.items())
+
+
+class TestScenarioFiles:
+    """Scenario sets load from and save to JSON"""
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "scenarios.json"
+        StressScenarioSet.default().to_file(path)
+
+        loaded = StressScenarioSet.from_file(path)
+
+        assert [s.to_dict() for s in loaded.scenarios] == [s.to_dict() for s in DEFAULT_STRESS_SCENARIOS]
+        holdings = _book(random.Random(3), 12)
+        assert StressTestEngine(loaded).run(holdings) == StressTestEngine().run(holdings)
+
+    @pytest.mark.asyncio
+    async def test_analyzer_uses_configured_file(self, tmp_path):
+        path = tmp_path / "house.json"
+        StressScenarioSet([ShockScenario("flat_minus_10", StressScenario.BLACK_SWAN, default_asset_class_shock=-0.1)]).to_file(path)
+        analyzer = PortfolioAnalyzer({**PortfolioAnalyzer()._default_config(), "stress_scenarios_path": str(path)})
+        holdings = _book(random.Random(4), 5)
+
+        results = await analyzer._run_stress_tests(holdings, {})
+
+        assert len(results) == 1 and results[0].portfolio_loss_pct == pytest.approx(0.1)
+
+
+class TestBookStreaming:
+    """Many books are stressed in batches of whole books"""
+
+    def test_stream_matches_single_book_runs(self):
+        rng = random.Random(5)
+        books = {f"BOOK{i:03d}": _book(rng, rng.randint(1, 15)) for i in range(23)}
+        books["EMPTY"] = []
+        engine = StressTestEngine(batch_size=4)
+
+        batches = list(engine.stream(books))
+
+        assert [len(batch) for batch in batches] == [4] * 6
+        streamed = dict(pair for batch in batches for pair in batch)
+        assert streamed["EMPTY"] == []
+        for book_id, holdings in books.items():
+            if holdings:
+                assert streamed[book_id] == engine.run(holdings)
+
+
+class TestStressBenchmark:
+    """Hundreds of scenarios across thousands of books"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="stress_testing")
+    def test_500_scenarios_on_10000_portfolios(self, benchmark):
+        rng = random.Random(6)
+        scenarios = StressScenarioSet([
+            ShockScenario(
+                name=f"HOUSE_{i:03d}", category=StressScenario.BLACK_SWAN,
+                asset_class_shocks={a.lower(): rng.uniform(-0.5, 0.1) for a in ASSET_CLASSES},
+                default_asset_class_shock=-0.1, beta_scaled=i % 2 == 0,
+                sector_shocks={s: rng.uniform(-0.3, 0.1) for s in SECTORS},
+                rate_shock_bps=rng.choice([0, 100, 300]),
+                market_value_tiers=[(1e6, -0.1), (None, -0.02)] if i % 10 == 0 else []
+            )
+            for i in range(500)
+        ])
+        books = {f"PF{i:05d}": _book(rng, 12) for i in range(10_000)}
+        engine = StressTestEngine(scenarios)
+
+        def run():
+            started = time.perf_counter()
+            count = sum(len(results) for batch in engine.stream(books) for _, results in batch)
+            return count, time.perf_counter() - started
+
+        count, elapsed = benchmark.pedantic(run, rounds=1, iterations=1)
+
+        benchmark.extra_info.update({"scenarios": 500, "portfolios": 10_000, "results": count, "seconds": elapsed})
+        assert count == 5_000_000
+        assert elapsed < 60
@@ -0,0 +1,187 @@
+"""
+TradeMate Vectorized VaR Test Suite
+===================================
+VolatilityCalculator rolling price buffers, cached return matrices kept
+across intraday marks, VaR / expected shortfall / component VaR from one scenario P&L vector
+and the batch API across many client books
+"""
+
+import pytest
+import time
+import numpy as np
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from app.institutional.covariance_store import CovarianceStore
+from app.institutional.institutional_risk_management import (
+    InstitutionalRiskManager, Position, VolatilityCalculator
+)
+from app.institutional.hni_portfolio_management import AssetClass
+
+
+def _calculator(symbols: int, days: int, seed: int = 5, lookback_days: int = 252) -> VolatilityCalculator:
+    rng = np.random.default_rng(seed)
+    calculator = VolatilityCalculator(lookback_days=lookback_days)
+    paths = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, symbols)), axis=0))
+    now = datetime.now()
+    for row in paths:
+        for s, price in enumerate(row):
+            calculator.update_price(f"SYM{s:03d}", float(price), now)
+    return calculator
+
+
+def _position(symbol: str, market_value: float, client_id: str = "INST001") -> Position:
+    return Position(client_id, symbol, 100, market_value / 100, market_value / 100, market_value,
+                    0.0, 0.0, "IT", AssetClass.EQUITY)
+
+
+def _reference_var(calculator: VolatilityCalculator, positions, confidence=0.05, days=1) -> float:
+    """Scenario-by-scenario loop over the same window"""
+    window = min(calculator.history_length(p.symbol) for p in positions)
+    total = sum(p.market_value for p in positions)
+    returns = []
+    for i in range(window - 1):
+        portfolio_return = 0.0
+        for p in positions:
+            prices = calculator.prices(p.symbol)[-window:]
+            portfolio_return += (p.market_value / total) * (prices[i + 1] - prices[i]) / prices[i]
+        returns.append(portfolio_return)
+    return abs(np.percentile(returns, confidence * 100) * total * np.sqrt(days))
+
+
+class TestRollingPrices:
+    """Preallocated buffers keep the latest lookback window"""
+
+    def test_buffer_wraps_and_keeps_latest_window(self):
+        calculator = VolatilityCalculator(lookback_days=50)
+        for i in range(237):
+            calculator.update_price("TCS", float(i), datetime.now())
+
+        np.testing.assert_array_equal(calculator.prices("TCS"), np.arange(187, 237, dtype=float))
+        assert calculator.history_length("TCS") == 50
+        assert len(calculator.prices("INFY")) == 0
+
+    def test_volatility_matches_log_return_std(self):
+        calculator = _calculator(symbols=1, days=300)
+        prices = calculator.prices("SYM000")[-30:]
+
+        expected = np.std(np.diff(np.log(prices))) * np.sqrt(252)
+        assert calculator.calculate_volatility("SYM000", days=30) == pytest.approx(expected)
+        assert calculator.calculate_volatility("MISSING") == 0.0
+
+
+class TestPortfolioVaR:
+    """Single-book VaR and its decomposition"""
+
+    @pytest.mark.parametrize("confidence, days", [(0.05, 1), (0.01, 5)])
+    def test_var_matches_scenario_loop(self, confidence, days):
+        calculator = _calculator(symbols=8, days=400)
+        positions = [_position(f"SYM{s:03d}", 10_000.0 * (s + 1)) for s in range(8)]
+
+        assert calculator.calculate_var(positions, confidence, days) == pytest.approx(
+            _reference_var(calculator, positions, confidence, days), rel=1e-9)
+
+    def test_components_sum_to_var_and_shortfall_exceeds_it(self):
+        calculator = _calculator(symbols=6, days=300)
+        positions = [_position(f"SYM{s:03d}", 50_000.0) for s in range(6)] + [_position("SYM000", 25_000.0)]
+
+        result = calculator.calculate_portfolio_var(positions, days=5)
+
+        assert set(result.component_var) == {f"SYM{s:03d}" for s in range(6)}
+        assert sum(result.component_var.values()) == pytest.approx(result.var, rel=1e-9)
+        assert result.component_var["SYM000"] == pytest.approx(result.marginal_var["SYM000"] * 75_000.0)
+        assert result.expected_shortfall >= result.var > 0
+        assert result.observations == 251
+
+    def test_short_history_and_unknown_symbols(self):
+        calculator = _calculator(symbols=2, days=20)
+
+        assert calculator.calculate_var([_position("SYM000", 1e5)]) == 0.0
+        assert calculator.calculate_var([_position("UNKNOWN", 1e5)]) == 0.0
+        assert calculator.calculate_var([]) == 0.0
+
+    def test_returns_matrix_is_cached_until_a_member_ticks(self):
+        calculator = _calculator(symbols=3, days=100)
+        universe = ("SYM000", "SYM001")
+
+        first = calculator.returns_matrix(universe)
+        assert calculator.returns_matrix(universe) is first
+
+        calculator.update_price("SYM002", 100.0, datetime.now())
+        assert calculator.returns_matrix(universe) is first
+
+        calculator.update_price("SYM001", 100.0, datetime.now())
+        refreshed = calculator.returns_matrix(universe)
+        assert refreshed is not first
+        assert refreshed[-1, 1] == pytest.approx(100.0 / calculator.prices("SYM001")[-2] - 1)
+
+    @pytest.mark.asyncio
+    async def test_intraday_marks_keep_the_matrix_until_the_close(self):
+        manager = InstitutionalRiskManager()
+        manager.redis_client = MagicMock()
+        manager.volatility_calculator = calculator = _calculator(symbols=2, days=100)
+        calculator.covariance_store = CovarianceStore()
+        universe = ("SYM000", "SYM001")
+        await manager.update_position(_position("SYM001", 1e5))
+        first = calculator.returns_matrix(universe)
+        last_close = calculator.prices("SYM001")[-1]
+
+        for i in range(50):
+            await manager.update_market_price("SYM001", 100.0 + i, datetime(2026, 3, 2, 10, i))
+        assert calculator.returns_matrix(universe) is first
+        assert calculator.prices("SYM001")[-1] == last_close
+
+        manager.close_trading_day()
+        refreshed = calculator.returns_matrix(universe)
+        assert refreshed is not first and calculator.history_length("SYM001") == 101
+        assert refreshed[-1, 1] == pytest.approx(149.0 / last_close - 1)
+
+
+class TestBatchVaR:
+    """Many books in one matrix product"""
+
+    def test_batch_matches_per_book_var(self):
+        calculator = _calculator(symbols=40, days=300)
+        rng = np.random.default_rng(2)
+        books = {
+            f"INST{b:03d}": [_position(f"SYM{s:03d}", float(rng.uniform(1e4, 1e6)))
+                             for s in rng.choice(40, size=5, replace=False)]
+            for b in range(50)
+        }
+        books["EMPTY"] = []
+
+        results = calculator.calculate_var_batch(books, confidence=0.05, days=5)
+
+        for book_id, positions in books.items():
+            single = calculator.calculate_portfolio_var(positions, days=5)
+            expected_var = single.var if single else 0.0
+            expected_es = single.expected_shortfall if single else 0.0
+            assert results[book_id]['var'] == pytest.approx(expected_var, rel=1e-9)
+            assert results[book_id]['expected_shortfall'] == pytest.approx(expected_es, rel=1e-9)
+
+
+class TestVaRBenchmark:
+    """Batch VaR for thousands of books against a per-book loop"""
+
+    @pytest.mark.performance
+    @pytest.mark.benchmark(group="var")
+    def test_batch_var_for_2000_books(self, benchmark):
+        calculator = _calculator(symbols=500, days=252)
+        rng = np.random.default_rng(4)
+        books = {
+            f"INST{b:05d}": [_position(f"SYM{s:03d}", float(rng.uniform(1e4, 1e6)))
+                             for s in rng.choice(500, size=10, replace=False)]
+            for b in range(2000)
+        }
+
+        started = time.perf_counter()
+        looped = {book_id: calculator.calculate_var(positions) for book_id, positions in books.items()}
+        loop_seconds = time.perf_counter() - started
+
+        results = benchmark.pedantic(lambda: calculator.calculate_var_batch(books), rounds=1, iterations=1)
+
+        benchmark.extra_info.update({
+            "books": len(books),
+            "per_book_loop_ms": loop_seconds * 1000
+        })
+        assert all(results[b]['var'] == pytest.approx(looped[b], rel=1e-9) for b in books)